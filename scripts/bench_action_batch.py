@@ -0,0 +1,104 @@
+"""对比逐个调用 ActionProcessor.process 与 process_batch 的动作吞吐的基准脚本。"""  # 模块 docstring
+
+from __future__ import annotations  # 启用前向引用,便于类型标注
+
+import argparse  # 导入 argparse,处理命令行参数
+import logging  # 导入 logging,输出结果
+import sys  # 导入 sys,用于返回值与路径调整
+import tempfile  # 导入 tempfile,每轮使用独立数据目录
+import time  # 导入 time,用于计时
+from collections.abc import Iterable  # 导入 Iterable,用于类型标注
+from pathlib import Path  # 导入 Path,统一文件路径
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+sys.path.insert(0, str(PROJECT_ROOT / "src"))  # 确保可以直接导入 miniWorld 包
+
+from miniWorld.config import get_settings  # noqa: E402
+from miniWorld.services.generator import QuestGenerator  # noqa: E402
+from miniWorld.world.actions import ActionProcessor, ActionRequest  # noqa: E402
+from miniWorld.world.quests import QuestProgressor  # noqa: E402
+from miniWorld.world.store import WorldStore  # noqa: E402
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:  # 定义参数解析函数
+    """解析命令行参数并返回命名空间。"""  # 函数 docstring,说明用途
+
+    parser = argparse.ArgumentParser(description="miniWorld 批量动作吞吐基准")  # 创建解析器
+    parser.add_argument("--actions", type=int, default=500, help="动作数量")  # 动作数
+    parser.add_argument("--chunks", type=int, default=4, help="动作分散到的区块数量")  # 区块数
+    parser.add_argument(
+        "--write-behind", action="store_true", help="使用延迟写回模式(默认同步写入)"
+    )  # 写回模式
+    return parser.parse_args(list(argv) if argv is not None else None)  # 返回解析结果
+
+
+def build_requests(count: int, chunks: int) -> list[ActionRequest]:  # 定义请求构建函数
+    """生成勇者铺路的动作序列,依次铺满各区块的格子。"""  # 函数 docstring,说明用途
+
+    size = get_settings().chunk_size  # 读取区块边长
+    requests = []  # 初始化列表
+    for index in range(count):  # 遍历动作
+        cell = index // chunks  # 区块内的格子序号
+        requests.append(  # 追加请求
+            ActionRequest(  # 构造请求
+                actor="勇者",  # 无配额与冷却限制的角色
+                type="PLACE_TILE",  # 铺设地块
+                chunk={"cx": index % chunks, "cy": 0},  # 目标区块
+                pos={"x": cell % size, "y": (cell // size) % size},  # 目标格子
+                payload={"tile": "ROAD"},  # 铺设石路
+                client_ts=1_000_000 + index,  # 时间戳
+            )  # 结束构造
+        )  # 结束追加
+    return requests  # 返回请求列表
+
+
+def run_round(requests: list[ActionRequest], batched: bool, write_behind: bool) -> float:  # 单轮
+    """在独立数据目录中执行全部动作并返回耗时(秒)。"""  # 函数 docstring,说明用途
+
+    settings = get_settings()  # 加载配置
+    with tempfile.TemporaryDirectory() as tmp:  # 使用独立数据目录
+        store = WorldStore(  # 创建世界存储
+            root=Path(tmp),  # 临时目录
+            chunk_size=settings.chunk_size,  # 区块尺寸
+            default_world_state=settings.world_state,  # 默认世界状态
+            tick_tree_grow_steps=settings.tick_tree_grow_steps,  # 成长步数
+            write_behind=write_behind,  # 写回模式
+        )  # 结束存储初始化
+        progressor = QuestProgressor(store)  # 创建任务推进器
+        QuestGenerator(progressor=progressor, settings=settings).ensure_seed_quests(
+            store.load_world_state()
+        )  # 写入初始任务,使任务推进路径参与计时
+        processor = ActionProcessor(  # 创建动作处理器
+            store=store,  # 世界存储
+            settings=settings,  # 配置
+            permissions=settings.role_permissions,  # 角色权限
+            quest_progressor=progressor,  # 任务推进器
+        )  # 结束创建
+        started = time.perf_counter()  # 记录开始时间
+        if batched:  # 批量模式
+            processor.process_batch(requests)  # 整批执行
+        else:  # 逐个模式
+            for request in requests:  # 遍历动作
+                processor.process(request)  # 单独执行
+        store.close()  # 写回剩余数据,计入耗时
+        return time.perf_counter() - started  # 返回耗时
+
+
+def main(argv: Iterable[str] | None = None) -> int:  # 定义主函数
+    """依次运行逐个与批量两轮基准并输出吞吐对比。"""  # 函数 docstring,说明用途
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")  # 初始化日志
+    args = parse_args(argv)  # 解析参数
+    requests = build_requests(args.actions, args.chunks)  # 构建请求
+    single = run_round(requests, batched=False, write_behind=args.write_behind)  # 逐个执行
+    batch = run_round(requests, batched=True, write_behind=args.write_behind)  # 批量执行
+    for label, elapsed in (("逐个提交", single), ("批量提交", batch)):  # 遍历结果
+        logger.info("%s:%.3f s,%.0f 动作/s", label, elapsed, args.actions / elapsed)  # 输出结果
+    logger.info("批量提交加速 %.1f 倍", single / batch)  # 输出加速比
+    return 0  # 返回成功码
+
+
+if __name__ == "__main__":  # 脚本入口
+    raise SystemExit(main())  # 执行主函数
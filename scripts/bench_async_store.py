@@ -0,0 +1,132 @@
+"""对比事件循环内直接读写存储与 AsyncWorldStore 线程池卸载的基准脚本。"""  # 模块 docstring
+
+from __future__ import annotations  # 启用前向引用,便于类型标注
+
+import argparse  # 导入 argparse,处理命令行参数
+import asyncio  # 导入 asyncio,模拟并发请求
+import logging  # 导入 logging,输出结果
+import statistics  # 导入 statistics,计算分位数
+import sys  # 导入 sys,用于返回值与路径调整
+import tempfile  # 导入 tempfile,每轮使用独立数据目录
+import time  # 导入 time,计时与模拟慢速磁盘
+from collections.abc import Iterable  # 导入 Iterable,用于类型标注
+from pathlib import Path  # 导入 Path,统一文件路径
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+sys.path.insert(0, str(PROJECT_ROOT / "src"))  # 确保可以直接导入 miniWorld 包
+
+from miniWorld.config import get_settings  # noqa: E402
+from miniWorld.world.async_store import AsyncWorldStore  # noqa: E402
+from miniWorld.world.chunk import TileCell  # noqa: E402
+from miniWorld.world.store import WorldStore  # noqa: E402
+from miniWorld.world.tiles import TileType  # noqa: E402
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:  # 定义参数解析函数
+    """解析命令行参数并返回命名空间。"""  # 函数 docstring,说明用途
+
+    parser = argparse.ArgumentParser(description="miniWorld 异步存储访问基准")  # 创建解析器
+    parser.add_argument("--requests", type=int, default=400, help="每轮请求总数")  # 请求数
+    parser.add_argument("--concurrency", type=int, default=32, help="同时进行的请求数")  # 并发
+    parser.add_argument("--chunks", type=int, default=16, help="请求分散到的区块数量")  # 区块数
+    parser.add_argument("--workers", type=int, default=8, help="存储线程池大小")  # 线程数
+    parser.add_argument(
+        "--write-delay-ms", type=float, default=2.0, help="每次写入额外的模拟磁盘延迟"
+    )  # 模拟慢速磁盘
+    return parser.parse_args(list(argv) if argv is not None else None)  # 返回解析结果
+
+
+def edit_cell(store: WorldStore, cx: int, cy: int, index: int, delay: float) -> None:  # 定义编辑
+    """模拟一次动作:读取区块、修改一个格子并同步写回。"""  # 函数 docstring,说明用途
+
+    chunk = store.load_chunk(cx=cx, cy=cy)  # 加载区块
+    tile = TileType.ROAD if index % 2 else TileType.WATER  # 交替瓦片,保证每次都有修改
+    chunk.apply_cell(index % chunk.size, 0, TileCell(base=tile))  # 修改格子
+    store.save_chunk(chunk)  # 同步写回
+    if delay:  # 需要模拟慢速磁盘
+        time.sleep(delay)  # 阻塞当前线程
+
+
+async def run_round(args: argparse.Namespace, offload: bool) -> dict[str, float]:  # 定义单轮基准
+    """并发发出请求,统计请求延迟、吞吐与事件循环被阻塞的时长。"""  # 函数 docstring
+
+    settings = get_settings()  # 加载配置
+    delay = args.write_delay_ms / 1000  # 模拟延迟秒数
+    with tempfile.TemporaryDirectory() as tmp:  # 使用独立数据目录
+        store = WorldStore(  # 创建同步写入的世界存储
+            root=Path(tmp),  # 临时目录
+            chunk_size=settings.chunk_size,  # 区块尺寸
+            default_world_state=settings.world_state,  # 默认世界状态
+            tick_tree_grow_steps=settings.tick_tree_grow_steps,  # 成长步数
+        )  # 结束存储初始化
+        async_store = AsyncWorldStore(store, max_workers=args.workers)  # 创建异步包装
+        gate = asyncio.Semaphore(args.concurrency)  # 限制并发
+        latencies: list[float] = []  # 请求延迟
+        lags: list[float] = []  # 事件循环延迟
+        done = asyncio.Event()  # 请求结束信号
+
+        async def request(index: int) -> None:  # 定义单个请求
+            """执行一次编辑并记录从本轮开始到完成的延迟。"""  # 函数 docstring,说明用途
+
+            cx, cy = index % args.chunks, 0  # 分散到各区块
+            async with gate:  # 占用并发名额
+                if offload:  # 线程池卸载
+                    async with async_store.chunk_locked(cx, cy):  # 串行化同区块编辑
+                        await async_store.run(edit_cell, store, cx, cy, index, delay)  # 卸载
+                else:  # 在事件循环中直接执行
+                    edit_cell(store, cx, cy, index, delay)  # 阻塞事件循环
+                latencies.append(time.perf_counter() - started)  # 全部请求同时到达,延迟含排队
+
+        async def heartbeat() -> None:  # 定义事件循环探针
+            """每毫秒唤醒一次,记录实际唤醒延迟,相当于 /health 等轻量请求的排队时间。"""  # docstring
+
+            while not done.is_set():  # 直到请求结束
+                expected = time.perf_counter() + 0.001  # 期望唤醒时间
+                await asyncio.sleep(0.001)  # 让出事件循环
+                lags.append(max(0.0, time.perf_counter() - expected))  # 记录延迟
+
+        probe = asyncio.create_task(heartbeat())  # 启动探针
+        started = time.perf_counter()  # 记录开始时间
+        await asyncio.gather(*(request(index) for index in range(args.requests)))  # 并发请求
+        elapsed = time.perf_counter() - started  # 计算总耗时
+        done.set()  # 通知探针退出
+        await probe  # 等待探针结束
+        async_store.shutdown()  # 关闭线程池
+    return {  # 返回统计
+        "p50_ms": _percentile(latencies, 50) * 1000,  # 请求延迟中位数
+        "p99_ms": _percentile(latencies, 99) * 1000,  # 请求延迟 p99
+        "throughput": args.requests / elapsed,  # 每秒请求数
+        "loop_lag_p99_ms": _percentile(lags, 99) * 1000,  # 事件循环延迟 p99
+    }  # 结束字典
+
+
+def _percentile(values: list[float], percent: int) -> float:  # 定义分位数工具
+    """返回指定百分位,样本不足时返回最大值或零。"""  # 函数 docstring,说明用途
+
+    if len(values) < 2:  # 样本不足
+        return max(values, default=0.0)  # 返回最大值
+    return statistics.quantiles(values, n=100)[percent - 1]  # 返回分位数
+
+
+def main(argv: Iterable[str] | None = None) -> int:  # 定义主函数
+    """依次运行阻塞与卸载两轮基准并输出对比。"""  # 函数 docstring,说明用途
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")  # 初始化日志
+    args = parse_args(argv)  # 解析参数
+    for label, offload in (("事件循环内阻塞", False), ("线程池卸载", True)):  # 遍历两种模式
+        result = asyncio.run(run_round(args, offload))  # 运行一轮
+        logger.info(  # 输出结果
+            "%s:p50 %.2f ms,p99 %.2f ms,吞吐 %.0f req/s,事件循环延迟 p99 %.2f ms",  # 模板
+            label,  # 模式名称
+            result["p50_ms"],  # 中位数
+            result["p99_ms"],  # p99
+            result["throughput"],  # 吞吐
+            result["loop_lag_p99_ms"],  # 事件循环延迟
+        )  # 结束日志
+    return 0  # 返回成功码
+
+
+if __name__ == "__main__":  # 脚本入口
+    raise SystemExit(main())  # 执行主函数
@@ -0,0 +1,103 @@
+"""对比逐格模型拷贝/导出与编码级 CellChange 记录的单格编辑开销的微基准脚本。"""  # 模块 docstring
+
+from __future__ import annotations  # 启用前向引用,便于类型标注
+
+import argparse  # 导入 argparse,处理命令行参数
+import logging  # 导入 logging,输出结果
+import sys  # 导入 sys,用于返回值与路径调整
+import time  # 导入 time,用于计时
+from collections.abc import Callable, Iterable  # 导入抽象类型,用于类型标注
+from pathlib import Path  # 导入 Path,统一文件路径
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+sys.path.insert(0, str(PROJECT_ROOT / "src"))  # 确保可以直接导入 miniWorld 包
+
+from miniWorld.world.actions import ActionChange, CellChange, ChunkCoord, Position  # noqa: E402
+from miniWorld.world.chunk import Chunk  # noqa: E402
+from miniWorld.world.tiles import TileType, tile_to_code  # noqa: E402
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:  # 定义参数解析函数
+    """解析命令行参数并返回命名空间。"""  # 函数 docstring,说明用途
+
+    parser = argparse.ArgumentParser(description="miniWorld 单格变更记录微基准")  # 创建解析器
+    parser.add_argument("--edits", type=int, default=50_000, help="每轮编辑的格子数")  # 编辑数
+    parser.add_argument("--rounds", type=int, default=5, help="重复轮数,取最快一轮")  # 轮数
+    return parser.parse_args(list(argv) if argv is not None else None)  # 返回解析结果
+
+
+def edit_with_models(chunk: Chunk, cells: list[tuple[int, int]]) -> list[ActionChange]:  # 旧路径
+    """按原实现逐格 model_dump、深拷贝、再导出并构造 ActionChange 模型。"""  # 函数 docstring
+
+    coord = ChunkCoord(cx=chunk.cx, cy=chunk.cy)  # 区块坐标
+    changes = []  # 初始化变更列表
+    for x, y in cells:  # 遍历格子
+        cell = chunk.cell_at(x, y)  # 读取格子
+        before = cell.model_dump()  # 导出修改前数据
+        new_cell = cell.model_copy(deep=True)  # 拷贝为可修改格子
+        new_cell.base = TileType.ROAD if cell.base == TileType.GRASS else TileType.GRASS  # 修改
+        changes.append(  # 记录变更
+            ActionChange(  # 构造公开模型
+                chunk=coord,  # 区块坐标
+                pos=Position(x=x, y=y),  # 格子坐标
+                before=before,  # 修改前
+                after=new_cell.model_dump(),  # 修改后
+            )  # 结束构造
+        )  # 结束追加
+        chunk.apply_cell(x, y, new_cell)  # 写回区块
+    return changes  # 返回变更
+
+
+def edit_with_codes(chunk: Chunk, cells: list[tuple[int, int]]) -> list[CellChange]:  # 新路径
+    """批量读取平面编码、计算新编码并记录 CellChange,不构造任何 Pydantic 模型。"""  # 函数 docstring
+
+    grass, road = tile_to_code(TileType.GRASS), tile_to_code(TileType.ROAD)  # 瓦片编码
+    cx, cy = chunk.cx, chunk.cy  # 区块坐标
+    changes = []  # 初始化变更列表
+    for (x, y), before in zip(cells, chunk.read_codes(cells), strict=True):  # 遍历格子
+        after = (road if before[0] == grass else grass, *before[1:])  # 计算新编码
+        changes.append(CellChange(cx, cy, x, y, before, after))  # 记录变更
+    chunk.write_codes((change.x, change.y, change.after) for change in changes)  # 整笔写回
+    return changes  # 返回变更
+
+
+def best_of(rounds: int, func: Callable[[], object]) -> float:  # 定义计时工具
+    """执行多轮并返回最快一轮的耗时(秒)。"""  # 函数 docstring,说明用途
+
+    best = float("inf")  # 初始化最优值
+    for _ in range(rounds):  # 重复执行
+        started = time.perf_counter()  # 记录开始时间
+        func()  # 执行被测函数
+        best = min(best, time.perf_counter() - started)  # 更新最优值
+    return best  # 返回耗时
+
+
+def main(argv: Iterable[str] | None = None) -> int:  # 定义主函数
+    """分别测量旧路径、新路径以及新路径加接口边界转换的单格耗时。"""  # 函数 docstring,说明用途
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")  # 初始化日志
+    args = parse_args(argv)  # 解析参数
+    chunk = Chunk.create_default(cx=0, cy=0)  # 创建区块
+    cells = [
+        (index % chunk.size, (index // chunk.size) % chunk.size) for index in range(args.edits)
+    ]
+    models = best_of(args.rounds, lambda: edit_with_models(chunk, cells))  # 旧路径耗时
+    codes = best_of(args.rounds, lambda: edit_with_codes(chunk, cells))  # 新路径耗时
+    boundary = best_of(  # 新路径并在接口边界转换为 ActionChange
+        args.rounds,  # 轮数
+        lambda: [change.to_action_change() for change in edit_with_codes(chunk, cells)],  # 转换
+    )  # 结束计时
+    for label, elapsed in (  # 遍历结果
+        ("模型拷贝与导出", models),  # 旧路径
+        ("编码级 CellChange", codes),  # 新路径
+        ("CellChange + 边界转换", boundary),  # 新路径加转换
+    ):  # 结束元组
+        logger.info("%s:%.2f µs/格", label, elapsed / args.edits * 1e6)  # 输出单格耗时
+    logger.info("内部路径加速 %.1f 倍,含边界转换加速 %.1f 倍", models / codes, models / boundary)
+    return 0  # 返回成功码
+
+
+if __name__ == "__main__":  # 脚本入口
+    raise SystemExit(main())  # 执行主函数
@@ -0,0 +1,158 @@
+"""对比逐动作全量解析任务与常驻内存索引推进任务的开销的基准脚本。"""  # 模块 docstring
+
+from __future__ import annotations  # 启用前向引用,便于类型标注
+
+import argparse  # 导入 argparse,处理命令行参数
+import logging  # 导入 logging,输出结果
+import random  # 导入 random,生成任务分布
+import sys  # 导入 sys,用于返回值与路径调整
+import tempfile  # 导入 tempfile,使用独立数据目录
+import time  # 导入 time,用于计时
+from collections.abc import Iterable  # 导入 Iterable,用于类型标注
+from pathlib import Path  # 导入 Path,统一文件路径
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+sys.path.insert(0, str(PROJECT_ROOT / "src"))  # 确保可以直接导入 miniWorld 包
+
+from miniWorld.config import get_settings  # noqa: E402
+from miniWorld.world.actions import ActionRequest, CellChange  # noqa: E402
+from miniWorld.world.quests import Quest, QuestProgressor, QuestStatus  # noqa: E402
+from miniWorld.world.store import WorldStore  # noqa: E402
+from miniWorld.world.tiles import TileType, tile_to_code  # noqa: E402
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:  # 定义参数解析函数
+    """解析命令行参数并返回命名空间。"""  # 函数 docstring,说明用途
+
+    parser = argparse.ArgumentParser(description="miniWorld 任务推进基准")  # 创建解析器
+    parser.add_argument("--quests", type=int, default=10_000, help="活跃任务数量")  # 任务数
+    parser.add_argument("--actions", type=int, default=200, help="计时的动作数量")  # 动作数
+    parser.add_argument("--chunks", type=int, default=16, help="任务分布的区块边数")  # 区块边数
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")  # 随机种子
+    return parser.parse_args(list(argv) if argv is not None else None)  # 返回解析结果
+
+
+def build_quests(count: int, chunks: int, size: int, rng: random.Random) -> list[dict]:  # 任务
+    """生成分散在 chunks x chunks 个区块中的铺路任务,目标次数足够大以保持活跃。"""
+
+    quests = []  # 初始化列表
+    for index in range(count):  # 遍历任务
+        x0, y0 = rng.randrange(size - 4), rng.randrange(size - 4)  # 区域左上角
+        quests.append(  # 追加任务
+            {  # 任务字典
+                "id": f"bench-{index}",  # 任务 ID
+                "title": "铺路",  # 标题
+                "desc": "在指定区域铺设石路",  # 描述
+                "giver": "村长",  # 发布者
+                "requirements": [  # 需求列表
+                    {  # 单个需求
+                        "action_type": "PLACE_TILE",  # 动作类型
+                        "target_tile": "ROAD",  # 目标瓦片
+                        "chunk": {"cx": rng.randrange(chunks), "cy": rng.randrange(chunks)},
+                        "x_range": (x0, x0 + 4),  # X 范围
+                        "y_range": (y0, y0 + 4),  # Y 范围
+                        "target_count": 1_000_000,  # 目标次数
+                    }  # 结束需求
+                ],  # 结束需求列表
+                "created_at": 0,  # 创建时间
+                "updated_at": 0,  # 更新时间
+            }  # 结束任务
+        )  # 结束追加
+    return quests  # 返回任务
+
+
+def build_events(  # 定义动作构建函数
+    count: int, chunks: int, size: int, rng: random.Random
+) -> list[tuple[ActionRequest, list[CellChange]]]:  # 返回动作与变更
+    """生成随机格子上的铺路动作及其单格变更。"""  # 函数 docstring,说明用途
+
+    grass, road = tile_to_code(TileType.GRASS), tile_to_code(TileType.ROAD)  # 瓦片编码
+    events = []  # 初始化列表
+    for index in range(count):  # 遍历动作
+        cx, cy = rng.randrange(chunks), rng.randrange(chunks)  # 目标区块
+        x, y = rng.randrange(size), rng.randrange(size)  # 目标格子
+        request = ActionRequest(  # 构造请求
+            actor="勇者",  # 角色
+            type="PLACE_TILE",  # 动作类型
+            chunk={"cx": cx, "cy": cy},  # 区块
+            pos={"x": x, "y": y},  # 格子
+            payload={"tile": "ROAD"},  # 铺设石路
+            client_ts=1_000_000 + index,  # 时间戳
+        )  # 结束构造
+        change = CellChange(cx, cy, x, y, (grass, 0, 0, 0), (road, 0, 0, 0))  # 单格变更
+        events.append((request, [change]))  # 追加动作
+    return events  # 返回动作
+
+
+def legacy_progress(  # 定义旧实现
+    store: WorldStore, request: ActionRequest, changes: list[CellChange]
+) -> None:  # 方法返回 None
+    """按旧实现逐动作全量解析任务、遍历全部需求并整表写回。"""  # 函数 docstring
+
+    quests = [Quest.model_validate(item) for item in store.load_quests_raw()]  # 全量解析
+    updated = False  # 标记是否更新
+    for quest in quests:  # 遍历任务
+        if quest.status == QuestStatus.DONE:  # 跳过已完成
+            continue  # 继续
+        for requirement in quest.requirements:  # 遍历需求
+            for change in changes:  # 遍历变更
+                if requirement.matches(change, request.type) and requirement.apply_change(change):
+                    updated = True  # 标记更新
+    if updated:  # 有更新时整表写回
+        store.save_quests_raw([quest.model_dump(mode="json") for quest in quests])  # 写回
+
+
+def make_store(root: Path, quests: list[dict]) -> WorldStore:  # 定义存储构建函数
+    """在临时目录中创建延迟写回的存储并写入任务,计时只覆盖内存中的推进路径。"""
+
+    settings = get_settings()  # 加载配置
+    store = WorldStore(  # 创建世界存储
+        root=root,  # 数据目录
+        chunk_size=settings.chunk_size,  # 区块尺寸
+        default_world_state=settings.world_state,  # 默认世界状态
+        tick_tree_grow_steps=settings.tick_tree_grow_steps,  # 成长步数
+        write_behind=True,  # 延迟写回
+    )  # 结束存储初始化
+    store.save_quests_raw(quests)  # 写入任务
+    return store  # 返回存储
+
+
+def main(argv: Iterable[str] | None = None) -> int:  # 定义主函数
+    """分别测量旧实现与索引实现的单动作任务推进耗时。"""  # 函数 docstring,说明用途
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")  # 初始化日志
+    args = parse_args(argv)  # 解析参数
+    size = get_settings().chunk_size  # 区块边长
+    rng = random.Random(args.seed)  # 随机数生成器
+    quests = build_quests(args.quests, args.chunks, size, rng)  # 生成任务
+    events = build_events(args.actions, args.chunks, size, rng)  # 生成动作
+    with tempfile.TemporaryDirectory() as tmp:  # 使用独立数据目录
+        root = Path(tmp)  # 数据目录
+        store = make_store(root / "legacy", [dict(item) for item in quests])  # 旧实现存储
+        legacy_events = events[: max(1, args.actions // 20)]  # 旧实现很慢,只取部分动作
+        started = time.perf_counter()  # 记录开始时间
+        for request, changes in legacy_events:  # 遍历动作
+            legacy_progress(store, request, changes)  # 旧实现推进
+        legacy = (time.perf_counter() - started) / len(legacy_events)  # 单动作耗时
+        store.close()  # 关闭存储
+
+        store = make_store(root / "indexed", [dict(item) for item in quests])  # 新实现存储
+        progressor = QuestProgressor(store)  # 创建推进器
+        started = time.perf_counter()  # 记录开始时间
+        progressor.on_actions_success(events[:1])  # 首次推进解析任务并建立索引
+        warmup = time.perf_counter() - started  # 首次耗时
+        started = time.perf_counter()  # 记录开始时间
+        for event in events:  # 遍历动作
+            progressor.on_actions_success([event])  # 索引推进
+        indexed = (time.perf_counter() - started) / len(events)  # 单动作耗时
+        store.close()  # 关闭存储
+    logger.info("任务 %d 个,旧实现:%.2f ms/动作", args.quests, legacy * 1e3)  # 输出旧实现
+    logger.info("索引实现:%.3f ms/动作(首次建立索引 %.1f ms)", indexed * 1e3, warmup * 1e3)
+    logger.info("加速 %.0f 倍", legacy / indexed)  # 输出加速比
+    return 0  # 返回成功码
+
+
+if __name__ == "__main__":  # 脚本入口
+    raise SystemExit(main())  # 执行主函数
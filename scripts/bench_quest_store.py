@@ -0,0 +1,125 @@
+"""对比整表任务文档与逐条任务记录的更新开销,并测量索引分页查询的基准脚本。"""  # 模块 docstring
+
+from __future__ import annotations  # 启用前向引用,便于类型标注
+
+import argparse  # 导入 argparse,处理命令行参数
+import json  # 导入 json,模拟旧版整表编码
+import logging  # 导入 logging,输出结果
+import sys  # 导入 sys,用于返回值与路径调整
+import tempfile  # 导入 tempfile,使用独立数据目录
+import time  # 导入 time,用于计时
+from collections.abc import Callable, Iterable  # 导入抽象类型,用于类型标注
+from pathlib import Path  # 导入 Path,统一文件路径
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+sys.path.insert(0, str(PROJECT_ROOT / "src"))  # 确保可以直接导入 miniWorld 包
+
+from miniWorld.config import get_settings  # noqa: E402
+from miniWorld.world.store import WorldStore  # noqa: E402
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:  # 定义参数解析函数
+    """解析命令行参数并返回命名空间。"""  # 函数 docstring,说明用途
+
+    parser = argparse.ArgumentParser(description="miniWorld 任务存储基准")  # 创建解析器
+    parser.add_argument("--quests", type=int, default=200_000, help="任务数量")  # 任务数
+    parser.add_argument("--updates", type=int, default=200, help="计时的单任务更新次数")  # 更新数
+    parser.add_argument("--pages", type=int, default=200, help="计时的分页查询次数")  # 查询数
+    return parser.parse_args(list(argv) if argv is not None else None)  # 返回解析结果
+
+
+def build_quest(index: int) -> dict:  # 定义任务构建函数
+    """构造发布者、执行者、状态与区块交错分布的任务。"""  # 函数 docstring,说明用途
+
+    return {  # 任务字典
+        "id": f"bench-{index}",  # 任务 ID
+        "title": "铺路",  # 标题
+        "desc": "在指定区域铺设石路",  # 描述
+        "giver": ("公主", "神官", "勇者")[index % 3],  # 发布者
+        "assignee": [("剑士", "盗贼", "魔导师", "神官")[index % 7 % 4]],  # 执行者
+        "status": "DONE" if index % 10 else "OPEN",  # 九成任务已完成
+        "requirements": [  # 需求列表
+            {  # 单个需求
+                "action_type": "PLACE_TILE",  # 动作类型
+                "target_tile": "ROAD",  # 目标瓦片
+                "chunk": {"cx": index % 64, "cy": index // 64 % 64},  # 需求区块
+                "x_range": [0, 31],  # X 范围
+                "y_range": [0, 31],  # Y 范围
+                "target_count": 10,  # 目标次数
+                "progress": 0,  # 当前进度
+                "layer": "base",  # 监控层级
+            }  # 结束需求
+        ],  # 结束需求列表
+        "rewards": [],  # 奖励
+        "created_at": index,  # 创建时间
+        "updated_at": index,  # 更新时间
+    }  # 结束任务
+
+
+def per_call(count: int, func: Callable[[int], object]) -> float:  # 定义计时工具
+    """执行 count 次并返回单次平均耗时(毫秒),func 接收调用序号。"""  # 函数 docstring
+
+    started = time.perf_counter()  # 记录开始时间
+    for index in range(count):  # 重复执行
+        func(index)  # 执行被测函数
+    return (time.perf_counter() - started) / count * 1e3  # 返回平均耗时
+
+
+def main(argv: Iterable[str] | None = None) -> int:  # 定义主函数
+    """测量旧版整表写回、逐条写回与索引分页查询的耗时。"""  # 函数 docstring,说明用途
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")  # 初始化日志
+    args = parse_args(argv)  # 解析参数
+    settings = get_settings()  # 加载配置
+    quests = [build_quest(index) for index in range(args.quests)]  # 生成任务
+    with tempfile.TemporaryDirectory() as tmp:  # 使用独立数据目录
+        root = Path(tmp)  # 数据目录
+        legacy_path = root / "quests.json"  # 旧版整表文件
+        legacy = per_call(  # 旧版:每次更新都编码并改写整个任务列表
+            max(1, args.updates // 50),  # 旧版很慢,只取少量次数
+            lambda _: legacy_path.write_bytes(json.dumps(quests, ensure_ascii=False).encode()),
+        )  # 结束计时
+        store = WorldStore(  # 创建同步写入的世界存储
+            root=root,  # 数据目录
+            chunk_size=settings.chunk_size,  # 区块尺寸
+            default_world_state=settings.world_state,  # 默认世界状态
+            tick_tree_grow_steps=settings.tick_tree_grow_steps,  # 成长步数
+        )  # 结束存储初始化
+        started = time.perf_counter()  # 记录开始时间
+        store.update_quests_raw(quests)  # 首次写入全部任务记录
+        initial = time.perf_counter() - started  # 首次写入耗时
+        update = per_call(  # 逐条:每次只改写一个任务记录
+            args.updates,  # 更新次数
+            lambda index: store.update_quests_raw(  # 更新单个任务
+                [{**quests[index * 997 % args.quests], "updated_at": -index}]  # 修改时间
+            ),  # 结束更新
+        )  # 结束计时
+        open_page = per_call(  # 按状态与执行者过滤的分页查询
+            args.pages,  # 查询次数
+            lambda _: store.query_quests_raw(status="OPEN", assignee="盗贼", limit=50),  # 查询
+        )  # 结束计时
+        chunk_page = per_call(  # 按需求区块过滤的分页查询
+            args.pages,  # 查询次数
+            lambda index: store.query_quests_raw(cx=index % 64, cy=0, limit=50),  # 查询
+        )  # 结束计时
+        cursor = None  # 初始游标
+        started = time.perf_counter()  # 记录开始时间
+        pages = 0  # 页数
+        while True:  # 翻完全部 OPEN 任务
+            _, cursor = store.query_quests_raw(status="OPEN", cursor=cursor, limit=500)  # 一页
+            pages += 1  # 累加页数
+            if cursor is None:  # 最后一页
+                break  # 结束翻页
+        scan = time.perf_counter() - started  # 翻页耗时
+        store.close()  # 关闭存储
+    logger.info("任务 %d 个,首次写入全部记录 %.1f s", args.quests, initial)  # 输出首次写入
+    logger.info("单任务更新:整表改写 %.1f ms,逐条记录 %.3f ms", legacy, update)  # 输出更新耗时
+    logger.info("分页查询:状态+执行者 %.3f ms,区块 %.3f ms", open_page, chunk_page)  # 输出查询
+    logger.info("翻完全部 OPEN 任务:%d 页,%.1f ms", pages, scan * 1e3)  # 输出翻页耗时
+    return 0  # 返回成功码
+
+
+if __name__ == "__main__":  # 脚本入口
+    raise SystemExit(main())  # 执行主函数
@@ -0,0 +1,135 @@
+"""对比逐格循环与整块平面内核推进树苗与作物成长的基准脚本。"""  # 模块 docstring
+
+from __future__ import annotations  # 启用前向引用,便于类型标注
+
+import argparse  # 导入 argparse,处理命令行参数
+import logging  # 导入 logging,输出结果
+import random  # 导入 random,生成可复现的区块内容
+import sys  # 导入 sys,用于返回值与路径调整
+import time  # 导入 time,用于计时
+from collections.abc import Iterable  # 导入抽象类型,用于类型标注
+from pathlib import Path  # 导入 Path,统一文件路径
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+sys.path.insert(0, str(PROJECT_ROOT / "src"))  # 确保可以直接导入 miniWorld 包
+
+from miniWorld.config import get_settings  # noqa: E402
+from miniWorld.world.chunk import GROWTH_NONE, Chunk  # noqa: E402
+from miniWorld.world.systems import build_tick_engine  # noqa: E402
+from miniWorld.world.tiles import TileType, tile_to_code  # noqa: E402
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+_SAPLING = tile_to_code(TileType.TREE_SAPLING)  # 树苗编码
+_TREE = tile_to_code(TileType.TREE)  # 成树编码
+_FARM = tile_to_code(TileType.FARM)  # 农田编码
+_GRASS = tile_to_code(TileType.GRASS)  # 草地编码
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:  # 定义参数解析函数
+    """解析命令行参数并返回命名空间。"""  # 函数 docstring,说明用途
+
+    parser = argparse.ArgumentParser(description="miniWorld tick 成长内核基准")  # 创建解析器
+    parser.add_argument("--chunks", type=int, default=10_000, help="有内容的区块数量")  # 区块数
+    parser.add_argument("--density", type=float, default=0.05, help="树苗与农田各自的占比")
+    parser.add_argument("--elapsed", type=int, default=1, help="每个区块追赶的 tick 数")  # 追赶量
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")  # 随机种子
+    return parser.parse_args(list(argv) if argv is not None else None)  # 返回解析结果
+
+
+def build_chunks(count: int, size: int, density: float, seed: int) -> list[Chunk]:  # 构建函数
+    """生成随机分布树苗与农田的区块,相同参数得到相同内容。"""  # 函数 docstring,说明用途
+
+    rng = random.Random(seed)  # 可复现的随机数
+    cells = size * size  # 每个区块的格子数
+    picks = max(1, int(cells * density))  # 每类格子的数量
+    chunks = []  # 初始化结果
+    for index in range(count):  # 逐个生成区块
+        chunk = Chunk.create_default(cx=index % 100, cy=index // 100, size=size)  # 创建区块
+        positions = rng.sample(range(cells), picks * 2)  # 树苗与农田不重叠
+        chunk.write_codes(  # 铺设树苗与农田
+            [
+                (i % size, i // size, (_GRASS, _SAPLING, 0, rng.randrange(2)))
+                for i in positions[:picks]
+            ]
+            + [(i % size, i // size, (_FARM, 0, 0, GROWTH_NONE)) for i in positions[picks:]]
+        )  # 结束写入
+        chunk.drain_touched()  # 清空修改记录
+        chunks.append(chunk)  # 记录区块
+    return chunks  # 返回区块
+
+
+def loop_catch_up(chunk: Chunk, elapsed: int, tree_steps: int, crop_steps: int) -> int:  # 旧路径
+    """按原实现逐格查找、读取编码、计算新编码并写回,返回写入的格子数。"""  # 函数 docstring
+
+    writes = []  # 初始化写入列表
+    saplings = chunk.find_cells("deco", TileType.TREE_SAPLING)  # 查找树苗
+    for (x, y), (base, deco, height, growth) in zip(
+        saplings, chunk.read_codes(saplings), strict=True
+    ):  # 遍历树苗
+        stage = (0 if growth == GROWTH_NONE else growth) + elapsed  # 追赶后的阶段
+        if stage >= tree_steps:  # 成熟
+            writes.append((x, y, (base, _TREE, height, GROWTH_NONE)))  # 变为成树
+        else:  # 未成熟
+            writes.append((x, y, (base, deco, height, stage)))  # 更新阶段
+    farms = chunk.find_cells("base", TileType.FARM)  # 查找农田
+    for (x, y), (base, deco, height, growth) in zip(
+        farms, chunk.read_codes(farms), strict=True
+    ):  # 遍历农田
+        stage = 0 if growth == GROWTH_NONE else growth  # 当前阶段
+        if deco == 0 and stage < crop_steps:  # 空置且未成熟
+            writes.append((x, y, (base, deco, height, min(stage + elapsed, crop_steps))))
+    chunk.write_codes(writes)  # 写回格子
+    return len(writes)  # 返回写入数量
+
+
+def main(argv: Iterable[str] | None = None) -> int:  # 定义主函数
+    """分别用逐格循环与整块内核推进相同的区块,校验结果一致并输出耗时。"""  # 函数 docstring
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")  # 初始化日志
+    args = parse_args(argv)  # 解析参数
+    settings = get_settings()  # 加载配置
+    engine = build_tick_engine(settings)  # 创建默认 tick 引擎
+    looped = build_chunks(args.chunks, settings.chunk_size, args.density, args.seed)  # 旧路径
+    kernel = build_chunks(args.chunks, settings.chunk_size, args.density, args.seed)  # 内核
+
+    started = time.perf_counter()  # 记录开始时间
+    loop_cells = sum(  # 逐格循环
+        loop_catch_up(
+            chunk, args.elapsed, settings.tick_tree_grow_steps, settings.tick_crop_grow_steps
+        )
+        for chunk in looped  # 遍历区块
+    )  # 结束求和
+    loop_seconds = time.perf_counter() - started  # 逐格耗时
+
+    started = time.perf_counter()  # 记录开始时间
+    diffs = engine.catch_up_diffs(kernel, args.elapsed)  # 一次计算全部区块的紧凑差异
+    diff_seconds = time.perf_counter() - started  # 差异耗时
+    for diff in diffs:  # 应用差异
+        diff.apply(kernel[diff.cy * 100 + diff.cx])  # 写回区块
+    kernel_seconds = time.perf_counter() - started  # 内核总耗时
+
+    if any(a.planes != b.planes for a, b in zip(looped, kernel, strict=True)):  # 校验结果
+        logger.error("内核与逐格循环的结果不一致")  # 输出错误
+        return 1  # 返回失败码
+    kernel_cells = sum(len(chunk.drain_touched()) for chunk in kernel)  # 变化格子数
+    logger.info(  # 输出规模
+        "区块 %d 个,每块树苗与农田各 %.0f%%,追赶 %d tick",
+        args.chunks,
+        args.density * 100,
+        args.elapsed,
+    )  # 结束日志
+    logger.info("逐格循环:%.3f s,写入 %d 格", loop_seconds, loop_cells)  # 输出旧路径
+    logger.info(  # 输出内核
+        "整块内核:%.3f s(其中计算差异 %.3f s),%d 个区块变化 %d 格,加速 %.1fx",
+        kernel_seconds,
+        diff_seconds,
+        len(diffs),
+        kernel_cells,
+        loop_seconds / kernel_seconds,
+    )  # 结束日志
+    return 0  # 返回成功码
+
+
+if __name__ == "__main__":  # 脚本入口
+    raise SystemExit(main())  # 执行主函数
@@ -0,0 +1,112 @@
+"""测量 TickExecutor 在不同工作进程数下计算灌木蔓延的扩展性的基准脚本。"""  # 模块 docstring
+
+from __future__ import annotations  # 启用前向引用,便于类型标注
+
+import argparse  # 导入 argparse,处理命令行参数
+import logging  # 导入 logging,输出结果
+import os  # 导入 os,读取 CPU 数量
+import random  # 导入 random,生成可复现的区块内容
+import sys  # 导入 sys,用于返回值与路径调整
+import time  # 导入 time,用于计时
+from collections.abc import Iterable  # 导入抽象类型,用于类型标注
+from pathlib import Path  # 导入 Path,统一文件路径
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+sys.path.insert(0, str(PROJECT_ROOT / "src"))  # 确保可以直接导入 miniWorld 包
+
+from miniWorld.config import get_settings  # noqa: E402
+from miniWorld.world.chunk import GROWTH_NONE, Chunk  # noqa: E402
+from miniWorld.world.executor import TickExecutor  # noqa: E402
+from miniWorld.world.systems import ActiveCell, ShrubSpreadSystem, TickContext  # noqa: E402
+from miniWorld.world.tiles import TileType, tile_to_code  # noqa: E402
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+_GRASS = tile_to_code(TileType.GRASS)  # 草地编码
+_SHRUB = tile_to_code(TileType.SHRUB)  # 灌木编码
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:  # 定义参数解析函数
+    """解析命令行参数并返回命名空间。"""  # 函数 docstring,说明用途
+
+    parser = argparse.ArgumentParser(description="miniWorld tick 工作进程扩展性基准")  # 解析器
+    parser.add_argument("--chunks", type=int, default=10_000, help="有灌木的区块数量")  # 区块数
+    parser.add_argument("--density", type=float, default=0.2, help="每个区块中灌木的占比")
+    parser.add_argument("--chance", type=float, default=0.02, help="灌木每 tick 的蔓延概率")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="依次测量的工作进程数"
+    )  # 工作进程数
+    parser.add_argument("--repeat", type=int, default=3, help="每种进程数重复的 tick 次数")
+    parser.add_argument("--seed", type=int, default=7, help="随机种子")  # 随机种子
+    return parser.parse_args(list(argv) if argv is not None else None)  # 返回解析结果
+
+
+def build_batch(  # 定义批次构建函数
+    count: int, size: int, density: float, seed: int
+) -> list[tuple[Chunk, list[ActiveCell]]]:  # 返回区块与活跃格子
+    """生成随机分布灌木的区块与对应的活跃格子,相同参数得到相同内容。"""  # 函数 docstring
+
+    rng = random.Random(seed)  # 可复现的随机数
+    cells = size * size  # 每个区块的格子数
+    picks = max(1, int(cells * density))  # 每个区块的灌木数量
+    codes = (_GRASS, _SHRUB, 0, GROWTH_NONE)  # 灌木编码
+    batch = []  # 初始化结果
+    for index in range(count):  # 逐个生成区块
+        chunk = Chunk.create_default(cx=index % 100, cy=index // 100, size=size)  # 创建区块
+        positions = sorted(rng.sample(range(cells), picks))  # 行优先顺序,与活跃集合一致
+        chunk.write_codes((i % size, i // size, codes) for i in positions)  # 铺设灌木
+        batch.append((chunk, [(i % size, i // size, codes) for i in positions]))  # 记录区块
+    return batch  # 返回批次
+
+
+def main(argv: Iterable[str] | None = None) -> int:  # 定义主函数
+    """依次用不同的工作进程数计算同一批区块,校验结果与单进程一致并输出耗时。"""
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")  # 初始化日志
+    args = parse_args(argv)  # 解析参数
+    settings = get_settings()  # 加载配置
+    system = ShrubSpreadSystem(args.chance)  # 灌木蔓延系统
+    batch = build_batch(args.chunks, settings.chunk_size, args.density, args.seed)  # 构建批次
+    logger.info(  # 输出规模
+        "区块 %d 个,每块灌木 %.0f%%,CPU %d 个",
+        args.chunks,
+        args.density * 100,
+        os.cpu_count() or 1,
+    )  # 结束日志
+
+    baseline: list[list] | None = None  # 单进程结果
+    serial_seconds = 0.0  # 第一种进程数的耗时
+    for workers in args.workers:  # 遍历工作进程数
+        executor = TickExecutor(workers)  # 创建执行器
+        try:  # 确保关闭进程池
+            started = time.perf_counter()  # 记录开始时间
+            ctx = TickContext(store=None, tick=0, world_state=settings.world_state)  # 预热上下文
+            executor.update(system, ctx, batch)  # 预热:启动工作进程
+            startup = time.perf_counter() - started  # 首次耗时
+            elapsed = 0.0  # 累计耗时
+            for tick in range(1, args.repeat + 1):  # 重复 tick
+                ctx = TickContext(store=None, tick=tick, world_state=settings.world_state)
+                started = time.perf_counter()  # 记录开始时间
+                results = executor.update(system, ctx, batch)  # 计算新编码
+                elapsed += time.perf_counter() - started  # 累加耗时
+                if baseline is None and tick == 1:  # 记录第一轮结果
+                    baseline = results  # 作为基准
+                elif tick == 1 and results != baseline:  # 校验结果
+                    logger.error("%d 个工作进程的结果与基准不一致", workers)  # 输出错误
+                    return 1  # 返回失败码
+        finally:  # 清理阶段
+            executor.shutdown()  # 关闭进程池
+        per_tick = elapsed / args.repeat  # 平均单次耗时
+        serial_seconds = serial_seconds or per_tick  # 记录基准耗时
+        logger.info(  # 输出结果
+            "工作进程 %d 个:每 tick %.3f s(首次含进程启动 %.3f s),相对加速 %.2fx",
+            workers,
+            per_tick,
+            startup,
+            serial_seconds / per_tick,
+        )  # 结束日志
+    return 0  # 返回成功码
+
+
+if __name__ == "__main__":  # 脚本入口
+    raise SystemExit(main())  # 执行主函数
@@ -0,0 +1,56 @@
+"""将 data/world/chunks 下的区块文件批量迁移为指定存储格式的脚本。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 启用前向引用,便于类型标注
+
+import argparse  # 导入 argparse,处理命令行参数
+import logging  # 导入 logging,输出提示
+import sys  # 导入 sys,用于返回值与路径调整
+from collections.abc import Iterable  # 导入 Iterable,用于类型标注
+from pathlib import Path  # 导入 Path,统一文件路径
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+sys.path.insert(0, str(PROJECT_ROOT / "src"))  # 确保可以直接导入 miniWorld 包
+
+from miniWorld.config import get_settings  # noqa: E402  # 导入配置获取函数
+from miniWorld.world.store import CHUNK_FORMATS, WorldStore  # noqa: E402  # 导入世界存储
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:  # 定义参数解析函数
+    """解析命令行参数并返回命名空间。"""  # 函数 docstring,说明用途
+
+    parser = argparse.ArgumentParser(description="miniWorld 区块格式迁移脚本")  # 创建参数解析器
+    parser.add_argument(  # 添加数据目录参数
+        "--root", type=Path, default=PROJECT_ROOT / "data", help="数据根目录"
+    )  # 数据目录
+    parser.add_argument(  # 添加目标格式参数
+        "--format",  # 参数名称
+        dest="chunk_format",  # 保存到 chunk_format
+        choices=sorted(CHUNK_FORMATS),  # 可选格式
+        default="binary",  # 默认迁移为二进制
+        help="迁移后的区块格式",  # 参数说明
+    )  # 结束参数定义
+    return parser.parse_args(list(argv) if argv is not None else None)  # 返回解析结果
+
+
+def main(argv: Iterable[str] | None = None) -> int:  # 定义主函数
+    """执行区块迁移流程,返回退出码。"""  # 函数 docstring,说明用途
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")  # 初始化日志
+    args = parse_args(argv)  # 解析参数
+    settings = get_settings()  # 读取配置
+    store = WorldStore(  # 创建目标格式的世界存储
+        root=args.root,  # 数据根目录
+        chunk_size=settings.chunk_size,  # 区块尺寸
+        default_world_state=settings.world_state,  # 默认世界状态
+        tick_tree_grow_steps=settings.tick_tree_grow_steps,  # 树苗成长步数
+        chunk_format=args.chunk_format,  # 目标区块格式
+    )  # 结束存储初始化
+    migrated = store.migrate_chunks()  # 执行迁移
+    logger.info("迁移完成,共改写 %s 个区块为 %s 格式", migrated, args.chunk_format)  # 输出总结
+    return 0  # 返回成功码
+
+
+if __name__ == "__main__":  # 判断脚本是否直接执行
+    sys.exit(main())  # 调用主函数并退出
@@ -0,0 +1,66 @@
+"""将 data/ 下的文件布局一次性迁移到单文件 SQLite 数据库的脚本。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 启用前向引用,便于类型标注
+
+import argparse  # 导入 argparse,处理命令行参数
+import logging  # 导入 logging,输出提示
+import sys  # 导入 sys,用于返回值与路径调整
+from collections.abc import Iterable  # 导入 Iterable,用于类型标注
+from pathlib import Path  # 导入 Path,统一文件路径
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]  # 计算仓库根目录
+sys.path.insert(0, str(PROJECT_ROOT / "src"))  # 确保可以直接导入 miniWorld 包
+
+from miniWorld.world.backends import FileBackend, SqliteBackend, copy_backend  # noqa: E402
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+
+def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:  # 定义参数解析函数
+    """解析命令行参数并返回命名空间。"""  # 函数 docstring,说明用途
+
+    parser = argparse.ArgumentParser(description="miniWorld 文件布局到 SQLite 的迁移脚本")  # 解析器
+    parser.add_argument(
+        "--root", type=Path, default=PROJECT_ROOT / "data", help="数据根目录"
+    )  # 数据目录
+    parser.add_argument(
+        "--db", type=Path, default=None, help="目标数据库,默认 <root>/world/world.db"
+    )
+    parser.add_argument(
+        "--overwrite", action="store_true", help="目标数据库已存在时删除后重建"
+    )  # 覆盖
+    return parser.parse_args(list(argv) if argv is not None else None)  # 返回解析结果
+
+
+def main(argv: Iterable[str] | None = None) -> int:  # 定义主函数
+    """执行迁移流程,返回退出码。"""  # 函数 docstring,说明用途
+
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")  # 初始化日志
+    args = parse_args(argv)  # 解析参数
+    db_path = args.db or args.root / "world" / "world.db"  # 计算数据库路径
+    if db_path.exists():  # 目标已存在
+        if not args.overwrite:  # 未允许覆盖
+            logger.error("数据库 %s 已存在,如需重建请加 --overwrite", db_path)  # 输出错误
+            return 1  # 返回失败码
+        for suffix in ("", "-wal", "-shm"):  # 删除数据库及 WAL 附属文件
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)  # 删除文件
+    source = FileBackend(args.root)  # 打开文件布局
+    target = SqliteBackend(db_path)  # 创建数据库
+    try:  # 执行迁移
+        counts = copy_backend(source, target)  # 复制数据
+    finally:  # 确保关闭连接
+        source.close()  # 关闭文件布局
+        target.close()  # 关闭数据库
+    logger.info(  # 输出总结
+        "迁移完成:%s 个区块、%s 个文档、%s 个任务、%s 行审计日志 -> %s",  # 日志模板
+        counts["chunks"],  # 区块数量
+        counts["documents"],  # 文档数量
+        counts["quests"],  # 任务数量
+        counts["log_lines"],  # 日志行数
+        db_path,  # 数据库路径
+    )  # 结束日志
+    return 0  # 返回成功码
+
+
+if __name__ == "__main__":  # 判断脚本是否直接执行
+    sys.exit(main())  # 调用主函数并退出
@@ -2,16 +2,21 @@
 
 from __future__ import annotations  # 导入未来注解特性,支持前向引用
 
+import asyncio  # 导入 asyncio,等待订阅事件
+import json  # 导入 json,编码 tick 事件流
 import logging  # 导入 logging,用于输出调试信息
+from collections.abc import AsyncIterator  # 导入 AsyncIterator,用于注解生命周期函数与事件流
+from contextlib import asynccontextmanager  # 导入 asynccontextmanager,定义应用生命周期
 from pathlib import Path  # 导入 Path,定位工程目录
 from typing import Any  # 导入 Any,用于注解 payload
 
-from fastapi import FastAPI, HTTPException, Request  # 导入 FastAPI 相关类
-from fastapi.responses import JSONResponse  # 导入 JSONResponse,自定义错误响应
+from fastapi import FastAPI, HTTPException, Request, Response  # 导入 FastAPI 相关类
+from fastapi.responses import JSONResponse, StreamingResponse  # 导入自定义响应与流式响应
 
 from .assets_api import router as assets_router  # 导入素材接口路由
 from .config import get_settings  # 导入配置加载函数
 from .models import (  # 导入数据模型
+    ActionLogPage,  # 审计日志分页响应
     ChatSimulateResponse,  # 聊天响应模型
     ErrorResponse,  # 错误响应模型
     MessageIn,  # 聊天输入模型
@@ -23,34 +28,92 @@ from .services.generator import (  # 导入生成器与任务生成器
     QuestGenerator,  # 任务生成器
     build_generator,  # 文本生成器工厂
 )  # 结束导入
+from .world.action_log import ActionLogWriter  # 导入审计日志写入器
 from .world.actions import (  # 导入动作相关类型
-    ActionChange,  # 动作变更摘要
+    ActionBatchResponse,  # 批量动作响应模型
     ActionError,  # 动作异常
     ActionProcessor,  # 动作处理器
     ActionRequest,  # 动作请求模型
     ActionResponse,  # 动作响应模型
-    ChunkCoord,  # 区块坐标模型
-    Position,  # 坐标模型
 )  # 结束导入
-from .world.quests import QuestProgressor  # 导入任务推进器
+from .world.async_store import AsyncWorldStore  # 导入异步存储包装
+from .world.backends import create_backend  # 导入存储后端工厂
+from .world.flusher import WriteBehindFlusher  # 导入后台刷盘器
+from .world.log_index import ActionLogIndex  # 导入审计日志索引
+from .world.quests import Quest, QuestProgressor, QuestStatus  # 导入任务模型与推进器
+from .world.scheduler import SimulationScheduler  # 导入模拟调度器
 from .world.store import WorldStore  # 导入世界存储
-from .world.tiles import TileType  # 导入瓦片类型
+from .world.systems import build_tick_engine  # 导入 tick 引擎工厂
 from .world.world_state import WorldState  # 导入世界状态模型
 
 logger = logging.getLogger(__name__)  # 创建模块级日志记录器
 
 settings = get_settings()  # 读取全局配置
-app = FastAPI(title=settings.app_name, debug=settings.debug)  # 创建 FastAPI 应用实例
+
+
+@asynccontextmanager  # 声明异步上下文管理器
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:  # 定义应用生命周期
+    """启动时开启后台刷盘与模拟调度任务,关闭时先停止 tick,再强制写回全部脏数据。"""
+
+    flusher = WriteBehindFlusher(_async_store, settings.flush_interval_seconds)  # 创建刷盘器
+    flusher.start()  # 启动后台任务,同步写入模式下也负责写出用量账本
+    if settings.sim_tick_enabled:  # 启用后台模拟
+        _scheduler.start()  # 按固定节奏推进世界时间
+    try:  # 运行应用
+        yield  # 交出控制权
+    finally:  # 关闭阶段
+        await _scheduler.stop()  # 等待进行中的 tick 完成
+        _tick_engine.close()  # 关闭 tick 工作进程
+        await flusher.stop()  # 停止并完成最终刷盘,编码仍需存储线程池
+        _async_store.shutdown()  # 等待线程池中的存储操作结束
+        _store.close()  # 写回剩余脏数据
+
+
+app = FastAPI(title=settings.app_name, debug=settings.debug, lifespan=lifespan)  # 创建应用实例
 app.include_router(assets_router)  # 挂载素材接口路由
 
 _PROJECT_ROOT = Path(__file__).resolve().parents[2]  # 计算工程根目录
-_DATA_ROOT = _PROJECT_ROOT / "data"  # 定义数据目录
+_DATA_ROOT = settings.data_dir or _PROJECT_ROOT / "data"  # 定义数据目录,可由 DATA_DIR 覆盖
+_STREAM_KEEPALIVE = 15.0  # 事件流空闲时发送保活注释的间隔(秒)
+_tick_engine = build_tick_engine(settings)  # 创建 tick 引擎,注册全部 tick 系统
 _store = WorldStore(  # 初始化世界存储
     root=_DATA_ROOT,  # 指定数据根目录
     chunk_size=settings.chunk_size,  # 传入区块尺寸
     default_world_state=settings.world_state,  # 传入默认世界状态
     tick_tree_grow_steps=settings.tick_tree_grow_steps,  # 传入树苗成长步数
+    chunk_format=settings.chunk_format,  # 传入区块存储格式
+    write_behind=settings.write_behind,  # 传入延迟写回开关
+    flush_threshold=settings.flush_threshold,  # 传入刷盘阈值
+    journal=settings.journal_enabled,  # 传入预写日志开关
+    journal_fsync_batch=settings.journal_fsync_batch,  # 传入分组 fsync 事务数
+    journal_fsync_interval=settings.journal_fsync_interval_seconds,  # 传入分组 fsync 时间窗口
+    checkpoint_bytes=settings.journal_checkpoint_bytes,  # 传入检查点字节阈值
+    cache_max_chunks=settings.chunk_cache_max_chunks,  # 传入区块缓存数量上限
+    cache_max_bytes=settings.chunk_cache_max_bytes,  # 传入区块缓存字节上限
+    usage_snapshot_every=settings.usage_snapshot_every,  # 传入用量快照阈值
+    active_tiles=_tick_engine.active_tiles,  # 传入各 tick 系统关注的瓦片
+    catch_up=_tick_engine.catch_up,  # 传入惰性系统的成长追赶
+    backend=create_backend(  # 创建存储后端
+        settings.storage_backend,  # 后端名称
+        _DATA_ROOT,  # 数据根目录
+        chunk_format=settings.chunk_format,  # 优先读取的区块格式
+        durable=settings.journal_enabled,  # 检查点需要落盘保证
+        action_log=ActionLogWriter(  # 创建文件后端的审计日志写入器
+            _DATA_ROOT / "logs",  # 日志目录
+            flush_lines=settings.action_log_flush_lines,  # 分组行数
+            flush_interval_seconds=settings.action_log_flush_interval_seconds,  # 分组时间窗口
+            max_bytes=settings.action_log_max_bytes,  # 轮转字节阈值
+            rotate_daily=settings.action_log_rotate_daily,  # 按日轮转
+            compress=settings.action_log_compress,  # 压缩封存段
+        ),  # 结束写入器创建
+    ),  # 结束后端创建
+    log_index=(  # 审计日志旁路索引
+        ActionLogIndex(_DATA_ROOT / "logs" / "actions.index.db")  # 创建索引
+        if settings.action_log_index  # 仅在启用时创建
+        else None  # 未启用
+    ),  # 结束索引创建
 )  # 结束存储初始化
+_async_store = AsyncWorldStore(_store, max_workers=settings.store_io_workers)  # 创建异步存储包装
 _progressor = QuestProgressor(_store)  # 创建任务推进器
 _quest_generator = QuestGenerator(progressor=_progressor, settings=settings)  # 创建任务生成器
 _quest_generator.ensure_seed_quests(_store.load_world_state())  # 确保存在初始任务
@@ -60,6 +123,14 @@ _action_processor = ActionProcessor(  # 创建动作处理器
     permissions=settings.role_permissions,  # 注入角色权限
     quest_progressor=_progressor,  # 注入任务推进器
 )  # 结束处理器初始化
+_scheduler = SimulationScheduler(  # 创建模拟调度器
+    _async_store,  # 提供世界锁与线程池
+    lambda: _run_tick(),  # 同步 tick 函数,延迟查找下文的定义
+    interval_seconds=settings.sim_tick_interval_seconds,  # tick 间隔
+    policy=settings.sim_overload_policy,  # 过载策略
+    max_catch_up=settings.sim_max_catch_up_ticks,  # 补跑上限
+    queue_size=settings.sim_subscriber_queue_size,  # 订阅队列长度
+)  # 结束调度器初始化
 
 
 @app.exception_handler(ActionError)  # 注册动作异常处理器
@@ -80,80 +151,172 @@ async def health() -> dict[str, str]:  # 定义异步处理函数
     return {"status": "ok"}  # 返回固定状态
 
 
+@app.get("/world/stats", tags=["world"], summary="获取存储运行统计")  # 注册存储统计接口
+async def get_world_stats() -> dict[str, Any]:  # 定义处理函数
+    """返回区块缓存统计、待写回的脏数据数量与模拟调度统计。"""  # 函数 docstring
+
+    return {  # 构造响应字典
+        "cache": _store.cache_stats,  # 区块缓存统计
+        "dirty": _store.dirty_count,  # 待写回数量
+        "simulation": _scheduler.stats,  # 模拟调度统计
+    }  # 结束字典
+
+
 @app.get("/world/state", tags=["world"], summary="获取世界状态")  # 注册世界状态查询接口
 async def get_world_state() -> WorldState:  # 定义处理函数
     """返回当前的世界状态对象。"""  # 函数 docstring,说明用途
 
-    return _store.load_world_state()  # 从存储加载世界状态
+    return await _async_store.load_world_state()  # 在线程池中加载世界状态
 
 
 @app.get("/world/chunk", tags=["world"], summary="获取区块数据")  # 注册区块查询接口
 async def get_chunk(cx: int, cy: int):  # 定义处理函数
     """返回指定区块的 32x32 瓦片网格。"""  # 函数 docstring,说明用途
 
-    chunk = _store.load_chunk(cx=cx, cy=cy)  # 加载区块
-    return chunk  # FastAPI 会自动序列化 Pydantic 模型
+    return await _async_store.load_chunk_snapshot(cx, cy)  # 在线程池中加载并序列化区块
 
 
 @app.get("/world/quests", tags=["world"], summary="获取任务列表")  # 注册任务查询接口
-async def get_world_quests():  # 定义处理函数
-    """返回当前存储中的所有任务。"""  # 函数 docstring,说明用途
-
-    return _progressor.get_quests()  # 使用任务推进器读取任务
+async def get_world_quests(  # 定义处理函数
+    response: Response,  # 响应对象,用于写入分页游标
+    status: QuestStatus | None = None,  # 状态过滤
+    assignee: str | None = None,  # 执行者过滤
+    giver: str | None = None,  # 发布者过滤
+    cx: int | None = None,  # 需求区块 X 过滤
+    cy: int | None = None,  # 需求区块 Y 过滤
+    cursor: int | None = None,  # 上一页返回的游标
+    limit: int = 100,  # 每页条数
+) -> list[Quest]:  # 返回任务列表
+    """按状态、执行者、发布者与需求区块过滤任务,按创建顺序分页返回。
+
+    响应体仍为任务数组;还有下一页时在 X-Next-Cursor 响应头中返回游标。
+    """  # 函数 docstring
+
+    try:  # 查询任务索引
+        quests, next_cursor = await _async_store.run(  # 在线程池中执行查询
+            _progressor.query_quests,  # 查询函数
+            status=status,  # 状态
+            assignee=assignee,  # 执行者
+            giver=giver,  # 发布者
+            cx=cx,  # 区块 X
+            cy=cy,  # 区块 Y
+            cursor=cursor,  # 游标
+            limit=limit,  # 页大小
+        )  # 结束查询
+    except ValueError as exc:  # 参数组合无效
+        raise HTTPException(status_code=400, detail=str(exc)) from exc  # 返回 400
+    if next_cursor is not None:  # 还有下一页
+        response.headers["X-Next-Cursor"] = str(next_cursor)  # 写入游标
+    return quests  # 返回当前页
+
+
+@app.get("/world/log", tags=["world"], summary="查询审计日志")  # 注册审计日志查询接口
+async def get_world_log(  # 定义处理函数
+    actor: str | None = None,  # 执行者过滤
+    action: str | None = None,  # 动作类型过滤
+    cx: int | None = None,  # 区块 X 过滤
+    cy: int | None = None,  # 区块 Y 过滤
+    since: int | None = None,  # 起始时间戳(含)
+    until: int | None = None,  # 结束时间戳(不含)
+    cursor: int | None = None,  # 上一页返回的游标
+    limit: int = 50,  # 每页条数
+) -> ActionLogPage:  # 返回分页结果
+    """按执行者、动作、区块与时间过滤审计日志,从新到旧分页返回。"""  # 函数 docstring
+
+    try:  # 查询索引
+        entries, next_cursor = await _async_store.run(  # 在线程池中执行查询
+            _store.query_action_log,  # 查询函数
+            actor=actor,  # 执行者
+            action=action,  # 动作类型
+            cx=cx,  # 区块 X
+            cy=cy,  # 区块 Y
+            since=since,  # 起始时间
+            until=until,  # 结束时间
+            cursor=cursor,  # 游标
+            limit=limit,  # 页大小
+        )  # 结束查询
+    except ValueError as exc:  # 参数组合无效
+        raise HTTPException(status_code=400, detail=str(exc)) from exc  # 返回 400
+    except RuntimeError as exc:  # 未启用索引
+        raise HTTPException(status_code=503, detail=str(exc)) from exc  # 返回 503
+    return ActionLogPage(entries=entries, next_cursor=next_cursor)  # 返回分页结果
 
 
 @app.post("/world/action", tags=["world"], summary="执行世界编辑动作")  # 注册动作接口
 async def post_world_action(request: ActionRequest) -> ActionResponse:  # 定义处理函数
     """执行一次世界编辑动作并返回变更摘要。"""  # 函数 docstring,说明用途
 
-    response = _action_processor.process(request=request)  # 调用处理器执行动作
-    return response  # 返回动作响应
+    _action_processor.reload_permissions(settings.role_permissions)  # 权限配置变化时重新编译
+    async with _async_store.chunk_locked(request.chunk.cx, request.chunk.cy):  # 串行化同区块动作
+        return await _async_store.run(_action_processor.process, request)  # 在线程池中执行
+
+
+@app.post("/world/actions", tags=["world"], summary="批量执行世界编辑动作")  # 注册批量动作接口
+async def post_world_actions(requests: list[ActionRequest]) -> ActionBatchResponse:  # 定义处理函数
+    """按顺序执行一批动作,逐项返回结果;每个区块只保存一次,任务与日志整批写入。"""  # docstring
 
+    if len(requests) > settings.action_batch_max_size:  # 超过批量上限
+        raise HTTPException(  # 返回 413
+            status_code=413,  # 请求过大
+            detail=f"单次最多提交 {settings.action_batch_max_size} 个动作",  # 错误详情
+        )  # 结束异常
+    _action_processor.reload_permissions(settings.role_permissions)  # 权限配置变化时重新编译
+    keys = [(request.chunk.cx, request.chunk.cy) for request in requests]  # 涉及的区块
+    async with _async_store.chunks_locked(keys):  # 按坐标顺序锁定全部区块
+        return await _async_store.run(_action_processor.process_batch, requests)  # 在线程池中执行
 
-@app.post("/world/tick", tags=["world"], summary="推进世界时间")  # 注册时间推进接口
+
+@app.post("/world/tick", tags=["world"], summary="手动推进世界时间")  # 注册手动 tick 接口
 async def post_world_tick() -> dict[str, Any]:  # 定义处理函数
-    """让世界时间前进一个单位,同时处理树苗成长。"""  # 函数 docstring,说明用途
-
-    changes: list[ActionChange] = []  # 初始化变更列表
-    for chunk in _store.iter_chunks():  # 遍历所有区块
-        chunk_changed = False  # 标记区块是否修改
-        for y in range(chunk.size):  # 遍历行
-            for x in range(chunk.size):  # 遍历列
-                cell = chunk.cell_at(x, y)  # 获取当前格子
-                if cell.deco != TileType.TREE_SAPLING:  # 若不是树苗
-                    continue  # 跳过
-                new_cell = cell.model_copy(deep=True)  # 深拷贝格子
-                next_stage = (new_cell.growth_stage or 0) + 1  # 计算下一成长阶段
-                if next_stage >= _store.tick_tree_grow_steps:  # 若达到成熟阶段
-                    new_cell.deco = TileType.TREE  # 将装饰替换为成树
-                    new_cell.growth_stage = None  # 清空成长数据
-                else:  # 尚未成熟
-                    new_cell.growth_stage = next_stage  # 更新成长阶段
-                chunk.apply_cell(x, y, new_cell)  # 写入新格子
-                changes.append(  # 记录变更摘要
-                    ActionChange(  # 创建 ActionChange
-                        chunk=ChunkCoord(cx=chunk.cx, cy=chunk.cy),  # 区块坐标
-                        pos=Position(x=x, y=y),  # 格子坐标
-                        before=cell.model_dump(),  # 修改前数据
-                        after=new_cell.model_dump(),  # 修改后数据
-                    ),  # 结束 ActionChange
-                )  # 结束 append
-                chunk_changed = True  # 标记区块已修改
-        if chunk_changed:  # 若区块被修改
-            _store.save_chunk(chunk)  # 写回磁盘
+    """手动触发一次 tick;常规推进由后台调度器完成,结果同样发布给订阅者。
+
+    changes 只包含逐 tick 系统(灌木、季节)的变更;树苗与作物在读取区块时惰性追赶,不在其中。
+    """  # 函数 docstring
+
+    event = await _scheduler.trigger()  # 独占世界后在线程池中执行
+    return {  # 构造响应字典
+        "message": "世界时间推进完成",  # 返回提示语
+        "changes": event.changes,  # 本次变更
+    }  # 结束返回
+
+
+@app.get("/world/tick/stream", tags=["world"], summary="订阅 tick 事件")  # 注册事件流接口
+async def stream_world_ticks(request: Request) -> StreamingResponse:  # 定义处理函数
+    """以 Server-Sent Events 推送每次 tick 的变更(不含惰性成长),客户端断开后注销订阅。"""
+
+    async def events() -> AsyncIterator[str]:  # 定义事件生成器
+        """逐条编码订阅队列中的事件,空闲时发送注释行以检测断开。"""  # 函数 docstring
+
+        async with _scheduler.subscribe() as queue:  # 登记订阅者
+            while not await request.is_disconnected():  # 直到客户端断开
+                try:  # 等待下一个事件
+                    event = await asyncio.wait_for(queue.get(), timeout=_STREAM_KEEPALIVE)
+                except TimeoutError:  # 空闲超时
+                    yield ": keepalive\n\n"  # 发送注释行
+                    continue  # 继续等待
+                payload = json.dumps(event.to_dict(), ensure_ascii=False)  # 编码事件
+                yield f"event: tick\ndata: {payload}\n\n"  # 推送事件
+
+    return StreamingResponse(events(), media_type="text/event-stream")  # 返回事件流
+
+
+def _run_tick() -> tuple[int, list[dict[str, Any]]]:  # 定义同步 tick 函数
+    """由 tick 引擎执行逐 tick 的系统,记录审计日志并返回世界 tick 序号与本次变更列表。
+
+    惰性系统的成长在加载区块时追赶,不产生本次 tick 的变更,也不计入 WORLD_TICK 审计日志。
+    """  # 函数 docstring
+
+    tick, changes = _tick_engine.run(_store)  # 各系统只处理自己的活跃格子
     if changes:  # 若存在变更
         first = changes[0]  # 取出首条变更
         _store.append_action_log(  # 记录审计日志
             actor="系统",  # 日志执行者
             action_type="WORLD_TICK",  # 日志类型
-            chunk={"cx": first.chunk.cx, "cy": first.chunk.cy},  # 记录区块
-            pos={"x": first.pos.x, "y": first.pos.y},  # 记录坐标
+            chunk={"cx": first.cx, "cy": first.cy},  # 记录区块
+            pos={"x": first.x, "y": first.y},  # 记录坐标
             payload={"change_count": len(changes)},  # 附带变更数量
         )  # 结束日志记录
-    return {  # 构造响应字典
-        "message": "世界时间推进完成",  # 返回提示语
-        "changes": [change.model_dump() for change in changes],  # 返回本次变更列表
-    }  # 结束返回
+    return tick, [change.to_action_change().model_dump() for change in changes]  # 接口边界转换
 
 
 @app.get("/personas", tags=["world"], summary="获取角色与权限摘要")  # 注册人设查询接口
@@ -187,7 +350,7 @@ async def get_personas() -> PersonasResponse:  # 定义处理函数
 async def chat_simulate(message: MessageIn) -> ChatSimulateResponse:  # 定义处理函数
     """根据用户输入与世界状态生成多角色回复。"""  # 函数 docstring,说明用途
 
-    world_state = _store.load_world_state()  # 加载世界状态
+    world_state = await _async_store.load_world_state()  # 在线程池中加载世界状态
     if message.location:  # 若请求覆盖地点
         world_state = WorldState(  # 创建新的世界状态实例
             version=world_state.version,  # 继承版本
@@ -196,6 +359,7 @@ async def chat_simulate(message: MessageIn) -> ChatSimulateResponse:  # 定义
             location=message.location,  # 使用覆盖地点
             major_events=world_state.major_events,  # 保留事件
             seed=world_state.seed,  # 保留种子
+            tick=world_state.tick,  # 保留 tick 计数
         )  # 结束 WorldState 构造
     personas = settings.personas  # 获取默认角色列表
     if message.roles:  # 若指定角色子集
@@ -207,7 +371,9 @@ async def chat_simulate(message: MessageIn) -> ChatSimulateResponse:  # 定义
                 status_code=400,  # 指定状态码
                 detail=f"未知角色:{exc.args[0]}",  # 提供错误详情
             ) from exc  # 保留原始异常
-    quests = _quest_generator.ensure_seed_quests(world_state)  # 获取当前任务
+    quests = await _async_store.run(
+        _quest_generator.ensure_seed_quests, world_state
+    )  # 获取当前任务
     generator = build_generator(  # 构建角色生成器
         settings=settings,  # 传入配置
         world_state=world_state,  # 传入世界状态
@@ -3,9 +3,13 @@
 from __future__ import annotations  # 导入未来注解特性,支持前向引用类型
 
 import json  # 导入 json 模块,用于解析覆盖配置
+from collections.abc import Mapping  # 导入 Mapping,标注只读权限映射
 from functools import lru_cache  # 导入 lru_cache,用于缓存配置实例
+from pathlib import Path  # 导入 Path,表示数据目录
+from types import MappingProxyType  # 导入 MappingProxyType,提供只读映射视图
+from typing import Literal  # 导入 Literal,约束枚举型配置
 
-from pydantic import Field, ValidationError  # 导入 Field 与 ValidationError,声明字段并处理错误
+from pydantic import Field, PrivateAttr, ValidationError  # 导入字段声明、私有属性与校验错误
 from pydantic_settings import (  # 导入 pydantic_settings 中的类
     BaseSettings,  # BaseSettings 用于读取环境变量
     SettingsConfigDict,  # SettingsConfigDict 用于定义模型配置
@@ -86,11 +90,194 @@ class Settings(BaseSettings):  # 定义 Settings 类,继承 BaseSettings
         description="单个区块的边长",  # 字段描述
         alias="CHUNK_SIZE",  # 指定环境变量名称
     )  # 结束 Field 定义
+    chunk_format: str = Field(  # 定义区块存储格式字段
+        default="json",  # 默认沿用 JSON 格式
+        description="区块写入格式,可为 json 或 binary,读取时自动识别",  # 字段描述
+        alias="CHUNK_FORMAT",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    storage_backend: str = Field(  # 定义存储后端字段
+        default="files",  # 默认沿用目录文件布局
+        description="世界数据存储后端:files 为 data/world 目录,sqlite 为 data/world/world.db",
+        alias="STORAGE_BACKEND",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    data_dir: Path | None = Field(  # 定义数据目录字段
+        default=None,  # 默认使用仓库中的 data 目录
+        description="世界数据、任务与审计日志的根目录,未设置时为仓库中的 data 目录",  # 字段描述
+        alias="DATA_DIR",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    chunk_cache_max_chunks: int = Field(  # 定义区块缓存数量上限
+        default=4096,  # 默认最多 4096 个区块
+        ge=1,  # 至少为 1
+        description="内存中最多缓存的区块数量,超出后按 LRU 淘汰已落盘区块",  # 字段描述
+        alias="CHUNK_CACHE_MAX_CHUNKS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    chunk_cache_max_bytes: int = Field(  # 定义区块缓存字节上限
+        default=64 * 1024 * 1024,  # 默认 64 MiB
+        ge=1,  # 至少为 1
+        description="区块缓存的估算内存预算(字节)",  # 字段描述
+        alias="CHUNK_CACHE_MAX_BYTES",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    write_behind: bool = Field(  # 定义延迟写回开关
+        default=False,  # 默认每次动作同步写盘
+        description="是否启用延迟写回,由后台任务批量刷盘",  # 字段描述
+        alias="WRITE_BEHIND",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    flush_interval_seconds: float = Field(  # 定义刷盘间隔字段
+        default=2.0,  # 默认两秒
+        gt=0,  # 必须为正数
+        description="延迟写回模式下的最长刷盘间隔(秒)",  # 字段描述
+        alias="FLUSH_INTERVAL_SECONDS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    flush_threshold: int = Field(  # 定义刷盘阈值字段
+        default=64,  # 默认 64 个脏对象
+        ge=1,  # 至少为 1
+        description="脏区块与文档累计达到该数量时提前刷盘",  # 字段描述
+        alias="FLUSH_THRESHOLD",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    journal_enabled: bool = Field(  # 定义预写日志开关
+        default=False,  # 默认关闭
+        description="是否启用预写日志,启用后按检查点批量写回文件",  # 字段描述
+        alias="JOURNAL_ENABLED",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    journal_fsync_batch: int = Field(  # 定义日志分组 fsync 事务数
+        default=16,  # 默认 16 个事务
+        ge=1,  # 至少为 1
+        description="预写日志累计多少个事务后执行一次 fsync",  # 字段描述
+        alias="JOURNAL_FSYNC_BATCH",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    journal_fsync_interval_seconds: float = Field(  # 定义日志分组 fsync 时间窗口
+        default=0.05,  # 默认 50 毫秒
+        ge=0,  # 不可为负
+        description="距上次 fsync 超过该秒数时立即 fsync",  # 字段描述
+        alias="JOURNAL_FSYNC_INTERVAL_SECONDS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    journal_checkpoint_bytes: int = Field(  # 定义检查点字节阈值
+        default=4 * 1024 * 1024,  # 默认 4 MiB
+        ge=1,  # 至少为 1
+        description="预写日志累计达到该字节数时提前执行检查点",  # 字段描述
+        alias="JOURNAL_CHECKPOINT_BYTES",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    usage_snapshot_every: int = Field(  # 定义用量快照阈值
+        default=256,  # 默认 256 个键
+        ge=1,  # 至少为 1
+        description="用量增量累计达到该数量的 (角色, 动作) 键时改写完整快照",  # 字段描述
+        alias="USAGE_SNAPSHOT_EVERY",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    store_io_workers: int = Field(  # 定义存储线程池大小
+        default=8,  # 默认 8 个线程
+        ge=1,  # 至少为 1
+        description="接口处理函数卸载阻塞存储操作所用的线程数",  # 字段描述
+        alias="STORE_IO_WORKERS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    action_batch_max_size: int = Field(  # 定义批量动作上限
+        default=1000,  # 默认 1000 个动作
+        ge=1,  # 至少为 1
+        description="POST /world/actions 单次请求允许的最大动作数量",  # 字段描述
+        alias="ACTION_BATCH_MAX_SIZE",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    brush_max_cells: int = Field(  # 定义区域笔刷格子上限
+        default=1024,  # 默认 1024 格,即 32x32 区块的全部格子
+        ge=1,  # 至少为 1
+        description="单次区域笔刷动作最多覆盖的格子数",  # 字段描述
+        alias="BRUSH_MAX_CELLS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    brush_quota_mode: Literal["cell", "stroke"] = Field(  # 定义笔刷配额计量方式
+        default="cell",  # 默认按格计量
+        description="区域笔刷的配额计量方式:cell 按格子数,stroke 每笔计一次;冷却始终按笔计",
+        alias="BRUSH_QUOTA_MODE",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    action_log_flush_lines: int = Field(  # 定义审计日志分组行数
+        default=256,  # 默认 256 行
+        ge=1,  # 至少为 1
+        description="审计日志缓冲达到该行数时立即写入",  # 字段描述
+        alias="ACTION_LOG_FLUSH_LINES",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    action_log_flush_interval_seconds: float = Field(  # 定义审计日志分组时间窗口
+        default=1.0,  # 默认 1 秒
+        ge=0,  # 不能为负
+        description="审计日志缓冲行在内存中的最长停留秒数",  # 字段描述
+        alias="ACTION_LOG_FLUSH_INTERVAL_SECONDS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    action_log_max_bytes: int = Field(  # 定义审计日志轮转大小
+        default=64 * 1024 * 1024,  # 默认 64 MiB
+        ge=0,  # 0 表示不按大小轮转
+        description="actions.log 超过该字节数时轮转,0 表示不按大小轮转",  # 字段描述
+        alias="ACTION_LOG_MAX_BYTES",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    action_log_rotate_daily: bool = Field(  # 定义审计日志按日轮转开关
+        default=True,  # 默认按日轮转
+        description="日期变化时轮转 actions.log",  # 字段描述
+        alias="ACTION_LOG_ROTATE_DAILY",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    action_log_compress: bool = Field(  # 定义审计日志压缩开关
+        default=True,  # 默认压缩
+        description="以 gzip 压缩已轮转的审计日志段",  # 字段描述
+        alias="ACTION_LOG_COMPRESS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    action_log_index: bool = Field(  # 定义审计日志索引开关
+        default=True,  # 默认启用
+        description="维护 data/logs/actions.index.db 旁路索引,支持 GET /world/log 查询",  # 字段描述
+        alias="ACTION_LOG_INDEX",  # 指定环境变量名称
+    )  # 结束 Field 定义
     tick_tree_grow_steps: int = Field(  # 定义树苗成长步数字段
         default=3,  # 默认三步成长
         description="树苗成长为成树所需 tick 数",  # 字段描述
         alias="TICK_TREE_GROW_STEPS",  # 指定环境变量名称
     )  # 结束 Field 定义
+    tick_crop_grow_steps: int = Field(  # 定义作物成长步数字段
+        default=4,  # 默认四步成熟
+        ge=1,  # 至少一步
+        le=10,  # 不超过成长平面允许的最大阶段
+        description="农田作物从播种到成熟所需 tick 数",  # 字段描述
+        alias="TICK_CROP_GROW_STEPS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    tick_shrub_spread_chance: float = Field(  # 定义灌木蔓延概率字段
+        default=0.02,  # 默认每 tick 2%
+        ge=0,  # 不能为负数
+        le=1,  # 不超过 1
+        description="每个灌木每 tick 向相邻草地蔓延的概率",  # 字段描述
+        alias="TICK_SHRUB_SPREAD_CHANCE",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    tick_season_length: int = Field(  # 定义季节长度字段
+        default=360,  # 默认 360 个 tick 换季
+        ge=1,  # 至少为 1
+        description="每个季节持续的 tick 数,四季轮换一次年份加一",  # 字段描述
+        alias="TICK_SEASON_LENGTH",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    tick_workers: int = Field(  # 定义 tick 工作进程数量字段
+        default=1,  # 默认在本进程内计算
+        ge=1,  # 至少为 1
+        description="tick 时并行计算各区块更新的工作进程数,1 表示不启用进程池",  # 字段描述
+        alias="TICK_WORKERS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    sim_tick_enabled: bool = Field(  # 定义后台模拟开关
+        default=True,  # 默认启用
+        description="是否在应用生命周期内由后台调度器按固定节奏推进世界时间",  # 字段描述
+        alias="SIM_TICK_ENABLED",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    sim_tick_interval_seconds: float = Field(  # 定义 tick 间隔字段
+        default=10.0,  # 默认每 10 秒一次
+        gt=0,  # 必须为正数
+        description="后台模拟调度器的 tick 间隔(秒)",  # 字段描述
+        alias="SIM_TICK_INTERVAL_SECONDS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    sim_overload_policy: Literal["skip", "catch_up"] = Field(  # 定义过载策略字段
+        default="skip",  # 默认跳过错过的 tick
+        description="tick 耗时超过间隔时的处理方式:skip 跳过错过的 tick,catch_up 立即补跑",
+        alias="SIM_OVERLOAD_POLICY",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    sim_max_catch_up_ticks: int = Field(  # 定义补跑上限字段
+        default=4,  # 默认最多补跑 4 次
+        ge=0,  # 不能为负数
+        description="catch_up 策略下最多连续补跑的 tick 数,其余仍然跳过",  # 字段描述
+        alias="SIM_MAX_CATCH_UP_TICKS",  # 指定环境变量名称
+    )  # 结束 Field 定义
+    sim_subscriber_queue_size: int = Field(  # 定义订阅队列长度字段
+        default=64,  # 默认 64 个事件
+        ge=1,  # 至少为 1
+        description="每个 tick 订阅者缓存的事件数量,超出后丢弃最旧的事件",  # 字段描述
+        alias="SIM_SUBSCRIBER_QUEUE_SIZE",  # 指定环境变量名称
+    )  # 结束 Field 定义
     use_external_llm: bool = Field(  # 定义外部 LLM 开关
         default=False,  # 默认关闭
         description="是否启用外部大模型",  # 字段描述
@@ -117,6 +304,10 @@ class Settings(BaseSettings):  # 定义 Settings 类,继承 BaseSettings
         populate_by_name=True,  # 支持通过字段名或别名赋值
     )  # 结束模型配置
 
+    _role_permissions_cache: tuple[str | None, Mapping[str, RolePermission]] | None = PrivateAttr(
+        default=None
+    )  # 权限映射缓存:(覆盖 JSON, 解析结果)
+
     @property
     def world_state(self) -> WorldState:  # 定义 world_state 属性
         """根据配置构造默认世界状态对象。"""  # 属性 docstring,说明用途
@@ -146,19 +337,26 @@ class Settings(BaseSettings):  # 定义 Settings 类,继承 BaseSettings
         return self._default_personas()  # 若未覆盖则返回默认人设
 
     @property
-    def role_permissions(self) -> dict[str, RolePermission]:  # 定义 role_permissions 属性
-        """返回六位角色的权限配置映射。"""  # 属性 docstring,说明用途
+    def role_permissions(self) -> Mapping[str, RolePermission]:  # 定义 role_permissions 属性
+        """返回六位角色的只读权限映射;按覆盖 JSON 缓存,JSON 变化后才重新解析。"""  # 属性 docstring
 
+        cached = self._role_permissions_cache  # 读取缓存
+        if cached is not None and cached[0] == self.role_permissions_json:  # 配置未变化
+            return cached[1]  # 返回同一映射,便于下游按对象判断是否需要重新编译
         if self.role_permissions_json:  # 如果提供了覆盖 JSON
             try:  # 尝试解析 JSON
                 payload = json.loads(self.role_permissions_json)  # 解析字符串
             except json.JSONDecodeError as exc:  # 捕获解析错误
                 raise ValueError("ROLE_PERMISSIONS_JSON 必须是有效 JSON") from exc  # 抛出错误
-            return {  # 返回解析后的权限映射
+            permissions = {  # 解析后的权限映射
                 name: RolePermission.model_validate(data)  # 将每个条目转换为 RolePermission
                 for name, data in payload.items()  # 遍历 JSON 中的角色配置
             }  # 结束字典推导
-        return self._default_role_permissions()  # 若未覆盖则使用默认权限
+        else:  # 未覆盖
+            permissions = self._default_role_permissions()  # 使用默认权限
+        view = MappingProxyType(permissions)  # 只读视图,调用方无法改动缓存中的全局权限表
+        self._role_permissions_cache = (self.role_permissions_json, view)  # 写入缓存
+        return view  # 返回权限映射
 
     def _default_personas(self) -> list[Persona]:  # 定义内部方法,构建默认人设
         """提供六位核心角色的预置人设信息。"""  # 方法 docstring,说明用途
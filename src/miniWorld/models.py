@@ -2,6 +2,8 @@
 
 from __future__ import annotations  # 导入未来注解特性,支持前向引用
 
+from typing import Any  # 导入 Any,用于描述日志字典
+
 from pydantic import BaseModel, Field  # 导入 BaseModel 与 Field,用于数据建模
 
 
@@ -101,3 +103,16 @@ class PersonasResponse(BaseModel):  # 定义 /personas 的响应模型
         default_factory=list,  # 默认空列表
         description="角色权限摘要列表",  # 字段描述
     )  # 结束 Field 定义
+
+
+class ActionLogPage(BaseModel):  # 定义审计日志分页响应模型
+    """描述 /world/log 的一页查询结果。"""  # 类 docstring,说明用途
+
+    entries: list[dict[str, Any]] = Field(  # 日志列表
+        default_factory=list,  # 默认空列表
+        description="按时间从新到旧排列的日志,每条附带 seq",  # 字段描述
+    )  # 结束 Field 定义
+    next_cursor: int | None = Field(  # 下一页游标
+        default=None,  # 默认无下一页
+        description="传入 cursor 参数获取更早的日志,为空表示没有更多数据",  # 字段描述
+    )  # 结束 Field 定义
@@ -0,0 +1,209 @@
+"""实现常驻句柄、分组刷写并按大小或日期轮转压缩的审计日志写入器。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import gzip  # 导入 gzip,用于压缩已封存的日志段
+import logging  # 导入 logging,记录压缩失败
+import shutil  # 导入 shutil,用于流式复制压缩
+import time  # 导入 time,用于计算刷写间隔与日期
+from collections.abc import Callable, Iterator  # 导入回调与迭代器类型
+from pathlib import Path  # 导入 Path,处理文件路径
+from threading import Event, Lock, Thread  # 导入线程工具,实现后台刷写与压缩
+from typing import TextIO  # 导入 TextIO,用于标注文件句柄
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+LOG_NAME = "actions.log"  # 当前写入的日志文件名
+SEGMENT_PREFIX = "actions-"  # 已封存日志段的文件名前缀
+
+
+class ActionLogWriter:  # 定义审计日志写入器
+    """在内存中缓冲日志行并分组写入常驻句柄,超过大小或跨日时封存并压缩旧段。"""  # 类 docstring
+
+    def __init__(  # 定义构造函数
+        self,
+        directory: Path,  # 日志目录
+        flush_lines: int = 256,  # 缓冲达到该行数时立即写入
+        flush_interval_seconds: float = 1.0,  # 缓冲行最长停留秒数
+        max_bytes: int = 64 * 1024 * 1024,  # 当前段超过该字节数时轮转,0 表示不按大小轮转
+        rotate_daily: bool = True,  # 是否在日期变化时轮转
+        compress: bool = True,  # 是否以 gzip 压缩封存的日志段
+        clock: Callable[[], float] = time.time,  # 当前时间来源,便于测试日期轮转
+    ) -> None:  # 构造函数返回 None
+        """创建日志目录,沿用已有 actions.log 作为当前段。"""  # 方法 docstring,说明用途
+
+        directory.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+        self._dir = directory  # 保存目录
+        self._path = directory / LOG_NAME  # 当前段路径
+        self._flush_lines = max(1, flush_lines)  # 保存分组行数
+        self._flush_interval = max(0.0, flush_interval_seconds)  # 保存分组时间窗口
+        self._max_bytes = max(0, max_bytes)  # 保存轮转字节阈值
+        self._rotate_daily = rotate_daily  # 保存按日轮转开关
+        self._compress = compress  # 保存压缩开关
+        self._clock = clock  # 保存时间来源
+        self._buffer: list[str] = []  # 尚未写入的日志行
+        self._first_buffered = 0.0  # 缓冲中最早一行的时间
+        self._handle: TextIO | None = None  # 当前段句柄,首次写入时打开
+        self._size = self._path.stat().st_size if self._path.exists() else 0  # 当前段字节数
+        self._day = self._day_of(self._path.stat().st_mtime) if self._size else None  # 当前段日期
+        self._lock = Lock()  # 串行化缓冲、写入与轮转
+        self._compressors: list[Thread] = []  # 尚未结束的压缩线程
+        self._stop = Event()  # 后台刷写线程的停止信号
+        self._wakeup = Event()  # 缓冲非空时唤醒后台刷写线程
+        self._flusher: Thread | None = None  # 后台刷写线程,首次缓冲时启动
+        self.flush_count = 0  # 记录写入次数,便于观测分组效果
+        self.rotation_count = 0  # 记录轮转次数
+
+    def append(self, lines: list[str]) -> None:  # 定义追加方法
+        """缓冲日志行,达到行数或时间窗口时写入当前段。"""  # 方法 docstring,说明用途
+
+        if not lines:  # 无日志行
+            return  # 直接返回
+        with self._lock:  # 加锁缓冲
+            if not self._buffer:  # 缓冲由空变为非空
+                self._first_buffered = time.monotonic()  # 记录最早时间
+                self._ensure_flusher_locked()  # 确保后台刷写线程运行
+                self._wakeup.set()  # 唤醒后台线程计时
+            self._buffer.extend(lines)  # 追加日志行
+            if (  # 达到分组行数或时间窗口
+                len(self._buffer) >= self._flush_lines
+                or time.monotonic() - self._first_buffered >= self._flush_interval
+            ):
+                self._flush_locked()  # 立即写入
+
+    def flush(self) -> None:  # 定义强制写入方法
+        """立即写入全部缓冲行。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁
+            self._flush_locked()  # 写入缓冲
+
+    def iter_lines(self) -> Iterator[str]:  # 定义日志遍历方法
+        """先写入缓冲,再按时间顺序读取全部封存段与当前段。"""  # 方法 docstring,说明用途
+
+        self.flush()  # 写入缓冲
+        self.wait_for_compression()  # 等待压缩结束,避免读到半成品
+        for path in [*self.segments(), self._path]:  # 遍历日志段
+            if not path.exists():  # 段不存在
+                continue  # 跳过
+            opener = gzip.open if path.suffix == ".gz" else open  # 按后缀选择打开方式
+            with opener(path, "rt", encoding="utf-8") as handle:  # 打开日志段
+                for line in handle:  # 遍历行
+                    if line.strip():  # 跳过空行
+                        yield line.rstrip("\n")  # 返回日志行
+
+    def segments(self) -> list[Path]:  # 定义封存段枚举方法
+        """返回已封存的日志段,文件名按日期与序号排序即时间顺序。"""  # 方法 docstring
+
+        found: dict[str, Path] = {}  # 以去掉 .gz 的名称去重
+        for path in self._dir.glob(f"{SEGMENT_PREFIX}*.log*"):  # 遍历封存段
+            if path.suffix in {".log", ".gz"}:  # 跳过临时文件
+                key = path.name.removesuffix(".gz")  # 计算去重键
+                if key not in found or path.suffix == ".gz":  # 压缩完成的文件优先
+                    found[key] = path  # 记录路径
+        return [found[key] for key in sorted(found)]  # 按名称排序返回
+
+    def wait_for_compression(self) -> None:  # 定义等待压缩方法
+        """等待全部后台压缩线程结束。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁取出线程列表
+            pending, self._compressors = self._compressors, []  # 取出并清空
+        for thread in pending:  # 遍历线程
+            thread.join()  # 等待结束
+
+    def close(self) -> None:  # 定义关闭方法
+        """停止后台线程,写入剩余缓冲并关闭当前段。"""  # 方法 docstring,说明用途
+
+        self._stop.set()  # 通知后台线程退出
+        self._wakeup.set()  # 唤醒后台线程
+        if self._flusher is not None:  # 若后台线程已启动
+            self._flusher.join()  # 等待退出
+            self._flusher = None  # 清空引用
+        with self._lock:  # 加锁
+            self._flush_locked()  # 写入剩余缓冲
+            if self._handle is not None:  # 若句柄已打开
+                self._handle.close()  # 关闭句柄
+                self._handle = None  # 清空句柄
+        self.wait_for_compression()  # 等待压缩完成
+
+    def _flush_locked(self) -> None:  # 定义内部写入方法
+        """在已持有锁的情况下按需轮转,然后一次写入全部缓冲行。"""  # 方法 docstring
+
+        if not self._buffer:  # 无缓冲
+            return  # 直接返回
+        data = "".join(line + "\n" for line in self._buffer)  # 拼接缓冲
+        self._buffer = []  # 清空缓冲
+        today = self._day_of(self._clock())  # 计算当前日期
+        encoded = len(data.encode("utf-8"))  # 计算写入字节数
+        if self._size and (  # 当前段非空且需要轮转
+            (self._rotate_daily and self._day != today)
+            or (self._max_bytes and self._size + encoded > self._max_bytes)
+        ):
+            self._rotate_locked()  # 封存当前段
+        if self._handle is None:  # 句柄未打开
+            self._handle = self._path.open("a", encoding="utf-8")  # 追加打开当前段
+        if not self._size:  # 新段
+            self._day = today  # 记录段日期
+        self._handle.write(data)  # 写入日志行
+        self._handle.flush()  # 推入操作系统缓冲
+        self._size += encoded  # 累加字节数
+        self.flush_count += 1  # 累加写入次数
+
+    def _rotate_locked(self) -> None:  # 定义内部轮转方法
+        """关闭当前段并重命名为带日期与序号的封存段,随后在后台压缩。"""  # 方法 docstring
+
+        if self._handle is not None:  # 若句柄已打开
+            self._handle.close()  # 关闭句柄
+            self._handle = None  # 清空句柄
+        day = self._day or self._day_of(self._clock())  # 封存段所属日期
+        pattern = f"{SEGMENT_PREFIX}{day}-*"  # 同日封存段的文件名模式
+        stems = [path.name.split(".")[0] for path in self._dir.glob(pattern)]  # 同日封存段
+        sequence = 1 + max((int(stem.rsplit("-", 1)[1]) for stem in stems), default=0)  # 新序号
+        sealed = self._dir / f"{SEGMENT_PREFIX}{day}-{sequence:04d}.log"  # 封存段路径
+        self._path.replace(sealed)  # 重命名当前段
+        self._size = 0  # 重置字节数
+        self._day = None  # 重置段日期
+        self.rotation_count += 1  # 累加轮转次数
+        if self._compress:  # 需要压缩
+            thread = Thread(target=_compress_segment, args=(sealed,), daemon=True)  # 创建压缩线程
+            thread.start()  # 在后台压缩,不阻塞写入
+            self._compressors.append(thread)  # 记录线程
+
+    def _ensure_flusher_locked(self) -> None:  # 定义后台线程启动方法
+        """在首次缓冲时启动按时间窗口写入的后台线程。"""  # 方法 docstring,说明用途
+
+        if self._flusher is None and not self._stop.is_set():  # 尚未启动且未关闭
+            self._flusher = Thread(target=self._run, daemon=True)  # 创建后台刷写线程
+            self._flusher.start()  # 启动线程
+
+    def _run(self) -> None:  # 定义后台刷写循环
+        """缓冲非空时等待一个时间窗口再写入,保证空闲时日志也不会长期滞留内存。"""  # 方法 docstring
+
+        while not self._stop.is_set():  # 直到收到停止信号
+            self._wakeup.wait()  # 等待缓冲非空
+            self._wakeup.clear()  # 重置事件
+            if self._stop.wait(self._flush_interval):  # 等待时间窗口,期间收到停止信号则退出
+                return  # 剩余缓冲由 close 写入
+            try:  # 写入缓冲
+                self.flush()  # 写入到期的缓冲
+            except OSError:  # 捕获磁盘错误
+                logger.exception("审计日志写入失败,将在下次写入时重试")  # 记录异常
+
+    @staticmethod
+    def _day_of(timestamp: float) -> str:  # 定义日期格式化工具
+        """返回时间戳对应的本地日期字符串。"""  # 方法 docstring,说明用途
+
+        return time.strftime("%Y%m%d", time.localtime(timestamp))  # 格式化日期
+
+
+def _compress_segment(path: Path) -> None:  # 定义日志段压缩函数
+    """将封存段压缩为同名 .gz 文件,完成后删除原文件。"""  # 函数 docstring,说明用途
+
+    target = path.with_name(path.name + ".gz")  # 目标路径
+    partial = path.with_name(path.name + ".gz.tmp")  # 临时路径,避免读取到半成品
+    try:  # 执行压缩
+        with path.open("rb") as source, gzip.open(partial, "wb") as sink:  # 打开源与目标
+            shutil.copyfileobj(source, sink)  # 流式压缩
+        partial.replace(target)  # 原子替换
+        path.unlink()  # 删除原文件
+    except OSError:  # 捕获磁盘错误
+        logger.exception("压缩审计日志段 %s 失败,保留未压缩文件", path.name)  # 记录异常
@@ -2,14 +2,18 @@
 
 from __future__ import annotations  # 导入未来注解特性,支持前向引用
 
+from collections.abc import Callable, Mapping  # 导入 Callable 与 Mapping,用于类型标注
 from dataclasses import dataclass  # 导入 dataclass,用于内部临时结构
-from typing import TYPE_CHECKING, Any  # 导入类型工具
+from typing import TYPE_CHECKING, Any, Literal  # 导入类型工具
 
 from pydantic import BaseModel, Field, model_validator  # 导入 BaseModel 等工具
 
-from .chunk import Chunk  # 导入区块模型
-from .store import UsageLimitError, WorldStore  # 导入存储相关类型
-from .tiles import TileType  # 导入瓦片类型枚举
+from .brush import flood_cells, line_cells, rect_cells  # 导入笔刷格子枚举
+from .chunk import GROWTH_NONE, CellCodes, Chunk, codes_dump  # 导入区块与格子编码工具
+from .permissions import CompiledRole, PermissionEngine  # 导入编译后的权限引擎
+from .store import WorldStore  # 导入世界存储
+from .tiles import TileType, tile_to_code  # 导入瓦片类型枚举与编码函数
+from .usage import UsageLimitError  # 导入用量异常
 
 if TYPE_CHECKING:  # 类型检查分支,避免循环导入
     from ..config import Settings  # 仅在类型检查时导入 Settings
@@ -52,6 +56,29 @@ class Position(BaseModel):  # 定义格子坐标模型
     y: int = Field(..., ge=0, description="格子 Y 坐标")  # 定义纵向坐标
 
 
+class BrushShape(BaseModel):  # 定义区域笔刷模型
+    """描述一次区域动作覆盖的格子:矩形、直线或洪泛填充,范围限于目标区块内。"""  # 类 docstring
+
+    kind: Literal["rect", "line", "flood"] = Field(..., description="笔刷形状")  # 形状
+    to: Position | None = Field(  # 定义终点字段
+        default=None,  # 洪泛填充无需终点
+        description="矩形对角或直线终点,起点为请求的 pos",  # 字段描述
+    )  # 结束 Field 定义
+    limit: int | None = Field(  # 定义洪泛上限字段
+        default=None,  # 默认使用配置上限
+        ge=1,  # 至少 1 格
+        description="洪泛填充最多覆盖的格子数,不超过 BRUSH_MAX_CELLS",  # 字段描述
+    )  # 结束 Field 定义
+
+    @model_validator(mode="after")  # 定义模型验证器
+    def _validate_to(self) -> BrushShape:  # 定义验证方法
+        """矩形与直线必须提供终点。"""  # 方法 docstring,说明用途
+
+        if self.kind != "flood" and self.to is None:  # 缺少终点
+            raise ValueError(f"{self.kind} 笔刷需要提供 to")  # 抛出错误
+        return self  # 返回验证后的实例
+
+
 class ActionRequest(BaseModel):  # 定义动作请求模型
     """描述一次世界编辑动作的输入参数。"""  # 类 docstring,说明用途
 
@@ -64,6 +91,15 @@ class ActionRequest(BaseModel):  # 定义动作请求模型
         description="附加参数,如目标瓦片",  # 字段描述
     )  # 结束 Field 定义
     client_ts: int = Field(..., ge=0, description="客户端提供的毫秒时间戳")  # 时间戳
+    expected_revision: int | None = Field(  # 定义期望修订号字段
+        default=None,  # 默认不校验
+        ge=0,  # 修订号非负
+        description="客户端读取到的区块修订号,与当前修订号不一致时返回 409",  # 字段描述
+    )  # 结束 Field 定义
+    shape: BrushShape | None = Field(  # 定义区域笔刷字段
+        default=None,  # 默认只修改 pos 一格
+        description="区域笔刷,仅 PLACE_TILE/PLANT_TREE/FARM_TILL/REMOVE_TILE 支持",  # 字段描述
+    )  # 结束 Field 定义
 
     @model_validator(mode="after")  # 定义模型验证器
     def _validate_type(self) -> ActionRequest:  # 定义验证方法
@@ -83,6 +119,36 @@ class ActionChange(BaseModel):  # 定义动作变更摘要模型
     after: dict[str, Any] = Field(..., description="修改后的格子数据")  # 修改后数据
 
 
+@dataclass(frozen=True, slots=True)
+class CellChange:  # 定义内部格子变更记录
+    """动作与 tick 内部使用的单格变更,以平面编码保存,只在接口边界转换为 ActionChange。"""
+
+    cx: int  # 区块 X 坐标
+    cy: int  # 区块 Y 坐标
+    x: int  # 格子 X 坐标
+    y: int  # 格子 Y 坐标
+    before: CellCodes  # 修改前编码
+    after: CellCodes  # 修改后编码
+
+    def to_action_change(self) -> ActionChange:  # 定义公开模型转换方法
+        """转换为公开的 ActionChange,数据来自已校验的平面,跳过模型校验。"""  # 方法 docstring
+
+        return ActionChange.model_construct(  # 直接构造
+            chunk=ChunkCoord.model_construct(cx=self.cx, cy=self.cy),  # 区块坐标
+            pos=Position.model_construct(x=self.x, y=self.y),  # 格子坐标
+            before=codes_dump(self.before),  # 修改前数据
+            after=codes_dump(self.after),  # 修改后数据
+        )  # 结束构造
+
+
+class ChangeGroup(BaseModel):  # 定义紧凑变更组模型
+    """一组修改前后数据完全相同的格子,用于压缩区域动作的变更集。"""  # 类 docstring
+
+    before: dict[str, Any] = Field(..., description="修改前的格子数据")  # 修改前数据
+    after: dict[str, Any] = Field(..., description="修改后的格子数据")  # 修改后数据
+    positions: list[tuple[int, int]] = Field(..., description="组内格子的 (x, y) 坐标")  # 坐标
+
+
 class ActionResponse(BaseModel):  # 定义动作响应模型
     """返回动作执行结果与摘要。"""  # 类 docstring,说明用途
 
@@ -93,6 +159,25 @@ class ActionResponse(BaseModel):  # 定义动作响应模型
         description="本次动作涉及的格子变更集合",  # 字段描述
     )  # 结束 Field 定义
     code: int = Field(default=0, description="错误码,成功时为 0")  # 错误码
+    revision: int | None = Field(  # 定义修订号字段
+        default=None,  # 失败时为空
+        description="动作完成后目标区块的修订号",  # 字段描述
+    )  # 结束 Field 定义
+    change_groups: list[ChangeGroup] = Field(  # 定义紧凑变更集
+        default_factory=list,  # 默认空列表
+        description="区域动作按修改前后数据分组的变更集,此时 changes 为空",  # 字段描述
+    )  # 结束 Field 定义
+
+
+class ActionBatchResponse(BaseModel):  # 定义批量动作响应模型
+    """按提交顺序返回每个动作的结果与成功/失败计数。"""  # 类 docstring,说明用途
+
+    results: list[ActionResponse] = Field(  # 逐项结果
+        default_factory=list,  # 默认空列表
+        description="与请求顺序一致的动作结果,失败项 success 为 false 并附带错误码",  # 字段描述
+    )  # 结束 Field 定义
+    succeeded: int = Field(default=0, description="成功的动作数量")  # 成功数量
+    failed: int = Field(default=0, description="失败的动作数量")  # 失败数量
 
 
 class ForbiddenRegion(BaseModel):  # 定义禁区模型
@@ -142,6 +227,23 @@ class RolePermission(BaseModel):  # 定义角色权限模型
     )  # 结束 Field 定义
 
 
+BRUSH_ACTIONS = frozenset(  # 支持区域笔刷的动作类型
+    {
+        WorldActionType.PLACE_TILE,  # 铺设地块
+        WorldActionType.PLANT_TREE,  # 种植树苗
+        WorldActionType.FARM_TILL,  # 翻耕土地
+        WorldActionType.REMOVE_TILE,  # 拆除
+    }
+)  # 结束集合
+
+CellPlanner = Callable[[CellCodes], CellCodes]  # 由当前格子编码计算新编码,违反规则时抛出异常
+_GRASS = tile_to_code(TileType.GRASS)  # 草地编码
+_WATER = tile_to_code(TileType.WATER)  # 水面编码
+_SOIL = tile_to_code(TileType.SOIL)  # 土地编码
+_FARM = tile_to_code(TileType.FARM)  # 农田编码
+_SAPLING = tile_to_code(TileType.TREE_SAPLING)  # 树苗编码
+
+
 class ActionError(Exception):  # 定义动作异常基类
     """动作执行失败时抛出的异常。"""  # 类 docstring,说明用途
 
@@ -168,18 +270,118 @@ class ActionProcessor:  # 定义动作处理器
         self,  # 传入实例自身
         store: WorldStore,  # 世界存储对象
         settings: Settings,  # 配置对象
-        permissions: dict[str, RolePermission],  # 角色权限映射
+        permissions: Mapping[str, RolePermission],  # 角色权限映射
         quest_progressor: QuestProgressor,  # 任务推进器
     ) -> None:  # 构造函数返回 None
         """保存依赖对象并准备处理动作。"""  # 方法 docstring,说明用途
 
         self._store = store  # 保存世界存储实例
         self._settings = settings  # 保存配置实例
-        self._permissions = permissions  # 保存权限映射
+        self._permissions = PermissionEngine(permissions, settings.chunk_size)  # 编译权限
         self._quest_progressor = quest_progressor  # 保存任务推进器
 
+    def reload_permissions(self, permissions: Mapping[str, RolePermission]) -> None:  # 定义重载方法
+        """配置变化后重新编译角色权限,传入同一映射对象时不做任何事。"""  # 方法 docstring
+
+        self._permissions.reload(permissions)  # 交给权限引擎
+
     def process(self, request: ActionRequest) -> ActionResponse:  # 定义处理动作的方法
-        """执行单次动作并返回结果。"""  # 方法 docstring,说明用途
+        """执行单次动作并返回结果,用量、区块与任务变更写入同一个日志事务。"""  # 方法 docstring
+
+        with self._store.transaction():  # 开启存储事务
+            return self._process(request)  # 执行动作
+
+    def process_batch(self, requests: list[ActionRequest]) -> ActionBatchResponse:  # 定义批量处理
+        """按顺序执行一批动作并逐项返回结果;每个区块只保存一次,任务只读写一次。
+
+        区块被本批前面的动作修改后,后续动作看到的修订号是批末保存后的修订号,因此携带读取时
+        修订号的第二个动作会以 409 失败,与逐个提交的结果一致。非 ActionError 的异常照常抛出,
+        但此前成功的动作仍会保存区块并推进任务,缓存、修订号与日志保持一致。
+        """  # 方法 docstring
+
+        results: list[ActionResponse] = []  # 逐项结果
+        touched: dict[tuple[int, int], Chunk] = {}  # 本批修改过的区块
+        succeeded: list[tuple[ActionRequest, list[CellChange]]] = []  # 成功动作与变更
+        revisions: dict[tuple[int, int], int] = {}  # 区块保存后的修订号
+        with self._store.transaction():  # 整批写入同一个日志事务与一次后端提交
+            try:  # 执行全部动作
+                for request in requests:  # 按提交顺序执行
+                    key = (request.chunk.cx, request.chunk.cy)  # 目标区块
+                    try:  # 执行单个动作,已修改的区块不经缓存重新加载,避免被淘汰后丢失修改
+                        chunk, changes = self._apply(request, pending=touched.get(key))
+                    except ActionError as exc:  # 单项失败不影响其他动作
+                        results.append(  # 记录失败结果
+                            ActionResponse(success=False, message=exc.message, code=exc.code)
+                        )  # 结束追加
+                        continue  # 继续下一项
+                    touched[key] = chunk  # 记录区块,批末统一保存
+                    succeeded.append((request, changes))  # 记录成功动作
+                    results.append(self._success(request, changes, None))  # 修订号在保存后回填
+                    self._log_action(request, len(changes))  # 审计日志在事务中合并为一次写入
+            finally:  # 中途异常时同样保存已修改的区块,避免缓存中留下未记录的修改
+                for key, chunk in touched.items():  # 遍历修改过的区块
+                    revisions[key] = self._store.save_chunk(chunk)  # 保存区块
+                self._quest_progressor.on_actions_success(succeeded)  # 一次读写任务列表
+        for request, result in zip(requests, results, strict=True):  # 回填修订号
+            if result.success:  # 仅成功项
+                result.revision = revisions[(request.chunk.cx, request.chunk.cy)]  # 区块最终修订号
+        return ActionBatchResponse(  # 构造批量响应
+            results=results,  # 逐项结果
+            succeeded=len(succeeded),  # 成功数量
+            failed=len(results) - len(succeeded),  # 失败数量
+        )  # 结束响应构造
+
+    def _process(self, request: ActionRequest) -> ActionResponse:  # 定义动作执行主体
+        """执行单个动作并持久化区块、审计日志与任务进度。"""  # 方法 docstring,说明用途
+
+        chunk, changes = self._apply(request)  # 校验并修改区块
+        revision = self._store.save_chunk(chunk)  # 保存区块变更并取得新修订号
+        self._log_action(request, len(changes))  # 记录审计日志
+        self._quest_progressor.on_action_success(  # 通知任务推进器
+            actor=request.actor,  # 执行者
+            request=request,  # 动作请求
+            changes=changes,  # 变更列表
+        )  # 结束任务更新
+        return self._success(request, changes, revision)  # 构造成功响应
+
+    def _success(  # 定义成功响应构造方法
+        self,
+        request: ActionRequest,  # 动作请求
+        changes: list[CellChange],  # 逐格变更
+        revision: int | None,  # 新修订号
+    ) -> ActionResponse:  # 返回动作响应
+        """构造成功响应,在此把内部变更转换为公开模型;区域动作以分组后的紧凑变更集返回。"""
+
+        if request.shape is None:  # 单格动作
+            return ActionResponse(  # 返回逐格变更
+                success=True,  # 标记成功
+                message="动作执行成功",  # 返回提示消息
+                changes=[change.to_action_change() for change in changes],  # 转换变更列表
+                revision=revision,  # 返回新修订号
+            )  # 结束响应构造
+        groups: dict[tuple[CellCodes, CellCodes], list[tuple[int, int]]] = {}  # 按编码分组
+        for change in changes:  # 遍历变更
+            key = (change.before, change.after)  # 分组键
+            groups.setdefault(key, []).append((change.x, change.y))  # 追加坐标
+        return ActionResponse(  # 返回紧凑变更集
+            success=True,  # 标记成功
+            message=f"区域动作执行成功,共 {len(changes)} 格",  # 返回提示消息
+            change_groups=[  # 分组变更
+                ChangeGroup(before=codes_dump(before), after=codes_dump(after), positions=cells)
+                for (before, after), cells in groups.items()  # 遍历分组
+            ],  # 结束列表
+            revision=revision,  # 返回新修订号
+        )  # 结束响应构造
+
+    def _apply(  # 定义动作应用
+        self,
+        request: ActionRequest,  # 动作请求
+        pending: Chunk | None = None,  # 本批已修改、尚未保存的目标区块
+    ) -> tuple[Chunk, list[CellChange]]:  # 返回区块与变更
+        """校验权限、禁区、规则与用量后修改缓存中的区块,不做持久化;任一格违规则整笔不生效。
+
+        传入 pending 时直接在该区块上继续修改,可见的修订号为批末保存后的修订号。
+        """  # 方法 docstring
 
         permission = self._permissions.get(request.actor)  # 根据角色名称获取权限
         if permission is None:  # 如果没有权限配置
@@ -187,69 +389,113 @@ class ActionProcessor:  # 定义动作处理器
         action_type = request.type  # 读取动作类型
         if action_type not in permission.allowed_actions:  # 校验动作是否被允许
             raise ActionError("动作未被授权", code=403)  # 抛出权限错误
-        self._validate_forbidden_region(permission, request)  # 校验禁区
-        usage_ctx = UsageContext(  # 构建用量上下文
-            quota=permission.daily_quota.get(action_type),  # 获取配额
-            cooldown=permission.cooldown_seconds.get(action_type),  # 获取冷却
-        )  # 结束上下文构建
+        if request.shape is not None and action_type not in BRUSH_ACTIONS:  # 校验笔刷支持
+            raise ActionError(f"{action_type} 不支持区域笔刷", code=400)  # 抛出错误
+        chunk = pending  # 本批已修改的区块
+        if chunk is None:  # 尚未修改过
+            chunk = self._store.load_chunk(  # 加载目标区块
+                cx=request.chunk.cx,  # 区块 X 坐标
+                cy=request.chunk.cy,  # 区块 Y 坐标
+            )  # 结束加载
+        current = chunk.revision if pending is None else chunk.revision + 1  # 可见的修订号
+        if request.expected_revision not in (None, current):  # 区块已被其他请求修改
+            raise ActionError(  # 在消耗配额前拒绝
+                f"区块修订号冲突:期望 {request.expected_revision},当前 {current}",
+                code=409,  # 冲突状态码
+            )  # 结束异常
+        cells = self._target_cells(request, chunk)  # 计算覆盖的格子
+        self._validate_forbidden_region(permission, request, cells)  # 校验禁区
+        planner_factory = {  # 构建动作规划映射,白名单等整笔一致的条件在此只校验一次
+            WorldActionType.PLACE_TILE: self._plan_place_tile,  # 铺设地块
+            WorldActionType.PLACE_STRUCTURE: self._plan_place_structure,  # 放置结构
+            WorldActionType.PLANT_TREE: self._plan_plant_tree,  # 种树
+            WorldActionType.REMOVE_TILE: self._plan_remove_tile,  # 拆除
+            WorldActionType.FARM_TILL: self._plan_farm_till,  # 翻土
+        }  # 结束映射
+        planner = planner_factory[action_type](request, permission)  # 获取格子规划函数
+        cx, cy = chunk.cx, chunk.cy  # 读取区块坐标
+        changes: list[CellChange] = []  # 规划结果,尚不修改区块
+        for (x, y), before in zip(cells, chunk.read_codes(cells), strict=True):  # 逐格规划
+            try:  # 计算新编码
+                changes.append(CellChange(cx, cy, x, y, before, planner(before)))  # 记录变更
+            except ActionError as exc:  # 格子违反规则
+                if request.shape is None:  # 单格动作保持原错误信息
+                    raise  # 直接抛出
+                raise ActionError(f"格子 ({x}, {y}):{exc.message}", code=exc.code) from exc
+        self._consume_usage(request, permission, len(cells))  # 校验并记录配额与冷却
+        chunk.write_codes((change.x, change.y, change.after) for change in changes)  # 整笔写入
+        self._store.track_changes(changes)  # 同步各 tick 系统的活跃格子
+        return chunk, changes  # 返回区块与变更
+
+    def _target_cells(self, request: ActionRequest, chunk: Chunk) -> list[tuple[int, int]]:
+        """返回动作覆盖的区块内格子坐标,越界或超过笔刷上限时抛出异常。"""  # 方法 docstring
+
+        self._validate_position(request.pos, chunk.size)  # 校验起点
+        shape = request.shape  # 读取笔刷
+        if shape is None:  # 单格动作
+            return [(request.pos.x, request.pos.y)]  # 返回起点
+        max_cells = self._settings.brush_max_cells  # 读取笔刷上限
+        if shape.kind == "flood":  # 洪泛填充
+            limit = min(shape.limit or max_cells, max_cells)  # 计算上限
+            return flood_cells(chunk, request.pos.x, request.pos.y, limit)  # 返回连通格子
+        assert shape.to is not None  # 验证器保证矩形与直线提供终点
+        self._validate_position(shape.to, chunk.size)  # 校验终点,笔刷不跨区块
+        enumerate_cells = rect_cells if shape.kind == "rect" else line_cells  # 选择枚举函数
+        cells = enumerate_cells(request.pos.x, request.pos.y, shape.to.x, shape.to.y)  # 枚举格子
+        if len(cells) > max_cells:  # 超过上限
+            raise ActionError(f"笔刷覆盖 {len(cells)} 格,超过上限 {max_cells}", code=400)
+        return cells  # 返回格子
+
+    def _consume_usage(  # 定义用量记录方法
+        self,
+        request: ActionRequest,  # 动作请求
+        permission: CompiledRole,  # 编译后的角色权限
+        cell_count: int,  # 覆盖格子数
+    ) -> None:  # 方法返回 None
+        """按配置以格子数或笔画数扣减配额,冷却始终按笔画计算。"""  # 方法 docstring
+
+        per_cell = (
+            request.shape is not None and self._settings.brush_quota_mode == "cell"
+        )  # 计量方式
+        usage_ctx = UsageContext(*permission.limits.get(request.type, (None, None)))  # 配额与冷却
         try:  # 尝试执行用量校验
             self._store.ensure_usage(  # 调用存储校验配额与冷却
                 actor=request.actor,  # 传入执行者
-                action_type=action_type,  # 传入动作类型
+                action_type=request.type,  # 传入动作类型
                 client_ts=request.client_ts,  # 传入时间戳
                 quota=usage_ctx.quota,  # 传入配额
                 cooldown=usage_ctx.cooldown,  # 传入冷却
+                amount=cell_count if per_cell else 1,  # 本次扣减的次数
             )  # 结束用量校验
         except UsageLimitError as exc:  # 捕获配额或冷却异常
             raise ActionError(exc.message, code=exc.code) from exc  # 转换为 ActionError
-        chunk = self._store.load_chunk(  # 加载目标区块
-            cx=request.chunk.cx,  # 区块 X 坐标
-            cy=request.chunk.cy,  # 区块 Y 坐标
-        )  # 结束加载
-        self._validate_position(request.pos, chunk.size)  # 校验坐标范围
-        handler = {  # 构建动作处理映射
-            WorldActionType.PLACE_TILE: self._handle_place_tile,  # 铺设地块处理函数
-            WorldActionType.PLACE_STRUCTURE: self._handle_place_structure,  # 放置结构处理函数
-            WorldActionType.PLANT_TREE: self._handle_plant_tree,  # 种树处理函数
-            WorldActionType.REMOVE_TILE: self._handle_remove_tile,  # 拆除处理函数
-            WorldActionType.FARM_TILL: self._handle_farm_till,  # 翻土处理函数
-        }  # 结束映射
-        handler_fn = handler[action_type]  # 获取对应的处理函数
-        changes = handler_fn(request=request, chunk=chunk, permission=permission)  # 执行动作
-        self._store.save_chunk(chunk)  # 保存区块变更
+
+    def _log_action(self, request: ActionRequest, cell_count: int) -> None:  # 定义审计日志方法
+        """为成功的动作追加一行审计日志,区域动作附带笔刷与格子数。"""  # 方法 docstring
+
+        payload = dict(request.payload or {})  # 复制附加参数
+        if request.shape is not None:  # 区域动作
+            payload["shape"] = request.shape.model_dump()  # 记录笔刷
+            payload["cells"] = cell_count  # 记录格子数
         self._store.append_action_log(  # 记录审计日志
             actor=request.actor,  # 执行者
-            action_type=action_type,  # 动作类型
+            action_type=request.type,  # 动作类型
             chunk=request.chunk.model_dump(),  # 区块信息
             pos=request.pos.model_dump(),  # 坐标信息
-            payload=request.payload or {},  # 附加参数
+            payload=payload,  # 附加参数
         )  # 结束日志记录
-        self._quest_progressor.on_action_success(  # 通知任务推进器
-            actor=request.actor,  # 执行者
-            request=request,  # 动作请求
-            changes=changes,  # 变更列表
-        )  # 结束任务更新
-        return ActionResponse(  # 构造成功响应
-            success=True,  # 标记成功
-            message="动作执行成功",  # 返回提示消息
-            changes=changes,  # 返回变更列表
-        )  # 结束响应构造
 
     def _validate_forbidden_region(  # 定义禁区校验方法
         self,
-        permission: RolePermission,  # 角色权限
+        permission: CompiledRole,  # 编译后的角色权限
         request: ActionRequest,  # 动作请求
+        cells: list[tuple[int, int]],  # 覆盖的格子
     ) -> None:  # 方法返回 None
-        """若目标坐标位于禁区则抛出异常。"""  # 方法 docstring,说明用途
+        """若任一目标格子位于禁区则抛出异常,每格一次位图查询。"""  # 方法 docstring,说明用途
 
-        for region in permission.forbidden_regions:  # 遍历禁区列表
-            if region.contains(  # 调用 contains 判断
-                cx=request.chunk.cx,  # 区块 X
-                cy=request.chunk.cy,  # 区块 Y
-                x=request.pos.x,  # 格子 X
-                y=request.pos.y,  # 格子 Y
-            ):  # 判断结束
-                raise ActionError("目标坐标位于禁区", code=403)  # 抛出错误
+        cx, cy = request.chunk.cx, request.chunk.cy  # 读取区块坐标
+        if any(permission.forbids(cx, cy, x, y) for x, y in cells):  # 判断格子
+            raise ActionError("目标坐标位于禁区", code=403)  # 抛出错误
 
     def _validate_position(self, pos: Position, size: int) -> None:  # 定义坐标校验方法
         """保证坐标没有越界。"""  # 方法 docstring,说明用途
@@ -257,153 +503,112 @@ class ActionProcessor:  # 定义动作处理器
         if not 0 <= pos.x < size or not 0 <= pos.y < size:  # 判断范围
             raise ActionError("坐标越界", code=400)  # 抛出错误
 
-    def _handle_place_tile(  # 定义铺设地块处理函数
+    def _plan_place_tile(  # 定义铺设地块规划函数
         self,
         request: ActionRequest,  # 动作请求
-        chunk: Chunk,  # 目标区块
-        permission: RolePermission,  # 角色权限
-    ) -> list[ActionChange]:  # 返回变更列表
-        """处理基础地块铺设逻辑。"""  # 方法 docstring,说明用途
-
-        tile_name = self._require_tile_name(request)  # 获取目标瓦片名称
-        tile = TileType(tile_name)  # 转换为 TileType 枚举
-        allowed_tiles = permission.tile_whitelist.get(WorldActionType.PLACE_TILE, [])  # 获取白名单
-        if allowed_tiles and tile not in allowed_tiles:  # 如果存在白名单且不包含目标瓦片
+        permission: CompiledRole,  # 编译后的角色权限
+    ) -> CellPlanner:  # 返回格子规划函数
+        """校验目标瓦片后返回基础地块铺设的格子规划函数。"""  # 方法 docstring,说明用途
+
+        tile = tile_to_code(TileType(self._require_tile_name(request)))  # 目标瓦片编码
+        if not permission.allows_code(WorldActionType.PLACE_TILE, tile):  # 位集判断白名单
             raise ActionError("瓦片类型未被授权", code=403)  # 抛出错误
-        cell = chunk.cell_at(request.pos.x, request.pos.y)  # 获取当前格子
-        before = cell.model_dump()  # 记录修改前数据
-        new_cell = cell.model_copy(deep=True)  # 深拷贝为新格子
-        new_cell.base = tile  # 更新基础瓦片
-        if tile == TileType.WATER:  # 若新瓦片是水面
-            new_cell.deco = None  # 清空装饰
-            new_cell.growth_stage = None  # 清空成长数据
-        change = ActionChange(  # 构造变更摘要
-            chunk=request.chunk,  # 区块坐标
-            pos=request.pos,  # 格子坐标
-            before=before,  # 修改前
-            after=new_cell.model_dump(),  # 修改后
-        )  # 结束构造
-        chunk.apply_cell(request.pos.x, request.pos.y, new_cell)  # 应用变更
-        return [change]  # 返回变更列表
 
-    def _handle_place_structure(  # 定义放置结构处理函数
+        def plan(codes: CellCodes) -> CellCodes:  # 定义格子规划
+            """铺设基础瓦片,水面会清空装饰与成长数据。"""  # 函数 docstring,说明用途
+
+            _, deco, height, growth = codes  # 解包编码
+            if tile == _WATER:  # 若新瓦片是水面
+                return tile, 0, height, GROWTH_NONE  # 清空装饰与成长数据
+            return tile, deco, height, growth  # 仅更新基础瓦片
+
+        return plan  # 返回规划函数
+
+    def _plan_place_structure(  # 定义放置结构规划函数
         self,
         request: ActionRequest,  # 动作请求
-        chunk: Chunk,  # 目标区块
-        permission: RolePermission,  # 角色权限
-    ) -> list[ActionChange]:  # 返回变更列表
-        """处理结构放置逻辑,包括房基与法阵。"""  # 方法 docstring,说明用途
-
-        tile_name = self._require_tile_name(request)  # 获取目标瓦片名称
-        tile = TileType(tile_name)  # 转换为枚举
-        allowed_tiles = permission.tile_whitelist.get(  # 获取白名单
-            WorldActionType.PLACE_STRUCTURE,
-            [],
-        )
-        if allowed_tiles and tile not in allowed_tiles:  # 检查白名单
+        permission: CompiledRole,  # 编译后的角色权限
+    ) -> CellPlanner:  # 返回格子规划函数
+        """校验结构类型后返回放置房基与法阵的格子规划函数。"""  # 方法 docstring,说明用途
+
+        tile_type = TileType(self._require_tile_name(request))  # 转换为枚举
+        tile = tile_to_code(tile_type)  # 目标瓦片编码
+        if not permission.allows_code(WorldActionType.PLACE_STRUCTURE, tile):  # 检查白名单
             raise ActionError("结构类型未被授权", code=403)  # 抛出错误
-        if not TileType.is_structure(tile):  # 确保瓦片属于结构类别
+        if not TileType.is_structure(tile_type):  # 确保瓦片属于结构类别
             raise ActionError("目标瓦片不是结构类型", code=400)  # 抛出错误
-        cell = chunk.cell_at(request.pos.x, request.pos.y)  # 获取当前格子
-        if cell.base == TileType.WATER and tile == TileType.HOUSE_BASE:  # 若在水面放置房基
-            raise ActionError("水面需先铺设 WOODFLOOR 才能建造", code=400)  # 抛出规则错误
-        before = cell.model_dump()  # 记录修改前
-        new_cell = cell.model_copy(deep=True)  # 深拷贝格子
-        new_cell.base = tile  # 将基础瓦片更新为结构瓦片
-        change = ActionChange(  # 构造变更摘要
-            chunk=request.chunk,  # 区块坐标
-            pos=request.pos,  # 格子坐标
-            before=before,  # 修改前数据
-            after=new_cell.model_dump(),  # 修改后数据
-        )  # 结束构造
-        chunk.apply_cell(request.pos.x, request.pos.y, new_cell)  # 应用变更
-        return [change]  # 返回变更列表
+        on_water_forbidden = tile_type == TileType.HOUSE_BASE  # 房基不可直接建在水面
+
+        def plan(codes: CellCodes) -> CellCodes:  # 定义格子规划
+            """将基础瓦片替换为结构,水面不可直接建造房基。"""  # 函数 docstring,说明用途
+
+            base, deco, height, growth = codes  # 解包编码
+            if on_water_forbidden and base == _WATER:  # 若在水面放置房基
+                raise ActionError("水面需先铺设 WOODFLOOR 才能建造", code=400)  # 抛出规则错误
+            return tile, deco, height, growth  # 更新为结构瓦片
 
-    def _handle_plant_tree(  # 定义种树处理函数
+        return plan  # 返回规划函数
+
+    def _plan_plant_tree(  # 定义种树规划函数
         self,
         request: ActionRequest,  # 动作请求
-        chunk: Chunk,  # 目标区块
-        permission: RolePermission,  # 角色权限
-    ) -> list[ActionChange]:  # 返回变更列表
-        """处理种植树苗的逻辑。"""  # 方法 docstring,说明用途
-
-        cell = chunk.cell_at(request.pos.x, request.pos.y)  # 获取格子
-        allowed_tiles = permission.tile_whitelist.get(WorldActionType.PLANT_TREE, [])  # 获取白名单
-        if allowed_tiles and cell.base not in allowed_tiles:  # 判断基础瓦片是否可种植
-            raise ActionError("当前地表不允许种树", code=400)  # 抛出错误
-        if cell.deco is not None:  # 若已有装饰
-            raise ActionError("装饰槽已被占用", code=400)  # 抛出错误
-        before = cell.model_dump()  # 记录修改前
-        new_cell = cell.model_copy(deep=True)  # 深拷贝格子
-        new_cell.deco = TileType.TREE_SAPLING  # 放置树苗
-        new_cell.growth_stage = 0  # 初始化成长阶段
-        change = ActionChange(  # 构造变更摘要
-            chunk=request.chunk,  # 区块坐标
-            pos=request.pos,  # 格子坐标
-            before=before,  # 修改前
-            after=new_cell.model_dump(),  # 修改后
-        )  # 结束构造
-        chunk.apply_cell(request.pos.x, request.pos.y, new_cell)  # 应用变更
-        return [change]  # 返回变更列表
+        permission: CompiledRole,  # 编译后的角色权限
+    ) -> CellPlanner:  # 返回格子规划函数
+        """返回种植树苗的格子规划函数。"""  # 方法 docstring,说明用途
+
+        def plan(codes: CellCodes) -> CellCodes:  # 定义格子规划
+            """在允许的地表与空装饰槽上放置树苗。"""  # 函数 docstring,说明用途
 
-    def _handle_remove_tile(  # 定义拆除处理函数
+            base, deco, height, _ = codes  # 解包编码
+            if not permission.allows_code(WorldActionType.PLANT_TREE, base):  # 判断可否种植
+                raise ActionError("当前地表不允许种树", code=400)  # 抛出错误
+            if deco:  # 若已有装饰
+                raise ActionError("装饰槽已被占用", code=400)  # 抛出错误
+            return base, _SAPLING, height, 0  # 放置树苗并初始化成长阶段
+
+        return plan  # 返回规划函数
+
+    def _plan_remove_tile(  # 定义拆除规划函数
         self,
         request: ActionRequest,  # 动作请求
-        chunk: Chunk,  # 目标区块
-        permission: RolePermission,  # 角色权限
-    ) -> list[ActionChange]:  # 返回变更列表
-        """处理拆除或清除装饰的逻辑。"""  # 方法 docstring,说明用途
-
-        cell = chunk.cell_at(request.pos.x, request.pos.y)  # 获取格子
-        before = cell.model_dump()  # 记录修改前
-        new_cell = cell.model_copy(deep=True)  # 深拷贝格子
-        if new_cell.deco is not None:  # 如果存在装饰
-            allowed = permission.tile_whitelist.get(WorldActionType.REMOVE_TILE, [])  # 获取白名单
-            if allowed and new_cell.deco not in allowed:  # 若装饰不在白名单
-                raise ActionError("无权移除此装饰", code=403)  # 抛出错误
-            new_cell.deco = None  # 清空装饰
-            new_cell.growth_stage = None  # 清空成长数据
-        else:  # 若没有装饰则尝试拆除基础瓦片
-            allowed = permission.tile_whitelist.get(WorldActionType.REMOVE_TILE, [])  # 获取白名单
-            if allowed and new_cell.base not in allowed:  # 判断基础瓦片是否允许拆除
+        permission: CompiledRole,  # 编译后的角色权限
+    ) -> CellPlanner:  # 返回格子规划函数
+        """返回拆除或清除装饰的格子规划函数。"""  # 方法 docstring,说明用途
+
+        def plan(codes: CellCodes) -> CellCodes:  # 定义格子规划
+            """优先清除装饰,没有装饰时将基础瓦片恢复为草地。"""  # 函数 docstring,说明用途
+
+            base, deco, height, growth = codes  # 解包编码
+            if deco:  # 如果存在装饰
+                if not permission.allows_code(WorldActionType.REMOVE_TILE, deco):  # 白名单
+                    raise ActionError("无权移除此装饰", code=403)  # 抛出错误
+                return base, 0, height, GROWTH_NONE  # 清空装饰与成长数据
+            if not permission.allows_code(WorldActionType.REMOVE_TILE, base):  # 白名单
                 raise ActionError("无权移除此地块", code=403)  # 抛出错误
-            if new_cell.base in permission.forbidden_remove_bases:  # 判断是否在禁拆列表
+            if permission.protects_code(base):  # 判断是否在禁拆列表
                 raise ActionError("该基础瓦片被保护,无法拆除", code=403)  # 抛出错误
-            new_cell.base = TileType.GRASS  # 拆除后恢复为草地
-        change = ActionChange(  # 构造变更摘要
-            chunk=request.chunk,  # 区块坐标
-            pos=request.pos,  # 格子坐标
-            before=before,  # 修改前数据
-            after=new_cell.model_dump(),  # 修改后数据
-        )  # 结束构造
-        chunk.apply_cell(request.pos.x, request.pos.y, new_cell)  # 应用变更
-        return [change]  # 返回变更列表
+            return _GRASS, deco, height, growth  # 拆除后恢复为草地
 
-    def _handle_farm_till(  # 定义翻土处理函数
+        return plan  # 返回规划函数
+
+    def _plan_farm_till(  # 定义翻土规划函数
         self,
         request: ActionRequest,  # 动作请求
-        chunk: Chunk,  # 目标区块
-        permission: RolePermission,  # 角色权限(未直接使用,保留以便扩展)
-    ) -> list[ActionChange]:  # 返回变更列表
-        """处理翻耕土地的逻辑。"""  # 方法 docstring,说明用途
-
-        cell = chunk.cell_at(request.pos.x, request.pos.y)  # 获取格子
-        allowed_tiles = permission.tile_whitelist.get(WorldActionType.FARM_TILL, [])  # 获取白名单
-        if allowed_tiles and cell.base not in allowed_tiles:  # 判断是否允许翻土
-            raise ActionError("当前地块无法翻土", code=400)  # 抛出错误
-        if cell.base != TileType.SOIL:  # 只有土地方可翻耕
-            raise ActionError("只有 SOIL 可以翻土", code=400)  # 抛出错误
-        before = cell.model_dump()  # 记录修改前
-        new_cell = cell.model_copy(deep=True)  # 深拷贝格子
-        new_cell.base = TileType.FARM  # 更新为农田
-        change = ActionChange(  # 构造变更摘要
-            chunk=request.chunk,  # 区块坐标
-            pos=request.pos,  # 格子坐标
-            before=before,  # 修改前数据
-            after=new_cell.model_dump(),  # 修改后数据
-        )  # 结束构造
-        chunk.apply_cell(request.pos.x, request.pos.y, new_cell)  # 应用变更
-        return [change]  # 返回变更列表
+        permission: CompiledRole,  # 编译后的角色权限
+    ) -> CellPlanner:  # 返回格子规划函数
+        """返回翻耕土地的格子规划函数。"""  # 方法 docstring,说明用途
+
+        def plan(codes: CellCodes) -> CellCodes:  # 定义格子规划
+            """将 SOIL 翻耕为 FARM。"""  # 函数 docstring,说明用途
+
+            base, deco, height, growth = codes  # 解包编码
+            if not permission.allows_code(WorldActionType.FARM_TILL, base):  # 判断是否允许翻土
+                raise ActionError("当前地块无法翻土", code=400)  # 抛出错误
+            if base != _SOIL:  # 只有土地方可翻耕
+                raise ActionError("只有 SOIL 可以翻土", code=400)  # 抛出错误
+            return _FARM, deco, height, growth  # 更新为农田
+
+        return plan  # 返回规划函数
 
     def _require_tile_name(self, request: ActionRequest) -> str:  # 定义提取瓦片名的工具方法
         """从请求 payload 中读取目标瓦片名称。"""  # 方法 docstring,说明用途
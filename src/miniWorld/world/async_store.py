@@ -0,0 +1,175 @@
+"""为 FastAPI 处理函数提供异步存储访问:阻塞 I/O 卸载到专用线程池,按区块加锁。"""  # 模块 docstring
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import asyncio  # 导入 asyncio,用于锁与线程池调度
+import functools  # 导入 functools,用于绑定调用参数
+from collections.abc import AsyncIterator, Callable, Iterable  # 导入迭代器与回调类型
+from concurrent.futures import ThreadPoolExecutor  # 导入线程池,执行阻塞的存储操作
+from contextlib import AsyncExitStack, asynccontextmanager  # 导入上下文工具,实现锁上下文
+from typing import Any, TypeVar  # 导入类型工具
+
+from .chunk import Chunk  # 导入区块模型
+from .store import WorldStore  # 导入世界存储
+from .world_state import WorldState  # 导入世界状态模型
+
+T = TypeVar("T")  # 泛型返回值类型
+
+ChunkKey = tuple[int, int]  # 区块坐标类型别名
+
+
+class WorldGate:  # 定义世界级读写闸门
+    """单区块动作以共享方式进入,全图操作(如 tick)独占进入;等待中的独占者优先。"""  # 类 docstring
+
+    def __init__(self) -> None:  # 定义构造函数
+        """初始化计数与条件变量。"""  # 方法 docstring,说明用途
+
+        self._condition: asyncio.Condition | None = None  # 条件变量,首次使用时绑定事件循环
+        self._shared = 0  # 当前共享持有者数量
+        self._exclusive = False  # 是否被独占
+        self._waiting_exclusive = 0  # 等待独占的数量
+
+    @asynccontextmanager
+    async def shared(self) -> AsyncIterator[None]:  # 定义共享进入方法
+        """等待没有独占者后以共享方式进入。"""  # 方法 docstring,说明用途
+
+        condition = self._get_condition()  # 获取条件变量
+        async with condition:  # 加锁
+            await condition.wait_for(lambda: not self._exclusive and not self._waiting_exclusive)
+            self._shared += 1  # 增加共享计数
+        try:  # 执行临界区
+            yield  # 交出控制权
+        finally:  # 离开临界区
+            async with condition:  # 加锁
+                self._shared -= 1  # 减少共享计数
+                condition.notify_all()  # 唤醒等待者
+
+    @asynccontextmanager
+    async def exclusive(self) -> AsyncIterator[None]:  # 定义独占进入方法
+        """等待全部共享者与独占者离开后独占进入。"""  # 方法 docstring,说明用途
+
+        condition = self._get_condition()  # 获取条件变量
+        async with condition:  # 加锁
+            self._waiting_exclusive += 1  # 登记等待,阻止新的共享者进入
+            try:  # 等待条件满足
+                await condition.wait_for(lambda: not self._exclusive and not self._shared)
+            finally:  # 无论成功或取消都撤销登记
+                self._waiting_exclusive -= 1  # 撤销等待登记
+            self._exclusive = True  # 标记独占
+        try:  # 执行临界区
+            yield  # 交出控制权
+        finally:  # 离开临界区
+            async with condition:  # 加锁
+                self._exclusive = False  # 解除独占
+                condition.notify_all()  # 唤醒等待者
+
+    def _get_condition(self) -> asyncio.Condition:  # 定义条件变量获取方法
+        """在当前事件循环中惰性创建条件变量。"""  # 方法 docstring,说明用途
+
+        if self._condition is None:  # 尚未创建
+            self._condition = asyncio.Condition()  # 创建条件变量
+        return self._condition  # 返回条件变量
+
+
+class AsyncWorldStore:  # 定义异步世界存储
+    """包装 WorldStore:阻塞调用在专用线程池执行,同区块动作串行、不同区块并行。"""  # 类 docstring
+
+    def __init__(self, store: WorldStore, max_workers: int = 8) -> None:  # 定义构造函数
+        """保存底层存储,线程池在首次调用时创建。"""  # 方法 docstring,说明用途
+
+        self._store = store  # 保存世界存储
+        self._max_workers = max(1, max_workers)  # 保存线程数
+        self._executor: ThreadPoolExecutor | None = None  # 专用线程池
+        self._chunk_locks: dict[ChunkKey, tuple[asyncio.Lock, int]] = {}  # 区块锁与引用计数
+        self._gate = WorldGate()  # 世界级读写闸门
+
+    @property
+    def store(self) -> WorldStore:  # 定义底层存储属性
+        """返回被包装的同步存储。"""  # 属性 docstring,说明用途
+
+        return self._store  # 返回存储
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:  # 定义卸载方法
+        """在存储线程池中执行阻塞调用并等待结果。"""  # 方法 docstring,说明用途
+
+        if self._executor is None:  # 首次调用
+            self._executor = ThreadPoolExecutor(  # 创建线程池
+                max_workers=self._max_workers,  # 线程数
+                thread_name_prefix="world-store",  # 线程名前缀,便于排查
+            )  # 结束创建
+        loop = asyncio.get_running_loop()  # 获取当前事件循环
+        call = functools.partial(func, *args, **kwargs)  # 绑定参数
+        return await loop.run_in_executor(self._executor, call)  # 在线程池执行
+
+    def chunk_locked(self, cx: int, cy: int) -> Any:  # 定义区块锁方法
+        """以共享方式进入世界闸门并持有指定区块的锁。"""  # 方法 docstring,说明用途
+
+        return self.chunks_locked([(cx, cy)])  # 委托给多区块加锁
+
+    @asynccontextmanager
+    async def chunks_locked(self, keys: Iterable[ChunkKey]) -> AsyncIterator[None]:  # 多区块加锁
+        """以共享方式进入世界闸门,按坐标顺序持有多个区块的锁,避免批量请求之间死锁。"""  # docstring
+
+        ordered = sorted(set(keys))  # 去重并排序
+        locks = [self._acquire_ref(key) for key in ordered]  # 登记引用
+        try:  # 获取闸门与区块锁
+            async with self._gate.shared(), AsyncExitStack() as stack:  # 共享进入闸门
+                for lock in locks:  # 按顺序加锁
+                    await stack.enter_async_context(lock)  # 锁定区块
+                yield  # 交出控制权
+        finally:  # 释放引用
+            for key in ordered:  # 遍历区块
+                self._release_ref(key)  # 减少引用计数
+
+    def world_locked(self) -> Any:  # 定义全图独占方法
+        """返回独占世界闸门的异步上下文,等待全部区块动作结束。"""  # 方法 docstring
+
+        return self._gate.exclusive()  # 返回独占上下文
+
+    def _acquire_ref(self, key: ChunkKey) -> asyncio.Lock:  # 定义锁引用登记方法
+        """返回区块锁并增加引用计数,首次使用时创建。"""  # 方法 docstring,说明用途
+
+        lock, users = self._chunk_locks.get(key, (None, 0))  # 查找区块锁
+        if lock is None:  # 首次使用
+            lock = asyncio.Lock()  # 创建区块锁
+        self._chunk_locks[key] = (lock, users + 1)  # 增加引用计数
+        return lock  # 返回区块锁
+
+    def _release_ref(self, key: ChunkKey) -> None:  # 定义锁引用释放方法
+        """减少引用计数,最后一个使用者离开时删除区块锁,避免字典无限增长。"""  # 方法 docstring
+
+        lock, users = self._chunk_locks[key]  # 读取最新计数
+        if users == 1:  # 最后一个使用者
+            del self._chunk_locks[key]  # 删除区块锁
+        else:  # 仍有其他使用者
+            self._chunk_locks[key] = (lock, users - 1)  # 减少引用计数
+
+    async def load_world_state(self) -> WorldState:  # 定义异步读取世界状态方法
+        """在线程池中读取世界状态。"""  # 方法 docstring,说明用途
+
+        return await self.run(self._store.load_world_state)  # 卸载执行
+
+    async def load_chunk_snapshot(self, cx: int, cy: int) -> dict[str, Any]:  # 定义区块快照方法
+        """持有区块锁在线程池中读取并序列化区块,避免读到半完成的动作。"""  # 方法 docstring
+
+        async with self.chunk_locked(cx, cy):  # 锁定区块
+            return await self.run(_dump_chunk, self._store, cx, cy)  # 卸载读取与序列化
+
+    async def load_quests_raw(self) -> list[dict]:  # 定义异步读取任务方法
+        """在线程池中读取任务列表。"""  # 方法 docstring,说明用途
+
+        return await self.run(self._store.load_quests_raw)  # 卸载执行
+
+    def shutdown(self) -> None:  # 定义关闭方法
+        """等待线程池中的存储操作完成并释放线程。"""  # 方法 docstring,说明用途
+
+        if self._executor is not None:  # 若线程池已创建
+            self._executor.shutdown(wait=True)  # 等待任务完成
+            self._executor = None  # 清空引用
+
+
+def _dump_chunk(store: WorldStore, cx: int, cy: int) -> dict[str, Any]:  # 定义区块序列化函数
+    """加载区块并转换为 JSON 兼容字典。"""  # 函数 docstring,说明用途
+
+    chunk: Chunk = store.load_chunk(cx=cx, cy=cy)  # 加载区块
+    return chunk.model_dump(mode="json")  # 序列化区块
@@ -0,0 +1,397 @@
+"""定义 WorldStore 的可插拔存储后端:目录文件布局与单文件 SQLite。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import json  # 导入 json,用于迁移时解析旧 JSON 区块
+import os  # 导入 os,用于原子替换与 fsync
+import sqlite3  # 导入 sqlite3,实现单文件数据库后端
+from collections.abc import Iterator  # 导入 Iterator,用于类型标注
+from dataclasses import dataclass, field  # 导入 dataclass,描述写入批次
+from pathlib import Path  # 导入 Path,处理文件路径
+from threading import Lock  # 导入 Lock,串行化数据库连接访问
+from typing import Protocol  # 导入 Protocol,定义后端接口
+
+from .action_log import ActionLogWriter  # 导入缓冲轮转的审计日志写入器
+from .chunk import Chunk  # 导入区块模型,用于迁移时转换编码
+from .chunk_codec import encode_chunk, is_binary_chunk  # 导入二进制区块编解码
+
+CHUNK_FORMATS: dict[str, str] = {  # 定义区块编码到文件后缀的映射
+    "json": ".json",  # 可读的逐格 JSON 格式
+    "binary": ".chunk",  # 紧凑的定宽平面二进制格式
+}  # 结束映射
+DOCUMENT_FILES: dict[str, str] = {  # 定义文档名称到文件名的映射
+    "world_state": "world_state.json",  # 世界状态
+    "quests": "quests.json",  # 旧版整表任务列表,首次加载时迁移为逐任务记录
+    "usage": "actor_usage.json",  # 配额与冷却记录的快照
+    "usage_delta": "actor_usage.delta.json",  # 快照之后变化的配额记录
+    "growth": "growth_index.json",  # 成长格子索引
+}  # 结束映射
+STORAGE_BACKENDS = ("files", "sqlite")  # 可选的后端名称
+
+
+@dataclass
+class WriteBatch:  # 定义写入批次
+    """一次原子提交的区块、文档与审计日志行。"""  # 类 docstring,说明用途
+
+    chunks: list[tuple[tuple[int, int], bytes]] = field(default_factory=list)  # 区块坐标与编码
+    documents: list[tuple[str, bytes]] = field(default_factory=list)  # 文档名称与内容
+    log_lines: list[str] = field(default_factory=list)  # 审计日志行
+    quests: list[tuple[int, bytes | None]] = field(default_factory=list)  # 任务序号与编码
+
+    def is_empty(self) -> bool:  # 定义空批次判断
+        """判断批次是否没有任何待写内容。"""  # 方法 docstring,说明用途
+
+        return not (self.chunks or self.documents or self.log_lines or self.quests)  # 返回布尔值
+
+    def extend(self, other: WriteBatch) -> None:  # 定义批次合并方法
+        """将另一个批次追加到当前批次之后,后写入的同名内容覆盖先写入的。"""  # 方法 docstring
+
+        self.chunks.extend(other.chunks)  # 合并区块
+        self.documents.extend(other.documents)  # 合并文档
+        self.log_lines.extend(other.log_lines)  # 合并日志行
+        self.quests.extend(other.quests)  # 合并任务记录
+
+
+class StorageBackend(Protocol):  # 定义存储后端协议
+    """WorldStore 依赖的最小持久化接口,区块与文档均以字节形式存取。"""  # 类 docstring
+
+    name: str  # 后端名称
+
+    def read_chunk(self, cx: int, cy: int) -> bytes | None:  # 读取区块
+        """返回区块编码,不存在时返回 None。"""  # 方法 docstring,说明用途
+
+    def list_chunk_keys(self) -> list[tuple[int, int]]:  # 枚举区块
+        """返回全部已存储区块的坐标,按坐标排序。"""  # 方法 docstring,说明用途
+
+    def read_document(self, name: str) -> bytes | None:  # 读取文档
+        """返回文档内容,不存在时返回 None。"""  # 方法 docstring,说明用途
+
+    def delete_document(self, name: str) -> None:  # 删除文档
+        """删除指定文档,不存在时忽略。"""  # 方法 docstring,说明用途
+
+    def iter_quests(self) -> Iterator[tuple[int, bytes]]:  # 遍历任务记录
+        """按序号递增返回全部任务记录。"""  # 方法 docstring,说明用途
+
+    def write(self, batch: WriteBatch) -> None:  # 写入批次
+        """原子地提交一个写入批次,任务编码为 None 时删除该记录,失败时抛出 OSError。"""
+
+    def iter_log_lines(self) -> Iterator[str]:  # 遍历审计日志
+        """按写入顺序返回审计日志行。"""  # 方法 docstring,说明用途
+
+    def close(self) -> None:  # 关闭后端
+        """释放后端持有的资源。"""  # 方法 docstring,说明用途
+
+
+class FileBackend:  # 定义目录文件后端
+    """沿用 data/world 下每区块一个文件、每文档一个 JSON 的原有布局,任务按序号每条一个文件。"""
+
+    name = "files"  # 后端名称
+
+    def __init__(  # 定义构造函数
+        self,
+        root: Path,  # 数据根目录
+        chunk_format: str = "json",  # 同一区块存在多种文件时优先读取的格式
+        fsync: bool = False,  # 是否在原子替换前 fsync
+        action_log: ActionLogWriter | None = None,  # 审计日志写入器,默认使用缓冲写入器
+    ) -> None:  # 构造函数返回 None
+        """创建目录结构与审计日志写入器。"""  # 方法 docstring,说明用途
+
+        if chunk_format not in CHUNK_FORMATS:  # 校验区块格式
+            raise ValueError(f"未知区块格式:{chunk_format}")  # 抛出错误
+        self._chunk_format = chunk_format  # 保存优先格式
+        self._fsync = fsync  # 保存是否在替换前 fsync
+        self._world_dir = root / "world"  # 世界数据目录
+        self._chunk_dir = self._world_dir / "chunks"  # 区块目录
+        self._quest_dir = self._world_dir / "quests"  # 任务记录目录
+        self._chunk_dir.mkdir(parents=True, exist_ok=True)  # 确保区块目录存在
+        self._quest_dir.mkdir(exist_ok=True)  # 确保任务目录存在
+        self._log = action_log or ActionLogWriter(root / "logs")  # 常驻句柄的审计日志写入器
+
+    def read_chunk(self, cx: int, cy: int) -> bytes | None:  # 定义区块读取方法
+        """优先读取配置格式的文件,其次读取其他格式的文件。"""  # 方法 docstring,说明用途
+
+        others = [name for name in CHUNK_FORMATS if name != self._chunk_format]  # 其他格式
+        for chunk_format in [self._chunk_format, *others]:  # 依次尝试各格式
+            path = self._chunk_path(cx, cy, chunk_format)  # 构建路径
+            if path.exists():  # 若文件存在
+                return path.read_bytes()  # 返回文件内容
+        return None  # 未找到文件
+
+    def list_chunk_keys(self) -> list[tuple[int, int]]:  # 定义区块坐标枚举方法
+        """列出磁盘上所有区块坐标,跨格式去重并排序。"""  # 方法 docstring,说明用途
+
+        keys: set[tuple[int, int]] = set()  # 初始化坐标集合
+        for suffix in CHUNK_FORMATS.values():  # 遍历所有文件后缀
+            for path in self._chunk_dir.glob(f"*{suffix}"):  # 遍历对应文件
+                cx, cy = map(int, path.stem.split("_", maxsplit=1))  # 解析坐标
+                keys.add((cx, cy))  # 记录坐标
+        return sorted(keys)  # 返回排序后的坐标列表
+
+    def read_document(self, name: str) -> bytes | None:  # 定义文档读取方法
+        """读取文档文件,不存在时返回 None。"""  # 方法 docstring,说明用途
+
+        path = self._document_path(name)  # 构建路径
+        return path.read_bytes() if path.exists() else None  # 返回内容
+
+    def delete_document(self, name: str) -> None:  # 定义文档删除方法
+        """删除文档文件。"""  # 方法 docstring,说明用途
+
+        self._document_path(name).unlink(missing_ok=True)  # 删除文件
+
+    def iter_quests(self) -> Iterator[tuple[int, bytes]]:  # 定义任务记录遍历方法
+        """按序号读取 quests 目录下的任务文件。"""  # 方法 docstring,说明用途
+
+        seqs = sorted(int(path.stem) for path in self._quest_dir.glob("*.json"))  # 解析序号
+        for seq in seqs:  # 遍历序号
+            yield seq, self._quest_path(seq).read_bytes()  # 返回记录
+
+    def write(self, batch: WriteBatch) -> None:  # 定义批次写入方法
+        """逐个以临时文件加原子替换写入区块、文档与任务,审计日志交给缓冲写入器。"""
+
+        for (cx, cy), data in batch.chunks:  # 遍历区块
+            chunk_format = "binary" if is_binary_chunk(data) else "json"  # 按内容选择后缀
+            path = self._chunk_path(cx, cy, chunk_format)  # 构建路径
+            self._replace(path, data)  # 原子写入
+            for other in CHUNK_FORMATS:  # 删除其他格式的旧文件避免遮蔽
+                if other != chunk_format:  # 跳过当前格式
+                    self._chunk_path(cx, cy, other).unlink(missing_ok=True)  # 删除文件
+        for name, data in batch.documents:  # 遍历文档
+            self._replace(self._document_path(name), data)  # 原子写入
+        for seq, data in dict(batch.quests).items():  # 遍历任务,同一序号以最后一次为准
+            if data is None:  # 删除记录
+                self._quest_path(seq).unlink(missing_ok=True)  # 删除文件
+            else:  # 写入记录
+                self._replace(self._quest_path(seq), data)  # 原子写入
+        self._log.append(batch.log_lines)  # 缓冲日志行,由写入器分组落盘
+
+    def iter_log_lines(self) -> Iterator[str]:  # 定义日志遍历方法
+        """依次读取已轮转的日志段与当前 actions.log。"""  # 方法 docstring,说明用途
+
+        yield from self._log.iter_lines()  # 委托给写入器
+
+    def close(self) -> None:  # 定义关闭方法
+        """写入剩余审计日志并关闭日志句柄。"""  # 方法 docstring,说明用途
+
+        self._log.close()  # 关闭审计日志写入器
+
+    def _chunk_path(self, cx: int, cy: int, chunk_format: str) -> Path:  # 定义区块路径工具
+        """返回指定格式下区块文件的路径。"""  # 方法 docstring,说明用途
+
+        return self._chunk_dir / f"{cx}_{cy}{CHUNK_FORMATS[chunk_format]}"  # 拼接文件名
+
+    def _quest_path(self, seq: int) -> Path:  # 定义任务路径工具
+        """返回任务记录文件路径,以序号命名,避免任务 ID 中的特殊字符。"""  # 方法 docstring
+
+        return self._quest_dir / f"{seq}.json"  # 拼接文件名
+
+    def _document_path(self, name: str) -> Path:  # 定义文档路径工具
+        """返回文档文件路径。"""  # 方法 docstring,说明用途
+
+        if name not in DOCUMENT_FILES:  # 校验文档名称
+            raise ValueError(f"未知文档:{name}")  # 抛出错误
+        return self._world_dir / DOCUMENT_FILES[name]  # 拼接路径
+
+    def _replace(self, path: Path, data: bytes) -> None:  # 定义原子写入工具
+        """先写临时文件再原子替换,崩溃时不会留下半个文件。"""  # 方法 docstring,说明用途
+
+        temp_path = path.with_name(path.name + ".tmp")  # 临时文件路径
+        with temp_path.open("wb") as handle:  # 写入临时文件
+            handle.write(data)  # 写入内容
+            if self._fsync:  # 需要持久化保证时
+                handle.flush()  # 刷新缓冲
+                os.fsync(handle.fileno())  # 刷入磁盘
+        os.replace(temp_path, path)  # 原子替换
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    cx INTEGER NOT NULL,
+    cy INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (cx, cy)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quests (
+    seq INTEGER PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS action_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    line TEXT NOT NULL
+);
+"""  # 数据库结构:区块二进制、文档(世界状态/用量/成长索引)、逐条任务与审计日志
+
+
+class SqliteBackend:  # 定义 SQLite 后端
+    """以 WAL 模式的单个 SQLite 数据库保存全部世界数据,每个批次一个事务。"""  # 类 docstring
+
+    name = "sqlite"  # 后端名称
+
+    def __init__(self, path: Path, synchronous: str = "NORMAL") -> None:  # 定义构造函数
+        """打开数据库、启用 WAL 并创建表结构。"""  # 方法 docstring,说明用途
+
+        if synchronous not in {"OFF", "NORMAL", "FULL"}:  # 校验同步级别
+            raise ValueError(f"未知同步级别:{synchronous}")  # 抛出错误
+        path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+        self._path = path  # 保存数据库路径
+        self._conn = sqlite3.connect(  # 打开连接
+            path,  # 数据库文件
+            isolation_level=None,  # 手动管理事务
+            check_same_thread=False,  # 允许后台刷盘线程使用,由 _lock 串行化
+        )  # 结束连接
+        self._lock = Lock()  # 串行化连接访问
+        self._conn.execute("PRAGMA journal_mode=WAL")  # 启用 WAL,读写互不阻塞
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")  # 设置同步级别
+        self._conn.executescript(_SQLITE_SCHEMA)  # 创建表结构
+
+    @property
+    def path(self) -> Path:  # 定义数据库路径属性
+        """返回数据库文件路径。"""  # 属性 docstring,说明用途
+
+        return self._path  # 返回路径
+
+    def read_chunk(self, cx: int, cy: int) -> bytes | None:  # 定义区块读取方法
+        """按主键读取区块二进制。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问连接
+            row = self._conn.execute(  # 执行查询
+                "SELECT data FROM chunks WHERE cx = ? AND cy = ?", (cx, cy)  # 按坐标查询
+            ).fetchone()  # 读取一行
+        return None if row is None else bytes(row[0])  # 返回内容
+
+    def list_chunk_keys(self) -> list[tuple[int, int]]:  # 定义区块坐标枚举方法
+        """按主键顺序返回全部区块坐标,无需列目录。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问连接
+            rows = self._conn.execute("SELECT cx, cy FROM chunks ORDER BY cx, cy").fetchall()
+        return [(cx, cy) for cx, cy in rows]  # 返回坐标列表
+
+    def read_document(self, name: str) -> bytes | None:  # 定义文档读取方法
+        """按名称读取文档。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问连接
+            row = self._conn.execute(  # 执行查询
+                "SELECT data FROM documents WHERE name = ?", (name,)  # 按名称查询
+            ).fetchone()  # 读取一行
+        return None if row is None else bytes(row[0])  # 返回内容
+
+    def delete_document(self, name: str) -> None:  # 定义文档删除方法
+        """删除指定文档。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问连接
+            self._conn.execute("DELETE FROM documents WHERE name = ?", (name,))  # 删除文档
+
+    def iter_quests(self) -> Iterator[tuple[int, bytes]]:  # 定义任务记录遍历方法
+        """按主键顺序返回全部任务记录。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问连接
+            rows = self._conn.execute("SELECT seq, data FROM quests ORDER BY seq").fetchall()
+        for seq, data in rows:  # 遍历行
+            yield seq, bytes(data)  # 返回记录
+
+    def write(self, batch: WriteBatch) -> None:  # 定义批次写入方法
+        """在单个事务中写入区块、文档、任务与审计日志,失败时回滚并抛出 OSError。"""
+
+        with self._lock:  # 加锁访问连接
+            try:  # 执行事务
+                self._conn.execute("BEGIN IMMEDIATE")  # 开始写事务
+                self._conn.executemany(  # 写入区块
+                    "INSERT OR REPLACE INTO chunks (cx, cy, data) VALUES (?, ?, ?)",  # 覆盖写
+                    [(cx, cy, data) for (cx, cy), data in batch.chunks],  # 区块参数
+                )  # 结束写入
+                self._conn.executemany(  # 写入文档
+                    "INSERT OR REPLACE INTO documents (name, data) VALUES (?, ?)",  # 覆盖写
+                    batch.documents,  # 文档参数
+                )  # 结束写入
+                quests = dict(batch.quests)  # 同一序号以最后一次为准
+                self._conn.executemany(  # 删除任务
+                    "DELETE FROM quests WHERE seq = ?",  # 按序号删除
+                    [(seq,) for seq, data in quests.items() if data is None],  # 删除参数
+                )  # 结束删除
+                self._conn.executemany(  # 写入任务
+                    "INSERT OR REPLACE INTO quests (seq, data) VALUES (?, ?)",  # 覆盖写
+                    [(seq, data) for seq, data in quests.items() if data is not None],  # 任务参数
+                )  # 结束写入
+                self._conn.executemany(  # 写入审计日志
+                    "INSERT INTO action_log (line) VALUES (?)",  # 追加日志
+                    [(line,) for line in batch.log_lines],  # 日志参数
+                )  # 结束写入
+                self._conn.execute("COMMIT")  # 提交事务
+            except sqlite3.Error as exc:  # 捕获数据库错误
+                if self._conn.in_transaction:  # 若事务仍然打开
+                    self._conn.execute("ROLLBACK")  # 回滚事务
+                raise OSError(f"SQLite 写入失败:{exc}") from exc  # 统一转换为 OSError
+
+    def iter_log_lines(self) -> Iterator[str]:  # 定义日志遍历方法
+        """按自增 ID 顺序返回审计日志行。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问连接
+            rows = self._conn.execute("SELECT line FROM action_log ORDER BY id").fetchall()
+        for (line,) in rows:  # 遍历行
+            yield line  # 返回日志行
+
+    def close(self) -> None:  # 定义关闭方法
+        """关闭数据库连接。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问连接
+            self._conn.close()  # 关闭连接
+
+
+def create_backend(  # 定义后端工厂
+    kind: str,  # 后端名称
+    root: Path,  # 数据根目录
+    chunk_format: str = "json",  # 文件后端的优先区块格式
+    durable: bool = False,  # 是否要求每次提交落盘(预写日志检查点需要)
+    action_log: ActionLogWriter | None = None,  # 文件后端使用的审计日志写入器
+) -> StorageBackend:  # 返回后端实例
+    """按名称创建存储后端,SQLite 数据库位于 data/world/world.db。"""  # 函数 docstring,说明用途
+
+    if kind == "files":  # 目录文件后端
+        return FileBackend(  # 返回文件后端
+            root,  # 数据根目录
+            chunk_format=chunk_format,  # 优先读取的区块格式
+            fsync=durable,  # 原子替换前是否 fsync
+            action_log=action_log,  # 审计日志写入器
+        )  # 结束创建
+    if kind == "sqlite":  # SQLite 后端
+        return SqliteBackend(  # 返回数据库后端
+            root / "world" / "world.db",  # 数据库路径
+            synchronous="FULL" if durable else "NORMAL",  # 同步级别
+        )  # 结束创建
+    raise ValueError(f"未知存储后端:{kind}")  # 抛出错误
+
+
+def copy_backend(  # 定义后端数据复制函数
+    source: StorageBackend,  # 源后端
+    target: StorageBackend,  # 目标后端
+    chunk_batch_size: int = 500,  # 每个事务写入的区块数量
+) -> dict[str, int]:  # 返回各类数据的复制数量
+    """将源后端的全部数据复制到目标后端,区块统一转换为二进制编码。"""  # 函数 docstring
+
+    counts = {"chunks": 0, "documents": 0, "quests": 0, "log_lines": 0}  # 初始化计数
+    batch = WriteBatch()  # 创建批次
+    for cx, cy in source.list_chunk_keys():  # 遍历区块
+        data = source.read_chunk(cx, cy)  # 读取区块
+        if data is None:  # 并发删除等异常情况
+            continue  # 跳过
+        if not is_binary_chunk(data):  # 旧 JSON 区块
+            data = encode_chunk(Chunk.model_validate(json.loads(data.decode("utf-8"))))  # 转换
+        batch.chunks.append(((cx, cy), data))  # 加入批次
+        counts["chunks"] += 1  # 累加计数
+        if len(batch.chunks) >= chunk_batch_size:  # 达到批次上限
+            target.write(batch)  # 提交批次
+            batch = WriteBatch()  # 开始新批次
+    for name in DOCUMENT_FILES:  # 遍历文档
+        data = source.read_document(name)  # 读取文档
+        if data is not None:  # 若文档存在
+            batch.documents.append((name, data))  # 加入批次
+            counts["documents"] += 1  # 累加计数
+    batch.quests.extend(source.iter_quests())  # 复制任务记录
+    counts["quests"] = len(batch.quests)  # 记录任务数量
+    batch.log_lines.extend(source.iter_log_lines())  # 复制审计日志
+    counts["log_lines"] = len(batch.log_lines)  # 记录日志行数
+    target.write(batch)  # 提交最后一个批次
+    return counts  # 返回计数
@@ -0,0 +1,66 @@
+"""实现区域笔刷的格子枚举:矩形、Bresenham 直线与限量洪泛填充。"""  # 模块 docstring
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+from collections import deque  # 导入 deque,实现广度优先填充
+
+from .chunk import Chunk  # 导入区块模型
+
+Cell = tuple[int, int]  # 区块内格子坐标类型别名
+
+
+def rect_cells(x0: int, y0: int, x1: int, y1: int) -> list[Cell]:  # 定义矩形枚举函数
+    """返回以两点为对角的闭区间矩形内全部格子,按行优先排列。"""  # 函数 docstring,说明用途
+
+    left, right = sorted((x0, x1))  # 计算左右边界
+    top, bottom = sorted((y0, y1))  # 计算上下边界
+    return [(x, y) for y in range(top, bottom + 1) for x in range(left, right + 1)]  # 返回格子
+
+
+def line_cells(x0: int, y0: int, x1: int, y1: int) -> list[Cell]:  # 定义直线枚举函数
+    """按 Bresenham 算法返回两点之间(含端点)的格子,相邻格子至少共享一个角。"""  # 函数 docstring
+
+    dx, dy = abs(x1 - x0), -abs(y1 - y0)  # 计算增量
+    sx = 1 if x0 < x1 else -1  # X 步进方向
+    sy = 1 if y0 < y1 else -1  # Y 步进方向
+    error = dx + dy  # 初始误差
+    cells: list[Cell] = []  # 初始化结果
+    x, y = x0, y0  # 当前格子
+    while True:  # 逐格前进
+        cells.append((x, y))  # 记录格子
+        if x == x1 and y == y1:  # 到达终点
+            return cells  # 返回结果
+        doubled = 2 * error  # 误差的两倍
+        if doubled >= dy:  # 需要在 X 方向前进
+            error += dy  # 更新误差
+            x += sx  # 前进一格
+        if doubled <= dx:  # 需要在 Y 方向前进
+            error += dx  # 更新误差
+            y += sy  # 前进一格
+
+
+def flood_cells(chunk: Chunk, x: int, y: int, limit: int) -> list[Cell]:  # 定义洪泛填充函数
+    """从起点按四邻接扩展与起点基础瓦片、装饰均相同的格子,最多返回 limit 个。"""  # 函数 docstring
+
+    base, deco, _, _ = chunk.planes  # 读取平面,直接比较编码
+    size = chunk.size  # 读取边长
+    start = y * size + x  # 起点线性下标
+    key = (base[start], deco[start])  # 起点的瓦片编码
+    seen = {start}  # 已访问下标
+    queue = deque([start])  # 待扩展队列
+    cells: list[Cell] = []  # 初始化结果
+    while queue and len(cells) < limit:  # 直到队列为空或达到上限
+        index = queue.popleft()  # 取出格子
+        cy, cx = divmod(index, size)  # 还原坐标
+        cells.append((cx, cy))  # 记录格子
+        for nx, ny in ((cx - 1, cy), (cx + 1, cy), (cx, cy - 1), (cx, cy + 1)):  # 四邻接
+            neighbour = ny * size + nx  # 邻居下标
+            if (
+                0 <= nx < size
+                and 0 <= ny < size
+                and neighbour not in seen
+                and (base[neighbour], deco[neighbour]) == key
+            ):  # 邻居在区块内、未访问且瓦片相同
+                seen.add(neighbour)  # 标记访问
+                queue.append(neighbour)  # 加入队列
+    return cells  # 返回结果
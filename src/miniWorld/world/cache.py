@@ -0,0 +1,119 @@
+"""实现按区块数量与估算字节数限制的 LRU 区块缓存。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+from collections import OrderedDict  # 导入 OrderedDict,维护最近使用顺序
+from collections.abc import Callable  # 导入 Callable,用于类型标注
+from threading import Lock  # 导入 Lock,保护缓存结构
+
+from .chunk import Chunk  # 导入区块模型
+
+ChunkKey = tuple[int, int]  # 区块坐标类型别名
+
+
+def estimate_chunk_bytes(chunk: Chunk) -> int:  # 定义区块内存估算函数
+    """按私有平面的长度加固定对象开销估算区块占用的字节数。"""  # 函数 docstring,说明用途
+
+    if chunk.is_shared_default:  # 共享默认平面不计入
+        return 512  # 仅计模型开销
+    base, deco, height, growth = chunk.planes  # 读取平面
+    return len(base) + len(deco) + len(height) + len(growth) + 512  # 平面字节加模型开销
+
+
+class ChunkCache:  # 定义区块缓存
+    """LRU 区块缓存,超出数量或字节预算时淘汰最久未用且未被钉住的区块。"""  # 类 docstring
+
+    def __init__(  # 定义构造函数
+        self,
+        max_chunks: int = 4096,  # 最多缓存的区块数量
+        max_bytes: int = 64 * 1024 * 1024,  # 估算字节预算
+        is_pinned: Callable[[ChunkKey], bool] | None = None,  # 判断区块是否不可淘汰(如未落盘)
+    ) -> None:  # 构造函数返回 None
+        """保存预算并初始化统计计数。"""  # 方法 docstring,说明用途
+
+        self._max_chunks = max(1, max_chunks)  # 保存数量上限
+        self._max_bytes = max(1, max_bytes)  # 保存字节上限
+        self._is_pinned = is_pinned or (lambda key: False)  # 保存钉住判断
+        self._entries: OrderedDict[ChunkKey, tuple[Chunk, int]] = OrderedDict()  # 区块与估算字节
+        self._bytes = 0  # 当前估算字节数
+        self._lock = Lock()  # 保护缓存结构
+        self.hits = 0  # 命中次数
+        self.misses = 0  # 未命中次数
+        self.evictions = 0  # 淘汰次数
+
+    def __len__(self) -> int:  # 定义长度方法
+        """返回缓存中的区块数量。"""  # 方法 docstring,说明用途
+
+        return len(self._entries)  # 返回数量
+
+    def __contains__(self, key: object) -> bool:  # 定义包含判断
+        """判断区块是否在缓存中,不影响使用顺序与统计。"""  # 方法 docstring,说明用途
+
+        return key in self._entries  # 返回布尔值
+
+    def get(self, key: ChunkKey) -> Chunk | None:  # 定义读取方法
+        """读取区块并标记为最近使用,同时累计命中或未命中。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁
+            entry = self._entries.get(key)  # 查找条目
+            if entry is None:  # 未命中
+                self.misses += 1  # 累加未命中
+                return None  # 返回 None
+            self._entries.move_to_end(key)  # 标记为最近使用
+            self.hits += 1  # 累加命中
+            return entry[0]  # 返回区块
+
+    def peek(self, key: ChunkKey) -> Chunk | None:  # 定义只读查看方法
+        """读取区块但不改变使用顺序与统计,供刷盘等内部流程使用。"""  # 方法 docstring
+
+        entry = self._entries.get(key)  # 查找条目
+        return None if entry is None else entry[0]  # 返回区块
+
+    def put(self, key: ChunkKey, chunk: Chunk) -> None:  # 定义写入方法
+        """放入或替换区块并标记为最近使用,随后按预算淘汰。"""  # 方法 docstring,说明用途
+
+        size = estimate_chunk_bytes(chunk)  # 估算字节
+        with self._lock:  # 加锁
+            previous = self._entries.pop(key, None)  # 移除旧条目
+            if previous is not None:  # 若存在旧条目
+                self._bytes -= previous[1]  # 扣除旧字节
+            self._entries[key] = (chunk, size)  # 写入新条目
+            self._bytes += size  # 累加字节
+            self._evict_locked(keep=key)  # 按预算淘汰
+
+    def pop(self, key: ChunkKey) -> Chunk | None:  # 定义移除方法
+        """移除并返回指定区块。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁
+            entry = self._entries.pop(key, None)  # 移除条目
+            if entry is None:  # 不存在
+                return None  # 返回 None
+            self._bytes -= entry[1]  # 扣除字节
+            return entry[0]  # 返回区块
+
+    def stats(self) -> dict[str, int]:  # 定义统计方法
+        """返回缓存规模、预算与命中/未命中/淘汰计数。"""  # 方法 docstring,说明用途
+
+        return {  # 返回统计字典
+            "chunks": len(self._entries),  # 当前区块数
+            "bytes": self._bytes,  # 当前估算字节
+            "max_chunks": self._max_chunks,  # 数量上限
+            "max_bytes": self._max_bytes,  # 字节上限
+            "hits": self.hits,  # 命中次数
+            "misses": self.misses,  # 未命中次数
+            "evictions": self.evictions,  # 淘汰次数
+        }  # 结束字典
+
+    def _evict_locked(self, keep: ChunkKey) -> None:  # 定义淘汰方法
+        """从最久未用处开始淘汰,跳过钉住的区块与刚写入的区块。"""  # 方法 docstring,说明用途
+
+        if len(self._entries) <= self._max_chunks and self._bytes <= self._max_bytes:  # 未超预算
+            return  # 直接返回
+        for key in list(self._entries):  # 按最久未用顺序遍历
+            if len(self._entries) <= self._max_chunks and self._bytes <= self._max_bytes:
+                return  # 已回到预算内
+            if key == keep or self._is_pinned(key):  # 不可淘汰
+                continue  # 跳过
+            _, size = self._entries.pop(key)  # 移除条目
+            self._bytes -= size  # 扣除字节
+            self.evictions += 1  # 累加淘汰次数
@@ -2,9 +2,99 @@
 
 from __future__ import annotations  # 导入未来注解特性,支持前向引用类型
 
-from pydantic import BaseModel, Field, model_validator  # 导入 BaseModel 等工具,用于数据验证
+from array import array  # 导入 array,用于存放有符号高度平面
+from collections import Counter  # 导入 Counter,用于整块统计瓦片数量
+from collections.abc import Iterable, Sequence  # 导入抽象类型,用于类型标注
+from functools import lru_cache  # 导入 lru_cache,按边长缓存共享的默认平面
+from itertools import compress  # 导入 compress,在 C 层按非零字节挑选变化的格子
+from typing import Any, NamedTuple  # 导入类型工具
 
-from .tiles import TileType  # 导入 TileType 枚举,描述瓦片类型
+from pydantic import (  # 导入 BaseModel 等工具,用于数据验证
+    BaseModel,  # 模型基类
+    Field,  # 字段声明
+    PrivateAttr,  # 私有属性声明
+    SerializerFunctionWrapHandler,  # 序列化包装处理器类型
+    ValidatorFunctionWrapHandler,  # 验证包装处理器类型
+    model_serializer,  # 模型序列化装饰器
+    model_validator,  # 模型验证装饰器
+)  # 结束导入
+
+from .tiles import TILE_CODES, TILES_BY_CODE, TileType, tile_to_code  # 导入瓦片类型与编码工具
+
+GROWTH_NONE = 0xFF  # 成长平面中表示“无成长数据”的占位字节
+HEIGHT_RANGE = (-16, 16)  # 高度允许范围,与 TileCell 约束一致
+GROWTH_RANGE = (0, 10)  # 成长阶段允许范围,与 TileCell 约束一致
+_GRASS_CODE = TILE_CODES[TileType.GRASS.value]  # 草地编码,用于默认平面
+_VALID_BASE_CODES = bytes(sorted(TILES_BY_CODE))  # 基础平面允许出现的编码
+_VALID_DECO_CODES = bytes([0, *sorted(TILES_BY_CODE)])  # 装饰平面允许出现的编码
+_VALID_GROWTH_CODES = bytes([*range(GROWTH_RANGE[0], GROWTH_RANGE[1] + 1), GROWTH_NONE])
+_TILE_VALUES: dict[int, str | None] = {  # 编码到瓦片字符串,0 表示空
+    0: None,  # 空装饰
+    **{code: tile.value for code, tile in TILES_BY_CODE.items()},  # 全部瓦片
+}  # 结束映射
+
+CellCodes = tuple[int, int, int, int]  # 单格的平面编码:(基础瓦片, 装饰, 高度, 成长字节)
+
+
+def codes_dump(codes: CellCodes) -> dict[str, Any]:  # 定义编码导出函数
+    """将单格平面编码转换为与 TileCell.model_dump 相同结构的字典。"""  # 函数 docstring
+
+    base, deco, height, growth = codes  # 解包编码
+    return {  # 返回字典
+        "base": _TILE_VALUES[base],  # 基础瓦片字符串
+        "deco": _TILE_VALUES[deco],  # 装饰瓦片字符串
+        "height": height,  # 高度
+        "growth_stage": None if growth == GROWTH_NONE else growth,  # 成长阶段
+    }  # 结束字典
+
+
+def changed_cells(old: Sequence[bytes], new: Sequence[bytes]) -> list[int]:  # 定义平面比较函数
+    """按位异或比较多组等长平面,返回任一平面发生变化的格子线性下标(升序)。"""
+
+    changed = 0  # 变化位
+    for before, after in zip(old, new, strict=True):  # 遍历平面
+        changed |= int.from_bytes(before, "little") ^ int.from_bytes(after, "little")  # 异或
+    selector = changed.to_bytes(len(old[0]), "little")  # 非零字节即变化的格子
+    return list(compress(range(len(selector)), selector))  # 返回下标
+
+
+@lru_cache(maxsize=8)  # 每种边长只构建一份
+def _default_planes(size: int) -> tuple[bytes, bytes, memoryview, bytes]:  # 定义默认平面工厂
+    """返回草地、零高度、无装饰的只读平面,供所有未修改的区块共享。"""  # 函数 docstring,说明用途
+
+    cell_count = size * size  # 计算格子总数
+    return (  # 返回只读平面
+        bytes([_GRASS_CODE]) * cell_count,  # 全部为草地
+        bytes(cell_count),  # 全部无装饰
+        memoryview(bytes(cell_count)).cast("b"),  # 全部零高度,以有符号只读视图读取
+        bytes([GROWTH_NONE]) * cell_count,  # 全部无成长数据
+    )  # 结束平面
+
+
+def _write_cell(  # 定义平面写入函数
+    planes: tuple[bytearray, bytearray, array, bytearray],  # 区块平面
+    index: int,  # 线性下标
+    base: TileType | str | None,  # 基础瓦片
+    deco: TileType | str | None,  # 装饰瓦片
+    height: int,  # 高度
+    stage: int | None,  # 成长阶段
+) -> None:  # 函数返回 None
+    """校验单格取值并写入四个平面。"""  # 函数 docstring,说明用途
+
+    if not isinstance(height, int) or not HEIGHT_RANGE[0] <= height <= HEIGHT_RANGE[1]:
+        raise ValueError(f"高度超出范围: {height}")  # 抛出错误
+    if stage is not None and (  # 校验成长阶段
+        not isinstance(stage, int) or not GROWTH_RANGE[0] <= stage <= GROWTH_RANGE[1]
+    ):
+        raise ValueError(f"成长阶段超出范围: {stage}")  # 抛出错误
+    base_code = tile_to_code(base)  # 编码基础瓦片
+    if base_code == 0:  # 基础瓦片不可为空
+        raise ValueError("基础瓦片不可为空")  # 抛出错误
+    base_plane, deco_plane, height_plane, growth_plane = planes  # 解包平面
+    base_plane[index] = base_code  # 写入基础瓦片
+    deco_plane[index] = tile_to_code(deco)  # 写入装饰瓦片
+    height_plane[index] = height  # 写入高度
+    growth_plane[index] = GROWTH_NONE if stage is None else stage  # 写入成长阶段
 
 
 class TileCell(BaseModel):  # 定义单个格子的模型
@@ -26,51 +116,309 @@ class TileCell(BaseModel):  # 定义单个格子的模型
         use_enum_values = True  # 序列化时输出枚举值字符串
 
 
+class CellView(NamedTuple):  # 定义轻量格子视图
+    """从区块平面读取的只读格子快照,接口与 TileCell 的读取部分保持一致。"""  # 类 docstring
+
+    base: TileType  # 基础瓦片
+    deco: TileType | None  # 装饰瓦片
+    height: int  # 高度值
+    growth_stage: int | None  # 成长阶段
+
+    def model_dump(self, mode: str = "python") -> dict[str, Any]:  # 定义与 TileCell 一致的导出方法
+        """返回与 TileCell.model_dump 相同结构的字典。"""  # 方法 docstring,说明用途
+
+        return {  # 返回字典
+            "base": self.base.value,  # 基础瓦片字符串
+            "deco": None if self.deco is None else self.deco.value,  # 装饰瓦片字符串
+            "height": self.height,  # 高度
+            "growth_stage": self.growth_stage,  # 成长阶段
+        }  # 结束字典
+
+    def model_copy(self, deep: bool = False) -> TileCell:  # 定义可修改副本方法
+        """返回可修改的 TileCell 副本,修改后需通过 Chunk.apply_cell 写回。"""  # 方法 docstring
+
+        return TileCell.model_construct(  # 直接构造,数据来自已校验的平面
+            base=self.base.value,  # 基础瓦片
+            deco=None if self.deco is None else self.deco.value,  # 装饰瓦片
+            height=self.height,  # 高度
+            growth_stage=self.growth_stage,  # 成长阶段
+        )  # 结束构造
+
+
 class Chunk(BaseModel):  # 定义区块模型
-    """表示一个固定尺寸的区块,包含 32x32 的瓦片信息。"""  # 类 docstring,说明用途
+    """表示一个固定尺寸的区块,以定宽字节平面存储 32x32 的瓦片信息。"""  # 类 docstring,说明用途
 
     cx: int = Field(..., description="区块 X 坐标")  # 区块横向坐标
     cy: int = Field(..., description="区块 Y 坐标")  # 区块纵向坐标
     size: int = Field(default=32, description="区块边长,默认 32")  # 区块边长
     version: str = Field(default="v1", description="区块数据版本号")  # 数据版本
-    grid: list[list[TileCell]] = Field(  # 定义网格字段
-        default_factory=list,  # 默认提供空列表,稍后填充
-        description="区块内的格子二维数组",  # 字段描述
-    )  # 结束 Field 定义
+    revision: int = Field(default=0, ge=0, description="区块修订号,每次保存递增")  # 修订号
+    sim_tick: int = Field(default=0, ge=0, description="区块成长最近一次追赶到的世界 tick")  # tick
+    _base: bytearray | bytes = PrivateAttr(default_factory=bytearray)  # 基础瓦片编码平面
+    _deco: bytearray | bytes = PrivateAttr(default_factory=bytearray)  # 装饰编码平面,0 表示空
+    _height: array | memoryview = PrivateAttr(default_factory=lambda: array("b"))  # 高度平面
+    _growth: bytearray | bytes = PrivateAttr(default_factory=bytearray)  # 成长阶段平面
+    _shared: bool = PrivateAttr(default=False)  # 是否仍引用共享的只读默认平面
+    _touched: set[int] = PrivateAttr(default_factory=set)  # 上次保存后修改过的格子下标
+    _replaced: tuple[bytes, bytes] | None = PrivateAttr(default=None)  # 整块替换前的装饰与成长平面
 
     class Config:  # 定义内部配置
         """配置项用于序列化时保留枚举值。"""  # Config docstring
 
         use_enum_values = True  # 序列化时输出枚举值字符串
 
-    @model_validator(mode="after")  # 使用模型验证器在实例化后检查数据
-    def _ensure_grid(self) -> Chunk:  # 定义验证方法
-        """确保区块网格尺寸正确,不足时自动填充。"""  # 方法 docstring,说明用途
-
-        if not self.grid:  # 如果尚未提供网格
-            self.grid = [  # 创建二维数组
-                [TileCell() for _ in range(self.size)]  # 为每一行填充默认格子
-                for _ in range(self.size)  # 总共 size 行
-            ]  # 结束数组生成
-        else:  # 如果已有网格
-            if len(self.grid) != self.size:  # 检查行数是否匹配
-                raise ValueError("区块行数与尺寸不符")  # 抛出错误
-            for row in self.grid:  # 遍历每一行
-                if len(row) != self.size:  # 检查列数
-                    raise ValueError("区块列数与尺寸不符")  # 抛出错误
-        return self  # 返回经过验证的实例
-
-    def cell_at(self, x: int, y: int) -> TileCell:  # 定义获取格子的方法
-        """返回指定坐标的格子,坐标从 0 开始。"""  # 方法 docstring,说明用途
+    @model_validator(mode="wrap")  # 使用包装验证器接管 grid 输入
+    @classmethod
+    def _load_grid(cls, data: Any, handler: ValidatorFunctionWrapHandler) -> Chunk:  # 定义验证方法
+        """将旧版 grid 二维数组输入转换为字节平面,缺省时填充草地。"""  # 方法 docstring,说明用途
+
+        if not isinstance(data, dict):  # 非字典输入(如已有实例)交给默认流程
+            return handler(data)  # 返回默认验证结果
+        payload = dict(data)  # 复制输入,避免修改调用方数据
+        grid = payload.pop("grid", None)  # 取出网格数据
+        chunk = handler(payload)  # 验证标量字段
+        if grid:  # 若提供了网格
+            chunk._fill_from_grid(grid)  # 按网格填充平面
+        else:  # 未提供网格
+            chunk._fill_default()  # 填充默认草地
+        return chunk  # 返回经过验证的实例
+
+    @model_serializer(mode="wrap")  # 使用包装序列化器输出 grid
+    def _dump_grid(self, handler: SerializerFunctionWrapHandler) -> dict[str, Any]:  # 序列化方法
+        """在标量字段之后追加 grid 字段,保持原有 JSON 结构。"""  # 方法 docstring,说明用途
+
+        data = handler(self)  # 序列化标量字段
+        data["grid"] = self.grid_dump()  # 追加网格字典
+        return data  # 返回序列化结果
+
+    @classmethod
+    def from_planes(  # 定义平面工厂方法
+        cls,
+        cx: int,  # 区块 X 坐标
+        cy: int,  # 区块 Y 坐标
+        size: int,  # 区块边长
+        version: str,  # 数据版本
+        base: bytes,  # 基础瓦片平面
+        deco: bytes,  # 装饰平面
+        height: bytes,  # 高度平面(补码字节)
+        growth: bytes,  # 成长平面
+        revision: int = 0,  # 区块修订号
+        sim_tick: int = 0,  # 区块成长最近一次追赶到的世界 tick
+    ) -> Chunk:  # 返回区块
+        """直接由四个字节平面构建区块,逐平面校验编码而不逐格构造模型。"""  # 方法 docstring
+
+        cell_count = size * size  # 计算格子总数
+        if any(len(plane) != cell_count for plane in (base, deco, height, growth)):  # 校验长度
+            raise ValueError("区块平面长度与尺寸不符")  # 抛出错误
+        if base.translate(None, _VALID_BASE_CODES):  # 删除合法编码后仍有剩余
+            raise ValueError("基础平面包含未知瓦片编码")  # 抛出错误
+        if deco.translate(None, _VALID_DECO_CODES):  # 校验装饰平面
+            raise ValueError("装饰平面包含未知瓦片编码")  # 抛出错误
+        if growth.translate(None, _VALID_GROWTH_CODES):  # 校验成长平面
+            raise ValueError("成长平面包含非法阶段")  # 抛出错误
+        heights = array("b", height)  # 以有符号字节解读高度
+        if heights and not HEIGHT_RANGE[0] <= min(heights) <= max(heights) <= HEIGHT_RANGE[1]:
+            raise ValueError("高度平面超出允许范围")  # 抛出错误
+        chunk = cls.model_construct(  # 构造标量字段
+            cx=cx, cy=cy, size=size, version=version, revision=revision, sim_tick=sim_tick
+        )  # 结束构造
+        chunk._base = bytearray(base)  # 保存基础平面
+        chunk._deco = bytearray(deco)  # 保存装饰平面
+        chunk._height = heights  # 保存高度平面
+        chunk._growth = bytearray(growth)  # 保存成长平面
+        return chunk  # 返回区块
+
+    def __eq__(self, other: object) -> bool:  # 定义相等比较
+        """仅比较标量字段与四个平面,忽略修改记录等运行期状态。"""  # 方法 docstring,说明用途
+
+        if not isinstance(other, Chunk):  # 非区块对象
+            return NotImplemented  # 交由 Python 处理
+        mine = (self.cx, self.cy, self.size, self.version, self.revision, self.sim_tick)  # 标量
+        return (*mine, self.planes) == (
+            other.cx,  # 区块 X 坐标
+            other.cy,  # 区块 Y 坐标
+            other.size,  # 区块边长
+            other.version,  # 数据版本
+            other.revision,  # 修订号
+            other.sim_tick,  # 成长追赶 tick
+            other.planes,  # 区块平面
+        )  # 结束比较
+
+    __hash__ = None  # 可变对象不可哈希,与 BaseModel 保持一致
+
+    @property
+    def grid(self) -> list[list[TileCell]]:  # 定义兼容旧接口的网格属性
+        """返回 TileCell 二维数组快照,修改快照不会写回区块。"""  # 属性 docstring,说明用途
+
+        size = self.size  # 读取边长
+        return [  # 返回二维数组
+            [self.cell_at(x, y).model_copy() for x in range(size)]  # 逐格生成副本
+            for y in range(size)  # 遍历行
+        ]  # 结束数组生成
+
+    @property
+    def planes(self) -> tuple[Any, Any, Any, Any]:  # 定义平面访问属性
+        """返回四个平面,供编解码与整块扫描使用,调用方不得修改。"""  # 属性 docstring
+
+        private = self.__pydantic_private__  # 直接读取私有属性字典,避免逐个属性走异常回退路径
+        return private["_base"], private["_deco"], private["_height"], private["_growth"]  # 平面
+
+    @property
+    def is_shared_default(self) -> bool:  # 定义共享默认状态属性
+        """返回区块是否仍是从未修改、引用共享默认平面的空白地形。"""  # 属性 docstring,说明用途
+
+        return self._shared  # 返回布尔值
+
+    def is_default(self) -> bool:  # 定义默认内容判断方法
+        """判断区块内容是否与默认草地完全一致(包括修改后又恢复的情况)。"""  # 方法 docstring
+
+        return self._shared or self.planes == _default_planes(self.size)  # 整块比较
+
+    def grid_dump(self) -> list[list[dict[str, Any]]]:  # 定义网格导出方法
+        """直接由平面生成与旧版 grid 相同结构的字典二维数组。"""  # 方法 docstring,说明用途
+
+        values = _TILE_VALUES  # 编码到字符串,0 表示空装饰
+        base, deco, height, growth = self._base, self._deco, self._height, self._growth  # 局部引用
+        size = self.size  # 读取边长
+        rows: list[list[dict[str, Any]]] = []  # 初始化结果
+        for start in range(0, size * size, size):  # 按行遍历线性下标
+            rows.append(  # 追加一行
+                [
+                    {
+                        "base": values[base[index]],  # 基础瓦片
+                        "deco": values[deco[index]],  # 装饰瓦片
+                        "height": height[index],  # 高度
+                        "growth_stage": None if growth[index] == GROWTH_NONE else growth[index],
+                    }
+                    for index in range(start, start + size)  # 遍历行内格子
+                ]
+            )  # 结束追加
+        return rows  # 返回二维数组
+
+    def cell_at(self, x: int, y: int) -> CellView:  # 定义获取格子的方法
+        """返回指定坐标的只读格子视图,坐标从 0 开始。"""  # 方法 docstring,说明用途
 
         self._validate_coord(x, y)  # 调用内部校验坐标
-        return self.grid[y][x]  # 返回对应的 TileCell
+        index = y * self.size + x  # 计算线性下标
+        stage = self._growth[index]  # 读取成长阶段
+        deco = self._deco[index]  # 读取装饰编码
+        return CellView(  # 返回格子视图
+            TILES_BY_CODE[self._base[index]],  # 基础瓦片
+            TILES_BY_CODE[deco] if deco else None,  # 装饰瓦片
+            self._height[index],  # 高度
+            None if stage == GROWTH_NONE else stage,  # 成长阶段
+        )  # 结束构造
 
-    def apply_cell(self, x: int, y: int, cell: TileCell) -> None:  # 定义设置格子的方法
-        """将指定坐标更新为新的格子对象。"""  # 方法 docstring,说明用途
+    def apply_cell(self, x: int, y: int, cell: TileCell | CellView) -> None:  # 定义设置格子的方法
+        """将指定坐标更新为新的格子数据,写入前校验取值范围。"""  # 方法 docstring,说明用途
 
         self._validate_coord(x, y)  # 校验坐标
-        self.grid[y][x] = cell  # 替换对应格子
+        self._make_private()  # 首次写入时复制共享平面
+        _write_cell(  # 写入平面
+            self.planes,  # 区块平面
+            y * self.size + x,  # 线性下标
+            cell.base,  # 基础瓦片
+            cell.deco,  # 装饰瓦片
+            cell.height,  # 高度
+            cell.growth_stage,  # 成长阶段
+        )  # 结束写入
+        self._touched.add(y * self.size + x)  # 记录修改过的格子
+
+    def read_codes(self, cells: list[tuple[int, int]]) -> list[CellCodes]:  # 定义批量读取编码方法
+        """按顺序返回多个格子的平面编码元组,平面只取一次,不构造任何模型对象。"""  # 方法 docstring
+
+        base, deco, height, growth = self.planes  # 一次取出平面,避免逐格访问私有属性
+        size = self.size  # 读取边长
+        codes: list[CellCodes] = []  # 初始化结果
+        for x, y in cells:  # 遍历格子
+            self._validate_coord(x, y)  # 校验坐标
+            index = y * size + x  # 计算线性下标
+            codes.append((base[index], deco[index], height[index], growth[index]))  # 记录编码
+        return codes  # 返回编码列表
+
+    def write_codes(self, writes: Iterable[tuple[int, int, CellCodes]]) -> None:  # 定义批量写入方法
+        """按平面编码批量写入格子并记入修改记录,供动作与 tick 的内部变更使用。"""  # 方法 docstring
+
+        self._make_private()  # 首次写入时复制共享平面
+        base, deco, height, growth = self.planes  # 一次取出平面
+        touched = self._touched  # 读取修改记录
+        size = self.size  # 读取边长
+        for x, y, (base_code, deco_code, height_value, growth_code) in writes:  # 遍历写入
+            self._validate_coord(x, y)  # 校验坐标
+            if base_code not in TILES_BY_CODE or (deco_code and deco_code not in TILES_BY_CODE):
+                raise ValueError("未知瓦片编码")  # 抛出错误
+            index = y * size + x  # 计算线性下标
+            base[index] = base_code  # 写入基础瓦片
+            deco[index] = deco_code  # 写入装饰
+            height[index] = height_value  # 写入高度
+            growth[index] = growth_code  # 写入成长阶段
+            touched.add(index)  # 记录修改过的格子
+
+    def replace_planes(self, deco: bytes, growth: bytes) -> None:  # 定义整块平面替换方法
+        """整块替换装饰与成长平面,供成长内核使用,不做逐格校验。
+
+        修改过的格子不在此处逐个登记,而是记下首次替换前的平面,到 drain_touched 时再整块比较,
+        只被追赶而从未保存的区块因此不需要计算下标。
+        """  # 方法 docstring
+
+        cell_count = self.size * self.size  # 计算格子总数
+        if len(deco) != cell_count or len(growth) != cell_count:  # 校验平面长度
+            raise ValueError("平面长度与区块尺寸不符")  # 抛出错误
+        self._make_private()  # 首次写入时复制共享平面
+        if self._replaced is None:  # 上次保存后首次整块替换
+            self._replaced = (bytes(self._deco), bytes(self._growth))  # 记下替换前的平面
+        self._deco[:] = deco  # 替换装饰平面
+        self._growth[:] = growth  # 替换成长平面
+
+    def drain_touched(self) -> list[int]:  # 定义修改记录提取方法
+        """返回并清空自上次调用以来修改过的格子线性下标,供预写日志记录增量。"""  # 方法 docstring
+
+        if self._replaced is not None:  # 存在整块替换
+            current = (self._deco, self._growth)  # 当前平面
+            self._touched.update(changed_cells(self._replaced, current))  # 比较出变化的格子
+            self._replaced = None  # 清空替换记录
+        touched = sorted(self._touched)  # 按下标排序
+        self._touched.clear()  # 清空记录
+        return touched  # 返回下标列表
+
+    def restore_codes(  # 定义编码级写入方法
+        self,
+        index: int,  # 格子线性下标
+        base: int,  # 基础瓦片编码
+        deco: int,  # 装饰编码
+        height: int,  # 高度
+        growth: int,  # 成长阶段字节
+    ) -> None:  # 方法返回 None
+        """按平面编码直接写入单格,用于日志回放,不计入修改记录。"""  # 方法 docstring,说明用途
+
+        if not 0 <= index < self.size * self.size:  # 校验下标
+            raise ValueError(f"格子下标越界: {index}")  # 抛出错误
+        if base not in TILES_BY_CODE or (deco and deco not in TILES_BY_CODE):  # 校验瓦片编码
+            raise ValueError("未知瓦片编码")  # 抛出错误
+        self._make_private()  # 首次写入时复制共享平面
+        self._base[index] = base  # 写入基础瓦片
+        self._deco[index] = deco  # 写入装饰
+        self._height[index] = height  # 写入高度
+        self._growth[index] = growth  # 写入成长阶段
+
+    def find_cells(self, layer: str, tile: TileType) -> list[tuple[int, int]]:  # 定义整块查找方法
+        """在 base 或 deco 平面中查找指定瓦片,返回 (x, y) 坐标列表。"""  # 方法 docstring,说明用途
+
+        if layer == "base":  # 查找基础平面
+            plane = self._base  # 选择基础平面
+        elif layer == "deco":  # 查找装饰平面
+            plane = self._deco  # 选择装饰平面
+        else:  # 未知层级
+            raise ValueError("layer 仅支持 base 或 deco")  # 抛出错误
+        code = tile_to_code(tile)  # 编码目标瓦片
+        if not plane.count(code):  # 整块计数为 0 时直接返回
+            return []  # 返回空列表
+        found: list[tuple[int, int]] = []  # 初始化结果
+        index = plane.find(code)  # 查找第一个匹配
+        while index != -1:  # 直到没有更多匹配
+            found.append((index % self.size, index // self.size))  # 记录坐标
+            index = plane.find(code, index + 1)  # 继续向后查找
+        return found  # 返回坐标列表
 
     def _validate_coord(self, x: int, y: int) -> None:  # 定义内部坐标校验方法
         """验证坐标是否位于区块范围内。"""  # 方法 docstring,说明用途
@@ -78,21 +426,65 @@ class Chunk(BaseModel):  # 定义区块模型
         if not 0 <= x < self.size or not 0 <= y < self.size:  # 判断坐标范围
             raise ValueError(f"坐标越界: ({x}, {y}) not in [0,{self.size})")  # 抛出错误
 
+    def _fill_default(self) -> None:  # 定义默认平面填充方法
+        """引用共享的只读默认平面,首次写入时才复制为私有平面。"""  # 方法 docstring,说明用途
+
+        self._base, self._deco, self._height, self._growth = _default_planes(self.size)  # 共享
+        self._shared = True  # 标记为共享
+
+    def _make_private(self) -> None:  # 定义写时复制方法
+        """若仍引用共享默认平面,复制为可写的私有平面。"""  # 方法 docstring,说明用途
+
+        if not self._shared:  # 已是私有平面
+            return  # 直接返回
+        self._base = bytearray(self._base)  # 复制基础平面
+        self._deco = bytearray(self._deco)  # 复制装饰平面
+        self._height = array("b", self._height.tobytes())  # 复制高度平面
+        self._growth = bytearray(self._growth)  # 复制成长平面
+        self._shared = False  # 标记为私有
+
+    def _fill_from_grid(self, grid: list[list[Any]]) -> None:  # 定义网格填充方法
+        """校验旧版二维数组尺寸,并逐格写入平面。"""  # 方法 docstring,说明用途
+
+        if len(grid) != self.size:  # 检查行数是否匹配
+            raise ValueError("区块行数与尺寸不符")  # 抛出错误
+        for row in grid:  # 遍历每一行
+            if len(row) != self.size:  # 检查列数
+                raise ValueError("区块列数与尺寸不符")  # 抛出错误
+        self._fill_default()  # 先引用默认平面
+        self._make_private()  # 复制为可写平面
+        planes = self.planes  # 取出平面引用,避免逐格访问私有属性
+        index = 0  # 初始化线性下标
+        for row in grid:  # 遍历行
+            for item in row:  # 遍历格子
+                if isinstance(item, dict):  # JSON 字典直接取值,缺省字段沿用 TileCell 默认值
+                    _write_cell(  # 写入平面
+                        planes,  # 区块平面
+                        index,  # 线性下标
+                        item.get("base", TileType.GRASS),  # 基础瓦片
+                        item.get("deco"),  # 装饰瓦片
+                        item.get("height", 0),  # 高度
+                        item.get("growth_stage"),  # 成长阶段
+                    )  # 结束写入
+                else:  # TileCell 或 CellView
+                    _write_cell(  # 写入平面
+                        planes,  # 区块平面
+                        index,  # 线性下标
+                        item.base,  # 基础瓦片
+                        item.deco,  # 装饰瓦片
+                        item.height,  # 高度
+                        item.growth_stage,  # 成长阶段
+                    )  # 结束写入
+                index += 1  # 推进下标
+
     def to_summary(self) -> dict[str, int]:  # 定义区块统计方法
         """返回区块内基础瓦片的统计信息,用于调试。"""  # 方法 docstring,说明用途
 
-        counts: dict[str, int] = {}  # 初始化计数字典
-        for row in self.grid:  # 遍历每一行
-            for cell in row:  # 遍历每个格子
-                counts[cell.base] = counts.get(cell.base, 0) + 1  # 累加基础瓦片数量
-        return counts  # 返回统计结果
+        counts = Counter(self._base)  # 对基础平面整体计数
+        return {TILES_BY_CODE[code].value: total for code, total in counts.items()}  # 转换键
 
     @classmethod
     def create_default(cls, cx: int, cy: int, size: int = 32) -> Chunk:  # 定义默认工厂
         """创建填充草地的默认区块。"""  # 方法 docstring,说明用途
 
-        grid = [  # 构建网格列表
-            [TileCell(base=TileType.GRASS, height=0) for _ in range(size)]  # 填充草地
-            for _ in range(size)  # 生成 size 行
-        ]  # 结束网格构造
-        return cls(cx=cx, cy=cy, size=size, grid=grid)  # 返回 Chunk 实例
+        return cls(cx=cx, cy=cy, size=size)  # 未提供网格时验证器会填充草地
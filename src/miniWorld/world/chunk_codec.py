@@ -0,0 +1,71 @@
+"""实现区块的紧凑二进制编码,替代逐格 JSON 序列化。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import struct  # 导入 struct,用于打包定长文件头
+
+from .chunk import Chunk  # 导入区块模型
+
+CHUNK_MAGIC = b"MWCK"  # 二进制区块文件的魔数,用于格式自动识别
+CHUNK_FORMAT_VERSION = 3  # 当前二进制格式版本号,第 2 版追加修订号,第 3 版追加成长追赶 tick
+_HEADER = struct.Struct("<4sBBHii")  # 文件头:魔数、格式版本、版本串长度、边长、cx、cy
+_REVISION = struct.Struct("<Q")  # 第 2 版起的区块修订号
+_SIM_TICK = struct.Struct("<Q")  # 第 3 版起的成长追赶 tick
+
+
+def is_binary_chunk(data: bytes) -> bool:  # 定义格式识别函数
+    """判断给定字节串是否为二进制区块格式。"""  # 函数 docstring,说明用途
+
+    return data[: len(CHUNK_MAGIC)] == CHUNK_MAGIC  # 比较魔数前缀
+
+
+def encode_chunk(chunk: Chunk) -> bytes:  # 定义区块编码函数
+    """将区块编码为文件头加 base/deco/height/growth 四个定宽平面。"""  # 函数 docstring,说明用途
+
+    version_bytes = chunk.version.encode("utf-8")  # 编码数据版本字符串
+    if len(version_bytes) > 0xFF:  # 版本串长度需放入单字节
+        raise ValueError("区块版本字符串过长")  # 抛出错误
+    base, deco, height, growth = chunk.planes  # 读取区块平面
+    header = _HEADER.pack(  # 打包文件头
+        CHUNK_MAGIC,  # 魔数
+        CHUNK_FORMAT_VERSION,  # 格式版本
+        len(version_bytes),  # 版本串长度
+        chunk.size,  # 区块边长
+        chunk.cx,  # 区块 X 坐标
+        chunk.cy,  # 区块 Y 坐标
+    )  # 结束打包
+    revision = _REVISION.pack(chunk.revision)  # 打包修订号
+    sim_tick = _SIM_TICK.pack(chunk.sim_tick)  # 打包成长追赶 tick
+    planes = (base, deco, height.tobytes(), growth)  # 四个平面
+    return b"".join((header, revision, sim_tick, version_bytes, *planes))  # 拼接编码
+
+
+def decode_chunk(data: bytes) -> Chunk:  # 定义区块解码函数
+    """从二进制数据还原区块,按平面整体校验而不逐格构造模型;旧版缺少的修订号与 tick 记为 0。"""
+
+    if len(data) < _HEADER.size or not is_binary_chunk(data):  # 校验文件头
+        raise ValueError("不是有效的二进制区块数据")  # 抛出错误
+    _, fmt, version_len, size, cx, cy = _HEADER.unpack_from(data)  # 解析文件头
+    if fmt not in (1, 2, CHUNK_FORMAT_VERSION):  # 校验格式版本
+        raise ValueError(f"不支持的区块格式版本:{fmt}")  # 抛出错误
+    offset = _HEADER.size  # 计算修订号或版本串起点
+    revision = 0  # 第 1 版没有修订号
+    if fmt >= 2:  # 第 2 版读取修订号
+        (revision,) = _REVISION.unpack_from(data, offset)  # 解析修订号
+        offset += _REVISION.size  # 移动到成长追赶 tick 或版本串起点
+    sim_tick = 0  # 第 3 版之前没有成长追赶 tick
+    if fmt >= 3:  # 第 3 版读取成长追赶 tick
+        (sim_tick,) = _SIM_TICK.unpack_from(data, offset)  # 解析 tick
+        offset += _SIM_TICK.size  # 移动到版本串起点
+    version = data[offset : offset + version_len].decode("utf-8")  # 读取数据版本
+    offset += version_len  # 移动到平面起点
+    cell_count = size * size  # 计算格子总数
+    if len(data) != offset + cell_count * 4:  # 校验数据长度
+        raise ValueError("二进制区块数据长度不符")  # 抛出错误
+    planes = [  # 切出四个平面
+        data[offset + cell_count * index : offset + cell_count * (index + 1)]  # 单个平面
+        for index in range(4)  # base/deco/height/growth
+    ]  # 结束切片
+    return Chunk.from_planes(  # 构建区块
+        cx, cy, size, version, *planes, revision=revision, sim_tick=sim_tick
+    )  # 结束构建
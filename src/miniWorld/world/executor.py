@@ -0,0 +1,146 @@
+"""实现把 tick 系统的逐区块更新分配到进程池的 tick 执行器。"""  # 模块 docstring
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import multiprocessing  # 导入 multiprocessing,选择工作进程的启动方式
+import threading  # 导入 threading,保护进程池的延迟创建
+from array import array  # 导入 array,把活跃格子压缩为下标数组
+from collections.abc import Sequence  # 导入抽象类型,用于类型标注
+from concurrent.futures import ProcessPoolExecutor  # 导入进程池
+from dataclasses import dataclass, replace  # 导入 dataclass 工具,描述分区载荷
+from itertools import pairwise, repeat  # 导入迭代工具,切分分区并重复传入系统与上下文
+from typing import TYPE_CHECKING  # 导入类型检查开关
+
+from .chunk import Chunk  # 导入区块模型
+
+if TYPE_CHECKING:  # 类型检查分支,避免循环导入
+    from .systems import ActiveCell, CellWrite, TickContext, TickSystem  # tick 系统类型
+
+_MIN_PARTITION_CHUNKS = 16  # 每个分区至少包含的区块数,更小的批次在本进程内执行更快
+
+
+@dataclass(frozen=True, slots=True)
+class ChunkBatch:  # 定义分区载荷
+    """发往工作进程的一个分区:区块坐标与版本、拼接的四个平面,以及每个区块的活跃格子。
+
+    平面整体拼接为一个 bytes;活跃格子只传递行优先下标,编码由工作进程从平面读取。序列化时
+    不逐格构造对象,也不携带修订号等与更新无关的状态。
+    """  # 类 docstring
+
+    size: int  # 区块边长
+    keys: tuple[tuple[int, int, str], ...]  # 按顺序排列的 (cx, cy, 版本)
+    planes: bytes  # 每个区块依次拼接 base、deco、height、growth 平面
+    counts: tuple[int, ...]  # 每个区块的活跃格子数量
+    cells: bytes  # 全部活跃格子的下标,uint32 数组
+
+    @classmethod
+    def pack(cls, batch: Sequence[tuple[Chunk, list[ActiveCell]]]) -> ChunkBatch:  # 定义打包方法
+        """把区块与活跃格子打包为紧凑载荷,区块尺寸不一致时抛出 ValueError。"""
+
+        size = batch[0][0].size  # 区块边长
+        if any(chunk.size != size for chunk, _ in batch):  # 边长不一致无法按固定步长拆分
+            raise ValueError("区块尺寸必须一致")  # 抛出错误
+        return cls(  # 创建载荷
+            size=size,  # 区块边长
+            keys=tuple((chunk.cx, chunk.cy, chunk.version) for chunk, _ in batch),  # 坐标
+            planes=b"".join(plane for chunk, _ in batch for plane in chunk.planes),  # 拼接
+            counts=tuple(len(cells) for _, cells in batch),  # 格子数量
+            cells=array("I", (y * size + x for _, cells in batch for x, y, _ in cells)).tobytes(),
+        )  # 结束创建
+
+    def unpack(self) -> list[tuple[Chunk, list[ActiveCell]]]:  # 定义解包方法
+        """在工作进程中按固定步长切出平面,还原只读用途的区块与活跃格子的当前编码。"""
+
+        size = self.size  # 区块边长
+        step = size * size  # 每个平面的字节数
+        indices = array("I")  # 活跃格子下标
+        indices.frombytes(self.cells)  # 还原数组
+        batch: list[tuple[Chunk, list[ActiveCell]]] = []  # 初始化结果
+        start = 0  # 当前区块的首个下标位置
+        for index, ((cx, cy, version), count) in enumerate(
+            zip(self.keys, self.counts, strict=True)
+        ):  # 遍历区块
+            offset = index * 4 * step  # 区块平面的起始位置
+            base, deco, height, growth = (  # 切出四个平面
+                self.planes[offset + i * step : offset + (i + 1) * step] for i in range(4)
+            )  # 结束切片
+            chunk = Chunk.from_planes(cx, cy, size, version, base, deco, height, growth)
+            base, deco, height, growth = chunk.planes  # 下标来自合法坐标,直接读取平面
+            cells = [  # 活跃格子
+                (i % size, i // size, (base[i], deco[i], height[i], growth[i]))  # 坐标与编码
+                for i in indices[start : start + count]  # 本区块的下标
+            ]  # 结束列表
+            batch.append((chunk, cells))  # 记录区块
+            start += count  # 下一个区块
+        return batch  # 返回区块
+
+
+def _update_batch(  # 定义工作进程入口
+    system: TickSystem, ctx: TickContext, payload: ChunkBatch
+) -> list[list[CellWrite]]:  # 返回每个区块的新编码
+    """在工作进程中逐区块执行系统的 update,按载荷顺序返回结果。"""  # 函数 docstring
+
+    return [system.update(ctx, chunk, cells) for chunk, cells in payload.unpack()]  # 返回结果
+
+
+class TickExecutor:  # 定义 tick 执行器
+    """把一个系统的逐区块 update 按区块顺序切成连续分区,交给进程池并行计算。
+
+    每个分区的结果按提交顺序取回并拼接,与在本进程内逐区块执行的顺序完全一致,写入区块、活跃
+    集合与审计日志仍由引擎在主进程中串行完成。workers 为 1 或区块不足以切分时不创建进程池。
+    工作进程以 spawn 方式启动,不继承主进程的线程与锁;系统对象与上下文需要可以 pickle。
+    """  # 类 docstring
+
+    def __init__(self, workers: int = 1) -> None:  # 定义构造函数
+        """保存工作进程数量,进程池在首次需要时创建。"""  # 方法 docstring,说明用途
+
+        if workers < 1:  # 校验数量
+            raise ValueError("工作进程数量至少为 1")  # 抛出错误
+        self._workers = workers  # 保存工作进程数量
+        self._pool: ProcessPoolExecutor | None = None  # 进程池,延迟创建
+        self._lock = threading.Lock()  # 保护进程池的创建与关闭
+
+    @property
+    def workers(self) -> int:  # 定义工作进程数量属性
+        """返回工作进程数量。"""  # 属性 docstring,说明用途
+
+        return self._workers  # 返回数量
+
+    def update(  # 定义批量更新方法
+        self,
+        system: TickSystem,  # 执行的系统
+        ctx: TickContext,  # 本次 tick 的上下文
+        batch: Sequence[tuple[Chunk, list[ActiveCell]]],  # 按区块顺序排列的活跃格子
+    ) -> list[list[CellWrite]]:  # 返回每个区块的新编码
+        """返回与 batch 一一对应的新编码列表,不修改区块。"""  # 方法 docstring
+
+        partitions = min(self._workers, len(batch) // _MIN_PARTITION_CHUNKS)  # 分区数量
+        if partitions <= 1:  # 不值得跨进程
+            return [system.update(ctx, chunk, cells) for chunk, cells in batch]  # 本进程执行
+        bounds = [len(batch) * i // partitions for i in range(partitions + 1)]  # 分区边界
+        payloads = [  # 打包各分区
+            ChunkBatch.pack(batch[start:end])  # 连续的区块
+            for start, end in pairwise(bounds)  # 相邻边界
+        ]  # 结束列表
+        worker_ctx = replace(ctx, store=None)  # 存储不跨进程传递
+        results = self._executor().map(_update_batch, repeat(system), repeat(worker_ctx), payloads)
+        return [writes for part in results for writes in part]  # 按分区顺序拼接
+
+    def shutdown(self) -> None:  # 定义关闭方法
+        """关闭进程池并等待工作进程退出,之后再次使用会重新创建。"""  # 方法 docstring
+
+        with self._lock:  # 加锁替换进程池
+            pool, self._pool = self._pool, None  # 取出进程池
+        if pool is not None:  # 进程池已创建
+            pool.shutdown()  # 等待退出
+
+    def _executor(self) -> ProcessPoolExecutor:  # 定义进程池获取工具
+        """返回进程池,首次调用时创建。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 避免并发重复创建
+            if self._pool is None:  # 尚未创建
+                self._pool = ProcessPoolExecutor(  # 创建进程池
+                    max_workers=self._workers,  # 工作进程数量
+                    mp_context=multiprocessing.get_context("spawn"),  # 不继承线程与锁
+                )  # 结束创建
+            return self._pool  # 返回进程池
@@ -0,0 +1,84 @@
+"""实现延迟写回模式下的后台刷盘任务。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import asyncio  # 导入 asyncio,用于后台任务与线程卸载
+import contextlib  # 导入 contextlib,用于忽略等待超时
+import logging  # 导入 logging,记录刷盘异常
+
+from .async_store import AsyncWorldStore  # 导入异步存储包装
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+
+class WriteBehindFlusher:  # 定义后台刷盘器
+    """按固定间隔或脏数据阈值把 WorldStore 的脏数据写回磁盘。"""  # 类 docstring,说明用途
+
+    def __init__(self, async_store: AsyncWorldStore, interval_seconds: float) -> None:  # 构造函数
+        """保存异步存储包装与刷盘间隔。"""  # 方法 docstring,说明用途
+
+        self._async_store = async_store  # 保存异步存储,提供世界锁与线程池
+        self._store = async_store.store  # 保存世界存储
+        self._interval = max(0.01, interval_seconds)  # 保存刷盘间隔,避免忙等
+        self._wakeup: asyncio.Event | None = None  # 阈值触发时的唤醒事件
+        self._stopping = False  # 标记是否正在停止
+        self._task: asyncio.Task[None] | None = None  # 后台任务句柄
+        self.flush_count = 0  # 记录刷盘次数,便于观测
+
+    def start(self) -> None:  # 定义启动方法
+        """在当前事件循环中启动后台任务,并向存储注册阈值回调。"""  # 方法 docstring
+
+        loop = asyncio.get_running_loop()  # 获取当前事件循环
+        self._wakeup = asyncio.Event()  # 创建唤醒事件
+        wakeup = self._wakeup  # 局部引用,供回调使用
+        self._store.set_flush_listener(lambda: loop.call_soon_threadsafe(wakeup.set))  # 注册回调
+        self._stopping = False  # 重置停止标记
+        self._task = loop.create_task(self._run())  # 创建后台任务
+
+    async def stop(self) -> None:  # 定义停止方法
+        """等待后台任务结束并强制写回剩余脏数据。"""  # 方法 docstring,说明用途
+
+        self._stopping = True  # 标记停止
+        if self._wakeup is not None:  # 若事件存在
+            self._wakeup.set()  # 唤醒后台任务
+        if self._task is not None:  # 若任务存在
+            await self._task  # 等待当前刷盘完成,避免与最终刷盘交错
+            self._task = None  # 清空任务句柄
+        self._store.set_flush_listener(None)  # 取消回调注册
+        await self.flush_once()  # 最终刷盘
+
+    async def flush_once(self) -> int:  # 定义单次刷盘方法
+        """在存储线程池中收集脏数据快照,再写入磁盘;没有待写内容时不进入世界闸门。
+
+        延迟写回模式下,动作、成长追赶与 tick 都在区块锁或世界锁内修改缓存中的区块,收集时独占
+        闸门保证没有进行中的修改,快照中的格子、修订号与 sim_tick 来自同一时刻。同步写入模式下
+        区块随动作落盘,待写的只有自带锁的用量账本,无需独占闸门阻塞新的动作。
+        """  # 方法 docstring
+
+        if self._store.dirty_count == 0 and not self._store.has_failed_writes:  # 无待写内容
+            return 0  # 直接返回,不阻塞动作
+        if self._store.write_behind:  # 缓存中可能有脏区块
+            async with self._async_store.world_locked():  # 等待进行中的动作与 tick 结束
+                batch = await self._async_store.run(self._store.collect_dirty)  # 在线程池中编码
+        else:  # 同步写入模式
+            batch = await self._async_store.run(self._store.collect_dirty)  # 用量账本自行加锁
+        if batch.is_empty():  # 无脏数据
+            return 0  # 直接返回
+        await asyncio.to_thread(self._store.write_batch, batch)  # 在线程中执行磁盘写入
+        self.flush_count += 1  # 累加刷盘次数
+        return batch.size  # 返回写入数量
+
+    async def _run(self) -> None:  # 定义后台循环
+        """循环等待间隔或阈值事件,然后执行一次刷盘。"""  # 方法 docstring,说明用途
+
+        assert self._wakeup is not None  # 启动时已创建事件
+        while not self._stopping:  # 直到收到停止信号
+            with contextlib.suppress(TimeoutError):  # 超时即到达刷盘间隔
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._interval)  # 等待
+            self._wakeup.clear()  # 重置事件
+            if self._stopping:  # 停止时交由 stop 执行最终刷盘
+                break  # 退出循环
+            try:  # 执行刷盘
+                await self.flush_once()  # 写回脏数据
+            except OSError:  # 捕获磁盘错误
+                logger.exception("后台刷盘失败,将在下个周期重试")  # 记录异常
@@ -0,0 +1,238 @@
+"""实现世界存储的追加式二进制预写日志,支持分组 fsync 与崩溃恢复。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import json  # 导入 json,用于编码用量与任务增量
+import logging  # 导入 logging,记录损坏的日志尾部
+import os  # 导入 os,用于 fsync
+import struct  # 导入 struct,用于打包定长记录
+import time  # 导入 time,用于计算 fsync 间隔
+import zlib  # 导入 zlib,用于计算帧校验和
+from collections.abc import Iterator  # 导入 Iterator,用于类型标注
+from pathlib import Path  # 导入 Path,处理文件路径
+from threading import Lock  # 导入 Lock,串行化日志追加
+from typing import Any, BinaryIO  # 导入类型工具
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+RECORD_CELL = 1  # 单格变更记录:区块坐标、线性下标与四个平面编码
+RECORD_GROWTH = 2  # 旧版成长索引记录,仅在回放旧日志时解码
+RECORD_USAGE = 3  # 用量记录:角色某动作的完整计数状态
+RECORD_USAGE_RESET = 4  # 用量清空记录
+RECORD_QUEST = 5  # 单个任务的覆盖写记录
+RECORD_QUESTS = 6  # 任务列表的整体替换记录
+RECORD_REVISION = 7  # 区块修订号记录:区块坐标与保存后的修订号
+RECORD_ACTIVE = 8  # 活跃格子记录:某个 tick 系统登记或移除一个格子
+RECORD_SIM_TICK = 9  # 区块成长追赶记录:区块坐标与保存时已追赶到的世界 tick
+
+SEGMENT_MAGIC = b"MWJL\x01"  # 日志段文件头:魔数与格式版本
+_FRAME = struct.Struct("<II")  # 帧头:负载长度与 CRC32
+_CELL = struct.Struct("<BiiHBBbB")  # 单格记录:类型、cx、cy、下标、base、deco、height、growth
+_GROWTH = struct.Struct("<BiiHH?")  # 旧版成长记录:类型、cx、cy、x、y、是否成长
+_ACTIVE = struct.Struct("<BiiHH?B")  # 活跃记录:类型、cx、cy、x、y、是否活跃、系统名长度
+_REVISION = struct.Struct("<BiiQ")  # 修订号记录:类型、cx、cy、修订号
+_SIM_TICK = struct.Struct("<BiiQ")  # 成长追赶记录:类型、cx、cy、世界 tick
+_JSON_HEAD = struct.Struct("<BI")  # JSON 记录头:类型与负载长度
+
+
+def encode_cell(  # 定义单格记录编码函数
+    cx: int,  # 区块 X 坐标
+    cy: int,  # 区块 Y 坐标
+    index: int,  # 格子线性下标
+    base: int,  # 基础瓦片编码
+    deco: int,  # 装饰编码
+    height: int,  # 高度
+    growth: int,  # 成长阶段字节
+) -> bytes:  # 返回记录字节
+    """将一次格子变更的最终状态编码为定长记录。"""  # 函数 docstring,说明用途
+
+    return _CELL.pack(RECORD_CELL, cx, cy, index, base, deco, height, growth)  # 打包记录
+
+
+def encode_active(  # 定义活跃记录编码函数
+    system: str, cx: int, cy: int, x: int, y: int, active: bool
+) -> bytes:  # 返回记录字节
+    """将活跃格子索引的一次登记或移除编码为定长记录头加系统名。"""  # 函数 docstring
+
+    name = system.encode("utf-8")  # 编码系统名
+    return _ACTIVE.pack(RECORD_ACTIVE, cx, cy, x, y, active, len(name)) + name  # 打包记录
+
+
+def encode_revision(cx: int, cy: int, revision: int) -> bytes:  # 定义修订号记录编码函数
+    """将区块保存后的修订号编码为定长记录。"""  # 函数 docstring,说明用途
+
+    return _REVISION.pack(RECORD_REVISION, cx, cy, revision)  # 打包记录
+
+
+def encode_sim_tick(cx: int, cy: int, tick: int) -> bytes:  # 定义成长追赶记录编码函数
+    """将区块保存时已追赶到的世界 tick 编码为定长记录。"""  # 函数 docstring,说明用途
+
+    return _SIM_TICK.pack(RECORD_SIM_TICK, cx, cy, tick)  # 打包记录
+
+
+def encode_json(kind: int, payload: Any) -> bytes:  # 定义 JSON 记录编码函数
+    """将用量或任务增量编码为带长度前缀的 JSON 记录。"""  # 函数 docstring,说明用途
+
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")  # 编码
+    return _JSON_HEAD.pack(kind, len(data)) + data  # 拼接记录头与负载
+
+
+def decode_records(payload: bytes) -> Iterator[tuple[int, tuple[Any, ...]]]:  # 定义记录解码函数
+    """依次解析一帧中的全部记录,返回记录类型与字段元组。"""  # 函数 docstring,说明用途
+
+    offset = 0  # 初始化偏移
+    while offset < len(payload):  # 遍历整帧
+        kind = payload[offset]  # 读取记录类型
+        if kind == RECORD_CELL:  # 单格记录
+            yield kind, _CELL.unpack_from(payload, offset)[1:]  # 返回字段
+            offset += _CELL.size  # 移动偏移
+        elif kind == RECORD_GROWTH:  # 成长记录
+            yield kind, _GROWTH.unpack_from(payload, offset)[1:]  # 返回字段
+            offset += _GROWTH.size  # 移动偏移
+        elif kind == RECORD_ACTIVE:  # 活跃记录
+            *fields, length = _ACTIVE.unpack_from(payload, offset)[1:]  # 读取字段
+            start = offset + _ACTIVE.size  # 计算系统名起点
+            yield kind, (payload[start : start + length].decode("utf-8"), *fields)  # 返回字段
+            offset = start + length  # 移动偏移
+        elif kind == RECORD_REVISION:  # 修订号记录
+            yield kind, _REVISION.unpack_from(payload, offset)[1:]  # 返回字段
+            offset += _REVISION.size  # 移动偏移
+        elif kind == RECORD_SIM_TICK:  # 成长追赶记录
+            yield kind, _SIM_TICK.unpack_from(payload, offset)[1:]  # 返回字段
+            offset += _SIM_TICK.size  # 移动偏移
+        else:  # JSON 记录
+            _, length = _JSON_HEAD.unpack_from(payload, offset)  # 读取负载长度
+            start = offset + _JSON_HEAD.size  # 计算负载起点
+            yield kind, (json.loads(payload[start : start + length].decode("utf-8")),)  # 返回负载
+            offset = start + length  # 移动偏移
+
+
+class WorldJournal:  # 定义预写日志
+    """以分段文件追加事务帧,按条数或时间分组 fsync,检查点完成后删除旧段。"""  # 类 docstring
+
+    def __init__(  # 定义构造函数
+        self,
+        directory: Path,  # 日志段目录
+        fsync_batch: int = 16,  # 累计多少个事务后 fsync
+        fsync_interval_seconds: float = 0.05,  # 距上次 fsync 超过该秒数时立即 fsync
+    ) -> None:  # 构造函数返回 None
+        """创建日志目录,新的追加写入从已有最大段号之后开始。"""  # 方法 docstring,说明用途
+
+        directory.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+        self._dir = directory  # 保存目录
+        self._fsync_batch = max(1, fsync_batch)  # 保存分组大小
+        self._fsync_interval = max(0.0, fsync_interval_seconds)  # 保存分组时间窗口
+        existing = self.segments()  # 读取已有段号
+        self._segment = existing[-1] + 1 if existing else 1  # 当前段号
+        self._handle: BinaryIO | None = None  # 当前段文件句柄,首次追加时打开
+        self._written = 0  # 当前段已写入字节数
+        self._unsynced = 0  # 尚未 fsync 的事务数
+        self._last_sync = time.monotonic()  # 上次 fsync 时间
+        self._lock = Lock()  # 串行化追加、fsync 与轮转
+        self.sync_count = 0  # 记录 fsync 次数,便于观测分组效果
+
+    @property
+    def pending_bytes(self) -> int:  # 定义当前段大小属性
+        """返回自上次检查点以来写入的日志字节数。"""  # 属性 docstring,说明用途
+
+        return self._written  # 返回字节数
+
+    def segments(self) -> list[int]:  # 定义段号枚举方法
+        """返回磁盘上所有日志段的段号,按升序排列。"""  # 方法 docstring,说明用途
+
+        return sorted(int(path.stem) for path in self._dir.glob("*.wal"))  # 解析文件名
+
+    def append(self, records: list[bytes]) -> None:  # 定义事务追加方法
+        """将一组记录作为一个带校验和的帧追加到当前段。"""  # 方法 docstring,说明用途
+
+        if not records:  # 无记录
+            return  # 直接返回
+        payload = b"".join(records)  # 拼接记录
+        frame = _FRAME.pack(len(payload), zlib.crc32(payload)) + payload  # 构建帧
+        with self._lock:  # 加锁追加
+            if self._handle is None:  # 首次写入当前段
+                self._handle = self._segment_path(self._segment).open("ab")  # 打开段文件
+                self._handle.write(SEGMENT_MAGIC)  # 写入段文件头
+                self._written = len(SEGMENT_MAGIC)  # 计入文件头
+            self._handle.write(frame)  # 写入帧
+            self._handle.flush()  # 推入操作系统缓冲,进程崩溃不会丢失
+            self._written += len(frame)  # 累加字节数
+            self._unsynced += 1  # 累加未同步事务数
+            if (  # 达到分组大小或时间窗口
+                self._unsynced >= self._fsync_batch
+                or time.monotonic() - self._last_sync >= self._fsync_interval
+            ):
+                self._sync_locked()  # 执行 fsync
+
+    def sync(self) -> None:  # 定义强制同步方法
+        """立即 fsync 尚未落盘的事务。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁
+            self._sync_locked()  # 执行 fsync
+
+    def rotate(self) -> int | None:  # 定义段轮转方法
+        """封存当前段并切换到新段,返回被封存的段号;当前段为空时返回 None。"""  # 方法 docstring
+
+        with self._lock:  # 加锁
+            if self._handle is None:  # 当前段尚未写入
+                return None  # 无需轮转
+            self._sync_locked()  # 封存前确保落盘
+            self._handle.close()  # 关闭文件
+            self._handle = None  # 清空句柄
+            sealed = self._segment  # 记录封存段号
+            self._segment += 1  # 切换到新段
+            self._written = 0  # 重置字节数
+            return sealed  # 返回封存段号
+
+    def discard_through(self, segment: int) -> None:  # 定义旧段删除方法
+        """删除段号不大于 segment 的日志段,在其内容已由检查点落盘后调用。"""  # 方法 docstring
+
+        for number in self.segments():  # 遍历已有段
+            if number <= segment:  # 已被检查点覆盖
+                self._segment_path(number).unlink(missing_ok=True)  # 删除段文件
+
+    def replay(self) -> Iterator[bytes]:  # 定义日志回放方法
+        """按顺序返回所有完整帧的负载,遇到截断或校验失败的帧即停止。"""  # 方法 docstring
+
+        for number in self.segments():  # 遍历日志段
+            data = self._segment_path(number).read_bytes()  # 读取段文件
+            if not data.startswith(SEGMENT_MAGIC):  # 校验文件头
+                logger.warning("日志段 %s 文件头无效,停止回放", number)  # 记录警告
+                return  # 停止回放
+            offset = len(SEGMENT_MAGIC)  # 跳过文件头
+            while offset < len(data):  # 遍历帧
+                if offset + _FRAME.size > len(data):  # 帧头不完整
+                    logger.warning("日志段 %s 尾部帧头被截断,停止回放", number)  # 记录警告
+                    return  # 停止回放
+                length, checksum = _FRAME.unpack_from(data, offset)  # 解析帧头
+                start = offset + _FRAME.size  # 计算负载起点
+                payload = data[start : start + length]  # 切出负载
+                if len(payload) != length or zlib.crc32(payload) != checksum:  # 截断或损坏
+                    logger.warning("日志段 %s 存在不完整的帧,停止回放", number)  # 记录警告
+                    return  # 之后的帧顺序无法保证,停止回放
+                yield payload  # 返回负载
+                offset = start + length  # 移动到下一帧
+
+    def close(self) -> None:  # 定义关闭方法
+        """同步并关闭当前段文件。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁
+            if self._handle is not None:  # 若文件已打开
+                self._sync_locked()  # 执行 fsync
+                self._handle.close()  # 关闭文件
+                self._handle = None  # 清空句柄
+
+    def _segment_path(self, number: int) -> Path:  # 定义段路径工具
+        """返回指定段号的文件路径。"""  # 方法 docstring,说明用途
+
+        return self._dir / f"{number:08d}.wal"  # 拼接文件名
+
+    def _sync_locked(self) -> None:  # 定义内部 fsync 方法
+        """在已持有锁的情况下 fsync 当前段。"""  # 方法 docstring,说明用途
+
+        if self._handle is None or not self._unsynced:  # 无待同步数据
+            return  # 直接返回
+        os.fsync(self._handle.fileno())  # 刷入磁盘
+        self._unsynced = 0  # 重置计数
+        self._last_sync = time.monotonic()  # 更新同步时间
+        self.sync_count += 1  # 累加同步次数
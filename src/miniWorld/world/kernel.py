@@ -0,0 +1,157 @@
+"""实现对整块字节平面一次性计算的成长内核,以及按区块拆分的紧凑差异。"""  # 模块 docstring
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+from collections.abc import Sequence  # 导入抽象类型,用于类型标注
+from dataclasses import dataclass  # 导入 dataclass,描述区块差异
+from functools import lru_cache  # 导入 lru_cache,缓存按成长步数构建的查找表
+
+from .actions import CellChange  # 导入内部格子变更记录
+from .chunk import GROWTH_NONE, Chunk, changed_cells  # 导入区块与平面比较工具
+from .tiles import TileType, tile_to_code  # 导入瓦片类型与编码函数
+
+_FLAG = 0x80  # 组合键的最高位,标记该格需要成长
+_NO_STAGE = 0x7F  # 组合键低 7 位中表示“无成长数据”的值
+_SAPLING = tile_to_code(TileType.TREE_SAPLING)  # 树苗编码
+_TREE = tile_to_code(TileType.TREE)  # 成树编码
+_FARM = tile_to_code(TileType.FARM)  # 农田编码
+_STAGE = bytes(  # 成长字节到组合键低 7 位,合法的成长阶段(0~10)原样保留
+    _NO_STAGE if code == GROWTH_NONE else min(code, _NO_STAGE - 1) for code in range(256)
+)  # 结束查找表
+_IS_SAPLING = bytes(_FLAG if code == _SAPLING else 0 for code in range(256))  # 树苗标记
+_IS_FARM = bytes(_FLAG if code == _FARM else 0 for code in range(256))  # 农田标记
+_IS_EMPTY = bytes(_FLAG if code == 0 else 0 for code in range(256))  # 空装饰标记
+
+
+def _int(plane: bytes) -> int:  # 定义平面转整数工具
+    """把字节平面视为一个小端大整数,一次按位运算即可处理全部格子。"""  # 函数 docstring
+
+    return int.from_bytes(plane, "little")  # 返回整数
+
+
+def _bytes(value: int, length: int) -> bytes:  # 定义整数转平面工具
+    """把大整数还原为指定长度的字节平面。"""  # 函数 docstring,说明用途
+
+    return value.to_bytes(length, "little")  # 返回字节
+
+
+def _keys(flags: int, growth: bytes) -> bytes:  # 定义组合键工具
+    """把标记位与成长阶段合成每格一个字节的组合键,之后只需一次 translate 查表。"""
+
+    return _bytes(flags | _int(growth.translate(_STAGE)), len(growth))  # 返回组合键
+
+
+def _table(rule: dict[int, int]) -> bytes:  # 定义查找表工具
+    """构建组合键查找表:未标记的键还原原成长字节,标记的键按 rule 给出新成长字节。"""
+
+    table = bytearray(GROWTH_NONE if key == _NO_STAGE else key for key in range(_FLAG))  # 原值
+    table.extend(rule[key] for key in range(_FLAG))  # 标记的键
+    return bytes(table)  # 返回查找表
+
+
+@lru_cache(maxsize=64)  # 不同步数与追赶量的组合很少
+def _sapling_tables(steps: int, elapsed: int) -> tuple[bytes, bytes]:  # 定义树苗查找表工厂
+    """返回组合键到新成长字节、组合键到装饰异或值的两张查找表。"""  # 函数 docstring
+
+    reached = {key: (0 if key == _NO_STAGE else key) + elapsed for key in range(_FLAG)}  # 新阶段
+    growth = _table(
+        {key: GROWTH_NONE if stage >= steps else stage for key, stage in reached.items()}
+    )
+    mature = bytes(_FLAG) + bytes(  # 成熟的树苗把装饰从树苗异或为成树
+        _SAPLING ^ _TREE if reached[key] >= steps else 0 for key in range(_FLAG)
+    )  # 结束查找表
+    return growth, mature  # 返回查找表
+
+
+@lru_cache(maxsize=64)  # 不同步数与追赶量的组合很少
+def _crop_table(steps: int, elapsed: int) -> bytes:  # 定义作物查找表工厂
+    """返回组合键到新成长字节的查找表,已成熟的作物保持原阶段。"""  # 函数 docstring
+
+    stages = {key: 0 if key == _NO_STAGE else key for key in range(_FLAG)}  # 当前阶段
+    return _table(  # 构建查找表
+        {
+            key: stage if stage >= steps else min(stage + elapsed, steps)
+            for key, stage in stages.items()
+        }
+    )  # 结束构建
+
+
+def grow_saplings(  # 定义树苗成长内核
+    deco: bytes, growth: bytes, elapsed: int, steps: int
+) -> tuple[bytes, bytes]:  # 返回新的装饰与成长平面
+    """让全部树苗一次成长 elapsed 阶,达到 steps 的变为成树;没有树苗时原样返回输入对象。"""
+
+    if _SAPLING not in deco:  # 没有树苗
+        return deco, growth  # 直接返回
+    growth_table, mature_table = _sapling_tables(steps, min(elapsed, steps))  # 超过步数结果相同
+    keys = _keys(_int(deco.translate(_IS_SAPLING)), growth)  # 组合键
+    new_deco = _bytes(_int(deco) ^ _int(keys.translate(mature_table)), len(deco))  # 成树
+    return new_deco, keys.translate(growth_table)  # 返回新平面
+
+
+def grow_crops(  # 定义作物成长内核
+    base: bytes, deco: bytes, growth: bytes, elapsed: int, steps: int
+) -> bytes:  # 返回新的成长平面
+    """让未放置装饰的农田一次成长 elapsed 阶并封顶于 steps;没有农田时原样返回输入对象。"""
+
+    if _FARM not in base:  # 没有农田
+        return growth  # 直接返回
+    flags = _int(base.translate(_IS_FARM)) & _int(deco.translate(_IS_EMPTY))  # 空置农田
+    return _keys(flags, growth).translate(_crop_table(steps, min(elapsed, steps)))  # 查表
+
+
+@dataclass(frozen=True, slots=True)
+class ChunkDiff:  # 定义区块差异
+    """成长内核对一个区块的修改,只为确实变化的区块生成。
+
+    成长只改写 deco 与 growth 平面,差异即这两个平面的新内容(每格 2 字节),不携带 base 与
+    height,也不逐格构造对象;只含字节,可以低成本地序列化或跨进程传递。
+    """  # 类 docstring
+
+    cx: int  # 区块 X 坐标
+    cy: int  # 区块 Y 坐标
+    deco: bytes  # 新的装饰平面
+    growth: bytes  # 新的成长平面
+
+    def changes(self, chunk: Chunk) -> list[CellChange]:  # 定义变更记录生成方法
+        """在应用差异之前调用,按下标顺序生成与逐格写入一致的 CellChange 列表。"""
+
+        base, deco, height, growth = chunk.planes  # 读取平面
+        size = chunk.size  # 读取边长
+        return [  # 返回变更
+            CellChange(  # 单格变更
+                self.cx,  # 区块 X 坐标
+                self.cy,  # 区块 Y 坐标
+                index % size,  # 格子 X 坐标
+                index // size,  # 格子 Y 坐标
+                (base[index], deco[index], height[index], growth[index]),  # 修改前编码
+                (base[index], self.deco[index], height[index], self.growth[index]),  # 修改后编码
+            )  # 结束变更
+            for index in changed_cells((deco, growth), (self.deco, self.growth))  # 变化的格子
+        ]  # 结束列表
+
+    def apply(self, chunk: Chunk) -> None:  # 定义应用方法
+        """把差异写入区块,变化的格子在保存时计入日志增量。"""  # 方法 docstring
+
+        chunk.replace_planes(self.deco, self.growth)  # 整块替换平面
+
+
+def split_diffs(  # 定义差异拆分函数
+    coords: Sequence[tuple[int, int]],  # 按拼接顺序排列的区块坐标
+    cell_count: int,  # 每个区块的格子数
+    deco: bytes,  # 拼接的原装饰平面
+    growth: bytes,  # 拼接的原成长平面
+    new_deco: bytes,  # 拼接的新装饰平面
+    new_growth: bytes,  # 拼接的新成长平面
+) -> list[ChunkDiff]:  # 返回按坐标顺序排列的差异
+    """把多个区块拼接计算的结果按区块切开,只为平面确实变化的区块生成差异。"""
+
+    if new_deco is deco and new_growth is growth:  # 内核没有处理任何格子
+        return []  # 直接返回
+    diffs: list[ChunkDiff] = []  # 初始化结果
+    for offset, (cx, cy) in zip(range(0, len(deco), cell_count), coords, strict=True):  # 遍历
+        end = offset + cell_count  # 区块结束位置
+        chunk_deco, chunk_growth = new_deco[offset:end], new_growth[offset:end]  # 新平面切片
+        if chunk_deco != deco[offset:end] or chunk_growth != growth[offset:end]:  # 区块有变化
+            diffs.append(ChunkDiff(cx, cy, chunk_deco, chunk_growth))  # 记录差异
+    return diffs  # 返回差异
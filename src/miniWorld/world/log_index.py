@@ -0,0 +1,205 @@
+"""实现审计日志的旁路索引,按执行者、区块、动作类型与时间过滤并分页查询。"""  # 模块 docstring
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import json  # 导入 json,用于解析日志行
+import sqlite3  # 导入 sqlite3,索引保存在单文件数据库中
+from collections.abc import Callable, Iterable  # 导入抽象类型,用于类型标注
+from pathlib import Path  # 导入 Path,处理文件路径
+from threading import Lock  # 导入 Lock,串行化连接访问
+from typing import Any  # 导入 Any,用于标注日志字典
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    seq INTEGER PRIMARY KEY,
+    ts INTEGER,
+    actor TEXT,
+    action TEXT,
+    cx INTEGER,
+    cy INTEGER,
+    line TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_actor ON entries (actor);
+CREATE INDEX IF NOT EXISTS entries_chunk ON entries (cx, cy);
+CREATE INDEX IF NOT EXISTS entries_action ON entries (action);
+CREATE INDEX IF NOT EXISTS entries_ts ON entries (ts);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""  # 索引结构:二级索引隐含 seq,因此每个过滤条件内天然按写入顺序排列;meta 记录已索引的日志行数
+
+MAX_PAGE_SIZE = 500  # 单页最多返回的日志条数
+
+
+class ActionLogIndex:  # 定义审计日志索引
+    """随日志写入增量维护的 SQLite 旁路索引,查询按 seq 倒序并以 seq 作为游标。"""  # 类 docstring
+
+    def __init__(self, path: Path) -> None:  # 定义构造函数
+        """打开或创建索引数据库。"""  # 方法 docstring,说明用途
+
+        path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
+        self._path = path  # 保存索引路径
+        self._conn = sqlite3.connect(  # 打开连接
+            path,  # 索引文件
+            isolation_level=None,  # 手动管理事务
+            check_same_thread=False,  # 允许线程池访问,由 _lock 串行化
+        )  # 结束连接
+        self._lock = Lock()  # 串行化连接访问
+        self._conn.execute("PRAGMA journal_mode=WAL")  # 启用 WAL,查询不阻塞写入
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # 启动时由 sync 与日志对账,无需每次 fsync
+        self._conn.executescript(_INDEX_SCHEMA)  # 创建表结构
+
+    def __len__(self) -> int:  # 定义长度方法
+        """返回已索引的日志条数。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问连接
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]  # 返回条数
+
+    def add(self, lines: Iterable[str]) -> None:  # 定义增量索引方法
+        """解析日志行并在一个事务中写入索引。"""  # 方法 docstring,说明用途
+
+        rows = [_index_row(line) for line in lines]  # 解析日志行
+        if not rows:  # 无日志行
+            return  # 直接返回
+        with self._lock:  # 加锁访问连接
+            self._conn.execute("BEGIN")  # 开启事务
+            try:  # 写入索引
+                self._conn.executemany(  # 批量插入
+                    "INSERT INTO entries (ts, actor, action, cx, cy, line)"  # 插入索引列
+                    " VALUES (?, ?, ?, ?, ?, ?)",  # 参数占位
+                    rows,  # 索引行
+                )  # 结束插入
+                self._conn.execute(  # 推进高水位
+                    "INSERT INTO meta (key, value) VALUES ('lines', ?)"  # 首次写入
+                    " ON CONFLICT (key) DO UPDATE SET value = value + excluded.value",  # 累加行数
+                    (len(rows),),  # 本批行数
+                )  # 结束更新
+                self._conn.execute("COMMIT")  # 提交事务
+            except sqlite3.Error as exc:  # 捕获数据库错误
+                self._conn.execute("ROLLBACK")  # 回滚事务
+                raise OSError(f"审计日志索引写入失败:{exc}") from exc  # 统一为 OSError
+
+    def rebuild(self, lines: Iterable[str], batch_size: int = 5000) -> int:  # 定义重建方法
+        """清空索引后按顺序重新索引全部日志行,返回索引条数。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问连接
+            self._conn.execute("BEGIN")  # 开启事务
+            self._conn.execute("DELETE FROM entries")  # 清空索引
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('lines', 0)")
+            self._conn.execute("COMMIT")  # 提交事务
+        count = 0  # 初始化计数
+        pending: list[str] = []  # 待写入的日志行
+        for line in lines:  # 遍历日志行
+            pending.append(line)  # 加入批次
+            if len(pending) >= batch_size:  # 达到批次上限
+                self.add(pending)  # 写入批次
+                count += len(pending)  # 累加计数
+                pending = []  # 开始新批次
+        self.add(pending)  # 写入最后一批
+        return count + len(pending)  # 返回索引条数
+
+    def sync(self, read_lines: Callable[[], Iterable[str]], batch_size: int = 5000) -> int:
+        """与日志对账:日志在高水位之后的行增量索引;日志更短或高水位处的行不一致时整体重建。
+
+        索引行在后端提交时立即写入,日志写入器却按时间窗口分组落盘,崩溃或关闭索引期间写入的
+        日志都会让两者不一致。read_lines 每次调用都从头遍历日志,重建时会再调用一次。返回本次
+        写入的索引条数。
+        """  # 方法 docstring
+
+        indexed, last = self._high_water()  # 读取高水位与最后一条已索引的行
+        count = 0  # 日志行数
+        matched = indexed == 0  # 高水位处的行与索引一致
+        pending: list[str] = []  # 待写入的新增行
+        added = 0  # 新增条数
+        for line in read_lines():  # 遍历日志
+            count += 1  # 累加行数
+            if count == indexed:  # 到达高水位
+                matched = line == last  # 校验同一行
+            elif count > indexed and matched:  # 高水位之后的新增行
+                pending.append(line)  # 加入批次
+                if len(pending) >= batch_size:  # 达到批次上限
+                    self.add(pending)  # 写入批次
+                    added += len(pending)  # 累加计数
+                    pending = []  # 开始新批次
+        if matched and count >= indexed:  # 索引是日志的前缀
+            self.add(pending)  # 写入最后一批
+            return added + len(pending)  # 返回新增条数
+        return self.rebuild(read_lines(), batch_size)  # 整体重建
+
+    def _high_water(self) -> tuple[int, str | None]:  # 定义高水位读取方法
+        """返回已索引的日志行数与最后一条已索引的行;旧版索引没有记录时返回 -1,强制重建。"""
+
+        with self._lock:  # 加锁访问连接
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'lines'").fetchone()
+            last = self._conn.execute(  # 读取最后一条
+                "SELECT line FROM entries ORDER BY seq DESC LIMIT 1"  # 按主键倒序
+            ).fetchone()  # 取一行
+        if row is None:  # 旧版索引或新建索引
+            return (0, None) if last is None else (-1, None)  # 空索引视为高水位 0
+        return row[0], None if last is None else last[0]  # 返回高水位
+
+    def query(  # 定义查询方法
+        self,
+        actor: str | None = None,  # 执行者过滤
+        action: str | None = None,  # 动作类型过滤
+        cx: int | None = None,  # 区块 X 过滤,需与 cy 同时提供
+        cy: int | None = None,  # 区块 Y 过滤,需与 cx 同时提供
+        since: int | None = None,  # 起始时间戳(含)
+        until: int | None = None,  # 结束时间戳(不含)
+        cursor: int | None = None,  # 上一页返回的游标,只返回更早的日志
+        limit: int = 50,  # 每页条数
+    ) -> tuple[list[dict[str, Any]], int | None]:  # 返回日志列表与下一页游标
+        """按条件从新到旧返回一页日志,每条附带 seq;没有更多数据时游标为 None。"""  # 方法 docstring
+
+        if (cx is None) != (cy is None):  # 区块坐标必须成对出现
+            raise ValueError("cx 与 cy 需同时提供")  # 抛出错误
+        limit = max(1, min(limit, MAX_PAGE_SIZE))  # 限制页大小
+        clauses: list[str] = []  # 查询条件
+        params: list[Any] = []  # 查询参数
+        if actor is not None:  # 执行者过滤
+            clauses.append("actor = ?")  # 使用执行者索引
+            params.append(actor)  # 添加参数
+        if action is not None:  # 动作类型过滤
+            clauses.append("action = ?")  # 使用动作索引
+            params.append(action)  # 添加参数
+        if cx is not None:  # 区块过滤
+            clauses.append("cx = ? AND cy = ?")  # 使用区块索引
+            params.extend([cx, cy])  # 添加参数
+        if since is not None:  # 起始时间
+            clauses.append("ts >= ?")  # 使用时间索引
+            params.append(since)  # 添加参数
+        if until is not None:  # 结束时间
+            clauses.append("ts < ?")  # 使用时间索引
+            params.append(until)  # 添加参数
+        if cursor is not None:  # 游标分页
+            clauses.append("seq < ?")  # 只取更早的日志
+            params.append(cursor)  # 添加参数
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""  # 拼接条件
+        sql = f"SELECT seq, line FROM entries {where} ORDER BY seq DESC LIMIT ?"  # 构建查询
+        with self._lock:  # 加锁访问连接
+            rows = self._conn.execute(sql, [*params, limit + 1]).fetchall()  # 多取一条判断下一页
+        entries = [{**json.loads(line), "seq": seq} for seq, line in rows[:limit]]  # 解析日志
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None  # 计算下一页游标
+        return entries, next_cursor  # 返回结果
+
+    def close(self) -> None:  # 定义关闭方法
+        """关闭索引数据库连接。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问连接
+            self._conn.close()  # 关闭连接
+
+
+def _index_row(line: str) -> tuple[Any, ...]:  # 定义索引行构建函数
+    """从日志行提取时间、执行者、动作与区块坐标,缺失字段记为 NULL。"""  # 函数 docstring
+
+    record = json.loads(line)  # 解析日志行
+    chunk = record.get("chunk") or {}  # 读取区块信息
+    return (  # 返回索引行
+        record.get("ts"),  # 时间戳,旧日志没有该字段
+        record.get("actor"),  # 执行者
+        record.get("action"),  # 动作类型
+        chunk.get("cx"),  # 区块 X
+        chunk.get("cy"),  # 区块 Y
+        line,  # 原始日志行,查询时无需回读已压缩的日志段
+    )  # 结束元组
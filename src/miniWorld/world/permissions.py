@@ -0,0 +1,112 @@
+"""将 RolePermission 编译为位集与禁区空间索引,使每次动作的权限判断为常数时间。"""  # 模块 docstring
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+from collections.abc import Iterable, Mapping  # 导入抽象类型,用于类型标注
+from dataclasses import dataclass  # 导入 dataclass,定义编译结果
+from typing import TYPE_CHECKING  # 导入类型检查标志
+
+from .spatial import SpatialIndex  # 导入空间索引
+from .tiles import TileType, tile_to_code  # 导入瓦片类型与编码函数
+
+if TYPE_CHECKING:  # 仅在类型检查时导入,避免与 actions 循环导入
+    from .actions import ForbiddenRegion, RolePermission  # 权限模型
+
+
+def tile_mask(tiles: Iterable[TileType | str]) -> int:  # 定义瓦片位集函数
+    """将瓦片集合编码为以瓦片编码为位序号的整数位集。"""  # 函数 docstring,说明用途
+
+    mask = 0  # 初始化位集
+    for tile in tiles:  # 遍历瓦片
+        mask |= 1 << tile_to_code(tile)  # 置位
+    return mask  # 返回位集
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRole:  # 定义编译后的角色权限
+    """单个角色的查表结构:动作集合、瓦片位集、配额冷却与禁区空间索引。"""  # 类 docstring
+
+    allowed_actions: frozenset[str]  # 允许的动作
+    tile_whitelist: dict[str, int]  # 动作到瓦片位集,缺省或 0 表示不限制
+    forbidden_remove_bases: int  # 禁止拆除的基础瓦片位集
+    limits: dict[str, tuple[int | None, int | None]]  # 动作到 (每日配额, 冷却秒数)
+    forbidden_regions: SpatialIndex[ForbiddenRegion]  # 禁区空间索引
+
+    def allows_tile(self, action_type: str, tile: TileType | str | None) -> bool:  # 白名单判断
+        """判断瓦片是否在动作的白名单内,未配置白名单时一律允许。"""  # 方法 docstring
+
+        return self.allows_code(action_type, tile_to_code(tile))  # 编码后判断
+
+    def allows_code(self, action_type: str, code: int) -> bool:  # 定义按编码的白名单判断
+        """按瓦片编码判断白名单,供直接操作平面编码的调用方使用。"""  # 方法 docstring
+
+        mask = self.tile_whitelist.get(action_type, 0)  # 读取位集
+        return not mask or bool(mask >> code & 1)  # 位测试
+
+    def protects_base(self, tile: TileType | str | None) -> bool:  # 定义禁拆判断
+        """判断基础瓦片是否被保护而不可拆除。"""  # 方法 docstring,说明用途
+
+        return self.protects_code(tile_to_code(tile))  # 编码后判断
+
+    def protects_code(self, code: int) -> bool:  # 定义按编码的禁拆判断
+        """按瓦片编码判断基础瓦片是否被保护。"""  # 方法 docstring,说明用途
+
+        return bool(self.forbidden_remove_bases >> code & 1)  # 位测试
+
+    def forbids(self, cx: int, cy: int, x: int, y: int) -> bool:  # 定义禁区判断
+        """判断格子是否位于禁区内,与禁区数量无关。"""  # 方法 docstring,说明用途
+
+        return self.forbidden_regions.covers(cx, cy, x, y)  # 查询区块覆盖位图
+
+    @classmethod
+    def compile(cls, permission: RolePermission, chunk_size: int) -> CompiledRole:  # 编译方法
+        """将 RolePermission 编译为查表结构。"""  # 方法 docstring,说明用途
+
+        regions: SpatialIndex[ForbiddenRegion] = SpatialIndex(chunk_size)  # 禁区空间索引
+        for region in permission.forbidden_regions:  # 遍历禁区
+            regions.insert(region.cx, region.cy, region.x_range, region.y_range, region)  # 登记
+        actions = set(permission.daily_quota) | set(permission.cooldown_seconds)  # 有限制的动作
+        return cls(  # 构造编译结果
+            allowed_actions=frozenset(permission.allowed_actions),  # 动作集合
+            tile_whitelist={  # 白名单位集
+                action: tile_mask(tiles) for action, tiles in permission.tile_whitelist.items()
+            },  # 结束字典
+            forbidden_remove_bases=tile_mask(permission.forbidden_remove_bases),  # 禁拆位集
+            limits={  # 配额与冷却合并为一次查找
+                action: (  # 动作到限制元组
+                    permission.daily_quota.get(action),  # 每日配额
+                    permission.cooldown_seconds.get(action),  # 冷却秒数
+                )  # 结束元组
+                for action in actions  # 遍历动作
+            },  # 结束字典
+            forbidden_regions=regions,  # 禁区空间索引
+        )  # 结束构造
+
+
+class PermissionEngine:  # 定义权限引擎
+    """启动时编译全部角色权限;配置变化时调用 reload 整表替换,读取无需加锁。"""  # 类 docstring
+
+    def __init__(self, permissions: Mapping[str, RolePermission], chunk_size: int) -> None:
+        """保存区块边长并编译初始权限。"""  # 方法 docstring,说明用途
+
+        self._chunk_size = chunk_size  # 保存区块边长
+        self._source: Mapping[str, RolePermission] = {}  # 最近一次编译的来源
+        self._roles: dict[str, CompiledRole] = {}  # 编译结果
+        self.reload(permissions)  # 执行首次编译
+
+    def reload(self, permissions: Mapping[str, RolePermission]) -> None:  # 定义重新编译方法
+        """重新编译权限;来源对象未变化时直接跳过。"""  # 方法 docstring,说明用途
+
+        if permissions is self._source:  # 同一来源已编译
+            return  # 跳过
+        roles = {  # 先在局部完成编译,避免读者看到半成品
+            name: CompiledRole.compile(permission, self._chunk_size)
+            for name, permission in permissions.items()  # 遍历角色
+        }  # 结束字典
+        self._roles = roles  # 整表替换
+        self._source = permissions  # 记录来源
+
+    def get(self, actor: str) -> CompiledRole | None:  # 定义查询方法
+        """返回角色的编译权限,未知角色返回 None。"""  # 方法 docstring,说明用途
+
+        return self._roles.get(actor)  # 字典查找
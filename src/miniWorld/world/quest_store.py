@@ -0,0 +1,196 @@
+"""实现按任务逐条存储的内存任务表,维护状态、执行者、发布者与区块二级索引。"""  # 模块 docstring
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import json  # 导入 json,用于编码任务记录
+from bisect import bisect_left, bisect_right, insort  # 导入二分工具,维护有序序号列表
+from collections.abc import Hashable, Iterable  # 导入抽象类型,用于类型标注
+
+MAX_PAGE_SIZE = 500  # 单页最多返回的任务条数
+INDEX_FIELDS = ("status", "assignee", "giver", "chunk")  # 支持过滤的索引字段
+
+QuestRecord = tuple[int, bytes | None]  # (序号, 编码),编码为 None 表示删除
+
+
+def quest_keys(item: dict) -> dict[str, set[Hashable]]:  # 定义索引键提取函数
+    """提取任务在各索引中的键,缺失字段按默认值处理,兼容只含部分字段的原始字典。"""
+
+    chunks = set()  # 需求涉及的区块
+    for requirement in item.get("requirements") or []:  # 遍历需求
+        chunk = requirement.get("chunk") or {}  # 读取区块
+        if "cx" in chunk and "cy" in chunk:  # 区块完整
+            chunks.add((chunk["cx"], chunk["cy"]))  # 记录区块
+    giver = item.get("giver")  # 读取发布者
+    return {  # 返回各索引的键集合
+        "status": {item.get("status", "OPEN")},  # 状态,缺省为 OPEN
+        "assignee": set(item.get("assignee") or []),  # 执行者
+        "giver": set() if giver is None else {giver},  # 发布者
+        "chunk": chunks,  # 区块
+    }  # 结束字典
+
+
+class QuestStore:  # 定义任务表
+    """以单调递增的序号登记任务,每个任务是一条独立记录。
+
+    任务按序号(即插入顺序)排列;二级索引把键映射到有序序号列表,分页查询从游标处二分定位,
+    只扫描最短的候选列表。修改过的记录积累在脏集合中,由 WorldStore 逐条写回后端。
+    返回的任务字典由任务表持有,调用方应替换而不是原地修改。
+    """  # 类 docstring
+
+    def __init__(self) -> None:  # 定义构造函数
+        """创建空任务表。"""  # 方法 docstring,说明用途
+
+        self._records: dict[int, dict] = {}  # 序号到任务字典,按序号递增排列
+        self._ids: dict[str, int] = {}  # 任务 ID 到序号
+        self._order: list[int] = []  # 全部序号,有序
+        self._indexes: dict[str, dict[Hashable, list[int]]] = {  # 二级索引
+            name: {} for name in INDEX_FIELDS  # 每个字段一个键到序号列表的映射
+        }  # 结束字典
+        self._dirty: dict[int, bool] = {}  # 待写回的序号,值为记录是否仍存在
+        self._next_seq = 1  # 下一个可分配的序号
+        self.generation = 0  # 任务表的修改次数,每次 load/upsert/replace 调用递增
+
+    def __len__(self) -> int:  # 定义长度方法
+        """返回任务数量。"""  # 方法 docstring,说明用途
+
+        return len(self._records)  # 返回数量
+
+    @property
+    def dirty_count(self) -> int:  # 定义脏记录数量属性
+        """返回尚未写回的记录数量。"""  # 属性 docstring,说明用途
+
+        return len(self._dirty)  # 返回数量
+
+    def load(self, records: Iterable[tuple[int, dict]]) -> None:  # 定义加载方法
+        """从后端记录恢复任务表,记录需按序号递增排列,不产生脏记录。"""  # 方法 docstring
+
+        for seq, item in records:  # 遍历记录
+            self._insert(seq, item)  # 登记任务
+            self._next_seq = max(self._next_seq, seq + 1)  # 推进序号
+        self.generation += 1  # 任务表已修改
+
+    def values(self) -> list[dict]:  # 定义全部任务读取方法
+        """按序号顺序返回全部任务字典。"""  # 方法 docstring,说明用途
+
+        return list(self._records.values())  # 返回列表
+
+    def get(self, quest_id: str) -> dict | None:  # 定义单任务读取方法
+        """按 ID 返回任务字典,不存在时返回 None。"""  # 方法 docstring,说明用途
+
+        seq = self._ids.get(quest_id)  # 查找序号
+        return None if seq is None else self._records[seq]  # 返回任务
+
+    def upsert(self, items: Iterable[dict]) -> None:  # 定义覆盖或追加方法
+        """按 ID 覆盖已有任务或以新序号追加任务,只调整键发生变化的索引。"""  # 方法 docstring
+
+        self.generation += 1  # 任务表已修改
+        for item in items:  # 遍历任务
+            quest_id = str(item.get("id"))  # 任务 ID
+            seq = self._ids.get(quest_id)  # 查找序号
+            if seq is None:  # 新任务
+                seq = self._next_seq  # 分配序号
+                self._next_seq += 1  # 推进序号
+                self._insert(seq, item)  # 登记任务
+            else:  # 已有任务
+                self._reindex(seq, self._records[seq], item)  # 调整索引
+                self._records[seq] = item  # 覆盖任务
+            self._dirty[seq] = True  # 标记待写回
+
+    def replace(self, items: list[dict]) -> list[dict] | None:  # 定义整体替换方法
+        """用给定列表替换全部任务。
+
+        ID 与顺序不变时只覆盖内容变化的任务并返回它们;否则删除全部旧记录、以新序号重新登记,
+        返回 None 表示发生了整体替换。
+        """  # 方法 docstring
+
+        if [str(item.get("id")) for item in items] == list(self._ids):  # 任务集合与顺序未变
+            changed = [  # 找出内容变化的任务
+                item  # 新任务字典
+                for item, current in zip(items, self._records.values(), strict=True)  # 逐个比较
+                if item != current  # 内容变化
+            ]  # 结束列表
+            self.upsert(changed)  # 覆盖变化的任务
+            return changed  # 返回变化的任务
+        for seq in self._order:  # 遍历旧记录
+            self._dirty[seq] = False  # 标记删除
+        self._records.clear()  # 清空任务
+        self._ids.clear()  # 清空 ID 映射
+        self._order.clear()  # 清空序号
+        for index in self._indexes.values():  # 遍历索引
+            index.clear()  # 清空索引
+        self.upsert(items)  # 以新序号登记
+        return None  # 表示整体替换
+
+    def query(  # 定义分页查询方法
+        self,
+        filters: dict[str, Hashable],  # 索引字段到过滤值,值为 None 的字段不过滤
+        cursor: int | None = None,  # 上一页返回的游标,只返回序号更大的任务
+        limit: int = 50,  # 每页条数
+    ) -> tuple[list[dict], int | None]:  # 返回任务列表与下一页游标
+        """按索引过滤并按序号分页,没有更多数据时游标为 None。"""  # 方法 docstring
+
+        limit = max(1, min(limit, MAX_PAGE_SIZE))  # 限制页大小
+        lists = [  # 各条件对应的有序序号列表
+            self._indexes[name].get(value, [])
+            for name, value in filters.items()
+            if value is not None
+        ]  # 结束列表
+        lists.sort(key=len)  # 短的在前,只遍历最短的列表
+        candidates, others = (lists[0], lists[1:]) if lists else (self._order, [])  # 最短的列表
+        start = bisect_right(candidates, cursor) if cursor is not None else 0  # 定位游标
+        page: list[dict] = []  # 初始化结果
+        last = 0  # 本页最后一个序号
+        for seq in candidates[start:] if others else candidates[start : start + limit + 1]:
+            if others and not all(_contains(seqs, seq) for seqs in others):  # 不满足其他条件
+                continue  # 跳过
+            if len(page) == limit:  # 已取满一页且还有数据
+                return page, last  # 返回结果与游标
+            page.append(self._records[seq])  # 加入结果
+            last = seq  # 记录序号
+        return page, None  # 没有更多数据
+
+    def drain_dirty(self) -> list[QuestRecord]:  # 定义脏记录取出方法
+        """编码并清空脏记录,删除的记录编码为 None。"""  # 方法 docstring,说明用途
+
+        dirty, self._dirty = self._dirty, {}  # 取出脏集合
+        return [  # 返回记录
+            (seq, _encode(self._records[seq]) if exists else None)  # 编码或删除
+            for seq, exists in sorted(dirty.items())  # 按序号遍历
+        ]  # 结束列表
+
+    def _insert(self, seq: int, item: dict) -> None:  # 定义登记工具
+        """登记新序号的任务并写入各索引。"""  # 方法 docstring,说明用途
+
+        self._records[seq] = item  # 保存任务
+        self._ids[str(item.get("id"))] = seq  # 记录 ID
+        insort(self._order, seq)  # 加入序号列表,新序号通常直接追加在末尾
+        for name, keys in quest_keys(item).items():  # 遍历索引键
+            for key in keys:  # 遍历键
+                insort(self._indexes[name].setdefault(key, []), seq)  # 加入索引
+
+    def _reindex(self, seq: int, old: dict, new: dict) -> None:  # 定义索引调整工具
+        """只对新旧任务键不同的索引做删除与插入。"""  # 方法 docstring,说明用途
+
+        old_keys, new_keys = quest_keys(old), quest_keys(new)  # 新旧索引键
+        for name in INDEX_FIELDS:  # 遍历索引
+            index = self._indexes[name]  # 读取索引
+            for key in old_keys[name] - new_keys[name]:  # 移除的键
+                seqs = index[key]  # 读取序号列表
+                del seqs[bisect_left(seqs, seq)]  # 删除序号
+                if not seqs:  # 列表为空
+                    del index[key]  # 删除键
+            for key in new_keys[name] - old_keys[name]:  # 新增的键
+                insort(index.setdefault(key, []), seq)  # 加入索引
+
+
+def _contains(seqs: list[int], seq: int) -> bool:  # 定义有序列表成员判断函数
+    """二分判断序号是否在有序序号列表中。"""  # 函数 docstring,说明用途
+
+    position = bisect_left(seqs, seq)  # 二分定位
+    return position < len(seqs) and seqs[position] == seq  # 返回布尔值
+
+
+def _encode(item: dict) -> bytes:  # 定义任务编码函数
+    """将任务字典编码为 UTF-8 JSON 记录。"""  # 函数 docstring,说明用途
+
+    return json.dumps(item, ensure_ascii=False, indent=2).encode("utf-8")  # 返回字节
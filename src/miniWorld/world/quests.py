@@ -4,12 +4,16 @@ from __future__ import annotations  # 导入未来注解特性,支持前向引
 
 from collections.abc import Iterable  # 导入 Iterable,用于类型注解
 from enum import Enum  # 导入 Enum,用于定义状态枚举
+from threading import RLock  # 导入 RLock,串行化任务进度更新
 
 from pydantic import BaseModel, Field, model_validator  # 导入 BaseModel 等工具
 
-from .actions import ActionChange, ActionRequest, ChunkCoord  # 导入动作相关类型
+from .actions import ActionRequest, CellChange, ChunkCoord  # 导入动作相关类型
+from .spatial import SpatialIndex  # 导入空间索引
 from .store import WorldStore  # 导入 WorldStore,用于读写数据
-from .tiles import TileType  # 导入 TileType,用于瓦片约束
+from .tiles import TileType, tile_to_code  # 导入 TileType 与编码函数,用于瓦片约束
+
+_LAYER_INDEX = {"base": 0, "deco": 1}  # 监控层级到格子编码下标
 
 
 class QuestStatus(str, Enum):  # 定义任务状态枚举
@@ -54,24 +58,22 @@ class ActionRequirement(BaseModel):  # 定义动作需求模型
             self.progress = self.target_count  # 自动截断
         return self  # 返回自身
 
-    def matches(self, change: ActionChange, action_type: str) -> bool:  # 定义匹配判定方法
+    def matches(self, change: CellChange, action_type: str) -> bool:  # 定义匹配判定方法
         """判断给定变更是否满足需求基本条件。"""  # 方法 docstring,说明用途
 
         if action_type != self.action_type:  # 判断动作类型
             return False  # 不匹配
-        if change.chunk.cx != self.chunk.cx or change.chunk.cy != self.chunk.cy:  # 判断区块
+        if change.cx != self.chunk.cx or change.cy != self.chunk.cy:  # 判断区块
             return False  # 不匹配
-        if not (self.x_range[0] <= change.pos.x <= self.x_range[1]):  # 判断 X 范围
+        if not (self.x_range[0] <= change.x <= self.x_range[1]):  # 判断 X 范围
             return False  # 不匹配
-        return self.y_range[0] <= change.pos.y <= self.y_range[1]  # 返回最终判断
+        return self.y_range[0] <= change.y <= self.y_range[1]  # 返回最终判断
 
-    def apply_change(self, change: ActionChange) -> bool:  # 定义应用变更的方法
-        """根据变更更新进度,返回是否发生变化。"""  # 方法 docstring,说明用途
+    def apply_change(self, change: CellChange) -> bool:  # 定义应用变更的方法
+        """根据变更更新进度,返回是否发生变化;直接比较目标层的瓦片编码。"""  # 方法 docstring
 
-        target_layer = change.after.get(self.layer)  # 获取目标层的值
-        if (  # 判断瓦片是否匹配
-            self.target_tile is not None and target_layer != self.target_tile.value
-        ):
+        target_code = change.after[_LAYER_INDEX[self.layer]]  # 获取目标层的编码
+        if self.target_tile is not None and target_code != tile_to_code(self.target_tile):
             return False  # 未匹配
         if self.progress >= self.target_count:  # 若已完成
             return False  # 不再增加
@@ -110,12 +112,23 @@ class Quest(BaseModel):  # 定义任务模型
 
 
 class QuestProgressor:  # 定义任务推进器
-    """负责读写任务数据并在动作成功后更新进度。"""  # 类 docstring,说明用途
+    """负责读写任务数据并在动作成功后更新进度。
+
+    推进器在内存中保存解析后的任务,以及按动作类型划分、按区块分桶的未完成需求索引;
+    每个动作只评估覆盖变更格子的需求,并且只写回进度发生变化的任务。存储中的任务表
+    被其他调用方修改(版本号变化)时,下一次推进会重新解析并重建索引。
+    """  # 类 docstring,说明用途
 
-    def __init__(self, store: WorldStore) -> None:  # 定义构造函数
-        """保存世界存储实例,供进度同步使用。"""  # 方法 docstring,说明用途
+    def __init__(self, store: WorldStore, stale_limit: int = 256) -> None:  # 定义构造函数
+        """保存世界存储实例,stale_limit 为触发索引重建的已完成任务数量下限。"""
 
         self._store = store  # 保存世界存储
+        self._lock = RLock()  # 串行化任务的读取-修改-写回,不同区块的动作可并发执行
+        self._stale_limit = max(1, stale_limit)  # 索引重建阈值
+        self._generation: int | None = None  # 内存任务对应的存储任务表版本
+        self._quests: list[Quest] = []  # 解析后的任务
+        self._index: dict[str, SpatialIndex[tuple[int, ActionRequirement]]] = {}  # 需求索引
+        self._stale = 0  # 仍留在索引中的已完成任务数量
 
     def get_quests(self) -> list[Quest]:  # 定义获取任务列表的方法
         """从存储中读取并解析所有任务。"""  # 方法 docstring,说明用途
@@ -123,45 +136,138 @@ class QuestProgressor:  # 定义任务推进器
         raw_list = self._store.load_quests_raw()  # 读取原始数据
         return [Quest.model_validate(item) for item in raw_list]  # 转换为 Quest 实例列表
 
+    def query_quests(  # 定义任务分页查询方法
+        self,
+        status: QuestStatus | None = None,  # 状态过滤
+        assignee: str | None = None,  # 执行者过滤
+        giver: str | None = None,  # 发布者过滤
+        cx: int | None = None,  # 需求区块 X 过滤
+        cy: int | None = None,  # 需求区块 Y 过滤
+        cursor: int | None = None,  # 上一页返回的游标
+        limit: int = 50,  # 每页条数
+    ) -> tuple[list[Quest], int | None]:  # 返回任务列表与下一页游标
+        """按存储索引过滤任务,只解析当前页。"""  # 方法 docstring,说明用途
+
+        raw_list, next_cursor = self._store.query_quests_raw(  # 查询存储索引
+            status=None if status is None else status.value,  # 状态
+            assignee=assignee,  # 执行者
+            giver=giver,  # 发布者
+            cx=cx,  # 区块 X
+            cy=cy,  # 区块 Y
+            cursor=cursor,  # 游标
+            limit=limit,  # 页大小
+        )  # 结束查询
+        return [Quest.model_validate(item) for item in raw_list], next_cursor  # 解析当前页
+
     def save_quests(self, quests: Iterable[Quest]) -> None:  # 定义保存任务列表的方法
         """将任务列表序列化回磁盘。"""  # 方法 docstring,说明用途
 
         payload = [quest.model_dump(mode="json") for quest in quests]  # 序列化数据
-        self._store.save_quests_raw(payload)  # 写入磁盘
+        with self._lock:  # 与进度推进互斥
+            self._store.save_quests_raw(payload)  # 写入磁盘
+            self._generation = None  # 使内存任务失效
 
     def on_action_success(  # 定义动作成功回调方法
         self,
         actor: str,  # 执行动作的角色
         request: ActionRequest,  # 动作请求
-        changes: list[ActionChange],  # 变更列表
+        changes: list[CellChange],  # 变更列表
     ) -> None:  # 方法返回 None
         """根据动作结果推进任务进度。"""  # 方法 docstring,说明用途
 
-        quests = self.get_quests()  # 读取任务列表
-        updated = False  # 标记是否有任务更新
-        for quest in quests:  # 遍历任务
-            if quest.status == QuestStatus.DONE:  # 若任务已完成
+        self.on_actions_success([(request, changes)])  # 按单项批次处理
+
+    def on_actions_success(  # 定义批量动作成功回调方法
+        self,
+        events: list[tuple[ActionRequest, list[CellChange]]],  # 按顺序排列的动作与变更
+    ) -> None:  # 方法返回 None
+        """按顺序应用一批动作的变更,只把进度变化的任务写回存储。"""  # 方法 docstring
+
+        if not events:  # 无成功动作
+            return  # 直接返回
+        with self._lock:  # 串行化任务更新
+            self._ensure_loaded()  # 确保内存任务与存储一致
+            touched: set[int] = set()  # 进度发生变化的任务序号
+            for request, changes in events:  # 遍历动作
+                touched |= self._apply_action(request, changes)  # 推进并收集任务
+            if not touched:  # 无任务更新
+                return  # 直接返回
+            quests = self._quests  # 内存任务
+            payload = [quests[position].model_dump(mode="json") for position in sorted(touched)]
+            expected = None if self._generation is None else self._generation + 1  # 预期版本
+            self._generation = None  # 写回失败时内存状态可能领先于存储,下次推进重新解析
+            generation = self._store.update_quests_raw(payload)  # 按 ID 部分更新
+            if generation == expected:  # 期间没有其他写入
+                self._generation = generation  # 内存任务仍与存储一致
+            if self._stale >= max(self._stale_limit, len(self._quests) // 2):  # 已完成任务过多
+                self._rebuild_index()  # 重建索引,剔除已完成需求
+
+    def _ensure_loaded(self) -> None:  # 定义内存任务同步方法
+        """存储中的任务表版本变化时重新解析任务并重建索引。"""  # 方法 docstring
+
+        generation = self._store.quests_generation  # 先读版本,之后的变化会在下次触发重新解析
+        if generation == self._generation:  # 任务集合未变化
+            return  # 复用内存任务
+        raw_list = self._store.load_quests_raw()  # 读取全部任务
+        self._quests = [Quest.model_validate(item) for item in raw_list]  # 解析任务
+        self._generation = generation  # 记录版本
+        self._rebuild_index()  # 重建索引
+
+    def _rebuild_index(self) -> None:  # 定义需求索引构建方法
+        """为未完成任务的需求建立按动作类型划分的空间索引,条目为 (任务序号, 需求)。"""
+
+        index: dict[str, SpatialIndex[tuple[int, ActionRequirement]]] = {}  # 初始化索引
+        for position, quest in enumerate(self._quests):  # 遍历任务
+            if quest.status == QuestStatus.DONE:  # 已完成任务不再推进
                 continue  # 跳过
-            quest_changed = False  # 标记单个任务是否更新
             for requirement in quest.requirements:  # 遍历需求
-                for change in changes:  # 遍历变更
-                    if not requirement.matches(change, request.type):  # 判断是否匹配
-                        continue  # 不匹配则跳过
-                    if requirement.apply_change(change):  # 应用变更并检查是否更新
-                        quest_changed = True  # 标记需求更新
-            if quest_changed:  # 若本任务有进度变化
-                quest.updated_at = request.client_ts  # 更新任务时间
-                if quest.status == QuestStatus.OPEN:  # 若之前为 OPEN
-                    quest.status = QuestStatus.IN_PROGRESS  # 切换为进行中
-                if quest.is_completed():  # 若任务全部完成
-                    quest.status = QuestStatus.DONE  # 标记完成
-                    self._store.append_action_log(  # 写入审计日志
-                        actor="系统",  # 使用系统作为记录者
-                        action_type="QUEST_DONE",  # 日志类型
-                        chunk={"cx": request.chunk.cx, "cy": request.chunk.cy},  # 复用动作位置
-                        pos={"x": request.pos.x, "y": request.pos.y},  # 复用坐标
-                        payload={"quest_id": quest.id, "actor": actor},  # 附带任务信息
-                    )  # 结束日志写入
-                updated = True  # 标记总体更新
-        if updated:  # 若存在更新
-            self.save_quests(quests)  # 将任务写回磁盘
+                spatial = index.get(requirement.action_type)  # 读取动作类型对应的索引
+                if spatial is None:  # 首次出现
+                    spatial = index[requirement.action_type] = SpatialIndex(  # 创建索引
+                        self._store.chunk_size
+                    )  # 结束创建
+                spatial.insert(  # 登记需求区域
+                    requirement.chunk.cx,  # 区块 X 坐标
+                    requirement.chunk.cy,  # 区块 Y 坐标
+                    requirement.x_range,  # X 范围
+                    requirement.y_range,  # Y 范围
+                    (position, requirement),  # 条目
+                )  # 结束登记
+        self._index = index  # 替换索引
+        self._stale = 0  # 重置计数
+
+    def _apply_action(  # 定义单个动作的任务推进方法
+        self,
+        request: ActionRequest,  # 动作请求
+        changes: list[CellChange],  # 变更列表
+    ) -> set[int]:  # 返回进度变化的任务序号
+        """只把变更应用到覆盖该格子的候选需求,任务完成时写入审计日志。"""  # 方法 docstring
+
+        spatial = self._index.get(request.type)  # 读取动作类型对应的索引
+        if spatial is None:  # 没有相关需求
+            return set()  # 无更新
+        quests = self._quests  # 内存任务
+        touched: set[int] = set()  # 进度发生变化的任务序号
+        for change in changes:  # 遍历变更
+            candidates = spatial.query(change.cx, change.cy, change.x, change.y)  # 覆盖该格子的需求
+            for position, requirement in candidates:  # 遍历候选
+                if quests[position].status == QuestStatus.DONE:  # 已完成但仍在索引中
+                    continue  # 跳过
+                if requirement.apply_change(change):  # 应用变更并检查是否更新
+                    touched.add(position)  # 记录任务
+        for position in sorted(touched):  # 按任务顺序处理状态变化
+            quest = quests[position]  # 读取进度发生变化的任务
+            quest.updated_at = request.client_ts  # 更新任务时间
+            if quest.status == QuestStatus.OPEN:  # 若之前为 OPEN
+                quest.status = QuestStatus.IN_PROGRESS  # 切换为进行中
+            if quest.is_completed():  # 若任务全部完成
+                quest.status = QuestStatus.DONE  # 标记完成
+                self._stale += 1  # 索引中多一个已完成任务
+                self._store.append_action_log(  # 写入审计日志
+                    actor="系统",  # 使用系统作为记录者
+                    action_type="QUEST_DONE",  # 日志类型
+                    chunk={"cx": request.chunk.cx, "cy": request.chunk.cy},  # 复用动作位置
+                    pos={"x": request.pos.x, "y": request.pos.y},  # 复用坐标
+                    payload={"quest_id": quest.id, "actor": request.actor},  # 附带任务信息
+                )  # 结束日志写入
+        return touched  # 返回进度变化的任务
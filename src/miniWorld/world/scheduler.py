@@ -0,0 +1,195 @@
+"""实现按固定节奏在后台推进世界时间的模拟调度器。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import asyncio  # 导入 asyncio,用于后台任务与订阅队列
+import contextlib  # 导入 contextlib,用于忽略等待超时
+import logging  # 导入 logging,记录超时与异常
+import time  # 导入 time,使用单调时钟计算截止时间
+from collections.abc import AsyncIterator, Callable  # 导入抽象类型,用于类型标注
+from dataclasses import dataclass  # 导入 dataclass,定义 tick 事件
+from typing import Any, Literal  # 导入类型工具
+
+from .async_store import AsyncWorldStore  # 导入异步存储包装
+
+logger = logging.getLogger(__name__)  # 创建模块级日志记录器
+
+OverloadPolicy = Literal["skip", "catch_up"]  # 过载策略:跳过错过的 tick 或补跑
+
+
+@dataclass(frozen=True, slots=True)  # 不可变且紧凑的事件
+class TickEvent:  # 定义 tick 事件
+    """一次 tick 的结果,发布给全部订阅者。"""  # 类 docstring,说明用途
+
+    tick: int  # 世界 tick 序号,与 WorldState.tick 一致
+    changes: list[dict[str, Any]]  # 本次 tick 的格子变更
+    duration_ms: float  # 执行耗时(毫秒)
+    manual: bool  # 是否由 HTTP 手动触发
+
+    def to_dict(self) -> dict[str, Any]:  # 定义序列化方法
+        """转换为可直接 JSON 编码的字典。"""  # 方法 docstring,说明用途
+
+        return {  # 构造字典
+            "tick": self.tick,  # 世界 tick 序号
+            "changes": self.changes,  # 变更列表
+            "duration_ms": round(self.duration_ms, 3),  # 耗时
+            "manual": self.manual,  # 触发方式
+        }  # 结束字典
+
+
+class SimulationScheduler:  # 定义模拟调度器
+    """以绝对截止时间驱动 tick,避免累计漂移,并把每次 tick 的变更发布给订阅者。
+
+    tick 函数是同步函数,调度器在独占世界后把它卸载到存储线程池执行,事件循环不会被阻塞。
+    某次 tick 超过间隔时按过载策略处理:skip 直接跳到下一个未来的截止时间;
+    catch_up 立即补跑错过的 tick,最多 max_catch_up 次,其余仍然跳过。
+    """  # 类 docstring
+
+    def __init__(  # 定义构造函数
+        self,
+        async_store: AsyncWorldStore,  # 异步存储包装,提供世界锁与线程池
+        tick_fn: Callable[[], tuple[int, list[dict[str, Any]]]],  # 返回世界 tick 与变更
+        interval_seconds: float,  # tick 间隔
+        policy: OverloadPolicy = "skip",  # 过载策略
+        max_catch_up: int = 4,  # catch_up 策略下最多连续补跑的 tick 数
+        queue_size: int = 64,  # 每个订阅者的队列长度
+    ) -> None:  # 构造函数返回 None
+        """保存 tick 函数与调度参数。"""  # 方法 docstring,说明用途
+
+        self._async_store = async_store  # 保存异步存储
+        self._tick_fn = tick_fn  # 保存 tick 函数
+        self._interval = max(0.01, interval_seconds)  # 保存间隔,避免忙等
+        self._policy = policy  # 保存过载策略
+        self._max_catch_up = max(0, max_catch_up)  # 保存补跑上限
+        self._queue_size = max(1, queue_size)  # 保存队列长度
+        self._subscribers: set[asyncio.Queue[TickEvent]] = set()  # 订阅者队列
+        self._stopping: asyncio.Event | None = None  # 停止事件
+        self._task: asyncio.Task[None] | None = None  # 后台任务句柄
+        self.tick_count = 0  # 已执行的 tick 数
+        self.skipped = 0  # 因过载跳过的 tick 数
+        self.overruns = 0  # 耗时超过间隔的 tick 数
+        self.last_duration_ms = 0.0  # 最近一次 tick 耗时
+        self.max_duration_ms = 0.0  # 最长 tick 耗时
+        self._total_duration_ms = 0.0  # 累计耗时,用于计算平均值
+        self.last_lag_ms = 0.0  # 最近一次 tick 相对截止时间的延迟
+
+    @property
+    def running(self) -> bool:  # 定义运行状态属性
+        """返回后台任务是否在运行。"""  # 属性 docstring,说明用途
+
+        return self._task is not None and not self._task.done()  # 返回布尔值
+
+    @property
+    def stats(self) -> dict[str, Any]:  # 定义统计属性
+        """返回调度统计,供 /world/stats 展示。"""  # 属性 docstring,说明用途
+
+        average = self._total_duration_ms / self.tick_count if self.tick_count else 0.0  # 平均耗时
+        return {  # 构造字典
+            "running": self.running,  # 是否在运行
+            "interval_seconds": self._interval,  # tick 间隔
+            "policy": self._policy,  # 过载策略
+            "ticks": self.tick_count,  # 已执行 tick 数
+            "skipped": self.skipped,  # 跳过的 tick 数
+            "overruns": self.overruns,  # 超时 tick 数
+            "last_duration_ms": round(self.last_duration_ms, 3),  # 最近耗时
+            "max_duration_ms": round(self.max_duration_ms, 3),  # 最长耗时
+            "avg_duration_ms": round(average, 3),  # 平均耗时
+            "last_lag_ms": round(self.last_lag_ms, 3),  # 最近延迟
+            "subscribers": len(self._subscribers),  # 订阅者数量
+        }  # 结束字典
+
+    def start(self) -> None:  # 定义启动方法
+        """在当前事件循环中启动后台调度任务。"""  # 方法 docstring,说明用途
+
+        if self.running:  # 已在运行
+            return  # 直接返回
+        self._stopping = asyncio.Event()  # 创建停止事件
+        self._task = asyncio.get_running_loop().create_task(self._run())  # 创建后台任务
+
+    async def stop(self) -> None:  # 定义停止方法
+        """通知后台任务停止并等待进行中的 tick 完成。"""  # 方法 docstring,说明用途
+
+        if self._stopping is not None:  # 若事件存在
+            self._stopping.set()  # 唤醒后台任务
+        if self._task is not None:  # 若任务存在
+            await self._task  # 等待退出
+            self._task = None  # 清空任务句柄
+
+    async def trigger(self) -> TickEvent:  # 定义手动触发方法
+        """立即执行一次 tick 并发布事件,不影响后台任务的截止时间。"""  # 方法 docstring
+
+        return await self._tick(manual=True)  # 执行 tick
+
+    @contextlib.asynccontextmanager  # 声明异步上下文管理器
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue[TickEvent]]:  # 定义订阅方法
+        """登记一个有界队列接收 tick 事件,退出上下文时注销;队列满时丢弃最旧的事件。"""
+
+        queue: asyncio.Queue[TickEvent] = asyncio.Queue(maxsize=self._queue_size)  # 创建队列
+        self._subscribers.add(queue)  # 登记订阅者
+        try:  # 交给调用方消费
+            yield queue  # 返回队列
+        finally:  # 退出时
+            self._subscribers.discard(queue)  # 注销订阅者
+
+    def _publish(self, event: TickEvent) -> None:  # 定义发布方法
+        """把事件放入每个订阅者队列,慢订阅者只丢失最旧的事件,不阻塞调度。"""
+
+        for queue in self._subscribers:  # 遍历订阅者
+            if queue.full():  # 队列已满
+                queue.get_nowait()  # 丢弃最旧的事件
+            queue.put_nowait(event)  # 放入新事件
+
+    async def _tick(self, manual: bool) -> TickEvent:  # 定义单次 tick 方法
+        """独占世界后在线程池中执行 tick 函数,记录耗时并发布事件。"""  # 方法 docstring
+
+        async with self._async_store.world_locked():  # 等待进行中的区块动作结束
+            started = time.perf_counter()  # 记录开始时间
+            world_tick, changes = await self._async_store.run(self._tick_fn)  # 在线程池中执行
+            duration_ms = (time.perf_counter() - started) * 1e3  # 计算耗时
+        self.tick_count += 1  # 累加 tick 数
+        self.last_duration_ms = duration_ms  # 记录最近耗时
+        self.max_duration_ms = max(self.max_duration_ms, duration_ms)  # 更新最长耗时
+        self._total_duration_ms += duration_ms  # 累加耗时
+        if duration_ms > self._interval * 1e3:  # 超过间隔
+            self.overruns += 1  # 累加超时数
+            logger.warning(  # 记录警告
+                "tick %d 耗时 %.1f ms,超过间隔 %.1f ms",
+                world_tick,
+                duration_ms,
+                self._interval * 1e3,
+            )  # 结束日志
+        event = TickEvent(world_tick, changes, duration_ms, manual)  # 构造事件
+        self._publish(event)  # 发布事件
+        return event  # 返回事件
+
+    async def _run(self) -> None:  # 定义后台循环
+        """按绝对截止时间循环执行 tick,截止时间由起点加整数倍间隔得出,不随耗时漂移。"""
+
+        assert self._stopping is not None  # 启动时已创建事件
+        next_deadline = time.monotonic() + self._interval  # 第一个截止时间
+        while not self._stopping.is_set():  # 直到收到停止信号
+            delay = next_deadline - time.monotonic()  # 距离截止时间的等待时长
+            if delay > 0:  # 尚未到达
+                with contextlib.suppress(TimeoutError):  # 超时即到达截止时间
+                    await asyncio.wait_for(self._stopping.wait(), timeout=delay)  # 等待
+                if self._stopping.is_set():  # 收到停止信号
+                    break  # 退出循环
+            self.last_lag_ms = max(0.0, (time.monotonic() - next_deadline) * 1e3)  # 记录延迟
+            try:  # 执行 tick
+                await self._tick(manual=False)  # 推进世界
+            except Exception:  # 捕获 tick 异常,保持调度器存活
+                logger.exception("后台 tick 失败,将在下个周期重试")  # 记录异常
+            next_deadline = self._next_deadline(next_deadline, time.monotonic())  # 下个截止时间
+
+    def _next_deadline(self, deadline: float, now: float) -> float:  # 定义截止时间推进方法
+        """返回下一个截止时间;错过的截止时间按过载策略补跑或计入跳过数。"""  # 方法 docstring
+
+        deadline += self._interval  # 正常情况下推进一个间隔
+        missed = int((now - deadline) // self._interval) + 1 if now > deadline else 0  # 已错过数
+        if missed == 0:  # 未过载
+            return deadline  # 直接返回
+        allowed = min(missed, self._max_catch_up) if self._policy == "catch_up" else 0  # 补跑数
+        self.skipped += missed - allowed  # 累加跳过数
+        if allowed:  # 需要补跑
+            return deadline + (missed - allowed) * self._interval  # 最早的待补跑截止时间已过期
+        return deadline + missed * self._interval  # 跳到第一个未来的截止时间
@@ -0,0 +1,83 @@
+"""实现按区块与格子分桶的矩形空间索引,供禁区与区域任务共享。"""  # 模块 docstring
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+from typing import Generic, TypeVar  # 导入泛型工具
+
+T = TypeVar("T")  # 索引条目类型
+
+ChunkKey = tuple[int, int]  # 区块坐标类型别名
+BucketKey = tuple[int, int, int, int]  # (cx, cy, 桶 X, 桶 Y)
+
+
+def rect_mask(x0: int, x1: int, y0: int, y1: int, chunk_size: int) -> int:  # 定义矩形位图函数
+    """将区块内闭区间矩形编码为按 y * size + x 排列的格子位图,矩形需已裁剪到区块内。"""
+
+    row = ((1 << (x1 - x0 + 1)) - 1) << x0  # 单行位图
+    mask = 0  # 初始化位图
+    for y in range(y0, y1 + 1):  # 逐行叠加
+        mask |= row << (y * chunk_size)  # 移到对应行
+    return mask  # 返回位图
+
+
+class SpatialIndex(Generic[T]):  # 定义空间索引
+    """以 (区块, bucket_size 见方的格子桶) 为键登记矩形,查询只检查目标格子所在桶内的候选。
+
+    同时为每个区块维护覆盖位图,只需判断“是否被任一矩形覆盖”时为一次位测试。
+    """  # 类 docstring
+
+    def __init__(self, chunk_size: int, bucket_size: int = 8) -> None:  # 定义构造函数
+        """保存区块边长与分桶大小。"""  # 方法 docstring,说明用途
+
+        self._chunk_size = chunk_size  # 区块边长
+        self._bucket_size = max(1, bucket_size)  # 桶边长
+        self._buckets: dict[BucketKey, list[tuple[int, int, int, int, T]]] = {}  # 分桶条目
+        self._masks: dict[ChunkKey, int] = {}  # 区块覆盖位图
+        self._count = 0  # 条目数量
+
+    def __len__(self) -> int:  # 定义长度方法
+        """返回登记的矩形数量。"""  # 方法 docstring,说明用途
+
+        return self._count  # 返回数量
+
+    def insert(  # 定义登记方法
+        self,
+        cx: int,  # 区块 X 坐标
+        cy: int,  # 区块 Y 坐标
+        x_range: tuple[int, int],  # X 闭区间
+        y_range: tuple[int, int],  # Y 闭区间
+        item: T,  # 条目
+    ) -> None:  # 方法返回 None
+        """登记一个区块内的矩形,超出区块的部分被裁掉,完全在区块外时忽略。"""  # 方法 docstring
+
+        last = self._chunk_size - 1  # 区块内最大坐标
+        x0, x1 = max(x_range[0], 0), min(x_range[1], last)  # 裁剪 X 范围
+        y0, y1 = max(y_range[0], 0), min(y_range[1], last)  # 裁剪 Y 范围
+        if x0 > x1 or y0 > y1:  # 裁剪后为空
+            return  # 忽略
+        entry = (x0, x1, y0, y1, item)  # 构造条目
+        size = self._bucket_size  # 读取桶边长
+        for by in range(y0 // size, y1 // size + 1):  # 遍历覆盖的桶行
+            for bx in range(x0 // size, x1 // size + 1):  # 遍历覆盖的桶列
+                self._buckets.setdefault((cx, cy, bx, by), []).append(entry)  # 登记条目
+        key = (cx, cy)  # 区块坐标
+        mask = rect_mask(x0, x1, y0, y1, self._chunk_size)  # 矩形位图
+        self._masks[key] = self._masks.get(key, 0) | mask  # 合并到区块覆盖位图
+        self._count += 1  # 增加计数
+
+    def query(self, cx: int, cy: int, x: int, y: int) -> list[T]:  # 定义候选查询方法
+        """按登记顺序返回覆盖指定格子的全部条目。"""  # 方法 docstring,说明用途
+
+        size = self._bucket_size  # 读取桶边长
+        entries = self._buckets.get((cx, cy, x // size, y // size))  # 读取所在桶
+        if not entries:  # 桶为空
+            return []  # 无候选
+        return [  # 精确过滤
+            item for x0, x1, y0, y1, item in entries if x0 <= x <= x1 and y0 <= y <= y1
+        ]  # 结束过滤
+
+    def covers(self, cx: int, cy: int, x: int, y: int) -> bool:  # 定义覆盖判断方法
+        """判断指定格子是否被任一矩形覆盖,与条目数量无关。"""  # 方法 docstring,说明用途
+
+        mask = self._masks.get((cx, cy), 0)  # 读取区块位图
+        return bool(mask >> (y * self._chunk_size + x) & 1)  # 位测试
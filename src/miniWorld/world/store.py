@@ -1,25 +1,66 @@
-"""实现基于 JSON 文件的世界状态与区块存储。"""  # 模块 docstring,说明用途
+"""实现世界状态与区块存储,持久化委托给可插拔的存储后端。"""  # 模块 docstring,说明用途
 
 from __future__ import annotations  # 导入未来注解特性,支持前向引用
 
 import json  # 导入 json 模块,用于读写数据
-from collections.abc import Iterable  # 导入 Iterable,用于返回区块迭代器
+import time  # 导入 time,用于记录审计日志时间戳
+from collections.abc import Callable, Iterable, Iterator, Mapping  # 导入回调、迭代器与映射类型
+from contextlib import contextmanager  # 导入 contextmanager,实现日志事务
+from dataclasses import dataclass  # 导入 dataclass,描述刷盘批次
 from pathlib import Path  # 导入 Path,处理文件路径
-from threading import Lock  # 导入 Lock,实现简单文件锁
-
-from .chunk import Chunk  # 导入区块模型
+from threading import Lock, RLock, local  # 导入锁与线程局部存储
+from typing import TYPE_CHECKING, Any  # 导入类型工具
+
+from .backends import CHUNK_FORMATS, FileBackend, StorageBackend, WriteBatch  # 导入存储后端
+from .cache import ChunkCache  # 导入有界区块缓存
+from .chunk import CellCodes, Chunk  # 导入区块模型与格子编码类型
+from .chunk_codec import decode_chunk, encode_chunk, is_binary_chunk  # 导入二进制区块编解码
+from .journal import (  # 导入预写日志
+    RECORD_ACTIVE,  # 活跃格子记录类型
+    RECORD_CELL,  # 单格记录类型
+    RECORD_GROWTH,  # 旧版成长记录类型,成长改为加载时追赶后忽略
+    RECORD_QUEST,  # 单任务记录类型
+    RECORD_QUESTS,  # 任务列表记录类型
+    RECORD_REVISION,  # 修订号记录类型
+    RECORD_SIM_TICK,  # 成长追赶记录类型
+    RECORD_USAGE,  # 用量记录类型
+    RECORD_USAGE_RESET,  # 用量清空记录类型
+    WorldJournal,  # 日志实现
+    decode_records,  # 记录解码
+    encode_active,  # 活跃格子记录编码
+    encode_cell,  # 单格记录编码
+    encode_json,  # JSON 记录编码
+    encode_revision,  # 修订号记录编码
+    encode_sim_tick,  # 成长追赶记录编码
+)  # 结束导入
+from .log_index import ActionLogIndex  # 导入审计日志索引
+from .quest_store import QuestStore  # 导入逐条存储的任务表
+from .tiles import TileType, tile_to_code  # 导入瓦片类型与编码函数,用于重建活跃格子索引
+from .usage import UsageLedger, UsageLimitError  # noqa: F401  # 导入用量账本,异常保留旧导入路径
 from .world_state import WorldState  # 导入世界状态模型
 
+if TYPE_CHECKING:  # 类型检查分支,避免循环导入
+    from .actions import CellChange  # 内部格子变更记录
+
+ActiveIndex = dict[str, dict[tuple[int, int], set[tuple[int, int]]]]  # 系统 -> 区块 -> 格子
+
 
-class UsageLimitError(Exception):  # 定义用量限制异常
-    """在配额或冷却校验失败时抛出的异常。"""  # 类 docstring,说明用途
+@dataclass
+class FlushBatch(WriteBatch):  # 定义刷盘批次
+    """一次刷盘要写入的区块与文档,以及写入成功后可删除的日志段。"""  # 类 docstring,说明用途
 
-    def __init__(self, message: str, code: int = 429) -> None:  # 定义构造函数
-        """保存错误信息与错误码。"""  # 方法 docstring,说明用途
+    journal_segment: int | None = None  # 写入成功后删除不大于该段号的日志段
+
+    @property
+    def size(self) -> int:  # 定义写入数量属性
+        """返回批次中的区块与文档数量。"""  # 属性 docstring,说明用途
 
-        super().__init__(message)  # 调用父类构造
-        self.code = code  # 保存错误码
-        self.message = message  # 保存错误消息
+        return len(self.chunks) + len(self.documents) + len(self.quests)  # 返回合计数量
+
+    def is_empty(self) -> bool:  # 定义空批次判断
+        """判断批次是否无需执行任何存储操作。"""  # 方法 docstring,说明用途
+
+        return super().is_empty() and self.journal_segment is None  # 返回布尔值
 
 
 class WorldStore:  # 定义世界存储类
@@ -31,25 +72,108 @@ class WorldStore:  # 定义世界存储类
         chunk_size: int,  # 区块边长
         default_world_state: WorldState,  # 默认世界状态
         tick_tree_grow_steps: int,  # 树苗成长所需步数
+        chunk_format: str = "json",  # 区块写入格式,读取时自动识别
+        write_behind: bool = False,  # 是否启用延迟写回模式
+        flush_threshold: int = 64,  # 延迟写回模式下触发刷盘的脏数据数量
+        journal: bool = False,  # 是否启用预写日志,启用时同样延迟写回
+        journal_fsync_batch: int = 16,  # 日志分组 fsync 的事务数
+        journal_fsync_interval: float = 0.05,  # 日志分组 fsync 的时间窗口(秒)
+        checkpoint_bytes: int = 4 * 1024 * 1024,  # 日志累计达到该字节数时提前检查点
+        backend: StorageBackend | None = None,  # 存储后端,默认使用目录文件布局
+        cache_max_chunks: int = 4096,  # 区块缓存的数量上限
+        cache_max_bytes: int = 64 * 1024 * 1024,  # 区块缓存的估算字节上限
+        usage_snapshot_every: int = 256,  # 用量增量累计达到该键数时改写完整快照
+        log_index: ActionLogIndex | None = None,  # 审计日志索引,为空时不支持日志查询
+        active_tiles: Mapping[str, Iterable[tuple[str, TileType]]] | None = None,  # 系统关注的瓦片
+        catch_up: Callable[[Chunk, int], None] | None = None,  # 区块落后世界 tick 时的成长追赶
     ) -> None:  # 构造函数返回 None
-        """初始化目录结构并创建缓存容器。"""  # 方法 docstring,说明用途
+        """初始化存储后端并创建缓存容器。"""  # 方法 docstring,说明用途
 
+        if chunk_format not in CHUNK_FORMATS:  # 校验区块格式
+            raise ValueError(f"未知区块格式:{chunk_format}")  # 抛出错误
+        self._chunk_format = chunk_format  # 保存区块写入格式
         self._root = root  # 保存根目录
         self._chunk_size = chunk_size  # 保存区块尺寸
         self._default_world_state = default_world_state  # 保存默认世界状态
         self._tick_tree_grow_steps = tick_tree_grow_steps  # 保存成长步数
-        self._chunk_dir = self._root / "world" / "chunks"  # 构建区块目录路径
-        self._world_state_path = self._root / "world" / "world_state.json"  # 世界状态文件
-        self._quests_path = self._root / "world" / "quests.json"  # 任务文件
-        self._usage_path = self._root / "world" / "actor_usage.json"  # 用量记录文件
-        self._log_path = self._root / "logs" / "actions.log"  # 审计日志文件
-        self._chunk_dir.mkdir(parents=True, exist_ok=True)  # 确保区块目录存在
-        self._log_path.parent.mkdir(parents=True, exist_ok=True)  # 确保日志目录存在
-        self._world_cache: dict[tuple[int, int], Chunk] = {}  # 初始化区块缓存
+        self._chunk_dir = self._root / "world" / "chunks"  # 文件后端的区块目录
+        self._backend: StorageBackend = backend or FileBackend(  # 创建默认文件后端
+            root,  # 数据根目录
+            chunk_format=chunk_format,  # 优先读取的区块格式
+            fsync=journal,  # 预写日志的检查点需在删除日志前落盘
+        )  # 结束后端创建
+        self._dirty_chunks: set[tuple[int, int]] = set()  # 待写回的区块坐标
+        self._world_cache = ChunkCache(  # 初始化有界区块缓存
+            max_chunks=cache_max_chunks,  # 数量上限
+            max_bytes=cache_max_bytes,  # 字节上限
+            is_pinned=self._dirty_chunks.__contains__,  # 未落盘的区块不可淘汰
+        )  # 结束缓存初始化
         self._world_state_cache: WorldState | None = None  # 初始化世界状态缓存
-        self._quests_cache: list[dict] | None = None  # 初始化任务缓存(字典形式)
-        self._usage_cache: dict | None = None  # 初始化用量缓存
+        self._quests = QuestStore()  # 逐条存储的任务表
+        self._quests_loaded = False  # 任务表是否已从后端加载
+        self._usage = UsageLedger(snapshot_every=usage_snapshot_every)  # 常驻内存的用量账本
+        self._usage_loaded = False  # 用量账本是否已从后端加载
+        self._active_tiles = {  # 各 tick 系统关注的 (层级, 瓦片)
+            system: tuple(tiles) for system, tiles in (active_tiles or {}).items()  # 复制声明
+        }  # 结束字典
+        self._active_codes = {  # 各 tick 系统关注的 base 与 deco 编码集合,供逐格判断
+            system: (  # 单个系统
+                frozenset(tile_to_code(tile) for layer, tile in tiles if layer == "base"),  # base
+                frozenset(tile_to_code(tile) for layer, tile in tiles if layer == "deco"),  # deco
+            )  # 结束元组
+            for system, tiles in self._active_tiles.items()  # 遍历系统
+        }  # 结束字典
+        self._active_index: ActiveIndex | None = None  # 各系统的活跃格子索引
+        self._catch_up = catch_up  # 保存成长追赶回调
         self._lock = Lock()  # 创建互斥锁
+        self._write_behind = write_behind or journal  # 保存写回模式,日志模式下同样延迟写回
+        self._flush_threshold = max(1, flush_threshold)  # 保存刷盘阈值
+        self._dirty_documents: set[str] = set()  # 待写回的文档名称(quests/usage/growth)
+        self._dirty_lock = Lock()  # 保护脏集合的互斥锁
+        self._flush_listener: Callable[[], None] | None = None  # 达到阈值时通知的回调
+        self._failed_batch = WriteBatch()  # 上次写入失败、待重试的区块与文档
+        self._checkpoint_bytes = max(1, checkpoint_bytes)  # 保存检查点字节阈值
+        self._txn_local = local()  # 每个线程各自的事务缓冲,线程池中的动作互不混入
+        self._state_lock = RLock()  # 保护惰性加载与活跃格子索引,允许线程池并发访问
+        self._replaying = False  # 标记是否正在回放日志
+        self._journal: WorldJournal | None = None  # 预写日志实例
+        self._log_index = log_index  # 保存审计日志索引
+        if log_index is not None:  # 启用日志索引
+            log_index.sync(self._backend.iter_log_lines)  # 与日志对账,补齐或重建索引
+        if journal:  # 启用预写日志
+            self._journal = WorldJournal(  # 创建日志
+                self._root / "world" / "journal",  # 日志段目录
+                fsync_batch=journal_fsync_batch,  # 分组事务数
+                fsync_interval_seconds=journal_fsync_interval,  # 分组时间窗口
+            )  # 结束日志创建
+            self.recover()  # 回放上次未检查点的日志
+
+    @property
+    def _txn_records(self) -> list[bytes] | None:  # 定义当前线程事务记录属性
+        """返回当前线程事务缓冲的日志记录,非 None 即处于事务中。"""  # 属性 docstring
+
+        return getattr(self._txn_local, "records", None)  # 读取线程局部值
+
+    @_txn_records.setter
+    def _txn_records(self, records: list[bytes] | None) -> None:  # 定义事务记录设置方法
+        """设置当前线程的事务日志缓冲。"""  # 方法 docstring,说明用途
+
+        self._txn_local.records = records  # 写入线程局部值
+
+    @property
+    def _txn_batch(self) -> WriteBatch:  # 定义当前线程事务写入属性
+        """返回当前线程事务缓冲的同步写入。"""  # 属性 docstring,说明用途
+
+        batch = getattr(self._txn_local, "batch", None)  # 读取线程局部值
+        if batch is None:  # 首次访问
+            batch = self._txn_local.batch = WriteBatch()  # 创建空批次
+        return batch  # 返回批次
+
+    @_txn_batch.setter
+    def _txn_batch(self, batch: WriteBatch) -> None:  # 定义事务写入设置方法
+        """设置当前线程的事务写入缓冲。"""  # 方法 docstring,说明用途
+
+        self._txn_local.batch = batch  # 写入线程局部值
 
     @property
     def chunk_size(self) -> int:  # 定义区块尺寸属性
@@ -57,6 +181,54 @@ class WorldStore:  # 定义世界存储类
 
         return self._chunk_size  # 返回区块尺寸
 
+    @property
+    def chunk_format(self) -> str:  # 定义区块格式属性
+        """返回区块写入格式。"""  # 属性 docstring,说明用途
+
+        return self._chunk_format  # 返回区块格式
+
+    @property
+    def backend(self) -> StorageBackend:  # 定义存储后端属性
+        """返回当前使用的存储后端。"""  # 属性 docstring,说明用途
+
+        return self._backend  # 返回后端
+
+    @property
+    def cache_stats(self) -> dict[str, int]:  # 定义缓存统计属性
+        """返回区块缓存的规模与命中/未命中/淘汰计数。"""  # 属性 docstring,说明用途
+
+        return self._world_cache.stats()  # 返回统计
+
+    @property
+    def write_behind(self) -> bool:  # 定义写回模式属性
+        """返回是否启用延迟写回模式。"""  # 属性 docstring,说明用途
+
+        return self._write_behind  # 返回写回模式
+
+    @property
+    def journal(self) -> WorldJournal | None:  # 定义预写日志属性
+        """返回预写日志实例,未启用时为 None。"""  # 属性 docstring,说明用途
+
+        return self._journal  # 返回日志
+
+    @property
+    def dirty_count(self) -> int:  # 定义脏数据数量属性
+        """返回尚未写回磁盘的区块与文档数量。"""  # 属性 docstring,说明用途
+
+        return len(self._dirty_chunks) + len(self._dirty_documents)  # 返回合计数量
+
+    @property
+    def has_failed_writes(self) -> bool:  # 定义待重试属性
+        """返回是否存在上次写入失败、等待下次刷盘重试的内容。"""  # 属性 docstring,说明用途
+
+        return not self._failed_batch.is_empty()  # 返回判断结果
+
+    @property
+    def quests_generation(self) -> int:  # 定义任务表版本属性
+        """返回任务表的修改次数,任何任务写入都会使其递增,供内存副本判断是否过期。"""
+
+        return self._load_quests().generation  # 返回版本
+
     @property
     def tick_tree_grow_steps(self) -> int:  # 定义树成长步数属性
         """返回树苗成长所需的 tick 数。"""  # 属性 docstring,说明用途
@@ -64,87 +236,561 @@ class WorldStore:  # 定义世界存储类
         return self._tick_tree_grow_steps  # 返回成长步数
 
     def load_world_state(self) -> WorldState:  # 定义加载世界状态方法
-        """读取 world_state.json,若不存在则写入默认值。"""  # 方法 docstring,说明用途
+        """读取世界状态文档,若不存在则写入默认值。"""  # 方法 docstring,说明用途
 
         if self._world_state_cache is not None:  # 若缓存存在
             return self._world_state_cache  # 直接返回缓存
-        if not self._world_state_path.exists():  # 若文件不存在
-            self.save_world_state(self._default_world_state)  # 写入默认世界状态
-            self._world_state_cache = self._default_world_state  # 缓存默认值
-            return self._default_world_state  # 返回默认值
-        with self._world_state_path.open("r", encoding="utf-8") as handle:  # 打开文件
-            data = json.load(handle)  # 读取 JSON 数据
-        self._world_state_cache = WorldState.model_validate(data)  # 验证并缓存
-        return self._world_state_cache  # 返回缓存
+        with self._state_lock:  # 避免并发首次加载
+            if self._world_state_cache is not None:  # 其他线程已加载
+                return self._world_state_cache  # 返回缓存
+            data = self._read_json_document("world_state")  # 读取世界状态
+            if data is None:  # 若文档不存在
+                self.save_world_state(self._default_world_state)  # 写入默认世界状态
+                self._world_state_cache = self._default_world_state  # 缓存默认值
+                return self._default_world_state  # 返回默认值
+            self._world_state_cache = WorldState.model_validate(data)  # 验证并缓存
+            return self._world_state_cache  # 返回缓存
 
     def save_world_state(self, world_state: WorldState) -> None:  # 定义保存世界状态方法
         """将世界状态写入磁盘并更新缓存。"""  # 方法 docstring,说明用途
 
-        self._world_state_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
-        with self._world_state_path.open("w", encoding="utf-8") as handle:  # 打开文件以写入
-            json.dump(world_state.model_dump(), handle, ensure_ascii=False, indent=2)  # 写入 JSON
+        data = _json_bytes(world_state.model_dump(), indent=2)  # 编码世界状态
+        self._write_now(WriteBatch(documents=[("world_state", data)]))  # 立即写入
         self._world_state_cache = world_state  # 更新缓存
 
     def load_chunk(self, cx: int, cy: int) -> Chunk:  # 定义加载区块方法
-        """读取指定区块,若不存在则创建默认区块。"""  # 方法 docstring,说明用途
+        """读取指定区块,若不存在则创建默认区块;区块落后世界 tick 时先追赶成长。"""
 
         key = (cx, cy)  # 构建缓存键
-        if key in self._world_cache:  # 如果缓存中存在
-            return self._world_cache[key]  # 返回缓存
-        path = self._chunk_dir / f"{cx}_{cy}.json"  # 构建文件路径
-        if not path.exists():  # 若文件不存在
+        cached = self._world_cache.get(key)  # 查询缓存
+        if cached is not None:  # 如果缓存中存在
+            return self._caught_up(cached)  # 返回追赶后的缓存
+        data = self._backend.read_chunk(cx, cy)  # 从后端读取区块编码
+        if data is None:  # 若区块不存在
             chunk = Chunk.create_default(cx=cx, cy=cy, size=self._chunk_size)  # 创建默认区块
-            self._world_cache[key] = chunk  # 缓存默认区块
+            chunk.sim_tick = self._current_tick()  # 新区块没有需要追赶的成长
+            self._world_cache.put(key, chunk)  # 缓存默认区块
             return chunk  # 返回默认区块
-        with path.open("r", encoding="utf-8") as handle:  # 打开文件读取
-            data = json.load(handle)  # 解析 JSON
-        chunk = Chunk.model_validate(data)  # 验证并构建区块
-        self._world_cache[key] = chunk  # 缓存区块
+        chunk = _decode_chunk_bytes(data)  # 按内容自动识别格式并解析
+        self._world_cache.put(key, chunk)  # 缓存区块
+        return self._caught_up(chunk)  # 返回追赶后的区块
+
+    def _current_tick(self) -> int:  # 定义当前 tick 读取工具
+        """返回世界状态中的 tick 计数;未配置成长追赶时恒为 0,不触发世界状态加载。"""
+
+        return 0 if self._catch_up is None else self.load_world_state().tick  # 返回 tick
+
+    def _caught_up(self, chunk: Chunk) -> Chunk:  # 定义成长追赶工具
+        """把区块的惰性成长追赶到当前世界 tick。
+
+        追赶结果只由磁盘上的区块与 tick 差决定,因此不标记脏数据:区块被淘汰后重新加载会得到
+        相同的结果,直到下次保存时随 sim_tick 一起落盘。日志回放期间区块处于中间状态,不追赶。
+        """  # 方法 docstring
+
+        if self._catch_up is None or self._replaying:  # 未配置追赶或正在回放
+            return chunk  # 直接返回
+        tick = self.load_world_state().tick  # 读取当前 tick
+        if chunk.sim_tick == tick:  # 已是最新
+            return chunk  # 直接返回
+        with self._state_lock:  # 避免并发加载重复追赶
+            elapsed = tick - chunk.sim_tick  # 落后的 tick 数,世界状态被重置时为负
+            if elapsed > 0 and not chunk.is_shared_default:  # 共享默认区块没有可成长的格子
+                self._catch_up(chunk, elapsed)  # 执行惰性系统的成长追赶
+            chunk.sim_tick = tick  # 记录已追赶到的 tick
         return chunk  # 返回区块
 
-    def save_chunk(self, chunk: Chunk) -> None:  # 定义保存区块方法
-        """将区块数据写回磁盘。"""  # 方法 docstring,说明用途
-
-        path = self._chunk_dir / f"{chunk.cx}_{chunk.cy}.json"  # 构建文件路径
-        with path.open("w", encoding="utf-8") as handle:  # 打开文件写入
-            json.dump(  # 写入 JSON
-                chunk.model_dump(mode="json"),  # 序列化区块
-                handle,  # 目标文件句柄
-                ensure_ascii=False,  # 保留中文
-                indent=2,  # 设置缩进
-            )  # 结束 json.dump
-        self._world_cache[(chunk.cx, chunk.cy)] = chunk  # 更新缓存
+    def save_chunk(self, chunk: Chunk) -> int:  # 定义保存区块方法
+        """递增区块修订号并按配置格式写回磁盘,返回新的修订号。"""  # 方法 docstring,说明用途
+
+        key = (chunk.cx, chunk.cy)  # 构建缓存键
+        if chunk.is_shared_default:  # 从未修改的空白地形无需持久化
+            self._world_cache.put(key, chunk)  # 仅更新缓存
+            return chunk.revision  # 内容未变,修订号不变
+        chunk.revision += 1  # 递增修订号,供乐观并发校验
+        touched = chunk.drain_touched()  # 取出修改过的格子
+        if self._journal is not None:  # 启用日志时记录单格最终状态与修订号
+            base, deco, height, growth = chunk.planes  # 读取平面
+            self._journal_append(  # 追加单格记录
+                [
+                    *(
+                        encode_cell(chunk.cx, chunk.cy, i, base[i], deco[i], height[i], growth[i])
+                        for i in touched  # 遍历修改过的格子
+                    ),
+                    encode_revision(chunk.cx, chunk.cy, chunk.revision),  # 修订号记录
+                    encode_sim_tick(chunk.cx, chunk.cy, chunk.sim_tick),  # 成长追赶记录
+                ]
+            )  # 结束追加
+        if self._write_behind:  # 延迟写回模式
+            with self._dirty_lock:  # 加锁修改脏集合
+                self._dirty_chunks.add(key)  # 先标记区块待写回,使其在缓存中不可淘汰
+            self._world_cache.put(key, chunk)  # 更新缓存
+            self._after_mark_dirty()  # 检查是否达到阈值
+            return chunk.revision  # 不在请求路径上写盘
+        self._world_cache.put(key, chunk)  # 更新缓存
+        self._write_now(WriteBatch(chunks=[self._encode_chunk(chunk, self._chunk_format)]))
+        return chunk.revision  # 返回新的修订号
 
     def iter_chunks(self) -> Iterable[Chunk]:  # 定义遍历区块方法
-        """遍历所有已存在的区块。"""  # 方法 docstring,说明用途
-
-        for path in sorted(self._chunk_dir.glob("*.json")):  # 遍历所有区块文件
-            cx, cy = map(int, path.stem.split("_", maxsplit=1))  # 解析坐标
-            yield self.load_chunk(cx, cy)  # 逐个返回区块
+        """遍历所有已存储或待写回的区块,跳过内容仍为默认草地的区块。"""  # 方法 docstring
+
+        keys = set(self._backend.list_chunk_keys()) | set(self._dirty_chunks)  # 合并已存储与脏区块
+        for cx, cy in sorted(keys):  # 按坐标遍历
+            chunk = self.load_chunk(cx, cy)  # 加载区块
+            if not chunk.is_default():  # 跳过空白地形
+                yield chunk  # 返回区块
+
+    def migrate_chunks(self, chunk_format: str | None = None) -> int:  # 定义区块格式迁移方法
+        """将全部区块改写为目标编码格式,返回迁移的区块数量。"""  # 方法 docstring,说明用途
+
+        target = chunk_format or self._chunk_format  # 默认迁移到当前配置格式
+        if target not in CHUNK_FORMATS:  # 校验目标格式
+            raise ValueError(f"未知区块格式:{target}")  # 抛出错误
+        migrated = 0  # 初始化计数
+        for cx, cy in self._backend.list_chunk_keys():  # 遍历所有区块坐标
+            data = self._backend.read_chunk(cx, cy)  # 读取现有编码
+            if data is None or is_binary_chunk(data) == (target == "binary"):  # 已是目标格式
+                continue  # 跳过
+            chunk = self.load_chunk(cx, cy)  # 加载区块
+            self._write_now(WriteBatch(chunks=[self._encode_chunk(chunk, target)]))  # 重写
+            migrated += 1  # 累加计数
+        return migrated  # 返回迁移数量
+
+    def _encode_chunk(  # 定义区块编码方法
+        self, chunk: Chunk, chunk_format: str
+    ) -> tuple[tuple[int, int], bytes]:  # 返回区块坐标与编码
+        """按指定格式编码区块,返回区块坐标与编码后的字节。"""  # 方法 docstring,说明用途
+
+        key = (chunk.cx, chunk.cy)  # 构建区块坐标
+        if chunk_format == "binary":  # 二进制格式
+            return key, encode_chunk(chunk)  # 返回编码后的字节
+        return key, _json_bytes(chunk.model_dump(mode="json"), indent=2)  # 返回 JSON 字节
+
+    def _write_now(self, batch: WriteBatch) -> None:  # 定义同步写入方法
+        """处于事务中时合并到事务批次,否则立即交给后端提交。"""  # 方法 docstring,说明用途
+
+        if self._txn_records is not None:  # 处于事务中
+            self._txn_batch.extend(batch)  # 合并到事务批次
+            return  # 等待事务提交
+        with self._lock:  # 串行化后端写入
+            self._backend.write(batch)  # 提交批次
+            if self._log_index is not None:  # 启用日志索引
+                self._log_index.add(batch.log_lines)  # 与日志同序增量索引
+
+    def _read_json_document(self, name: str) -> object | None:  # 定义 JSON 文档读取方法
+        """从后端读取并解析 JSON 文档,不存在时返回 None。"""  # 方法 docstring,说明用途
+
+        data = self._backend.read_document(name)  # 读取文档
+        return None if data is None else json.loads(data.decode("utf-8"))  # 解析 JSON
+
+    def _persist_document(self, name: str) -> None:  # 定义文档持久化方法
+        """立即写回或标记待写回指定文档(quests/usage/growth)。"""  # 方法 docstring,说明用途
+
+        if self._write_behind:  # 延迟写回模式
+            with self._dirty_lock:  # 加锁修改脏集合
+                self._dirty_documents.add(name)  # 标记文档待写回
+            self._after_mark_dirty()  # 检查是否达到阈值
+            return  # 不在请求路径上写盘
+        self._write_now(self._document_batch(name))  # 立即写入
+
+    def _document_batch(self, name: str) -> WriteBatch:  # 定义文档批次方法
+        """将文档编码为写入批次;任务只写出变化过的记录,而不是整个任务表。"""  # 方法 docstring
+
+        if name == "quests":  # 任务表
+            with self._state_lock:  # 避免与任务修改交错
+                return WriteBatch(quests=self._quests.drain_dirty())  # 逐条写出脏任务
+        return WriteBatch(documents=[self._encode_document(name)])  # 单个文档
+
+    def _encode_document(self, name: str) -> tuple[str, bytes]:  # 定义文档编码方法
+        """将缓存中的文档编码为文档名称与内容。"""  # 方法 docstring,说明用途
+
+        if name == "usage":  # 用量账本,变化较少时只写增量文档
+            is_snapshot, payload = self._usage.encode()  # 编码快照或增量
+            return ("usage" if is_snapshot else "usage_delta"), _json_bytes(payload)  # 返回文档
+        if name == "growth":  # 活跃格子索引
+            with self._state_lock:  # 避免与工作线程中的索引修改交错
+                payload = {  # 构建可序列化数据,没有格子的系统同样保留,避免重启后重新扫描
+                    system: {  # 单个系统
+                        f"{cx}_{cy}": sorted([x, y] for x, y in cells)  # 区块键到坐标列表
+                        for (cx, cy), cells in sorted(chunks.items())  # 遍历区块
+                    }  # 结束字典
+                    for system, chunks in sorted((self._active_index or {}).items())  # 遍历系统
+                }  # 结束字典
+            return name, _json_bytes(payload)  # 编码索引
+        raise ValueError(f"未知文档:{name}")  # 抛出错误
+
+    def set_flush_listener(self, listener: Callable[[], None] | None) -> None:  # 注册阈值回调
+        """注册脏数据达到阈值时的通知回调;未注册时由存储同步刷盘。"""  # 方法 docstring
+
+        self._flush_listener = listener  # 保存回调
+
+    def collect_dirty(self) -> FlushBatch:  # 定义脏数据快照方法
+        """编码全部脏区块与文档并清空脏集合;启用日志时同时封存当前日志段。"""  # 方法 docstring
+
+        with self._dirty_lock:  # 加锁读取并清空脏集合
+            chunk_keys = sorted(self._dirty_chunks)  # 复制脏区块
+            documents = sorted(self._dirty_documents)  # 复制脏文档
+            self._dirty_chunks.clear()  # 清空脏区块
+            self._dirty_documents.clear()  # 清空脏文档
+            batch = FlushBatch()  # 创建刷盘批次
+            batch.extend(self._failed_batch)  # 先放入待重试内容,后续较新的内容会覆盖它们
+            self._failed_batch = WriteBatch()  # 清空重试批次
+        for key in chunk_keys:  # 遍历脏区块
+            chunk = self._world_cache.peek(key)  # 脏区块被钉在缓存中
+            if chunk is not None:  # 防御性检查
+                batch.chunks.append(self._encode_chunk(chunk, self._chunk_format))  # 编码区块
+        for name in documents:  # 遍历脏文档
+            batch.extend(self._document_batch(name))  # 编码文档
+        if self._journal is not None:  # 启用日志时
+            batch.journal_segment = self._journal.rotate()  # 封存当前日志段
+        return batch  # 返回刷盘批次
+
+    def write_batch(self, batch: FlushBatch) -> None:  # 定义公开批次写入方法
+        """写入 collect_dirty 生成的批次并删除已覆盖的日志段,可在线程中调用。"""  # 方法 docstring
+
+        with self._lock:  # 串行化磁盘写入
+            try:  # 尝试写入
+                self._backend.write(batch)  # 交给后端提交
+            except OSError:  # 写入失败,日志段保留到下次成功的检查点
+                with self._dirty_lock:  # 加锁保存重试批次
+                    retry = WriteBatch(  # 复制批次
+                        chunks=batch.chunks, documents=batch.documents, quests=batch.quests
+                    )  # 结束复制
+                    retry.extend(self._failed_batch)  # 保留更新的待重试内容
+                    self._failed_batch = retry  # 下次刷盘时重试
+                raise  # 继续向上抛出
+            if self._journal is not None and batch.journal_segment is not None:  # 检查点完成
+                self._journal.discard_through(batch.journal_segment)  # 删除已落盘的日志段
+
+    def flush(self) -> int:  # 定义同步刷盘方法
+        """立即写回全部脏数据(日志模式下即一次检查点),返回写入的文件数量。"""  # 方法 docstring
+
+        batch = self.collect_dirty()  # 收集脏数据
+        if not batch.is_empty():  # 若存在待写内容
+            self.write_batch(batch)  # 写入磁盘
+        return batch.size  # 返回写入数量
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:  # 定义日志事务
+        """将块内的全部变更合并为一个日志帧与一次后端提交,回放时整体生效。"""  # 方法 docstring
+
+        if self._txn_records is not None:  # 已在事务中
+            yield  # 直接执行
+            return  # 结束
+        self._txn_records = []  # 开启事务缓冲
+        try:  # 执行事务体
+            yield  # 交出控制权
+        finally:  # 事务体中途失败时,已修改的缓存同样会进入检查点,因此照常提交
+            records, self._txn_records = self._txn_records, None  # 取出日志缓冲
+            batch, self._txn_batch = self._txn_batch, WriteBatch()  # 取出写入缓冲
+            self._journal_append(records)  # 以单帧写入日志
+            if not batch.is_empty():  # 若存在同步写入
+                self._write_now(batch)  # 以一次提交写入后端
+            self._after_mark_dirty()  # 检查刷盘阈值
+
+    def recover(self) -> int:  # 定义日志回放方法
+        """把日志中已提交的事务重放到缓存,写出检查点后删除旧日志,返回事务数量。"""  # 方法 docstring
+
+        if self._journal is None:  # 未启用日志
+            return 0  # 无需回放
+        segments = self._journal.segments()  # 记录回放前的日志段
+        if not segments:  # 无日志
+            return 0  # 无需回放
+        applied = 0  # 初始化计数
+        self._replaying = True  # 回放期间不再写日志
+        try:  # 回放日志
+            for payload in self._journal.replay():  # 遍历完整帧
+                for kind, values in decode_records(payload):  # 遍历记录
+                    self._apply_record(kind, values)  # 应用记录
+                applied += 1  # 累加事务数
+        finally:  # 恢复标记
+            self._replaying = False  # 结束回放
+        batch = self.collect_dirty()  # 收集回放产生的脏数据
+        batch.journal_segment = segments[-1]  # 检查点覆盖全部已回放的日志段
+        self.write_batch(batch)  # 写出检查点并删除旧日志
+        return applied  # 返回事务数量
+
+    def _apply_record(self, kind: int, values: tuple) -> None:  # 定义单条记录回放方法
+        """将一条日志记录应用到缓存并标记脏数据。"""  # 方法 docstring,说明用途
+
+        if kind == RECORD_CELL:  # 单格记录
+            cx, cy, index, *codes = values  # 解包字段
+            self.load_chunk(cx, cy).restore_codes(index, *codes)  # 写回格子
+            self._dirty_chunks.add((cx, cy))  # 标记区块
+        elif kind == RECORD_REVISION:  # 修订号记录
+            cx, cy, revision = values  # 解包字段
+            self.load_chunk(cx, cy).revision = revision  # 恢复修订号
+            self._dirty_chunks.add((cx, cy))  # 标记区块
+        elif kind == RECORD_SIM_TICK:  # 成长追赶记录
+            cx, cy, tick = values  # 解包字段
+            self.load_chunk(cx, cy).sim_tick = tick  # 恢复已追赶到的 tick
+            self._dirty_chunks.add((cx, cy))  # 标记区块
+        elif kind == RECORD_ACTIVE:  # 活跃格子记录
+            system, cx, cy, x, y, active = values  # 解包字段
+            if system in self._active_tiles:  # 忽略已不再关注瓦片的系统
+                self.set_active(system, cx, cy, x, y, active=active, persist=False)  # 更新索引
+                self._dirty_documents.add("growth")  # 标记索引
+        elif kind == RECORD_GROWTH:  # 旧版树苗成长记录
+            pass  # 树苗改为加载区块时追赶成长,不再需要活跃索引
+        elif kind == RECORD_USAGE:  # 用量记录
+            actor, action_type, record = values[0]  # 解包字段
+            self._load_usage().restore(actor, action_type, record)  # 覆盖用量
+            self._dirty_documents.add("usage")  # 标记用量
+        elif kind == RECORD_USAGE_RESET:  # 用量清空记录
+            self._load_usage().clear()  # 清空用量
+            self._dirty_documents.add("usage")  # 标记用量
+        elif kind == RECORD_QUEST:  # 单任务记录
+            self._load_quests().upsert([values[0]])  # 按 ID 覆盖或追加任务
+            self._dirty_documents.add("quests")  # 标记任务
+        elif kind == RECORD_QUESTS:  # 任务列表记录
+            self._load_quests().replace(values[0])  # 替换任务列表
+            self._dirty_documents.add("quests")  # 标记任务
+        else:  # 未知记录
+            raise ValueError(f"未知日志记录类型:{kind}")  # 抛出错误
+
+    def _journal_append(self, records: list[bytes]) -> None:  # 定义日志追加工具
+        """在事务中缓冲记录,否则立即作为单独一帧写入日志。"""  # 方法 docstring,说明用途
+
+        if self._journal is None or self._replaying or not records:  # 无需记录
+            return  # 直接返回
+        if self._txn_records is not None:  # 处于事务中
+            self._txn_records.extend(records)  # 缓冲记录
+            return  # 等待事务提交
+        self._journal.append(records)  # 追加日志帧
+
+    def _after_mark_dirty(self) -> None:  # 定义阈值检查方法
+        """脏数据或日志达到阈值时通知后台刷盘任务,无任务时同步刷盘。"""  # 方法 docstring
+
+        if self._txn_records is not None or self._replaying:  # 事务未提交或回放中不刷盘
+            return  # 由事务结束或回放完成时统一写出
+        journal_full = (  # 判断日志是否需要检查点
+            self._journal is not None and self._journal.pending_bytes >= self._checkpoint_bytes
+        )  # 结束判断
+        if self.dirty_count < self._flush_threshold and not journal_full:  # 未达到阈值
+            return  # 直接返回
+        if self._flush_listener is not None:  # 若注册了后台任务
+            self._flush_listener()  # 通知后台任务尽快刷盘
+        else:  # 未注册后台任务
+            self.flush()  # 同步刷盘
+
+    def set_active(  # 定义活跃格子登记方法
+        self,
+        system: str,  # tick 系统名称
+        cx: int,  # 区块 X 坐标
+        cy: int,  # 区块 Y 坐标
+        x: int,  # 格子 X 坐标
+        y: int,  # 格子 Y 坐标
+        active: bool,  # 是否需要该系统在 tick 中处理
+        persist: bool = True,  # 是否立即写回索引文件
+    ) -> None:  # 方法返回 None
+        """在指定系统的活跃格子集合中登记或移除一个格子。"""  # 方法 docstring,说明用途
+
+        key = (cx, cy)  # 构建区块键
+        with self._state_lock:  # 串行化索引修改
+            index = self._load_active_index().setdefault(system, {})  # 读取系统索引
+            cells = index.get(key)  # 读取区块内的活跃格子
+            if active:  # 登记活跃格子
+                if cells is not None and (x, y) in cells:  # 已登记则无需写盘
+                    return  # 直接返回
+                index.setdefault(key, set()).add((x, y))  # 加入索引
+            else:  # 移除活跃格子
+                if cells is None or (x, y) not in cells:  # 未登记则无需写盘
+                    return  # 直接返回
+                cells.discard((x, y))  # 移出索引
+                if not cells:  # 区块内已无活跃格子
+                    del index[key]  # 删除区块键
+        self._journal_append([encode_active(system, cx, cy, x, y, active)])  # 记录索引变更
+        if persist:  # 若需要立即持久化
+            self.save_active_index()  # 写回索引文件
+
+    def track_changes(self, changes: Iterable[CellChange], persist: bool = True) -> int:  # 同步
+        """按格子变更前后是否命中各系统关注的瓦片增量更新活跃集合,返回登记或移除的次数。"""
+
+        updated = 0  # 初始化计数
+        for change in changes:  # 遍历变更
+            before, after = change.before, change.after  # 读取前后编码
+            for system, (base_codes, deco_codes) in self._active_codes.items():  # 遍历系统
+                was = before[0] in base_codes or before[1] in deco_codes  # 修改前是否关注
+                now = after[0] in base_codes or after[1] in deco_codes  # 修改后是否关注
+                if was != now:  # 关注状态变化
+                    self.set_active(  # 更新系统索引
+                        system, change.cx, change.cy, change.x, change.y, active=now, persist=False
+                    )  # 结束更新
+                    updated += 1  # 累加计数
+        if updated and persist:  # 若需要立即持久化
+            self.save_active_index()  # 写回索引文件
+        return updated  # 返回次数
+
+    def watches(self, system: str, codes: CellCodes) -> bool:  # 定义关注判断方法
+        """判断格子编码是否命中指定系统关注的瓦片。"""  # 方法 docstring,说明用途
+
+        base_codes, deco_codes = self._active_codes[system]  # 读取编码集合
+        return codes[0] in base_codes or codes[1] in deco_codes  # 返回布尔值
+
+    def iter_active(self, system: str) -> list[tuple[Chunk, list[tuple[int, int]]]]:  # 遍历方法
+        """按区块坐标与行优先顺序返回指定系统的活跃格子,仅加载相关区块。"""  # 方法 docstring
+
+        with self._state_lock:  # 取得索引快照
+            index = self._load_active_index().get(system, {})  # 读取系统索引
+            snapshot = {  # 复制索引,遍历期间允许修改
+                key: sorted(cells, key=lambda pos: (pos[1], pos[0]))  # 行优先排序
+                for key, cells in index.items()  # 遍历区块
+            }  # 结束字典
+        return [(self.load_chunk(cx, cy), snapshot[(cx, cy)]) for cx, cy in sorted(snapshot)]
+
+    def save_active_index(self) -> None:  # 定义活跃格子索引保存方法
+        """将活跃格子索引写入 growth_index.json。"""  # 方法 docstring,说明用途
+
+        self._load_active_index()  # 确保索引已加载
+        self._persist_document("growth")  # 写回或标记索引
+
+    def rebuild_active_index(self, systems: Iterable[str] | None = None) -> int:  # 定义重建方法
+        """一次扫描现有区块重建指定系统(默认全部)的活跃格子,返回登记的格子数量。"""
+
+        if systems is not None:  # 只重建部分系统
+            self._load_active_index()  # 先加载其他系统的索引
+        names = list(self._active_tiles if systems is None else systems)  # 需要重建的系统
+        rebuilt: ActiveIndex = {name: {} for name in names}  # 新索引
+        total = 0  # 初始化计数
+        for chunk in self.iter_chunks():  # 遍历全部区块,多个系统共用一次扫描
+            for name in names:  # 遍历系统
+                cells = {  # 命中关注瓦片的格子
+                    pos  # 格子坐标
+                    for layer, tile in self._active_tiles[name]  # 遍历关注的瓦片
+                    for pos in chunk.find_cells(layer, tile)  # 整块查找
+                }  # 结束集合
+                if cells:  # 若存在活跃格子
+                    rebuilt[name][(chunk.cx, chunk.cy)] = cells  # 登记区块
+                    total += len(cells)  # 累加计数
+        with self._state_lock:  # 替换索引
+            if systems is None or self._active_index is None:  # 全部重建
+                self._active_index = rebuilt  # 整体替换
+            else:  # 部分重建
+                self._active_index.update(rebuilt)  # 只替换重建的系统
+        self.save_active_index()  # 写回索引文件
+        return total  # 返回格子数量
+
+    def _load_active_index(self) -> ActiveIndex:  # 定义索引加载方法
+        """读取活跃格子索引,文件缺失或缺少某些系统时由现有区块重建一次。"""  # 方法 docstring
+
+        if self._active_index is not None:  # 若缓存存在
+            return self._active_index  # 返回缓存
+        with self._state_lock:  # 避免并发首次加载
+            return self._read_active_index()  # 读取或重建索引
+
+    def _read_active_index(self) -> ActiveIndex:  # 定义索引读取方法
+        """在持有状态锁时读取索引文档;旧版平铺格式与不再关注瓦片的系统直接丢弃。"""
+
+        if self._active_index is not None:  # 其他线程已加载
+            return self._active_index  # 返回缓存
+        data = self._read_json_document("growth")  # 读取索引文档
+        if data is None:  # 若索引不存在
+            data = {}  # 视为空索引,下方统一重建
+        if not isinstance(data, dict):  # 校验类型
+            raise ValueError("growth_index.json 必须是字典")  # 抛出错误
+        if any(isinstance(cells, list) for cells in data.values()):  # 旧版只含树苗的平铺格式
+            data = {}  # 树苗已改为惰性成长,不再需要旧索引
+        self._active_index = {  # 还原索引结构
+            system: {  # 单个系统
+                tuple(map(int, key.split("_", maxsplit=1))): {(x, y) for x, y in cells}  # 区块
+                for key, cells in chunks.items()  # 遍历区块
+            }  # 结束字典
+            for system, chunks in data.items()  # 遍历系统
+            if system in self._active_tiles  # 只保留仍关注瓦片的系统
+        }  # 结束字典
+        missing = [name for name in self._active_tiles if name not in self._active_index]  # 新系统
+        if missing:  # 新注册的系统没有索引
+            self.rebuild_active_index(missing)  # 一次扫描补齐
+        return self._active_index  # 返回索引
 
     def load_quests_raw(self) -> list[dict]:  # 定义加载任务原始数据的方法
-        """以字典形式读取任务列表,供 Quest 模型解析。"""  # 方法 docstring,说明用途
-
-        if self._quests_cache is not None:  # 如果缓存存在
-            return self._quests_cache  # 返回缓存
-        if not self._quests_path.exists():  # 若任务文件不存在
-            self.save_quests_raw([])  # 写入空列表
-            self._quests_cache = []  # 缓存空列表
-            return []  # 返回空列表
-        with self._quests_path.open("r", encoding="utf-8") as handle:  # 打开文件读取
-            data = json.load(handle)  # 解析 JSON
-        if not isinstance(data, list):  # 校验数据类型
-            raise ValueError("quests.json 必须是列表")  # 抛出错误
-        self._quests_cache = data  # 缓存数据
-        return data  # 返回数据
+        """以字典形式按序号顺序读取全部任务,供 Quest 模型解析。"""  # 方法 docstring,说明用途
 
-    def save_quests_raw(self, quests: list[dict]) -> None:  # 定义保存任务原始数据的方法
-        """将任务列表写入磁盘。"""  # 方法 docstring,说明用途
+        with self._state_lock:  # 与任务修改互斥
+            return self._load_quests().values()  # 返回任务列表
+
+    def get_quest_raw(self, quest_id: str) -> dict | None:  # 定义单任务读取方法
+        """按 ID 读取任务字典,不存在时返回 None。"""  # 方法 docstring,说明用途
+
+        with self._state_lock:  # 与任务修改互斥
+            return self._load_quests().get(quest_id)  # 返回任务
 
-        self._quests_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
-        with self._quests_path.open("w", encoding="utf-8") as handle:  # 打开文件写入
-            json.dump(quests, handle, ensure_ascii=False, indent=2)  # 写入 JSON
-        self._quests_cache = quests  # 更新缓存
+    def query_quests_raw(  # 定义任务分页查询方法
+        self,
+        status: str | None = None,  # 状态过滤
+        assignee: str | None = None,  # 执行者过滤
+        giver: str | None = None,  # 发布者过滤
+        cx: int | None = None,  # 需求区块 X 过滤,需与 cy 同时提供
+        cy: int | None = None,  # 需求区块 Y 过滤,需与 cx 同时提供
+        cursor: int | None = None,  # 上一页返回的游标
+        limit: int = 50,  # 每页条数
+    ) -> tuple[list[dict], int | None]:  # 返回任务列表与下一页游标
+        """借助状态、执行者、发布者与区块索引过滤任务,按创建顺序返回一页与下一页游标。"""
+
+        if (cx is None) != (cy is None):  # 区块坐标必须成对出现
+            raise ValueError("cx 与 cy 需同时提供")  # 抛出错误
+        filters = {  # 构建过滤条件
+            "status": status,  # 状态
+            "assignee": assignee,  # 执行者
+            "giver": giver,  # 发布者
+            "chunk": None if cx is None else (cx, cy),  # 区块
+        }  # 结束字典
+        with self._state_lock:  # 与任务修改互斥
+            return self._load_quests().query(filters, cursor=cursor, limit=limit)  # 查询索引
+
+    def save_quests_raw(self, quests: list[dict]) -> None:  # 定义保存任务原始数据的方法
+        """用给定列表替换全部任务;任务集合与顺序不变时只记录并写回内容变化的任务。"""
+
+        with self._state_lock:  # 串行化任务表修改
+            changed = self._load_quests().replace(quests)  # 替换任务
+            if changed is None:  # 任务集合变化
+                records = [encode_json(RECORD_QUESTS, quests)]  # 记录整体替换
+            else:  # 仅内容变化
+                records = [encode_json(RECORD_QUEST, item) for item in changed]  # 记录单任务
+            self._journal_append(records)  # 追加日志
+        self._persist_document("quests")  # 写回或标记任务记录
+
+    def update_quests_raw(self, items: list[dict]) -> int:  # 定义部分任务更新方法
+        """按 ID 覆盖或追加指定任务,只为这些任务追加日志记录并写回对应的任务记录。
+
+        返回更新后的任务表版本;调用方据此判断期间是否有其他写入。
+        """  # 方法 docstring
+
+        with self._state_lock:  # 串行化任务表修改
+            quests = self._load_quests()  # 读取任务表
+            if not items:  # 没有任务需要更新
+                return quests.generation  # 返回当前版本
+            quests.upsert(items)  # 覆盖或追加任务
+            self._journal_append([encode_json(RECORD_QUEST, item) for item in items])  # 记录增量
+            generation = quests.generation  # 更新后的版本
+        self._persist_document("quests")  # 写回或标记任务记录
+        return generation  # 返回版本
+
+    def _load_quests(self) -> QuestStore:  # 定义任务表加载方法
+        """首次访问时从后端逐条加载任务;只有旧版整表文档时迁移为逐条记录,旧文档原样保留。
+
+        迁移后存在逐条记录,之后的加载不再读取旧文档;保留旧文档避免删除受版本管理的数据文件,
+        也便于回退到旧版本。
+        """  # 方法 docstring
+
+        if self._quests_loaded:  # 已加载
+            return self._quests  # 返回任务表
+        with self._state_lock:  # 避免并发首次加载
+            if self._quests_loaded:  # 其他线程已加载
+                return self._quests  # 返回任务表
+            records = [  # 读取逐条记录
+                (seq, json.loads(data.decode("utf-8")))  # 解析记录
+                for seq, data in self._backend.iter_quests()  # 遍历后端记录
+            ]  # 结束列表
+            self._quests.load(records)  # 恢复任务表
+            self._quests_loaded = True  # 标记已加载
+            legacy = None if records else self._read_json_document("quests")  # 旧版整表文档
+            if legacy is not None:  # 需要迁移
+                if not isinstance(legacy, list):  # 校验数据类型
+                    raise ValueError("quests.json 必须是列表")  # 抛出错误
+                self._quests.replace(legacy)  # 以新序号登记
+                with self._lock:  # 串行化后端写入
+                    self._backend.write(WriteBatch(quests=self._quests.drain_dirty()))  # 写入记录
+        return self._quests  # 返回任务表
 
     def ensure_usage(  # 定义用量与冷却校验方法
         self,
@@ -153,51 +799,39 @@ class WorldStore:  # 定义世界存储类
         client_ts: int,  # 时间戳(毫秒)
         quota: int | None,  # 每日配额
         cooldown: int | None,  # 冷却秒数
+        amount: int = 1,  # 本次计入的次数
     ) -> None:  # 方法返回 None
-        """校验并记录角色动作的配额与冷却状态。"""  # 方法 docstring,说明用途
-
-        usage = self._load_usage()  # 加载用量数据
-        actor_usage = usage.setdefault(actor, {})  # 获取或创建角色记录
-        record = actor_usage.setdefault(  # 获取或创建动作记录
-            action_type,  # 动作类型
-            {"count": 0, "day": None, "last_ts": None},  # 默认数据结构
-        )  # 结束默认值
-        current_day = client_ts // 86_400_000  # 计算当前日期编号
-        if record["day"] != current_day:  # 若跨天
-            record["day"] = current_day  # 重置日期
-            record["count"] = 0  # 重置计数
-        if quota is not None and record["count"] >= quota:  # 检查配额
-            raise UsageLimitError("已达到今日配额", code=429)  # 抛出异常
-        if cooldown is not None and record["last_ts"] is not None:  # 检查冷却
-            elapsed = (client_ts - record["last_ts"]) / 1000  # 计算已过秒数
-            if elapsed < cooldown:  # 若未达到冷却时间
-                raise UsageLimitError("动作处于冷却中", code=429)  # 抛出异常
-        record["count"] += 1  # 增加计数
-        record["last_ts"] = client_ts  # 更新最后执行时间
-        self._save_usage(usage)  # 保存用量数据
-
-    def _load_usage(self) -> dict:  # 定义加载用量数据的内部方法
-        """从磁盘读取 actor_usage.json。"""  # 方法 docstring,说明用途
-
-        if self._usage_cache is not None:  # 若缓存存在
-            return self._usage_cache  # 返回缓存
-        if not self._usage_path.exists():  # 若文件不存在
-            self._usage_cache = {}  # 初始化空字典
-            return self._usage_cache  # 返回空字典
-        with self._usage_path.open("r", encoding="utf-8") as handle:  # 打开文件
-            data = json.load(handle)  # 解析 JSON
-        if not isinstance(data, dict):  # 校验类型
-            raise ValueError("actor_usage.json 必须是字典")  # 抛出错误
-        self._usage_cache = data  # 缓存数据
-        return data  # 返回数据
-
-    def _save_usage(self, usage: dict) -> None:  # 定义保存用量数据的内部方法
-        """将用量数据写入磁盘并更新缓存。"""  # 方法 docstring,说明用途
-
-        self._usage_path.parent.mkdir(parents=True, exist_ok=True)  # 确保目录存在
-        with self._usage_path.open("w", encoding="utf-8") as handle:  # 打开文件写入
-            json.dump(usage, handle, ensure_ascii=False, indent=2)  # 写入 JSON
-        self._usage_cache = usage  # 更新缓存
+        """在内存账本中 O(1) 校验并记录配额与冷却,持久化推迟到刷盘时写出。
+
+        用量记录是整条计数的覆盖值,回放时以最后一条为准。若像其他记录一样缓冲到事务提交,
+        同一角色的并发动作可能以与计数相反的顺序提交,因此在账本锁内直接写入日志。
+        """  # 方法 docstring
+
+        def journal_record(record: dict[str, Any]) -> None:  # 定义日志回调
+            """在账本锁内把计数记录写成单独一帧。"""  # 函数 docstring,说明用途
+
+            if self._journal is not None and not self._replaying:  # 启用日志且不在回放中
+                self._journal.append([encode_json(RECORD_USAGE, [actor, action_type, record])])
+
+        self._load_usage().check_and_record(  # 校验并计数
+            actor, action_type, client_ts, quota, cooldown, amount, on_record=journal_record
+        )  # 结束校验
+        with self._dirty_lock:  # 加锁修改脏集合
+            self._dirty_documents.add("usage")  # 请求路径上不写盘,由刷盘或关闭时写出
+        self._after_mark_dirty()  # 检查是否达到阈值
+
+    def _load_usage(self) -> UsageLedger:  # 定义加载用量账本的内部方法
+        """首次访问时从快照与增量文档还原用量账本。"""  # 方法 docstring,说明用途
+
+        if self._usage_loaded:  # 已加载
+            return self._usage  # 返回账本
+        with self._state_lock:  # 避免并发首次加载覆盖已记录的计数
+            if not self._usage_loaded:  # 尚未加载
+                snapshot = self._read_json_document("usage")  # 读取快照
+                delta = self._read_json_document("usage_delta")  # 读取增量
+                self._usage.load(snapshot, delta)  # 还原账本
+                self._usage_loaded = True  # 标记已加载
+        return self._usage  # 返回账本
 
     def append_action_log(  # 定义追加审计日志的方法
         self,
@@ -207,7 +841,7 @@ class WorldStore:  # 定义世界存储类
         pos: dict,  # 坐标信息
         payload: dict,  # 附加参数
     ) -> None:  # 方法返回 None
-        """向 actions.log 追加一行文本记录。"""  # 方法 docstring,说明用途
+        """向审计日志追加一行文本记录,事务中与其他写入一并提交。"""  # 方法 docstring,说明用途
 
         line = json.dumps(  # 构建日志行
             {
@@ -216,21 +850,70 @@ class WorldStore:  # 定义世界存储类
                 "chunk": chunk,  # 记录区块
                 "pos": pos,  # 记录坐标
                 "payload": payload,  # 记录附加参数
+                "ts": int(time.time()),  # 记录写入时间,供按时间查询
             },
             ensure_ascii=False,  # 保留中文
         )  # 结束 json.dumps
-        with (
-            self._lock,
-            self._log_path.open(  # 使用互斥锁并打开文件
-                "a",
-                encoding="utf-8",
-            ) as handle,
-        ):
-            handle.write(line + "\n")  # 写入日志行
+        self._write_now(WriteBatch(log_lines=[line]))  # 同步写入审计日志
+
+    def query_action_log(  # 定义审计日志查询方法
+        self,
+        actor: str | None = None,  # 执行者过滤
+        action: str | None = None,  # 动作类型过滤
+        cx: int | None = None,  # 区块 X 过滤
+        cy: int | None = None,  # 区块 Y 过滤
+        since: int | None = None,  # 起始时间戳(含)
+        until: int | None = None,  # 结束时间戳(不含)
+        cursor: int | None = None,  # 分页游标
+        limit: int = 50,  # 每页条数
+    ) -> tuple[list[dict[str, Any]], int | None]:  # 返回日志列表与下一页游标
+        """按执行者、动作、区块与时间过滤审计日志,返回一页日志与下一页游标。"""  # 方法 docstring
+
+        if self._log_index is None:  # 未启用索引
+            raise RuntimeError("审计日志索引未启用")  # 抛出错误
+        return self._log_index.query(  # 委托给索引查询
+            actor=actor,  # 执行者
+            action=action,  # 动作类型
+            cx=cx,  # 区块 X
+            cy=cy,  # 区块 Y
+            since=since,  # 起始时间
+            until=until,  # 结束时间
+            cursor=cursor,  # 游标
+            limit=limit,  # 页大小
+        )  # 结束查询
 
     def reset_usage(self) -> None:  # 定义测试辅助方法,重置用量
         """清空配额记录,主要用于单元测试。"""  # 方法 docstring,说明用途
 
-        self._usage_cache = {}  # 清空缓存
-        if self._usage_path.exists():  # 如果文件存在
-            self._usage_path.unlink()  # 删除文件
+        self._usage.clear()  # 清空账本
+        self._usage_loaded = True  # 无需再从后端加载
+        self._journal_append([encode_json(RECORD_USAGE_RESET, None)])  # 记录清空操作
+        with self._dirty_lock:  # 加锁修改脏集合
+            self._dirty_documents.discard("usage")  # 丢弃未写回的用量
+        with self._lock:  # 串行化后端写入
+            self._backend.delete_document("usage")  # 删除用量快照
+            self._backend.delete_document("usage_delta")  # 删除用量增量
+
+    def close(self) -> None:  # 定义关闭方法
+        """写回全部脏数据并关闭日志与后端,在进程退出前调用。"""  # 方法 docstring,说明用途
+
+        self.flush()  # 强制刷盘
+        if self._journal is not None:  # 若启用日志
+            self._journal.close()  # 关闭日志段
+        self._backend.close()  # 释放后端资源
+        if self._log_index is not None:  # 若启用日志索引
+            self._log_index.close()  # 关闭索引
+
+
+def _json_bytes(payload: object, indent: int | None = None) -> bytes:  # 定义 JSON 编码工具
+    """将对象编码为 UTF-8 JSON 字节,保留中文。"""  # 函数 docstring,说明用途
+
+    return json.dumps(payload, ensure_ascii=False, indent=indent).encode("utf-8")  # 返回字节
+
+
+def _decode_chunk_bytes(data: bytes) -> Chunk:  # 定义区块解码工具
+    """依据魔数自动识别二进制或 JSON 编码并还原区块。"""  # 函数 docstring,说明用途
+
+    if is_binary_chunk(data):  # 若为二进制格式
+        return decode_chunk(data)  # 直接解码平面数据
+    return Chunk.model_validate(json.loads(data.decode("utf-8")))  # 解析并验证 JSON
@@ -0,0 +1,320 @@
+"""实现可插拔的 tick 系统注册表,以及维护活跃格子、惰性追赶成长的 tick 引擎。"""  # 模块 docstring
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import struct  # 导入 struct,打包确定性随机数的输入
+import zlib  # 导入 zlib,用 CRC32 生成确定性随机数
+from dataclasses import dataclass  # 导入 dataclass,描述 tick 上下文
+from typing import TYPE_CHECKING, ClassVar  # 导入类型工具
+
+from .actions import CellChange  # 导入内部格子变更记录
+from .chunk import GROWTH_NONE, CellCodes, Chunk  # 导入区块与格子编码工具
+from .executor import TickExecutor  # 导入跨进程的 tick 执行器
+from .kernel import ChunkDiff, grow_crops, grow_saplings, split_diffs  # 导入整块成长内核
+from .store import WorldStore  # 导入世界存储
+from .tiles import TileType, tile_to_code  # 导入瓦片类型与编码函数
+from .world_state import WorldState  # 导入世界状态模型
+
+if TYPE_CHECKING:  # 类型检查分支,避免循环导入
+    from ..config import Settings  # 仅在类型检查时导入 Settings
+
+SEASONS = ("春", "夏", "秋", "冬")  # 季节轮换顺序
+CellWrite = tuple[int, int, CellCodes]  # (x, y, 新编码)
+ActiveCell = tuple[int, int, CellCodes]  # (x, y, 当前编码)
+
+_GRASS = tile_to_code(TileType.GRASS)  # 草地编码
+_SHRUB = tile_to_code(TileType.SHRUB)  # 灌木编码
+_ROLL = struct.Struct("<qqiiHH")  # 随机数输入:种子、tick、cx、cy、x、y
+_NEIGHBOURS = ((1, 0), (0, 1), (-1, 0), (0, -1))  # 四邻域偏移
+
+
+@dataclass(slots=True)
+class TickContext:  # 定义 tick 上下文
+    """一次 tick 中各系统共享的状态;系统可以替换 world_state,引擎在 tick 结束时保存。
+
+    update 可能在工作进程中执行,此时 store 为 None,系统只能依赖 tick 与 world_state。
+    """  # 类 docstring
+
+    store: WorldStore | None  # 世界存储,工作进程中为 None
+    tick: int  # 本次 tick 的序号
+    world_state: WorldState  # 世界状态
+
+    def roll(self, cx: int, cy: int, x: int, y: int) -> int:  # 定义确定性随机数方法
+        """由世界种子、tick 与格子坐标得到 32 位随机数,同一世界重放时结果一致。"""
+
+        data = _ROLL.pack(self.world_state.seed, self.tick, cx, cy, x, y)  # 打包输入
+        return zlib.crc32(data)  # 返回随机数
+
+
+class TickSystem:  # 定义 tick 系统基类
+    """tick 系统基类。
+
+    watches 声明系统关注的 (层级, 瓦片);存储在格子变更时按声明增量维护每个系统的活跃格子,
+    引擎每次 tick 只把活跃格子交给 update,不扫描整个世界。不关注任何瓦片的系统只执行 advance。
+
+    结果只取决于经过的 tick 数的系统可以改为实现 catch_up:tick 时不做任何工作,区块加载时
+    对整块平面一次性追赶落后的 tick。惰性系统只能改写 deco 与 growth 平面,且不得创建或移除
+    其他系统关注的瓦片,否则活跃集合会失去同步;平面可能由多个区块拼接而成,计算必须逐格独立。
+    """  # 类 docstring
+
+    name: ClassVar[str] = ""  # 系统名称,同时是活跃格子索引的键
+    watches: ClassVar[tuple[tuple[str, TileType], ...]] = ()  # 关注的 (层级, 瓦片)
+
+    def is_active(self, codes: CellCodes) -> bool:  # 定义活跃判断方法
+        """判断命中关注瓦片的格子是否仍需处理,返回 False 的格子会移出活跃集合。"""
+
+        return True  # 默认始终处理
+
+    def update(  # 定义区块更新方法
+        self, ctx: TickContext, chunk: Chunk, cells: list[ActiveCell]
+    ) -> list[CellWrite]:  # 返回新编码
+        """处理一个区块内的活跃格子,返回需要写入的新编码,由引擎统一写入并记录变更。
+
+        结果只能取决于 ctx.tick、ctx.world_state 与本区块,不得读取其他区块或存储,以便执行器
+        把不同区块分配到多个进程计算。
+        """  # 方法 docstring
+
+        return []  # 默认不修改格子
+
+    def advance(self, ctx: TickContext) -> None:  # 定义全局推进方法
+        """处理与格子无关的全局状态,在本系统的格子更新之后调用。"""  # 方法 docstring
+
+    def catch_up(  # 定义成长追赶方法
+        self, base: bytes, deco: bytes, growth: bytes, elapsed: int
+    ) -> tuple[bytes, bytes]:  # 返回新的装饰与成长平面
+        """返回整块经过 elapsed 个 tick 后的装饰与成长平面,结果须与逐 tick 执行一致。"""
+
+        return deco, growth  # 默认不修改格子
+
+
+class TreeGrowthSystem(TickSystem):  # 定义树苗成长系统
+    """树苗每 tick 成长一阶,达到 TICK_TREE_GROW_STEPS 后变为成树;在区块加载时惰性追赶。"""
+
+    name = "trees"  # 系统名称
+
+    def __init__(self, grow_steps: int) -> None:  # 定义构造函数
+        """保存树苗成熟所需 tick 数。"""  # 方法 docstring,说明用途
+
+        self._steps = grow_steps  # 保存成长步数
+
+    def catch_up(  # 定义成长追赶方法
+        self, base: bytes, deco: bytes, growth: bytes, elapsed: int
+    ) -> tuple[bytes, bytes]:  # 返回新的装饰与成长平面
+        """一次推进 elapsed 阶,达到成熟阶段的树苗替换为成树并清空成长数据。"""
+
+        return grow_saplings(deco, growth, elapsed, self._steps)  # 整块计算
+
+
+class CropGrowthSystem(TickSystem):  # 定义作物成长系统
+    """空置的农田每 tick 让作物成长一阶,成熟后停留在最终阶段;在区块加载时惰性追赶。"""
+
+    name = "crops"  # 系统名称
+
+    def __init__(self, grow_steps: int) -> None:  # 定义构造函数
+        """保存作物成熟所需 tick 数。"""  # 方法 docstring,说明用途
+
+        self._steps = grow_steps  # 保存成长步数
+
+    def catch_up(  # 定义成长追赶方法
+        self, base: bytes, deco: bytes, growth: bytes, elapsed: int
+    ) -> tuple[bytes, bytes]:  # 返回新的装饰与成长平面
+        """一次推进 elapsed 阶,成长阶段不超过成熟阶段;放置了装饰的农田不成长。"""
+
+        return deco, grow_crops(base, deco, growth, elapsed, self._steps)  # 整块计算
+
+
+class ShrubSpreadSystem(TickSystem):  # 定义灌木蔓延系统
+    """每个灌木每 tick 以固定概率向区块内一个相邻的空草地蔓延,结果由世界种子确定。"""
+
+    name = "shrubs"  # 系统名称
+    watches = (("deco", TileType.SHRUB),)  # 关注灌木装饰
+
+    def __init__(self, chance: float) -> None:  # 定义构造函数
+        """保存蔓延概率。"""  # 方法 docstring,说明用途
+
+        self._threshold = int(chance * 0x1_0000_0000)  # 换算为 32 位随机数阈值
+
+    def update(  # 定义区块更新方法
+        self, ctx: TickContext, chunk: Chunk, cells: list[ActiveCell]
+    ) -> list[CellWrite]:  # 返回新编码
+        """为命中概率的灌木挑选一个相邻格子,目标只能是没有装饰的草地。"""  # 方法 docstring
+
+        size = chunk.size  # 读取边长
+        targets: dict[tuple[int, int], None] = {}  # 本 tick 的蔓延目标,保持确定的顺序并去重
+        for x, y, _ in cells:  # 遍历灌木
+            roll = ctx.roll(chunk.cx, chunk.cy, x, y)  # 确定性随机数
+            if roll >= self._threshold:  # 未命中概率
+                continue  # 跳过
+            dx, dy = _NEIGHBOURS[roll % 4]  # 选择方向
+            if 0 <= x + dx < size and 0 <= y + dy < size:  # 不跨越区块
+                targets[(x + dx, y + dy)] = None  # 记录目标
+        positions = list(targets)  # 目标坐标
+        return [  # 返回新编码,读取的是 tick 开始时的编码,新灌木不会在同一 tick 继续蔓延
+            (x, y, (base, _SHRUB, height, GROWTH_NONE))  # 长出灌木
+            for (x, y), (base, deco, height, _) in zip(
+                positions, chunk.read_codes(positions), strict=True
+            )  # 遍历目标
+            if base == _GRASS and deco == 0  # 只能蔓延到空草地
+        ]  # 结束列表
+
+
+class SeasonSystem(TickSystem):  # 定义季节系统
+    """每 TICK_SEASON_LENGTH 个 tick 推进一次季节,冬季之后进入新的一年。"""  # 类 docstring
+
+    name = "seasons"  # 系统名称
+
+    def __init__(self, season_length: int) -> None:  # 定义构造函数
+        """保存季节长度。"""  # 方法 docstring,说明用途
+
+        self._length = season_length  # 保存季节长度
+
+    def advance(self, ctx: TickContext) -> None:  # 定义全局推进方法
+        """到达季节边界时替换世界状态的季节与年份,未知季节从春季重新开始。"""  # 方法 docstring
+
+        if ctx.tick % self._length:  # 未到季节边界
+            return  # 直接返回
+        state = ctx.world_state  # 读取世界状态
+        current = SEASONS.index(state.season) if state.season in SEASONS else -1  # 当前季节
+        year = state.year + 1 if current == len(SEASONS) - 1 else state.year  # 冬季后跨年
+        season = SEASONS[(current + 1) % len(SEASONS)]  # 下一季节
+        ctx.world_state = state.model_copy(update={"season": season, "year": year})  # 替换状态
+
+
+class TickEngine:  # 定义 tick 引擎
+    """按注册顺序执行 tick 系统;每个系统只处理自己的活跃格子,写入后统一增量更新各系统的集合。
+
+    惰性系统不参与 tick,由 WorldStore 在加载落后于世界 tick 的区块时调用 catch_up 追赶。
+    各区块的 update 交给 TickExecutor 计算,结果按区块顺序写回,与单进程执行完全一致。
+    """  # 类 docstring
+
+    def __init__(  # 定义构造函数
+        self, systems: list[TickSystem] | None = None, executor: TickExecutor | None = None
+    ) -> None:  # 无返回值
+        """创建引擎并注册给定系统,未提供执行器时在本进程内计算。"""  # 方法 docstring
+
+        self._executor = executor or TickExecutor()  # 保存执行器
+        self._systems: dict[str, TickSystem] = {}  # 系统名称到系统
+        for system in systems or []:  # 遍历系统
+            self.register(system)  # 注册系统
+
+    def register(self, system: TickSystem) -> TickSystem:  # 定义注册方法
+        """注册 tick 系统,名称重复时抛出 ValueError;需在创建 WorldStore 之前完成注册。"""
+
+        if not system.name:  # 名称为空
+            raise ValueError("tick 系统必须声明 name")  # 抛出错误
+        if system.name in self._systems:  # 名称重复
+            raise ValueError(f"tick 系统重复注册:{system.name}")  # 抛出错误
+        self._systems[system.name] = system  # 登记系统
+        return system  # 返回系统,便于链式使用
+
+    @property
+    def systems(self) -> list[TickSystem]:  # 定义系统列表属性
+        """按注册顺序返回全部系统。"""  # 属性 docstring,说明用途
+
+        return list(self._systems.values())  # 返回列表
+
+    @property
+    def active_tiles(self) -> dict[str, tuple[tuple[str, TileType], ...]]:  # 定义关注瓦片属性
+        """返回关注瓦片的系统及其声明,作为 WorldStore 的 active_tiles 参数。"""  # 属性 docstring
+
+        return {name: system.watches for name, system in self._systems.items() if system.watches}
+
+    def run(self, store: WorldStore) -> tuple[int, list[CellChange]]:  # 定义 tick 执行方法
+        """执行一次 tick,返回写入世界状态的 tick 序号与全部格子变更。
+
+        格子、活跃集合与世界状态写入同一个日志事务。
+        """  # 方法 docstring
+
+        state = store.load_world_state()  # 读取世界状态
+        ctx = TickContext(store=store, tick=state.tick + 1, world_state=state)  # 创建上下文
+        changes: list[CellChange] = []  # 初始化变更列表
+        with store.transaction():  # 本次 tick 的全部变更写入同一个日志事务
+            for system in self._systems.values():  # 按注册顺序执行
+                if system.watches:  # 关注瓦片的系统
+                    changes.extend(self._update_cells(system, ctx))  # 处理活跃格子
+                system.advance(ctx)  # 推进全局状态
+            store.save_active_index()  # 写回活跃格子索引
+            store.save_world_state(ctx.world_state.model_copy(update={"tick": ctx.tick}))  # 计数
+        return ctx.tick, changes  # 返回世界 tick 与变更
+
+    def close(self) -> None:  # 定义关闭方法
+        """关闭执行器的工作进程。"""  # 方法 docstring,说明用途
+
+        self._executor.shutdown()  # 关闭进程池
+
+    def catch_up(self, chunk: Chunk, elapsed: int) -> None:  # 定义区块追赶方法
+        """让区块追赶 elapsed 个 tick 并写入差异,作为 WorldStore 的 catch_up 参数。"""
+
+        for diff in self.catch_up_diffs([chunk], elapsed):  # 至多一个差异
+            diff.apply(chunk)  # 写入区块
+
+    def catch_up_diffs(self, chunks: list[Chunk], elapsed: int) -> list[ChunkDiff]:  # 差异计算
+        """把同尺寸区块的平面拼接后依次交给各系统的 catch_up,返回变化区块的差异而不修改区块。
+
+        拼接让每个系统对任意数量的区块只做固定次数的整块运算,逐区块的开销只剩切片与比较。
+        """  # 方法 docstring
+
+        if not chunks:  # 没有区块
+            return []  # 直接返回
+        size = chunks[0].size  # 区块边长
+        if any(chunk.size != size for chunk in chunks):  # 边长不一致无法拼接
+            raise ValueError("区块尺寸必须一致")  # 抛出错误
+        planes = [chunk.planes for chunk in chunks]  # 读取平面
+        base, deco, growth = (b"".join(plane[i] for plane in planes) for i in (0, 1, 3))  # 拼接
+        new_deco, new_growth = deco, growth  # 初始化结果
+        for system in self._systems.values():  # 按注册顺序执行
+            new_deco, new_growth = system.catch_up(base, new_deco, new_growth, elapsed)  # 计算
+        coords = [(chunk.cx, chunk.cy) for chunk in chunks]  # 区块坐标
+        return split_diffs(coords, size * size, deco, growth, new_deco, new_growth)  # 拆分差异
+
+    def _update_cells(self, system: TickSystem, ctx: TickContext) -> list[CellChange]:  # 格子
+        """把系统的活跃格子逐区块交给 update,写入结果并同步全部系统的活跃集合。
+
+        update 只读取本区块,因此先收集全部区块的活跃格子,交给执行器一次计算,再按区块顺序
+        写回;与逐区块交替计算、写入的结果相同。
+        """  # 方法 docstring
+
+        store = ctx.store  # 读取存储
+        assert store is not None  # 引擎只在主进程中执行
+        batch: list[tuple[Chunk, list[ActiveCell]]] = []  # 需要更新的区块
+        for chunk, positions in store.iter_active(system.name):  # 仅遍历活跃格子
+            cx, cy = chunk.cx, chunk.cy  # 读取区块坐标
+            cells: list[ActiveCell] = []  # 仍需处理的格子
+            for (x, y), codes in zip(positions, chunk.read_codes(positions), strict=True):
+                if store.watches(system.name, codes) and system.is_active(codes):  # 仍需处理
+                    cells.append((x, y, codes))  # 记录格子
+                else:  # 集合已过期(如被外部修改)或系统不再需要处理
+                    store.set_active(system.name, cx, cy, x, y, active=False, persist=False)
+            if cells:  # 区块仍有活跃格子
+                batch.append((chunk, cells))  # 记录区块
+        results = self._executor.update(system, ctx, batch) if batch else []  # 计算新编码
+        changes: list[CellChange] = []  # 初始化变更列表
+        for (chunk, _), writes in zip(batch, results, strict=True):  # 按区块顺序写回
+            cx, cy = chunk.cx, chunk.cy  # 读取区块坐标
+            targets = [(x, y) for x, y, _ in writes]  # 写入坐标
+            chunk_changes = [  # 编码确实变化的格子
+                CellChange(cx, cy, x, y, before, after)  # 记录变更
+                for (x, y, after), before in zip(writes, chunk.read_codes(targets), strict=True)
+                if before != after  # 过滤未变化的格子
+            ]  # 结束列表
+            if not chunk_changes:  # 区块未被修改
+                continue  # 跳过
+            chunk.write_codes((change.x, change.y, change.after) for change in chunk_changes)
+            store.save_chunk(chunk)  # 写回区块
+            store.track_changes(chunk_changes, persist=False)  # 同步各系统的活跃集合
+            changes.extend(chunk_changes)  # 记录变更
+        return changes  # 返回变更
+
+
+def build_tick_engine(settings: Settings) -> TickEngine:  # 定义默认引擎工厂
+    """按配置注册树苗成长、作物成长(惰性)、灌木蔓延与季节推进四个系统。"""  # 函数 docstring
+
+    return TickEngine(  # 创建引擎
+        [  # 系统列表,执行顺序即注册顺序
+            TreeGrowthSystem(settings.tick_tree_grow_steps),  # 树苗成长
+            CropGrowthSystem(settings.tick_crop_grow_steps),  # 作物成长
+            ShrubSpreadSystem(settings.tick_shrub_spread_chance),  # 灌木蔓延
+            SeasonSystem(settings.tick_season_length),  # 季节推进
+        ],  # 结束列表
+        executor=TickExecutor(settings.tick_workers),  # 按配置的进程数计算区块更新
+    )  # 结束创建
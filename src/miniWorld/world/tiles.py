@@ -32,3 +32,48 @@ class TileType(str, Enum):  # 定义 TileType 枚举,继承自 str 与 Enum 便
         """判断给定瓦片是否可以放置在装饰槽。"""  # 方法 docstring,说明用途
 
         return tile in {cls.TREE_SAPLING, cls.TREE, cls.SHRUB, cls.ROCK}  # 返回布尔判断
+
+
+TILE_CODE_ORDER: tuple[TileType, ...] = (  # 定义瓦片编码顺序,二进制格式依赖该顺序,只能追加
+    TileType.GRASS,  # 编码 1
+    TileType.ROAD,  # 编码 2
+    TileType.WATER,  # 编码 3
+    TileType.SOIL,  # 编码 4
+    TileType.WOODFLOOR,  # 编码 5
+    TileType.HOUSE_BASE,  # 编码 6
+    TileType.TREE_SAPLING,  # 编码 7
+    TileType.TREE,  # 编码 8
+    TileType.FARM,  # 编码 9
+    TileType.ROCK,  # 编码 10
+    TileType.SHRUB,  # 编码 11
+    TileType.MAGIC_SIGIL,  # 编码 12
+)  # 结束编码顺序
+TILE_CODES: dict[str, int] = {  # 构建瓦片值到编码的映射,0 保留给“空”
+    tile.value: index + 1 for index, tile in enumerate(TILE_CODE_ORDER)  # 编码从 1 开始
+}  # 结束映射
+TILES_BY_CODE: dict[int, TileType] = {  # 构建编码到瓦片的反向映射
+    code: TileType(value) for value, code in TILE_CODES.items()  # 遍历正向映射
+}  # 结束映射
+
+
+def tile_to_code(tile: TileType | str | None) -> int:  # 定义瓦片编码函数
+    """将瓦片转换为单字节编码,None 编码为 0。"""  # 函数 docstring,说明用途
+
+    if tile is None:  # 空装饰槽
+        return 0  # 返回保留编码
+    value = tile.value if isinstance(tile, TileType) else tile  # 统一取字符串值
+    try:  # 尝试查找编码
+        return TILE_CODES[value]  # 返回对应编码
+    except KeyError as exc:  # 捕获未知瓦片
+        raise ValueError(f"未知瓦片类型:{value}") from exc  # 抛出友好错误
+
+
+def tile_from_code(code: int) -> TileType | None:  # 定义瓦片解码函数
+    """将单字节编码还原为瓦片类型,0 还原为 None。"""  # 函数 docstring,说明用途
+
+    if code == 0:  # 保留编码
+        return None  # 表示空
+    try:  # 尝试查找瓦片
+        return TILES_BY_CODE[code]  # 返回瓦片类型
+    except KeyError as exc:  # 捕获未知编码
+        raise ValueError(f"未知瓦片编码:{code}") from exc  # 抛出友好错误
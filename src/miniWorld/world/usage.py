@@ -0,0 +1,178 @@
+"""实现常驻内存的角色用量账本,以快照加增量的方式持久化。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+from collections.abc import Callable  # 导入抽象类型,用于标注记录回调
+from threading import RLock  # 导入 RLock,保护线程池中的并发计数
+from typing import Any  # 导入 Any,用于标注文档结构
+
+DAY_MS = 86_400_000  # 一天的毫秒数,用于计算日期编号
+
+UsageKey = tuple[str, str]  # (角色, 动作类型) 键类型别名
+
+
+class UsageLimitError(Exception):  # 定义用量限制异常
+    """在配额或冷却校验失败时抛出的异常。"""  # 类 docstring,说明用途
+
+    def __init__(self, message: str, code: int = 429) -> None:  # 定义构造函数
+        """保存错误信息与错误码。"""  # 方法 docstring,说明用途
+
+        super().__init__(message)  # 调用父类构造
+        self.code = code  # 保存错误码
+        self.message = message  # 保存错误消息
+
+
+class UsageCounter:  # 定义单个用量计数
+    """某角色某动作的当日计数与最后执行时间。"""  # 类 docstring,说明用途
+
+    __slots__ = ("count", "day", "last_ts")  # 固定字段,降低大量计数的内存占用
+
+    def __init__(  # 定义构造函数
+        self,
+        count: int = 0,  # 当日已执行次数
+        day: int | None = None,  # 计数所属日期编号
+        last_ts: int | None = None,  # 最后执行时间(毫秒)
+    ) -> None:  # 构造函数返回 None
+        """保存计数字段。"""  # 方法 docstring,说明用途
+
+        self.count = count  # 保存计数
+        self.day = day  # 保存日期
+        self.last_ts = last_ts  # 保存时间
+
+    def to_record(self) -> dict[str, Any]:  # 定义序列化方法
+        """返回与 actor_usage.json 旧格式一致的记录字典。"""  # 方法 docstring,说明用途
+
+        return {"count": self.count, "day": self.day, "last_ts": self.last_ts}  # 返回字典
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> UsageCounter:  # 定义反序列化方法
+        """从记录字典还原计数。"""  # 方法 docstring,说明用途
+
+        return cls(record.get("count", 0), record.get("day"), record.get("last_ts"))  # 返回计数
+
+
+class UsageLedger:  # 定义用量账本
+    """以 (角色, 动作) 为键的 O(1) 计数表,记录快照以来变化过的键用于增量持久化。"""  # 类 docstring
+
+    def __init__(self, snapshot_every: int = 256) -> None:  # 定义构造函数
+        """创建空账本,增量累计达到 snapshot_every 个键时改写完整快照。"""  # 方法 docstring
+
+        self._counters: dict[UsageKey, UsageCounter] = {}  # 计数表
+        self._changed: set[UsageKey] = set()  # 上次快照以来变化过的键
+        self._generation = 0  # 当前快照代数,增量只对同代快照生效
+        self._snapshot_every = max(1, snapshot_every)  # 保存快照阈值
+        self._force_snapshot = False  # 清空后下次持久化必须改写快照
+        self._lock = RLock()  # 保证同一键的校验与计数原子完成
+
+    def __len__(self) -> int:  # 定义长度方法
+        """返回计数条目数量。"""  # 方法 docstring,说明用途
+
+        return len(self._counters)  # 返回数量
+
+    def get(self, actor: str, action_type: str) -> UsageCounter | None:  # 定义查询方法
+        """返回指定计数,不存在时返回 None。"""  # 方法 docstring,说明用途
+
+        return self._counters.get((actor, action_type))  # 返回计数
+
+    def check_and_record(  # 定义校验并记录方法
+        self,
+        actor: str,  # 执行者
+        action_type: str,  # 动作类型
+        client_ts: int,  # 时间戳(毫秒)
+        quota: int | None,  # 每日配额
+        cooldown: int | None,  # 冷却秒数
+        amount: int = 1,  # 本次计入的次数,区域笔刷按格计量时为格子数
+        on_record: Callable[[dict[str, Any]], None] | None = None,  # 计数更新后的记录回调
+    ) -> dict[str, Any]:  # 返回更新后的记录快照
+        """校验配额与冷却,通过后计数加 amount 并返回记录快照;跨日在访问时惰性重置。
+
+        on_record 在持锁期间以同一份快照调用,同一键的回调顺序与计数顺序一致,可用于写日志。
+        """  # 方法 docstring
+
+        with self._lock:  # 加锁访问计数表
+            key = (actor, action_type)  # 构建键
+            counter = self._counters.get(key)  # 查找计数
+            if counter is None:  # 首次执行
+                counter = self._counters[key] = UsageCounter()  # 创建计数
+            current_day = client_ts // DAY_MS  # 计算当前日期编号
+            count = counter.count if counter.day == current_day else 0  # 跨日视为零次
+            if quota is not None and count + amount > quota:  # 检查配额
+                raise UsageLimitError("已达到今日配额", code=429)  # 抛出异常
+            if (  # 检查冷却
+                cooldown is not None
+                and counter.last_ts is not None
+                and (client_ts - counter.last_ts) / 1000 < cooldown
+            ):
+                raise UsageLimitError("动作处于冷却中", code=429)  # 抛出异常
+            counter.day = current_day  # 更新日期
+            counter.count = count + amount  # 增加计数
+            counter.last_ts = client_ts  # 更新最后执行时间
+            self._changed.add(key)  # 记录变化
+            record = counter.to_record()  # 持锁取快照,避免读到其他线程随后的计数
+            if on_record is not None:  # 需要同步记录
+                on_record(record)  # 在锁内调用回调
+            return record  # 返回快照
+
+    def restore(self, actor: str, action_type: str, record: dict[str, Any]) -> None:  # 定义覆盖方法
+        """以记录字典覆盖指定计数,用于日志回放。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问计数表
+            key = (actor, action_type)  # 构建键
+            self._counters[key] = UsageCounter.from_record(record)  # 覆盖计数
+            self._changed.add(key)  # 记录变化
+
+    def clear(self) -> None:  # 定义清空方法
+        """清空全部计数,下次持久化时改写快照。"""  # 方法 docstring,说明用途
+
+        with self._lock:  # 加锁访问计数表
+            self._counters.clear()  # 清空计数
+            self._changed.clear()  # 清空变化
+            self._force_snapshot = True  # 旧快照与增量随下次快照失效
+
+    def load(self, snapshot: Any, delta: Any) -> None:  # 定义加载方法
+        """从快照与同代增量文档还原账本,兼容旧版嵌套字典快照。"""  # 方法 docstring
+
+        with self._lock:  # 加锁访问计数表
+            self._counters.clear()  # 清空计数
+            self._changed.clear()  # 清空变化
+            self._force_snapshot = False  # 重置标记
+            if snapshot is None:  # 无快照
+                snapshot = {}  # 视为空快照
+            if not isinstance(snapshot, dict):  # 校验类型
+                raise ValueError("actor_usage.json 必须是字典")  # 抛出错误
+            if "actors" in snapshot and "generation" in snapshot:  # 新版快照
+                self._generation = int(snapshot["generation"])  # 读取代数
+                actors = snapshot["actors"]  # 读取计数
+            else:  # 旧版嵌套字典
+                self._generation = 0  # 旧快照视为第 0 代
+                actors = snapshot  # 整个字典即计数
+            for actor, actions in actors.items():  # 遍历角色
+                for action_type, record in actions.items():  # 遍历动作
+                    self._counters[(actor, action_type)] = UsageCounter.from_record(record)  # 还原
+            if isinstance(delta, dict) and delta.get("generation") == self._generation:  # 同代增量
+                for actor, action_type, record in delta.get("records", []):  # 遍历增量
+                    self.restore(actor, action_type, record)  # 覆盖计数
+
+    def encode(self) -> tuple[bool, dict[str, Any]]:  # 定义持久化编码方法
+        """返回 (是否为快照, 文档内容):变化的键较少时只编码增量,否则改写快照。"""  # 方法 docstring
+
+        with self._lock:  # 加锁访问计数表
+            if not self._force_snapshot and len(self._changed) < self._snapshot_every:  # 增量较小
+                records = [  # 构建增量记录
+                    [actor, action_type, self._counters[(actor, action_type)].to_record()]  # 记录
+                    for actor, action_type in sorted(self._changed)  # 按键排序
+                ]  # 结束列表
+                return False, {"generation": self._generation, "records": records}  # 返回增量
+            return True, self.snapshot()  # 返回快照
+
+    def snapshot(self) -> dict[str, Any]:  # 定义快照方法
+        """开启新一代快照并返回完整文档,之前的增量随之失效。"""  # 方法 docstring
+
+        with self._lock:  # 加锁访问计数表
+            self._generation += 1  # 递增代数
+            self._changed.clear()  # 清空变化
+            self._force_snapshot = False  # 重置标记
+            actors: dict[str, dict[str, Any]] = {}  # 初始化嵌套字典
+            for (actor, action_type), counter in sorted(self._counters.items()):  # 遍历计数
+                actors.setdefault(actor, {})[action_type] = counter.to_record()  # 写入记录
+            return {"generation": self._generation, "actors": actors}  # 返回快照
@@ -17,6 +17,7 @@ class WorldState(BaseModel):  # 定义世界状态模型
         description="正在发生的重大事件列表",  # 字段描述
     )  # 结束 Field 定义
     seed: int = Field(default=42, description="随机种子,用于确定性生成")  # 随机种子
+    tick: int = Field(default=0, ge=0, description="已推进的世界 tick 数")  # 世界 tick 计数
 
     class Config:  # 定义内部配置
         """配置项用于保持字段顺序。"""  # Config docstring
@@ -0,0 +1,55 @@
+"""测试共享的 pytest 固件。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import os  # 导入 os,为应用设置数据目录环境变量
+import shutil  # 导入 shutil,清理临时数据目录
+import tempfile  # 导入 tempfile,创建测试会话的数据目录
+from collections.abc import Callable  # 导入抽象类型,用于类型标注
+from pathlib import Path  # 导入 Path,用于临时目录类型标注
+from typing import Any  # 导入 Any,标注存储选项
+
+import pytest  # 导入 pytest,声明固件
+
+from miniWorld.config import get_settings  # 导入配置获取函数
+from miniWorld.world.store import WorldStore  # 导入世界存储
+
+StoreFactory = Callable[..., WorldStore]  # 存储工厂类型别名
+
+_DATA_DIR: Path | None = None  # 测试会话的应用数据目录
+
+
+def pytest_configure(config: pytest.Config) -> None:  # 定义会话启动钩子
+    """在导入 miniWorld.app 之前把 DATA_DIR 指向临时目录,测试不改动仓库中的 data 目录。"""
+
+    global _DATA_DIR  # 记录目录以便清理
+    _DATA_DIR = Path(tempfile.mkdtemp(prefix="miniWorld-data-"))  # 创建临时目录
+    os.environ["DATA_DIR"] = str(_DATA_DIR)  # 应用模块导入时读取
+    get_settings.cache_clear()  # 丢弃可能已缓存的配置
+
+
+def pytest_unconfigure(config: pytest.Config) -> None:  # 定义会话结束钩子
+    """删除测试会话的数据目录。"""  # 函数 docstring,说明用途
+
+    if _DATA_DIR is not None:  # 已创建目录
+        shutil.rmtree(_DATA_DIR, ignore_errors=True)  # 删除目录
+
+
+@pytest.fixture()  # 声明 pytest 固件
+def make_store(tmp_path: Path) -> StoreFactory:  # 定义存储工厂固件
+    """返回以 tmp_path 为默认数据目录的 WorldStore 工厂,关键字参数覆盖默认选项。"""
+
+    settings = get_settings()  # 加载配置
+
+    def factory(root: Path | None = None, **options: Any) -> WorldStore:  # 定义工厂
+        """按配置的区块尺寸、默认世界状态与成长步数创建存储。"""  # 函数 docstring
+
+        params: dict[str, Any] = {  # 默认选项
+            "chunk_size": settings.chunk_size,  # 区块尺寸
+            "default_world_state": settings.world_state,  # 默认世界状态
+            "tick_tree_grow_steps": settings.tick_tree_grow_steps,  # 树苗成长步数
+        }  # 结束字典
+        params.update(options)  # 覆盖默认选项
+        return WorldStore(root=root or tmp_path, **params)  # 返回存储
+
+    return factory  # 返回工厂
@@ -0,0 +1,90 @@
+"""针对审计日志写入、轮转与索引查询的测试用例。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+from pathlib import Path  # 导入 Path,用于临时目录类型标注
+
+import pytest  # 导入 pytest,用于断言异常
+
+from miniWorld.world.action_log import ActionLogWriter  # 导入审计日志写入器
+from miniWorld.world.log_index import ActionLogIndex  # 导入审计日志索引
+from tests.conftest import StoreFactory  # 导入存储工厂类型
+
+
+def test_action_log_writer_buffers_and_rotates(tmp_path: Path) -> None:  # 定义测试函数
+    """审计日志按行数分组写入,超过大小或跨日时轮转并压缩,读取时保持顺序。"""  # 函数 docstring
+
+    now = [1_700_000_000.0]  # 可调整的当前时间
+    writer = ActionLogWriter(  # 创建写入器
+        tmp_path,  # 日志目录
+        flush_lines=3,  # 每三行写入一次
+        flush_interval_seconds=60,  # 测试期间不按时间写入
+        max_bytes=40,  # 很小的轮转阈值
+        clock=lambda: now[0],  # 使用可控时钟
+    )  # 结束写入器创建
+    writer.append(["line-0", "line-1"])  # 缓冲两行
+    assert not (tmp_path / "actions.log").exists()  # 尚未写入磁盘
+    writer.append(["line-2"])  # 达到分组行数
+    assert (tmp_path / "actions.log").read_text(encoding="utf-8").count("\n") == 3  # 一次写入
+    writer.append(["line-3", "line-4", "line-5"])  # 超过大小阈值
+    now[0] += 86_400  # 进入下一天
+    writer.append(["line-6", "line-7", "line-8"])  # 跨日轮转
+    writer.close()  # 关闭写入器
+    assert writer.rotation_count == 2 and writer.flush_count == 3  # 两次轮转、三次写入
+    assert [path.suffix for path in writer.segments()] == [".gz", ".gz"]  # 旧段已压缩
+    assert list(writer.iter_lines()) == [f"line-{index}" for index in range(9)]  # 顺序完整
+
+
+def test_action_log_index_filters_and_paginates(
+    tmp_path: Path, make_store: StoreFactory
+) -> None:  # 定义测试函数
+    """日志写入时增量索引,可按执行者与区块过滤并以游标翻页,新索引会回填旧日志。"""  # 函数 docstring
+
+    store = make_store(log_index=ActionLogIndex(tmp_path / "actions.index.db"))  # 创建带索引的存储
+    for index, actor in enumerate(["盗贼", "骑士", "盗贼", "盗贼"]):  # 写入四条日志
+        chunk = {"cx": index % 2, "cy": 0}  # 交替区块
+        store.append_action_log(actor, "PLACE_TILE", chunk, {"x": index, "y": 0}, {})  # 写日志
+    entries, cursor = store.query_action_log(actor="盗贼", limit=2)  # 查询第一页
+    assert [entry["pos"]["x"] for entry in entries] == [3, 2] and cursor is not None  # 从新到旧
+    entries, cursor = store.query_action_log(actor="盗贼", cursor=cursor, limit=2)  # 查询下一页
+    assert [entry["pos"]["x"] for entry in entries] == [0] and cursor is None  # 最后一页
+    entries, _ = store.query_action_log(actor="盗贼", cx=0, cy=0, since=entries[0]["ts"])
+    assert [entry["pos"]["x"] for entry in entries] == [2, 0]  # 按区块与时间过滤
+    with pytest.raises(ValueError):  # 区块坐标需成对提供
+        store.query_action_log(cx=0)  # 仅提供 cx
+    store.close()  # 关闭存储
+    rebuilt = ActionLogIndex(tmp_path / "rebuilt.index.db")  # 创建空索引
+    reopened = make_store(log_index=rebuilt)  # 重新打开存储
+    assert len(rebuilt) == 4  # 已回填旧日志
+    assert reopened.query_action_log(actor="骑士")[0][0]["pos"]["x"] == 1  # 回填后可查询
+    reopened.close()  # 关闭存储
+
+
+def test_action_log_index_reconciles_with_log(tmp_path: Path, make_store: StoreFactory) -> None:
+    """重启时索引与日志对账:关闭索引期间写入的日志被补齐,日志比索引短时整体重建。"""
+
+    index_path = tmp_path / "actions.index.db"  # 索引路径
+
+    def write(count: int, indexed: bool) -> None:  # 定义日志写入函数
+        """打开存储写入若干条日志后关闭,indexed 为假时不启用索引。"""  # 函数 docstring
+
+        store = make_store(log_index=ActionLogIndex(index_path) if indexed else None)  # 创建存储
+        for x in range(count):  # 写入日志
+            store.append_action_log("盗贼", "PLACE_TILE", {"cx": 0, "cy": 0}, {"x": x, "y": 0}, {})
+        store.close()  # 关闭存储
+
+    write(1, indexed=True)  # 启用索引写入一条
+    write(3, indexed=False)  # 关闭索引写入三条
+    write(1, indexed=True)  # 再次启用索引写入一条
+    store = make_store(log_index=ActionLogIndex(index_path))  # 重新打开
+    entries, _ = store.query_action_log(limit=10)  # 查询全部日志
+    assert [entry["pos"]["x"] for entry in entries] == [0, 2, 1, 0, 0]  # 五条日志均已索引
+    store.close()  # 关闭存储
+
+    ahead = ActionLogIndex(index_path)  # 模拟索引已提交而日志未落盘
+    ahead.add(['{"actor": "骑士", "action": "PLACE_TILE"}'])  # 日志中不存在的行
+    ahead.close()  # 关闭索引
+    store = make_store(log_index=ActionLogIndex(index_path))  # 重新打开,日志比索引短
+    assert len(store.query_action_log(limit=10)[0]) == 5  # 重建后与日志一致
+    assert store.query_action_log(actor="骑士")[0] == []  # 多出的索引行被丢弃
+    store.close()  # 关闭存储
@@ -2,9 +2,22 @@
 
 from __future__ import annotations  # 导入未来注解特性,支持前向引用
 
+import pytest  # 导入 pytest,用于断言异常
 from fastapi.testclient import TestClient  # 导入 TestClient,用于请求接口
 
 from miniWorld.app import app  # 导入 FastAPI 应用实例
+from miniWorld.config import get_settings  # 导入配置获取函数
+from miniWorld.world.actions import (  # 导入动作处理器与权限模型
+    ActionProcessor,  # 动作处理器
+    ActionRequest,  # 动作请求
+    ForbiddenRegion,  # 禁区
+    RolePermission,  # 角色权限
+)  # 结束导入
+from miniWorld.world.permissions import PermissionEngine  # 导入权限引擎
+from miniWorld.world.quests import QuestProgressor  # 导入任务推进器
+from miniWorld.world.store import WorldStore  # 导入世界存储
+from miniWorld.world.tiles import TileType  # 导入瓦片类型
+from tests.conftest import StoreFactory  # 导入存储工厂类型
 
 client = TestClient(app)  # 创建测试客户端
 
@@ -85,3 +98,263 @@ def test_structure_rules_and_invalid_action() -> None:  # 定义测试函数,验
     )  # 结束请求
     assert response.status_code == 403  # 断言权限不足
     assert response.json()["code"] == 403  # 断言错误码一致
+
+
+def test_expected_revision_conflict_returns_409() -> None:  # 定义测试函数,验证乐观并发
+    """携带过期修订号的动作返回 409,成功动作返回新的修订号。"""  # 函数 docstring,说明测试目标
+
+    revision = client.get("/world/chunk", params={"cx": 23, "cy": 23}).json()["revision"]
+    request = {  # 构建请求体
+        "actor": "勇者",  # 执行动作的角色
+        "type": "PLACE_TILE",  # 动作类型
+        "chunk": {"cx": 23, "cy": 23},  # 目标区块
+        "pos": {"x": 2, "y": 2},  # 目标坐标
+        "payload": {"tile": "ROAD"},  # 指定瓦片
+        "client_ts": 1_003_000,  # 时间戳
+        "expected_revision": revision,  # 读取到的修订号
+    }  # 结束请求体
+    response = client.post("/world/action", json=request)  # 首次提交
+    assert response.status_code == 200  # 断言成功
+    assert response.json()["revision"] == revision + 1  # 修订号递增
+
+    stale = {**request, "pos": {"x": 3, "y": 2}, "client_ts": 1_004_000}  # 沿用旧修订号
+    response = client.post("/world/action", json=stale)  # 再次提交
+    assert response.status_code == 409  # 断言冲突
+    assert response.json()["code"] == 409  # 断言错误码一致
+
+
+def test_batch_actions_report_per_item_results() -> None:  # 定义测试函数,验证批量动作
+    """批量动作逐项返回结果,同一区块的多次修改只保存一次。"""  # 函数 docstring,说明测试目标
+
+    revision = client.get("/world/chunk", params={"cx": 24, "cy": 24}).json()["revision"]
+    base = {  # 公共请求字段
+        "actor": "勇者",  # 执行动作的角色
+        "type": "PLACE_TILE",  # 动作类型
+        "chunk": {"cx": 24, "cy": 24},  # 目标区块
+        "payload": {"tile": "ROAD"},  # 指定瓦片
+        "client_ts": 1_005_000,  # 时间戳
+    }  # 结束公共字段
+    response = client.post(  # 提交批量动作
+        "/world/actions",  # 指定路径
+        json=[  # 三个动作
+            {**base, "pos": {"x": 0, "y": 0}},  # 合法动作
+            {**base, "actor": "剑士", "type": "PLACE_STRUCTURE", "pos": {"x": 1, "y": 0}},
+            {**base, "pos": {"x": 2, "y": 0}},  # 合法动作
+        ],  # 结束列表
+    )  # 结束请求
+    assert response.status_code == 200  # 断言请求成功
+    payload = response.json()  # 解析响应
+    assert (payload["succeeded"], payload["failed"]) == (2, 1)  # 成功与失败计数
+    first, rejected, last = payload["results"]  # 按顺序解包结果
+    assert first["success"] and last["success"]  # 合法动作成功
+    assert rejected["success"] is False and rejected["code"] == 403  # 越权动作失败
+    assert first["revision"] == last["revision"] == revision + 1  # 区块只保存一次
+    chunk = client.get("/world/chunk", params={"cx": 24, "cy": 24}).json()  # 重新读取区块
+    assert [chunk["grid"][0][x]["base"] for x in range(3)] == ["ROAD", "GRASS", "ROAD"]
+
+
+def test_batch_actions_see_pending_revision() -> None:  # 定义测试函数,验证批内修订号
+    """批内第二个动作看到批末修订号:沿用读取时修订号的动作冲突,携带新修订号的动作成功。"""
+
+    revision = client.get("/world/chunk", params={"cx": 26, "cy": 26}).json()["revision"]
+    base = {  # 公共请求字段
+        "actor": "勇者",  # 执行动作的角色
+        "type": "PLACE_TILE",  # 动作类型
+        "chunk": {"cx": 26, "cy": 26},  # 目标区块
+        "payload": {"tile": "ROAD"},  # 指定瓦片
+        "client_ts": 1_006_000,  # 时间戳
+        "expected_revision": revision,  # 读取到的修订号
+    }  # 结束公共字段
+    response = client.post(  # 提交批量动作
+        "/world/actions",  # 指定路径
+        json=[  # 三个动作
+            {**base, "pos": {"x": 0, "y": 0}},  # 首个动作成功
+            {**base, "pos": {"x": 1, "y": 0}},  # 沿用旧修订号
+            {**base, "pos": {"x": 2, "y": 0}, "expected_revision": revision + 1},  # 批末修订号
+        ],  # 结束列表
+    )  # 结束请求
+    first, stale, chained = response.json()["results"]  # 按顺序解包结果
+    assert first["success"] and chained["success"]  # 首个与携带新修订号的动作成功
+    assert stale["success"] is False and stale["code"] == 409  # 旧修订号冲突
+    assert first["revision"] == chained["revision"] == revision + 1  # 区块只保存一次
+
+
+def _processor(store: WorldStore) -> ActionProcessor:  # 定义处理器构建函数
+    """创建使用默认配置与权限的动作处理器。"""  # 函数 docstring,说明用途
+
+    settings = get_settings()  # 加载配置
+    return ActionProcessor(  # 返回动作处理器
+        store=store,  # 注入世界存储
+        settings=settings,  # 注入配置
+        permissions=settings.role_permissions,  # 注入角色权限
+        quest_progressor=QuestProgressor(store),  # 注入任务推进器
+    )  # 结束处理器初始化
+
+
+def _road(cx: int, x: int, client_ts: int) -> ActionRequest:  # 定义铺路请求构建函数
+    """构造勇者在区块 (cx, 0) 的第 x 列首格铺设石路的请求。"""  # 函数 docstring,说明用途
+
+    return ActionRequest.model_validate(  # 构造请求
+        {
+            "actor": "勇者",  # 执行动作的角色
+            "type": "PLACE_TILE",  # 动作类型
+            "chunk": {"cx": cx, "cy": 0},  # 目标区块
+            "pos": {"x": x, "y": 0},  # 目标坐标
+            "payload": {"tile": "ROAD"},  # 指定瓦片
+            "client_ts": client_ts,  # 时间戳
+        }
+    )  # 结束构造
+
+
+def test_batch_keeps_edits_when_chunk_is_evicted(make_store: StoreFactory) -> None:  # 定义测试函数
+    """批内区块被缓存淘汰后,后续动作仍在本批已修改的区块上继续,保存时不丢失前面的修改。"""
+
+    store = make_store(cache_max_chunks=1)  # 只缓存一个区块,迫使批内淘汰
+    requests = [_road(1, 0, 1_008_000), _road(2, 0, 1_008_001), _road(1, 1, 1_008_002)]  # 交错区块
+    response = _processor(store).process_batch(requests)  # 执行批量动作
+    assert response.succeeded == 3  # 全部成功
+    chunk = make_store().load_chunk(cx=1, cy=0)  # 从磁盘重新加载
+    assert [chunk.cell_at(x, 0).base for x in range(2)] == [TileType.ROAD] * 2  # 两次修改均保存
+    assert chunk.revision == 1  # 区块只保存一次
+
+
+def test_batch_saves_applied_chunks_on_unexpected_error(
+    make_store: StoreFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:  # 定义测试函数,验证异常时的保存
+    """批量中途出现非 ActionError 异常时照常抛出,此前已修改的区块仍被保存并递增修订号。"""
+
+    store = make_store()  # 创建临时世界存储
+    processor = _processor(store)  # 创建动作处理器
+    logged = [0]  # 审计日志调用次数
+
+    def failing_log(request: ActionRequest, cell_count: int) -> None:  # 定义第二次失败的日志
+        """第二次写审计日志时模拟意外错误。"""  # 函数 docstring,说明用途
+
+        logged[0] += 1  # 累加次数
+        if logged[0] == 2:  # 第二个动作
+            raise RuntimeError("磁盘已满")  # 模拟意外错误
+
+    monkeypatch.setattr(processor, "_log_action", failing_log)  # 替换审计日志
+    requests = [_road(cx, 0, 1_007_000 + cx) for cx in range(2)]  # 两个动作,分别位于不同区块
+    with pytest.raises(RuntimeError):  # 异常照常抛出
+        processor.process_batch(requests)  # 执行批量动作
+    reopened = make_store()  # 从磁盘重新加载
+    for cx in range(2):  # 两个区块都已修改缓存,均应保存
+        chunk = reopened.load_chunk(cx=cx, cy=0)  # 读取区块
+        assert chunk.revision == 1 and chunk.cell_at(0, 0).base == TileType.ROAD  # 已保存
+
+
+def test_brush_actions_apply_as_one_stroke() -> None:  # 定义测试函数,验证区域笔刷
+    """直线与洪泛笔刷整笔生效并返回紧凑变更集,任一格违规则整笔不生效。"""  # 函数 docstring
+
+    base = {  # 公共请求字段
+        "actor": "勇者",  # 执行动作的角色
+        "chunk": {"cx": 25, "cy": 25},  # 目标区块
+        "pos": {"x": 0, "y": 0},  # 笔刷起点
+        "client_ts": 30 * 86_400_000,  # 独立日期,避免与其他测试共享配额
+    }  # 结束公共字段
+    line = client.post(  # 提交直线笔刷
+        "/world/action",  # 指定路径
+        json={  # 请求体
+            **base,  # 公共字段
+            "type": "PLACE_TILE",  # 铺设地块
+            "payload": {"tile": "ROAD"},  # 指定瓦片
+            "shape": {"kind": "line", "to": {"x": 4, "y": 2}},  # 直线终点
+        },  # 结束请求体
+    )  # 结束请求
+    assert line.status_code == 200  # 断言成功
+    body = line.json()  # 解析响应
+    assert body["changes"] == [] and len(body["change_groups"]) == 1  # 相同变更合并为一组
+    assert body["change_groups"][0]["positions"] == [[0, 0], [1, 1], [2, 1], [3, 2], [4, 2]]
+    flood = client.post(  # 提交洪泛笔刷
+        "/world/action",  # 指定路径
+        json={  # 请求体
+            **base,  # 公共字段
+            "type": "PLACE_TILE",  # 铺设地块
+            "pos": {"x": 10, "y": 10},  # 起点位于草地
+            "payload": {"tile": "SOIL"},  # 指定瓦片
+            "shape": {"kind": "flood", "limit": 3},  # 洪泛上限
+        },  # 结束请求体
+    )  # 结束请求
+    assert flood.status_code == 200  # 断言成功
+    assert flood.json()["change_groups"][0]["positions"] == [
+        [10, 10],
+        [9, 10],
+        [11, 10],
+    ]  # 广度优先
+    rejected = client.post(  # 矩形覆盖到 ROAD,不允许种树
+        "/world/action",  # 指定路径
+        json={  # 请求体
+            **base,  # 公共字段
+            "type": "PLANT_TREE",  # 种树
+            "pos": {"x": 5, "y": 2},  # 起点位于草地
+            "shape": {"kind": "rect", "to": {"x": 3, "y": 2}},  # 覆盖 (3, 2) 石路
+        },  # 结束请求体
+    )  # 结束请求
+    assert rejected.status_code == 400 and "(3, 2)" in rejected.json()["msg"]  # 定位违规格子
+    over_quota = client.post(  # 25 格超过每日 20 次种树配额
+        "/world/action",  # 指定路径
+        json={  # 请求体
+            **base,  # 公共字段
+            "type": "PLANT_TREE",  # 种树
+            "pos": {"x": 20, "y": 20},  # 起点
+            "shape": {"kind": "rect", "to": {"x": 24, "y": 24}},  # 5x5 矩形
+        },  # 结束请求体
+    )  # 结束请求
+    assert over_quota.status_code == 429  # 按格计量配额
+    chunk = client.get("/world/chunk", params={"cx": 25, "cy": 25}).json()  # 重新读取区块
+    assert chunk["grid"][2][5]["deco"] is None and chunk["grid"][20][20]["deco"] is None  # 未生效
+    assert [chunk["grid"][10][x]["base"] for x in range(8, 13)] == [  # 洪泛只覆盖 3 格
+        "GRASS",
+        "SOIL",
+        "SOIL",
+        "SOIL",
+        "GRASS",
+    ]
+
+
+def test_permission_engine_matches_role_permission() -> None:  # 定义测试函数,验证权限编译
+    """编译后的位集与禁区位图和原始 RolePermission 判断一致,同一映射不会重复编译。"""  # docstring
+
+    regions = [  # 两个重叠禁区与一个越界禁区
+        ForbiddenRegion(cx=1, cy=2, x_range=(0, 3), y_range=(5, 6)),  # 左侧禁区
+        ForbiddenRegion(cx=1, cy=2, x_range=(2, 40), y_range=(6, 6)),  # 超出区块的禁区
+        ForbiddenRegion(cx=0, cy=0, x_range=(31, 31), y_range=(31, 31)),  # 角落单格
+    ]  # 结束列表
+    permission = RolePermission(  # 构造原始权限
+        allowed_actions={"PLACE_TILE", "REMOVE_TILE"},  # 允许的动作
+        tile_whitelist={"PLACE_TILE": [TileType.ROAD, TileType.SOIL]},  # 白名单
+        forbidden_remove_bases=[TileType.WATER],  # 禁拆瓦片
+        cooldown_seconds={"REMOVE_TILE": 30},  # 冷却
+        forbidden_regions=regions,  # 禁区
+    )  # 结束构造
+    permissions = {"测试者": permission}  # 权限映射
+    engine = PermissionEngine(permissions, chunk_size=32)  # 编译权限
+    role = engine.get("测试者")  # 读取编译结果
+    assert role is not None and engine.get("路人") is None  # 未知角色返回 None
+    for cx, cy in ((1, 2), (0, 0), (5, 5)):  # 遍历区块
+        for y in range(32):  # 遍历行
+            for x in range(32):  # 遍历列
+                expected = any(region.contains(cx, cy, x, y) for region in regions)  # 原始判断
+                assert role.forbids(cx, cy, x, y) is expected  # 位图判断一致
+    assert [role.allows_tile("PLACE_TILE", tile) for tile in ("ROAD", "GRASS")] == [True, False]
+    assert role.allows_tile("REMOVE_TILE", TileType.GRASS)  # 未配置白名单时不限制
+    assert role.protects_base(TileType.WATER) and not role.protects_base(TileType.ROAD)  # 禁拆
+    assert role.limits == {"REMOVE_TILE": (None, 30)}  # 配额与冷却合并
+    engine.reload(permissions)  # 同一映射
+    assert engine.get("测试者") is role  # 未重新编译
+    engine.reload({"测试者": permission.model_copy(update={"forbidden_regions": []})})  # 新映射
+    assert not engine.get("测试者").forbids(1, 2, 0, 5)  # 重新编译后禁区消失
+
+
+def test_role_permissions_are_read_only() -> None:  # 定义测试函数,验证权限映射只读
+    """配置返回的权限映射只读且在配置未变化时为同一对象,调用方无法改动全局权限表。"""
+
+    settings = get_settings()  # 加载配置
+    permissions = settings.role_permissions  # 读取权限映射
+    assert settings.role_permissions is permissions  # 配置未变化时返回同一映射
+    with pytest.raises(TypeError):  # 只读视图拒绝写入
+        permissions["路人"] = permissions["勇者"]  # 尝试新增角色
+    with pytest.raises(TypeError):  # 只读视图拒绝删除
+        del permissions["勇者"]  # 尝试删除角色
+    assert "路人" not in settings.role_permissions and "勇者" in settings.role_permissions
@@ -5,6 +5,7 @@ from __future__ import annotations  # 导入未来注解特性,支持前向引
 from fastapi.testclient import TestClient  # 导入 TestClient,用于模拟 HTTP 请求
 
 from miniWorld.app import app  # 导入 FastAPI 应用实例
+from miniWorld.config import get_settings  # 导入配置获取函数
 
 client = TestClient(app)  # 创建测试客户端
 
@@ -23,6 +24,15 @@ def test_world_state_and_chunk_endpoints() -> None:  # 定义测试函数,验证
     assert len(chunk["grid"]) == 32  # 断言行数为 32
     assert len(chunk["grid"][0]) == 32  # 断言列数为 32
 
+    log_response = client.get("/world/log", params={"limit": 1})  # 请求审计日志
+    assert log_response.status_code == 200  # 断言成功
+    assert {"entries", "next_cursor"} == set(log_response.json())  # 断言分页结构
+    assert client.get("/world/log", params={"cx": 0}).status_code == 400  # 区块坐标需成对
+
+    stats_response = client.get("/world/stats")  # 请求存储统计
+    assert stats_response.status_code == 200  # 断言成功
+    assert stats_response.json()["cache"]["hits"] + stats_response.json()["cache"]["misses"] > 0
+
 
 def test_world_quests_and_personas() -> None:  # 定义测试函数,验证任务与人设接口
     """确保任务列表与角色权限接口返回结构化数据。"""  # 函数 docstring,说明测试目标
@@ -31,6 +41,14 @@ def test_world_quests_and_personas() -> None:  # 定义测试函数,验证任务
     assert quests_response.status_code == 200  # 断言成功
     quests = quests_response.json()  # 解析 JSON
     assert isinstance(quests, list)  # 断言返回列表
+    first = client.get("/world/quests", params={"giver": "公主", "limit": 1})  # 按发布者分页
+    assert [quest["giver"] for quest in first.json()] == ["公主"]  # 断言只返回一条
+    cursor = first.headers["X-Next-Cursor"]  # 读取下一页游标
+    second = client.get("/world/quests", params={"giver": "公主", "cursor": cursor, "limit": 50})
+    expected = [quest["id"] for quest in quests if quest["giver"] == "公主"]  # 全量过滤结果
+    assert [quest["id"] for quest in first.json() + second.json()] == expected  # 翻页结果一致
+    assert "X-Next-Cursor" not in second.headers  # 最后一页没有游标
+    assert client.get("/world/quests", params={"cy": 0}).status_code == 400  # 区块坐标需成对
 
     personas_response = client.get("/personas")  # 请求人设列表
     assert personas_response.status_code == 200  # 断言成功
@@ -61,3 +79,26 @@ def test_action_error_and_tick_endpoint() -> None:  # 定义测试函数,验证
     tick_payload = tick_response.json()  # 解析 JSON
     assert "message" in tick_payload  # 断言包含消息
     assert "changes" in tick_payload  # 断言包含变更列表
+
+
+def test_tick_responses_omit_lazy_growth() -> None:  # 定义测试函数,验证 tick 变更范围
+    """树苗与作物在读取区块时惰性成长,tick 响应只包含灌木等逐 tick 系统的变更。"""
+
+    response = client.post(  # 种下树苗
+        "/world/action",  # 指定路径
+        json={  # 构建请求体
+            "actor": "神官",  # 执行动作的角色
+            "type": "PLANT_TREE",  # 动作类型
+            "chunk": {"cx": 40, "cy": 40},  # 独立区块
+            "pos": {"x": 4, "y": 4},  # 目标坐标
+            "payload": {},  # 种树无需额外 payload
+            "client_ts": 60 * 86_400_000,  # 独立日期,避免与其他测试共享配额
+        },  # 结束 JSON
+    )  # 结束请求
+    assert response.json()["success"] is True  # 断言种植成功
+    changes = []  # 收集 tick 变更
+    for _ in range(get_settings().tick_tree_grow_steps):  # 推进到树苗成熟
+        changes += client.post("/world/tick").json()["changes"]  # 累加变更
+    assert all(c["chunk"] != {"cx": 40, "cy": 40} for c in changes)  # 成长不出现在 tick 变更中
+    chunk = client.get("/world/chunk", params={"cx": 40, "cy": 40}).json()  # 读取区块
+    assert chunk["grid"][4][4]["deco"] == "TREE"  # 读取时已追赶成树
@@ -0,0 +1,150 @@
+"""针对线程池卸载的异步存储包装的测试用例。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import asyncio  # 导入 asyncio,用于驱动异步存储
+import threading  # 导入 threading,保护测试中的并发计数
+import time  # 导入 time,用于模拟慢速写入
+
+from miniWorld.world.async_store import AsyncWorldStore  # 导入异步存储包装
+from miniWorld.world.chunk import TileCell  # 导入格子模型
+from miniWorld.world.flusher import WriteBehindFlusher  # 导入后台刷盘器
+from miniWorld.world.tiles import TileType  # 导入瓦片类型
+from tests.conftest import StoreFactory  # 导入存储工厂类型
+
+
+def test_async_store_serializes_same_chunk_and_parallelizes_others(
+    make_store: StoreFactory,
+) -> None:
+    """同一区块的编辑在线程池中串行且不丢失,不同区块并行执行,tick 独占时等待全部动作。"""
+
+    store = make_store()  # 创建临时世界存储
+    async_store = AsyncWorldStore(store, max_workers=4)  # 创建异步包装
+    active: dict[tuple[int, int], int] = {}  # 每个区块正在执行的编辑数
+    overlaps: list[tuple[int, int]] = []  # 记录同区块的并发编辑
+    peak = [0]  # 全局同时进行的编辑数峰值
+    guard = threading.Lock()  # 保护计数
+
+    def edit(cx: int, cy: int, x: int) -> None:  # 定义阻塞编辑
+        """读取-修改-写回一个格子,中间模拟慢速磁盘。"""  # 函数 docstring,说明用途
+
+        with guard:  # 加锁登记进入
+            active[(cx, cy)] = active.get((cx, cy), 0) + 1  # 登记进入
+            if active[(cx, cy)] > 1:  # 同区块已有编辑
+                overlaps.append((cx, cy))  # 记录并发
+            peak[0] = max(peak[0], sum(active.values()))  # 更新峰值
+        chunk = store.load_chunk(cx=cx, cy=cy)  # 加载区块
+        time.sleep(0.02)  # 模拟慢速磁盘
+        chunk.apply_cell(x, 0, TileCell(base=TileType.ROAD))  # 修改格子
+        store.save_chunk(chunk)  # 写回区块
+        with guard:  # 加锁登记离开
+            active[(cx, cy)] -= 1  # 登记离开
+
+    async def locked_edit(cx: int, cy: int, x: int) -> None:  # 定义加锁编辑
+        """持有区块锁在线程池中执行编辑。"""  # 函数 docstring,说明用途
+
+        async with async_store.chunk_locked(cx, cy):  # 锁定区块
+            await async_store.run(edit, cx, cy, x)  # 卸载执行
+
+    async def scenario() -> list[str]:  # 定义测试场景
+        """并发提交编辑与一次独占操作,返回执行顺序。"""  # 函数 docstring,说明用途
+
+        order: list[str] = []  # 记录完成顺序
+
+        async def exclusive() -> None:  # 定义独占操作
+            """等待全部区块编辑结束后执行。"""  # 函数 docstring,说明用途
+
+            await asyncio.sleep(0.005)  # 让编辑先进入
+            async with async_store.world_locked():  # 独占世界
+                order.append("tick" if not any(active.values()) else "overlap")  # 记录状态
+
+        await asyncio.gather(  # 并发执行
+            *(locked_edit(0, 0, x) for x in range(4)),  # 同一区块四次编辑
+            *(locked_edit(cx, 1, 0) for cx in range(4)),  # 四个不同区块各一次编辑
+            exclusive(),  # 一次独占操作
+        )  # 结束并发
+        return order  # 返回顺序
+
+    order = asyncio.run(scenario())  # 运行场景
+    async_store.shutdown()  # 关闭线程池
+    assert not overlaps  # 同区块编辑从未并发
+    assert order == ["tick"]  # 独占操作执行时没有进行中的编辑
+    assert peak[0] > 1  # 不同区块的编辑并行执行
+    chunk = store.load_chunk(cx=0, cy=0)  # 读取同区块结果
+    assert [chunk.cell_at(x, 0).base for x in range(4)] == [TileType.ROAD] * 4  # 编辑均未丢失
+
+
+def test_flush_waits_for_in_flight_batch(make_store: StoreFactory) -> None:  # 定义测试函数
+    """刷盘与批量动作并发时,等待批量动作完成后再编码,落盘的格子与修订号来自同一时刻。"""
+
+    store = make_store(write_behind=True, flush_threshold=1_000)  # 创建延迟写回存储
+    async_store = AsyncWorldStore(store, max_workers=2)  # 创建异步包装
+    flusher = WriteBehindFlusher(async_store, interval_seconds=60)  # 创建刷盘器,不启动后台任务
+    chunk = store.load_chunk(cx=0, cy=0)  # 加载区块
+    chunk.apply_cell(0, 0, TileCell(base=TileType.ROAD))  # 修改格子
+    store.save_chunk(chunk)  # 区块成为脏数据,修订号为 1
+    started = threading.Event()  # 批量动作已开始修改
+
+    def batch() -> None:  # 定义阻塞的批量动作
+        """逐格修改区块,中途模拟慢速处理,最后保存一次。"""  # 函数 docstring,说明用途
+
+        chunk = store.load_chunk(cx=0, cy=0)  # 加载区块
+        for x in range(1, 5):  # 逐格修改
+            chunk.apply_cell(x, 0, TileCell(base=TileType.ROAD))  # 修改格子
+            started.set()  # 通知已开始
+            time.sleep(0.01)  # 模拟慢速处理
+        store.save_chunk(chunk)  # 保存区块,修订号为 2
+
+    async def scenario() -> int:  # 定义测试场景
+        """批量动作开始修改后立即刷盘。"""  # 函数 docstring,说明用途
+
+        async def locked_batch() -> None:  # 定义加锁批量动作
+            """持有区块锁在线程池中执行批量动作。"""  # 函数 docstring,说明用途
+
+            async with async_store.chunks_locked([(0, 0)]):  # 锁定区块
+                await async_store.run(batch)  # 卸载执行
+
+        task = asyncio.create_task(locked_batch())  # 启动批量动作
+        await asyncio.to_thread(started.wait, 5)  # 等待批量动作进入修改
+        written = await flusher.flush_once()  # 并发刷盘
+        await task  # 等待批量动作结束
+        return written  # 返回写入数量
+
+    assert asyncio.run(scenario()) > 0  # 刷盘写出了区块
+    async_store.shutdown()  # 关闭线程池
+    on_disk = make_store().load_chunk(cx=0, cy=0)  # 从磁盘重新加载
+    assert on_disk.revision == 2  # 修订号与批量动作后的内容一致
+    assert [on_disk.cell_at(x, 0).base for x in range(5)] == [TileType.ROAD] * 5  # 没有半完成
+
+
+def test_flush_skips_world_gate_when_not_needed(make_store: StoreFactory) -> None:  # 定义测试函数
+    """没有脏数据或同步写入模式下只有用量账本待写时,刷盘不等待进行中的动作。"""
+
+    store = make_store()  # 创建同步写入存储
+    async_store = AsyncWorldStore(store, max_workers=2)  # 创建异步包装
+    flusher = WriteBehindFlusher(async_store, interval_seconds=60)  # 创建刷盘器,不启动后台任务
+
+    async def scenario() -> tuple[int, int]:  # 定义测试场景
+        """一个动作持有区块锁期间执行两次刷盘。"""  # 函数 docstring,说明用途
+
+        held, done = asyncio.Event(), asyncio.Event()  # 动作已持锁、允许动作结束
+
+        async def action() -> None:  # 定义长时间持锁的动作
+            """持有区块锁直到刷盘完成。"""  # 函数 docstring,说明用途
+
+            async with async_store.chunk_locked(0, 0):  # 锁定区块
+                held.set()  # 通知已持锁
+                await done.wait()  # 等待刷盘完成
+
+        task = asyncio.create_task(action())  # 启动动作
+        await held.wait()  # 等待动作持锁
+        empty = await asyncio.wait_for(flusher.flush_once(), timeout=1)  # 无脏数据
+        store.ensure_usage("甲", "PLACE_TILE", client_ts=1_000, quota=None, cooldown=None)
+        usage = await asyncio.wait_for(flusher.flush_once(), timeout=1)  # 只有用量账本
+        done.set()  # 允许动作结束
+        await task  # 等待动作结束
+        return empty, usage  # 返回写入数量
+
+    assert asyncio.run(scenario()) == (0, 1)  # 两次刷盘都未等待世界闸门
+    async_store.shutdown()  # 关闭线程池
+    assert store.dirty_count == 0  # 用量账本已写出
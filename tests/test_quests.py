@@ -2,14 +2,24 @@
 
 from __future__ import annotations  # 导入未来注解特性,支持前向引用
 
+import json  # 导入 json,用于写入旧版任务文档
 import time  # 导入 time,用于生成时间戳
+from pathlib import Path  # 导入 Path,用于临时目录类型标注
 
 from fastapi.testclient import TestClient  # 导入 TestClient,用于调用接口
 
 from miniWorld.app import _progressor, _store, app  # 导入应用、任务推进器与存储
-from miniWorld.world.actions import ChunkCoord  # 导入区块坐标模型
-from miniWorld.world.quests import ActionRequirement, Quest, QuestStatus  # 导入任务模型
-from miniWorld.world.tiles import TileType  # 导入瓦片类型
+from miniWorld.config import get_settings  # 导入配置
+from miniWorld.world.actions import ActionRequest, CellChange, ChunkCoord  # 导入动作相关模型
+from miniWorld.world.quests import (  # 导入任务模型与推进器
+    ActionRequirement,
+    Quest,
+    QuestProgressor,
+    QuestStatus,
+)
+from miniWorld.world.spatial import SpatialIndex  # 导入空间索引
+from miniWorld.world.store import WorldStore  # 导入世界存储
+from miniWorld.world.tiles import TileType, tile_to_code  # 导入瓦片类型与编码函数
 
 client = TestClient(app)  # 创建测试客户端
 
@@ -77,3 +87,196 @@ def test_quest_progression() -> None:  # 定义测试函数,验证任务推进
         _progressor.save_quests([Quest.model_validate(item) for item in original])  # 恢复原任务
         if chunk_path.exists():  # 若测试区块文件存在
             chunk_path.unlink()  # 删除以避免污染
+
+
+def test_spatial_index_matches_brute_force() -> None:  # 定义测试函数,验证空间索引
+    """空间索引返回的候选与逐个调用 ActionRequirement.matches 的结果一致。"""  # docstring
+
+    requirements = [  # 构造若干重叠、跨桶与越界的需求
+        ActionRequirement(  # 构造需求
+            action_type="PLACE_TILE",  # 动作类型
+            chunk=ChunkCoord(cx=cx, cy=0),  # 区块
+            x_range=(x0, x0 + width),  # X 范围
+            y_range=(y0, y0 + height),  # Y 范围
+            target_count=1,  # 目标次数
+        )  # 结束构造
+        for cx, x0, y0, width, height in (  # 参数组合
+            (0, 0, 0, 31, 31),  # 整个区块
+            (0, 5, 6, 4, 10),  # 跨桶矩形
+            (0, 30, 30, 8, 8),  # 超出区块
+            (1, 9, 9, 0, 0),  # 其他区块的单格
+        )  # 结束参数
+    ]  # 结束列表
+    index: SpatialIndex[ActionRequirement] = SpatialIndex(chunk_size=32)  # 创建索引
+    for requirement in requirements:  # 登记需求
+        index.insert(  # 登记矩形
+            requirement.chunk.cx,  # 区块 X 坐标
+            requirement.chunk.cy,  # 区块 Y 坐标
+            requirement.x_range,  # X 范围
+            requirement.y_range,  # Y 范围
+            requirement,  # 条目
+        )  # 结束登记
+    for cx in (0, 1, 2):  # 遍历区块
+        for y in range(32):  # 遍历行
+            for x in range(32):  # 遍历列
+                change = CellChange(cx, 0, x, y, (1, 0, 0, 0xFF), (2, 0, 0, 0xFF))  # 构造变更
+                expected = [req for req in requirements if req.matches(change, "PLACE_TILE")]
+                assert index.query(cx, 0, x, y) == expected  # 候选一致且保持登记顺序
+                assert index.covers(cx, 0, x, y) is bool(expected)  # 覆盖位图一致
+
+
+def test_progressor_keeps_index_and_persists_changed_quests(tmp_path: Path) -> None:  # 定义测试函数
+    """推进器复用内存索引,只记录进度变化的任务,任务列表被替换后重新解析。"""  # docstring
+
+    settings = get_settings()  # 加载配置
+
+    def open_store() -> WorldStore:  # 定义存储构建函数
+        """创建启用预写日志的存储。"""  # 函数 docstring,说明用途
+
+        return WorldStore(  # 创建世界存储
+            root=tmp_path,  # 使用临时目录
+            chunk_size=settings.chunk_size,  # 传入区块尺寸
+            default_world_state=settings.world_state,  # 传入默认世界状态
+            tick_tree_grow_steps=settings.tick_tree_grow_steps,  # 传入树苗成长步数
+            journal=True,  # 启用预写日志
+        )  # 结束存储初始化
+
+    def quest(quest_id: str, cx: int) -> dict:  # 定义任务构建函数
+        """构造一个在指定区块铺两次石路的任务。"""  # 函数 docstring,说明用途
+
+        requirement = ActionRequirement(  # 构造需求
+            action_type="PLACE_TILE",  # 动作类型
+            target_tile=TileType.ROAD,  # 目标瓦片
+            chunk=ChunkCoord(cx=cx, cy=0),  # 目标区块
+            target_count=2,  # 目标次数
+        )  # 结束构造
+        return Quest(  # 构造任务
+            id=quest_id,  # 任务 ID
+            title="铺路",  # 标题
+            desc="铺设石路",  # 描述
+            giver="村长",  # 发布者
+            requirements=[requirement],  # 需求列表
+            created_at=0,  # 创建时间
+            updated_at=0,  # 更新时间
+        ).model_dump(
+            mode="json"
+        )  # 导出字典
+
+    grass, road = tile_to_code(TileType.GRASS), tile_to_code(TileType.ROAD)  # 瓦片编码
+
+    def place(cx: int, x: int, ts: int) -> None:  # 定义推进函数
+        """模拟在区块 (cx, 0) 的格子 (x, 0) 铺设石路并推进任务。"""  # 函数 docstring
+
+        request = ActionRequest(  # 构造请求
+            actor="勇者",  # 角色
+            type="PLACE_TILE",  # 动作类型
+            chunk={"cx": cx, "cy": 0},  # 区块
+            pos={"x": x, "y": 0},  # 格子
+            payload={"tile": "ROAD"},  # 铺设石路
+            client_ts=ts,  # 时间戳
+        )  # 结束构造
+        change = CellChange(cx, 0, x, 0, (grass, 0, 0, 0), (road, 0, 0, 0))  # 单格变更
+        progressor.on_action_success("勇者", request, [change])  # 推进任务
+
+    store = open_store()  # 创建存储
+    store.save_quests_raw([quest("q1", 0), quest("q2", 1), quest("q3", 2)])  # 写入任务
+    generation = store.quests_generation  # 记录任务表版本
+    progressor = QuestProgressor(store)  # 创建推进器
+    place(1, 0, 1_000)  # 推进 q2
+    place(1, 1, 2_000)  # 完成 q2
+    place(1, 2, 3_000)  # 已完成任务不再推进
+    assert store.quests_generation == generation + 2  # 两次推进各按 ID 写回一次
+    raw = store.load_quests_raw()  # 读取任务
+    statuses = [item["status"] for item in raw]  # 读取状态
+    assert statuses == ["OPEN", "DONE", "OPEN"]  # 只有 q2 变化
+    assert raw[1]["requirements"][0]["progress"] == 2 and raw[1]["updated_at"] == 2_000
+
+    store.save_quests_raw([quest("q4", 2)])  # 外部整表替换任务
+    place(2, 0, 4_000)  # 推进新任务
+    assert [item["status"] for item in store.load_quests_raw()] == ["IN_PROGRESS"]  # 重新解析
+
+    recovered = open_store()  # 模拟重启,回放日志中的单任务记录
+    assert [item["id"] for item in recovered.load_quests_raw()] == ["q4"]  # 任务列表已恢复
+    assert recovered.load_quests_raw()[0]["status"] == "IN_PROGRESS"  # 增量已恢复
+
+
+def test_quest_store_indexes_migration_and_pagination(tmp_path: Path) -> None:  # 定义测试函数
+    """旧版整表任务迁移为逐条记录,索引过滤与分页结果与全量过滤一致,重启后保持顺序。"""
+
+    settings = get_settings()  # 加载配置
+
+    def open_store() -> WorldStore:  # 定义存储构建函数
+        """创建文件布局的存储。"""  # 函数 docstring,说明用途
+
+        return WorldStore(  # 创建世界存储
+            root=tmp_path,  # 使用临时目录
+            chunk_size=settings.chunk_size,  # 传入区块尺寸
+            default_world_state=settings.world_state,  # 传入默认世界状态
+            tick_tree_grow_steps=settings.tick_tree_grow_steps,  # 传入树苗成长步数
+        )  # 结束存储初始化
+
+    def quest(index: int) -> dict:  # 定义任务构建函数
+        """按序号构造发布者、执行者、状态与区块交错分布的任务。"""  # 函数 docstring
+
+        return {  # 任务字典
+            "id": f"q{index}",  # 任务 ID
+            "giver": ("公主", "神官")[index % 2],  # 发布者
+            "assignee": ["勇者", "剑士", "盗贼"][: index % 3 + 1],  # 执行者
+            "status": ("OPEN", "IN_PROGRESS", "DONE")[index % 3],  # 状态
+            "requirements": [{"chunk": {"cx": index % 4, "cy": 0}}],  # 需求区块
+        }  # 结束字典
+
+    legacy = tmp_path / "world" / "quests.json"  # 旧版整表文档
+    legacy.parent.mkdir(parents=True)  # 创建目录
+    legacy.write_text(json.dumps([quest(0), quest(1)]), encoding="utf-8")  # 写入旧格式
+    store = open_store()  # 创建存储
+    assert [item["id"] for item in store.load_quests_raw()] == ["q0", "q1"]  # 迁移后顺序不变
+    assert legacy.exists()  # 旧文档原样保留
+    store.update_quests_raw([quest(index) for index in range(2, 120)])  # 追加任务
+    store.update_quests_raw([{**quest(7), "status": "DONE", "assignee": []}])  # 修改索引字段
+    assert len(list((tmp_path / "world" / "quests").glob("*.json"))) == 120  # 每个任务一条记录
+    assert len(open_store().load_quests_raw()) == 120  # 重新打开后只读取逐条记录,不再迁移
+
+    def brute(items: list[dict], filters: dict) -> list[str]:  # 定义全量过滤函数
+        """逐个检查任务字段,作为索引查询的对照。"""  # 函数 docstring,说明用途
+
+        assignee, cx = filters.get("assignee"), filters.get("cx")  # 执行者与区块条件
+        return [  # 返回 ID 列表
+            item["id"]  # 任务 ID
+            for item in items  # 遍历任务
+            if filters.get("status") in (None, item["status"])  # 状态
+            and filters.get("giver") in (None, item["giver"])  # 发布者
+            and (assignee is None or assignee in item["assignee"])  # 执行者
+            and (cx is None or item["requirements"][0]["chunk"]["cx"] == cx)  # 区块
+        ]  # 结束列表
+
+    def paged(target: WorldStore, filters: dict) -> list[str]:  # 定义翻页查询函数
+        """以每页 7 条翻完全部结果。"""  # 函数 docstring,说明用途
+
+        ids: list[str] = []  # 初始化结果
+        cursor = None  # 初始游标
+        while True:  # 翻页
+            page, cursor = target.query_quests_raw(**filters, cursor=cursor, limit=7)  # 查询一页
+            ids.extend(item["id"] for item in page)  # 收集 ID
+            if cursor is None:  # 最后一页
+                return ids  # 返回结果
+
+    cases = [  # 过滤条件组合
+        {},  # 不过滤
+        {"status": "DONE"},  # 按状态
+        {"giver": "神官", "status": "OPEN"},  # 发布者与状态
+        {"assignee": "盗贼", "cx": 3, "cy": 0},  # 执行者与区块
+        {"assignee": "无名氏"},  # 不存在的执行者
+    ]  # 结束列表
+    for filters in cases:  # 遍历条件
+        assert paged(store, filters) == brute(store.load_quests_raw(), filters)  # 与全量过滤一致
+    assert "q7" in paged(store, {"status": "DONE"})  # 状态索引已更新
+    assert "q7" not in paged(store, {"assignee": "勇者"})  # 执行者索引已更新
+    store.close()  # 关闭存储
+
+    reopened = open_store()  # 模拟重启
+    assert reopened.load_quests_raw() == store.load_quests_raw()  # 顺序与内容一致
+    for filters in cases:  # 遍历条件
+        assert paged(reopened, filters) == brute(reopened.load_quests_raw(), filters)  # 索引重建
+    reopened.save_quests_raw([quest(200)])  # 整体替换
+    assert len(list((tmp_path / "world" / "quests").glob("*.json"))) == 1  # 旧记录已删除
@@ -0,0 +1,56 @@
+"""针对后台模拟调度器的测试用例。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import asyncio  # 导入 asyncio,用于驱动调度器
+
+from miniWorld.world.async_store import AsyncWorldStore  # 导入异步存储包装
+from miniWorld.world.scheduler import SimulationScheduler  # 导入模拟调度器
+from tests.conftest import StoreFactory  # 导入存储工厂类型
+
+
+def test_simulation_scheduler_publishes_and_handles_overload(
+    make_store: StoreFactory,
+) -> None:  # 调度测试
+    """手动与后台 tick 都会发布事件;过载时 skip 跳过错过的 tick,catch_up 有上限地补跑。"""
+
+    store = make_store()  # 创建临时世界存储
+    async_store = AsyncWorldStore(store, max_workers=2)  # 创建异步存储包装
+    calls: list[int] = []  # 记录 tick 函数调用
+
+    def tick() -> tuple[int, list[dict]]:  # 定义 tick 函数
+        """模拟从 tick 100 开始的世界,返回世界 tick 与一条带调用序号的变更。"""
+
+        calls.append(len(calls) + 1)  # 登记调用
+        return 100 + len(calls), [{"call": len(calls)}]  # 返回世界 tick 与变更
+
+    scheduler = SimulationScheduler(async_store, tick, interval_seconds=0.02, queue_size=2)
+
+    async def scenario() -> list[tuple[int, bool]]:  # 定义测试场景
+        """手动触发三次,再让后台任务运行一段时间,返回订阅到的事件。"""  # 函数 docstring
+
+        async with scheduler.subscribe() as queue:  # 登记订阅者
+            for _ in range(3):  # 手动触发三次
+                event = await scheduler.trigger()  # 执行 tick
+            assert event.changes == [{"call": 3}]  # 返回本次变更
+            manual = [queue.get_nowait() for _ in range(queue.qsize())]  # 取出事件
+            scheduler.start()  # 启动后台任务
+            background = await asyncio.wait_for(queue.get(), timeout=2)  # 等待后台事件
+            await scheduler.stop()  # 停止后台任务
+        return [(item.tick, item.manual) for item in [*manual, background]]  # 返回事件摘要
+
+    events = asyncio.run(scenario())  # 运行场景
+    async_store.shutdown()  # 关闭线程池
+    assert events[:2] == [(102, True), (103, True)]  # 队列长度为 2,最旧的事件被丢弃
+    assert events[2] == (104, False)  # 事件携带世界 tick,而不是调度器计数
+    assert not scheduler.running and scheduler.stats["subscribers"] == 0  # 已停止并注销订阅
+
+    skip = SimulationScheduler(async_store, tick, interval_seconds=1.0, policy="skip")  # 跳过
+    assert skip._next_deadline(10.0, 10.5) == 11.0  # 未过载时推进一个间隔
+    assert skip._next_deadline(10.0, 13.5) == 14.0  # 错过 11、12、13 三个截止时间
+    assert skip.skipped == 3  # 全部计入跳过数
+    catch_up = SimulationScheduler(  # 有上限的补跑
+        async_store, tick, interval_seconds=1.0, policy="catch_up", max_catch_up=2
+    )  # 结束构造
+    assert catch_up._next_deadline(10.0, 13.5) == 12.0  # 跳过 11,立即补跑 12 与 13
+    assert catch_up.skipped == 1  # 超出上限的部分计入跳过数
@@ -0,0 +1,61 @@
+"""针对存储后端与区块缓存的测试用例。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+from pathlib import Path  # 导入 Path,用于临时目录类型标注
+
+from miniWorld.world.backends import FileBackend, SqliteBackend, copy_backend  # 导入存储后端
+from miniWorld.world.chunk import TileCell  # 导入格子模型
+from miniWorld.world.tiles import TileType  # 导入瓦片类型
+from tests.conftest import StoreFactory  # 导入存储工厂类型
+
+
+def test_sqlite_backend_roundtrip_and_migration(
+    tmp_path: Path, make_store: StoreFactory
+) -> None:  # 定义测试函数,验证 SQLite
+    """文件布局的数据应能迁移到 SQLite,并通过同一 WorldStore 接口读写。"""  # 函数 docstring
+
+    file_store = make_store()  # 创建文件布局存储
+    chunk = file_store.load_chunk(cx=2, cy=-3)  # 加载区块
+    chunk.apply_cell(1, 1, TileCell(base=TileType.WATER, height=-2))  # 修改格子
+    file_store.save_chunk(chunk)  # 保存区块
+    file_store.save_quests_raw([{"id": "q1"}])  # 保存任务
+    file_store.append_action_log("甲", "PLACE_TILE", {"cx": 2, "cy": -3}, {"x": 1, "y": 1}, {})
+    file_store.close()  # 关闭存储,写入缓冲的审计日志
+
+    backend = SqliteBackend(tmp_path / "world.db")  # 创建 SQLite 后端
+    counts = copy_backend(FileBackend(tmp_path), backend)  # 迁移数据
+    assert counts == {"chunks": 1, "documents": 0, "quests": 1, "log_lines": 1}  # 任务逐条迁移
+    sqlite_store = make_store(chunk_format="binary", backend=backend)  # 创建 SQLite 存储
+    assert sqlite_store.load_chunk(cx=2, cy=-3).cell_at(1, 1).height == -2  # 区块已迁移
+    assert sqlite_store.load_quests_raw() == [{"id": "q1"}]  # 任务已迁移
+    with sqlite_store.transaction():  # 一次动作一个事务
+        moved = sqlite_store.load_chunk(cx=5, cy=5)  # 加载新区块
+        moved.apply_cell(0, 0, TileCell(base=TileType.ROAD))  # 修改格子
+        sqlite_store.save_chunk(moved)  # 保存区块
+        sqlite_store.append_action_log("甲", "PLACE_TILE", {"cx": 5, "cy": 5}, {"x": 0, "y": 0}, {})
+    assert backend.list_chunk_keys() == [(2, -3), (5, 5)]  # 按主键列出区块
+    assert len(list(backend.iter_log_lines())) == 2  # 审计日志写入数据库
+    assert not (tmp_path / "world" / "chunks" / "5_5.chunk").exists()  # 未写入文件布局
+    sqlite_store.close()  # 关闭存储
+
+
+def test_chunk_cache_is_bounded_and_keeps_dirty_chunks(
+    make_store: StoreFactory,
+) -> None:  # 定义测试函数
+    """区块缓存超出上限时按 LRU 淘汰,未落盘的脏区块保持常驻。"""  # 函数 docstring,说明测试目标
+
+    store = make_store(write_behind=True, cache_max_chunks=2)  # 创建小缓存的延迟写回存储
+    dirty = store.load_chunk(cx=0, cy=0)  # 加载区块
+    dirty.apply_cell(0, 0, TileCell(base=TileType.ROAD))  # 修改格子
+    store.save_chunk(dirty)  # 标记为脏区块
+    for cx in range(1, 6):  # 扫描更多坐标
+        store.load_chunk(cx=cx, cy=9)  # 加载默认区块
+    stats = store.cache_stats  # 读取统计
+    assert stats["chunks"] == 2 and stats["evictions"] == 4  # 缓存保持在上限
+    assert store.load_chunk(cx=0, cy=0) is dirty  # 脏区块未被淘汰
+    assert store.cache_stats["hits"] == 1  # 命中计数增加
+    store.flush()  # 刷盘后脏区块可被淘汰
+    store.load_chunk(cx=7, cy=9)  # 加载新区块
+    store.load_chunk(cx=8, cy=9)  # 再加载一个区块
+    assert store.load_chunk(cx=0, cy=0).cell_at(0, 0).base == TileType.ROAD  # 从磁盘重新加载
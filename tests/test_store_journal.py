@@ -0,0 +1,80 @@
+"""针对延迟写回与预写日志恢复的测试用例。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+from pathlib import Path  # 导入 Path,用于临时目录类型标注
+
+import pytest  # 导入 pytest,用于断言异常
+
+from miniWorld.config import get_settings  # 导入配置获取函数
+from miniWorld.world.chunk import TileCell  # 导入格子模型
+from miniWorld.world.store import UsageLimitError, WorldStore  # 导入世界存储与用量异常
+from miniWorld.world.systems import build_tick_engine  # 导入默认引擎工厂
+from miniWorld.world.tiles import TileType  # 导入瓦片类型
+from tests.conftest import StoreFactory  # 导入存储工厂类型
+
+
+def test_write_behind_defers_until_flush(
+    tmp_path: Path, make_store: StoreFactory
+) -> None:  # 定义测试函数,验证延迟写回
+    """延迟写回模式下保存只标记脏数据,刷盘或达到阈值后才落盘。"""  # 函数 docstring,说明测试目标
+
+    store = make_store(write_behind=True, flush_threshold=3)  # 创建延迟写回的世界存储
+    chunk = store.load_chunk(cx=0, cy=0)  # 加载区块
+    chunk.apply_cell(2, 2, TileCell(base=TileType.WATER))  # 修改格子
+    store.save_chunk(chunk)  # 保存区块
+    chunk_path = tmp_path / "world" / "chunks" / "0_0.json"  # 计算区块文件路径
+    assert not chunk_path.exists()  # 尚未落盘
+    assert store.dirty_count == 1  # 记录一个脏区块
+    assert store.load_chunk(cx=0, cy=0).cell_at(2, 2).base == TileType.WATER  # 读取命中内存
+    assert store.flush() == 1  # 手动刷盘写入一个文件
+    assert chunk_path.exists() and store.dirty_count == 0  # 刷盘后落盘且无脏数据
+
+    for cx in range(1, 4):  # 连续修改并保存三个区块
+        edited = store.load_chunk(cx=cx, cy=0)  # 加载区块
+        edited.apply_cell(0, 0, TileCell(base=TileType.ROAD))  # 修改格子
+        store.save_chunk(edited)  # 保存区块
+    assert store.dirty_count == 0  # 达到阈值后内联刷盘
+    assert (tmp_path / "world" / "chunks" / "3_0.json").exists()  # 最后一个区块已落盘
+
+
+def test_journal_recovers_uncheckpointed_changes(
+    tmp_path: Path, make_store: StoreFactory
+) -> None:  # 定义测试函数,验证日志回放
+    """未检查点的事务应在重启时回放,截断的尾帧被丢弃且旧日志段被删除。"""  # 函数 docstring
+
+    settings = get_settings()  # 加载配置
+
+    def open_store() -> WorldStore:  # 定义存储工厂
+        """创建启用预写日志的世界存储。"""  # 函数 docstring,说明用途
+
+        return make_store(  # 返回存储实例
+            journal=True,  # 启用预写日志
+            active_tiles=build_tick_engine(settings).active_tiles,  # 传入关注的瓦片
+        )  # 结束存储初始化
+
+    store = open_store()  # 创建存储
+    quests = [{"id": "q1", "progress": 0}, {"id": "q2", "progress": 0}]  # 构造任务
+    store.save_quests_raw(quests)  # 保存任务
+    with store.transaction():  # 模拟一次动作
+        store.ensure_usage("甲", "PLANT_TREE", client_ts=1_000, quota=None, cooldown=None)
+        chunk = store.load_chunk(cx=0, cy=0)  # 加载区块
+        chunk.apply_cell(3, 4, TileCell(deco=TileType.SHRUB))  # 种下灌木
+        store.save_chunk(chunk)  # 保存区块
+        store.set_active("shrubs", 0, 0, 3, 4, active=True)  # 登记活跃索引
+        store.save_quests_raw([{"id": "q1", "progress": 1}, {"id": "q2", "progress": 0}])
+    assert not (tmp_path / "world" / "chunks" / "0_0.json").exists()  # 尚未检查点
+    segment = next((tmp_path / "world" / "journal").glob("*.wal"))  # 定位日志段
+    with segment.open("ab") as handle:  # 模拟写到一半崩溃
+        handle.write(b"\x40\x00\x00\x00partial")  # 追加截断的帧
+
+    recovered = open_store()  # 模拟重启
+    cell = recovered.load_chunk(cx=0, cy=0).cell_at(3, 4)  # 读取回放后的格子
+    assert cell.deco == TileType.SHRUB  # 区块已恢复
+    assert recovered.load_chunk(cx=0, cy=0).revision == 1  # 修订号已恢复
+    assert recovered.iter_active("shrubs")[0][1] == [(3, 4)]  # 活跃索引已恢复
+    assert recovered.load_quests_raw()[0]["progress"] == 1  # 任务增量已恢复
+    with pytest.raises(UsageLimitError):  # 用量已恢复,配额 1 次已用完
+        recovered.ensure_usage("甲", "PLANT_TREE", client_ts=2_000, quota=1, cooldown=None)
+    assert (tmp_path / "world" / "chunks" / "0_0.json").exists()  # 回放后写出检查点
+    assert not list((tmp_path / "world" / "journal").glob("*.wal"))  # 旧日志段已删除
@@ -0,0 +1,206 @@
+"""针对 tick 系统、活跃格子索引与惰性成长的测试用例。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+from pathlib import Path  # 导入 Path,用于临时目录类型标注
+
+from miniWorld.config import get_settings  # 导入配置获取函数
+from miniWorld.world.actions import CellChange  # 导入内部格子变更记录
+from miniWorld.world.chunk import Chunk, TileCell  # 导入区块与格子模型
+from miniWorld.world.executor import TickExecutor  # 导入跨进程 tick 执行器
+from miniWorld.world.store import WorldStore  # 导入世界存储
+from miniWorld.world.systems import (  # 导入 tick 系统
+    CropGrowthSystem,  # 作物成长
+    SeasonSystem,  # 季节推进
+    ShrubSpreadSystem,  # 灌木蔓延
+    TickEngine,  # tick 引擎
+    TreeGrowthSystem,  # 树苗成长
+    build_tick_engine,  # 默认引擎工厂
+)  # 结束导入
+from miniWorld.world.tiles import TileType, tile_to_code  # 导入瓦片类型与编码函数
+from tests.conftest import StoreFactory  # 导入存储工厂类型
+
+
+def test_growth_index_tracks_and_rebuilds(
+    tmp_path: Path, make_store: StoreFactory
+) -> None:  # 定义测试函数,验证成长索引
+    """活跃格子索引应只返回登记的区块,并能在索引缺失时由区块重建。"""  # 函数 docstring
+
+    settings = get_settings()  # 加载配置
+    active_tiles = build_tick_engine(settings).active_tiles  # 各 tick 系统关注的瓦片
+    store = make_store(active_tiles=active_tiles)  # 创建临时世界存储
+    store.save_chunk(store.load_chunk(cx=9, cy=9))  # 保存一个没有灌木的区块
+    chunk = store.load_chunk(cx=1, cy=2)  # 加载目标区块
+    for x, y in [(5, 3), (1, 3), (0, 7)]:  # 放置三丛灌木
+        chunk.apply_cell(x, y, TileCell(deco=TileType.SHRUB))  # 写入灌木
+        store.set_active("shrubs", 1, 2, x, y, active=True)  # 登记活跃索引
+    store.save_chunk(chunk)  # 保存区块
+    store.set_active("shrubs", 1, 2, 0, 7, active=False)  # 移除一个格子
+    growing = store.iter_active("shrubs")  # 读取活跃格子
+    assert [(c.cx, c.cy) for c, _ in growing] == [(1, 2)]  # 只涉及登记的区块
+    assert growing[0][1] == [(1, 3), (5, 3)]  # 行优先排序
+
+    (tmp_path / "world" / "growth_index.json").unlink()  # 删除索引文件
+    fresh_store = make_store(active_tiles=active_tiles)  # 创建新的存储实例
+    rebuilt = fresh_store.iter_active("shrubs")  # 触发索引重建
+    assert [pos for _, positions in rebuilt for pos in positions] == [(1, 3), (5, 3), (0, 7)]
+
+
+def test_tick_systems_track_active_cells_and_stay_deterministic(
+    tmp_path: Path, make_store: StoreFactory
+) -> None:  # 定义测试函数,验证 tick 系统
+    """灌木只处理活跃格子,树苗与作物在加载区块时惰性追赶,结果与读取时机无关且可重放。"""
+
+    settings = get_settings()  # 加载配置
+    engine = TickEngine(  # 创建引擎
+        [TreeGrowthSystem(3), CropGrowthSystem(2), ShrubSpreadSystem(1.0), SeasonSystem(2)]
+    )  # 结束创建
+
+    def open_store(root: Path, **options: object) -> WorldStore:  # 定义存储工厂
+        """创建接入引擎的世界存储。"""  # 函数 docstring,说明用途
+
+        return make_store(  # 返回存储实例
+            root=root,  # 使用给定目录
+            tick_tree_grow_steps=3,  # 树苗三步成熟
+            active_tiles=engine.active_tiles,  # 各系统关注的瓦片
+            catch_up=engine.catch_up,  # 惰性系统的成长追赶
+            **options,  # 其他存储选项
+        )  # 结束存储初始化
+
+    def simulate(root: Path, ticks: int, peek: bool) -> tuple[WorldStore, list[list[tuple]]]:
+        """放置树苗、农田与灌木后执行若干次 tick;peek 为真时每次 tick 后都读取区块。"""
+
+        store = open_store(root, cache_max_chunks=1)  # 只缓存一个区块,迫使淘汰后重新加载
+        chunk = store.load_chunk(cx=0, cy=0)  # 加载区块
+        codes = {  # 初始格子
+            (1, 1): (tile_to_code(TileType.GRASS), tile_to_code(TileType.TREE_SAPLING), 0, 0),
+            (5, 5): (tile_to_code(TileType.FARM), 0, 0, 255),  # 刚翻耕的农田
+            (9, 9): (tile_to_code(TileType.GRASS), tile_to_code(TileType.SHRUB), 0, 255),
+        }  # 结束字典
+        changes = [  # 模拟动作产生的变更
+            CellChange(0, 0, x, y, chunk.read_codes([(x, y)])[0], after)  # 单格变更
+            for (x, y), after in codes.items()  # 遍历格子
+        ]  # 结束列表
+        chunk.write_codes((change.x, change.y, change.after) for change in changes)  # 写入格子
+        store.save_chunk(chunk)  # 保存区块
+        assert store.track_changes(changes) == 1  # 只有灌木登记到活跃集合
+        history = []  # 每次 tick 的变更
+        for _ in range(ticks):  # 执行 tick
+            history.append([(c.x, c.y, c.before, c.after) for c in engine.run(store)[1]])  # 变更
+            if peek:  # 每次 tick 后读取
+                store.load_chunk(cx=0, cy=0)  # 触发成长追赶
+                store.load_chunk(cx=5, cy=5)  # 挤出缓存中的目标区块
+        return store, history  # 返回结果
+
+    store, history = simulate(tmp_path / "a", 3, peek=True)  # 执行三次 tick,每次都读取
+    chunk = store.load_chunk(cx=0, cy=0)  # 读取区块
+    assert chunk.sim_tick == 3  # 已追赶到当前 tick
+    assert chunk.cell_at(1, 1).deco == TileType.TREE  # 树苗三步后成树
+    assert chunk.cell_at(5, 5).growth_stage == 2  # 作物停在成熟阶段
+    assert all(c[:2] not in ((1, 1), (5, 5)) for tick in history for c in tick)  # 变更只有灌木
+    shrubs = [pos for _, cells in store.iter_active("shrubs") for pos in cells]  # 灌木集合
+    assert len(shrubs) > 1 and (9, 9) in shrubs  # 新长出的灌木被增量登记
+    assert all(chunk.cell_at(x, y).deco == TileType.SHRUB for x, y in shrubs)  # 集合与区块一致
+    state = store.load_world_state()  # 读取世界状态
+    assert state.tick == 3 and state.season == "夏"  # 每两个 tick 换季
+    lazy, lazy_history = simulate(tmp_path / "b", 3, peek=False)  # 只在最后读取
+    assert lazy_history == history  # 相同种子的世界结果一致
+    assert lazy.load_chunk(cx=0, cy=0) == chunk  # 读取时机不影响 tick 3 的区块内容
+
+    tick, _ = engine.run(store)  # 再执行一次 tick
+    assert tick == store.load_world_state().tick == 4  # 返回写入世界状态的 tick 序号
+    store.load_chunk(cx=0, cy=0).cell_at(5, 5)  # 内存中追赶到 tick 4,不标记脏数据
+    reopened = open_store(tmp_path / "a")  # 重新打开存储,磁盘上仍是 tick 3 的区块
+    assert reopened.load_chunk(cx=0, cy=0).planes == store.load_chunk(cx=0, cy=0).planes
+
+    legacy = tmp_path / "legacy"  # 旧版成长索引目录
+    (legacy / "world").mkdir(parents=True)  # 创建目录
+    (legacy / "world" / "growth_index.json").write_text('{"0_0": [[1, 1]]}')  # 旧版平铺格式
+    old = make_store(  # 创建读取旧索引的存储
+        root=legacy,  # 使用旧目录
+        tick_tree_grow_steps=3,  # 成长步数
+        active_tiles=build_tick_engine(settings).active_tiles,  # 默认系统
+    )  # 结束存储初始化
+    assert old.iter_active("trees") == []  # 树苗改为惰性成长,旧索引被丢弃
+    assert old.iter_active("shrubs") == []  # 关注瓦片的系统由一次扫描补齐
+
+
+def test_growth_kernel_matches_per_cell_loop() -> None:  # 定义测试函数,验证整块成长内核
+    """整块平面内核与逐格成长结果一致,差异只包含变化的格子且应用后记入修改记录。"""
+
+    size = 16  # 区块边长
+    codes = [  # 循环铺设的格子编码:树苗、农田、放了装饰的农田、灌木与空草地
+        (tile_to_code(TileType.GRASS), tile_to_code(TileType.TREE_SAPLING), 0, 255),
+        (tile_to_code(TileType.GRASS), tile_to_code(TileType.TREE_SAPLING), 1, 1),
+        (tile_to_code(TileType.FARM), 0, 0, 255),  # 刚翻耕的农田
+        (tile_to_code(TileType.FARM), 0, 0, 1),  # 成长中的作物
+        (tile_to_code(TileType.FARM), tile_to_code(TileType.ROCK), 0, 255),  # 被占用的农田
+        (tile_to_code(TileType.GRASS), tile_to_code(TileType.SHRUB), 2, 255),  # 灌木
+        (tile_to_code(TileType.GRASS), 0, 0, 255),  # 空草地
+    ]  # 结束列表
+    writes = [(i % size, i // size, codes[i * 5 % len(codes)]) for i in range(size * size)]
+    engine = build_tick_engine(get_settings())  # 默认引擎,树苗 3 步、作物 4 步成熟
+    for elapsed in (1, 2, 3, 50):  # 不同的追赶量
+        chunk = Chunk.create_default(cx=2, cy=3, size=size)  # 创建区块
+        chunk.write_codes(writes)  # 铺设格子
+        chunk.drain_touched()  # 清空修改记录
+        expected = []  # 逐格计算的期望编码
+        for _, _, (base, deco, height, growth) in writes:  # 遍历格子
+            stage = (0 if growth == 255 else growth) + elapsed  # 追赶后的阶段
+            if deco == tile_to_code(TileType.TREE_SAPLING):  # 树苗
+                deco, growth = (tile_to_code(TileType.TREE), 255) if stage >= 3 else (deco, stage)
+            elif base == tile_to_code(TileType.FARM) and deco == 0:  # 空置农田
+                growth = min(stage, 4)  # 作物封顶
+            expected.append((base, deco, height, growth))  # 记录编码
+        (diff,) = engine.catch_up_diffs([chunk], elapsed)  # 计算差异
+        assert (diff.cx, diff.cy) == (2, 3)  # 差异属于该区块
+        changes = diff.changes(chunk)  # 应用前生成变更记录
+        indices = [c.y * size + c.x for c in changes]  # 变化格子的下标
+        assert [c.after for c in changes] == [expected[i] for i in indices]  # 变更一致
+        assert all(c.before != c.after for c in changes)  # 只包含变化的格子
+        diff.apply(chunk)  # 应用差异
+        assert chunk.read_codes([(x, y) for x, y, _ in writes]) == expected  # 与逐格结果一致
+        assert chunk.drain_touched() == indices  # 变化的格子进入日志增量
+    blank = Chunk.create_default(cx=0, cy=0, size=size)  # 空白区块
+    assert engine.catch_up_diffs([blank, chunk], 5) == []  # 已成熟的区块与空白区块都没有差异
+
+
+def test_tick_executor_matches_serial_engine(
+    tmp_path: Path, make_store: StoreFactory
+) -> None:  # 定义测试函数,验证并行 tick
+    """进程池计算的灌木蔓延与单进程结果完全一致,变更顺序与区块内容相同。"""
+
+    shrub = (tile_to_code(TileType.GRASS), tile_to_code(TileType.SHRUB), 0, 255)  # 灌木编码
+
+    def simulate(root: Path, engine: TickEngine) -> tuple[list[list[tuple]], list[bytes]]:
+        """在 40 个区块中放置灌木并执行三次 tick,返回每次的变更与最终平面。"""
+
+        store = make_store(  # 创建存储
+            root=root,  # 使用给定目录
+            tick_tree_grow_steps=3,  # 成长步数
+            active_tiles=engine.active_tiles,  # 各系统关注的瓦片
+        )  # 结束存储初始化
+        for cx in range(40):  # 逐个区块放置灌木
+            chunk = store.load_chunk(cx=cx, cy=0)  # 加载区块
+            changes = [  # 模拟动作产生的变更
+                CellChange(cx, 0, x, y, chunk.read_codes([(x, y)])[0], shrub)  # 单格变更
+                for x, y in ((3, 3), (10, 20), (31, 31))  # 包括区块边缘
+            ]  # 结束列表
+            chunk.write_codes((change.x, change.y, change.after) for change in changes)  # 写入
+            store.save_chunk(chunk)  # 保存区块
+            store.track_changes(changes)  # 登记活跃格子
+        history = [  # 每次 tick 的变更
+            [(c.cx, c.cy, c.x, c.y, c.before, c.after) for c in engine.run(store)[1]]  # 变更
+            for _ in range(3)  # 执行三次 tick
+        ]  # 结束列表
+        planes = [b"".join(chunk.planes) for chunk in store.iter_chunks()]  # 最终平面
+        return history, planes  # 返回结果
+
+    serial = simulate(tmp_path / "serial", TickEngine([ShrubSpreadSystem(0.5)]))  # 单进程
+    engine = TickEngine([ShrubSpreadSystem(0.5)], executor=TickExecutor(2))  # 两个工作进程
+    try:  # 确保关闭进程池
+        parallel = simulate(tmp_path / "parallel", engine)  # 并行执行
+    finally:  # 清理阶段
+        engine.close()  # 关闭工作进程
+    assert sum(map(len, serial[0])) > 40  # 灌木确实在蔓延
+    assert parallel == serial  # 变更顺序与区块内容一致
@@ -0,0 +1,72 @@
+"""针对角色用量账本持久化与日志回放的测试用例。"""  # 模块 docstring,说明用途
+
+from __future__ import annotations  # 导入未来注解特性,支持前向引用
+
+import threading  # 导入 threading,模拟并发动作
+from pathlib import Path  # 导入 Path,用于临时目录类型标注
+
+import pytest  # 导入 pytest,用于断言异常
+
+from miniWorld.world.store import UsageLimitError, WorldStore  # 导入世界存储与用量异常
+from tests.conftest import StoreFactory  # 导入存储工厂类型
+
+
+def test_usage_ledger_persists_snapshot_plus_delta(
+    tmp_path: Path, make_store: StoreFactory
+) -> None:  # 定义测试函数
+    """用量校验不写盘,刷盘时写增量,变化较多时改写快照,重启后配额与跨日重置均生效。"""  # docstring
+
+    def open_store() -> WorldStore:  # 定义存储工厂
+        """创建快照阈值为 2 的世界存储。"""  # 函数 docstring,说明用途
+
+        return make_store(usage_snapshot_every=2)  # 返回存储实例
+
+    world_dir = tmp_path / "world"  # 世界数据目录
+    store = open_store()  # 创建存储
+    store.ensure_usage("甲", "PLACE_TILE", client_ts=1_000, quota=1, cooldown=None)  # 首次执行
+    assert not list(world_dir.glob("actor_usage*"))  # 请求路径上未写盘
+    store.flush()  # 刷盘
+    assert (world_dir / "actor_usage.delta.json").exists()  # 只写出增量
+    assert not (world_dir / "actor_usage.json").exists()  # 尚无快照
+    reopened = open_store()  # 模拟重启
+    with pytest.raises(UsageLimitError):  # 增量已恢复,配额用完
+        reopened.ensure_usage("甲", "PLACE_TILE", client_ts=2_000, quota=1, cooldown=None)
+    reopened.ensure_usage("甲", "PLACE_TILE", client_ts=86_400_000, quota=1, cooldown=None)
+    reopened.ensure_usage("乙", "PLANT_TREE", client_ts=86_400_000, quota=None, cooldown=60)
+    reopened.flush()  # 两个键变化,改写快照
+    assert (world_dir / "actor_usage.json").exists()  # 已写出快照
+    final = open_store()  # 再次重启,旧代增量被忽略
+    with pytest.raises(UsageLimitError):  # 冷却已恢复
+        final.ensure_usage("乙", "PLANT_TREE", client_ts=86_401_000, quota=None, cooldown=60)
+    with pytest.raises(UsageLimitError):  # 次日配额已用完
+        final.ensure_usage("甲", "PLACE_TILE", client_ts=86_402_000, quota=1, cooldown=None)
+
+
+def test_usage_journal_order_matches_counter_order(
+    make_store: StoreFactory,
+) -> None:  # 定义测试函数
+    """同一角色的并发动作按相反顺序提交事务时,回放后的用量仍是最后一次计数。"""  # docstring
+
+    store = make_store(journal=True)  # 创建启用预写日志的存储
+    counted = threading.Event()  # 第一个动作已计数
+    committed = threading.Event()  # 第二个动作已提交
+
+    def first() -> None:  # 定义先计数、后提交的动作
+        """计数后等待另一个动作提交,再提交自己的事务。"""  # 函数 docstring,说明用途
+
+        with store.transaction():  # 开启事务
+            store.ensure_usage("甲", "PLACE_TILE", client_ts=1_000, quota=None, cooldown=None)
+            counted.set()  # 通知已计数
+            assert committed.wait(timeout=5)  # 等待另一个动作提交
+
+    worker = threading.Thread(target=first)  # 创建线程
+    worker.start()  # 启动线程
+    assert counted.wait(timeout=5)  # 等待第一个动作计数
+    with store.transaction():  # 第二个动作
+        store.ensure_usage("甲", "PLACE_TILE", client_ts=2_000, quota=None, cooldown=None)
+    committed.set()  # 通知已提交
+    worker.join()  # 等待第一个动作提交
+
+    recovered = make_store(journal=True)  # 模拟重启,从日志回放
+    with pytest.raises(UsageLimitError):  # 回放得到两次计数,配额 2 次已用完
+        recovered.ensure_usage("甲", "PLACE_TILE", client_ts=3_000, quota=2, cooldown=None)
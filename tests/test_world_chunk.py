@@ -4,9 +4,14 @@ from __future__ import annotations  # 导入未来注解特性,支持前向引
 
 from pathlib import Path  # 导入 Path,用于定位文件
 
+import pytest  # 导入 pytest,用于断言异常
+
 from miniWorld.config import get_settings  # 导入配置获取函数
-from miniWorld.world.store import WorldStore  # 导入世界存储
-from miniWorld.world.tiles import TileType  # 导入瓦片类型
+from miniWorld.world.actions import CellChange  # 导入内部格子变更记录
+from miniWorld.world.chunk import Chunk, TileCell  # 导入区块与格子模型
+from miniWorld.world.store import WorldStore  # 导入世界存储与用量异常
+from miniWorld.world.tiles import TileType  # 导入瓦片类型与编码函数
+from tests.conftest import StoreFactory  # 导入存储工厂类型
 
 
 def test_chunk_creation_and_bounds(tmp_path: Path) -> None:  # 定义测试函数,验证默认创建与越界校验
@@ -53,3 +58,109 @@ def test_chunk_persistence_roundtrip(tmp_path: Path) -> None:  # 定义测试函
     )  # 结束新存储初始化
     reloaded = fresh_store.load_chunk(cx=2, cy=3)  # 重新加载区块
     assert reloaded.cell_at(1, 1).base == TileType.ROAD  # 断言修改被持久化
+
+
+def test_binary_chunk_format_and_migration(
+    tmp_path: Path, make_store: StoreFactory
+) -> None:  # 定义测试函数,验证二进制格式
+    """二进制格式应可往返,并能自动识别与迁移旧的 JSON 区块。"""  # 函数 docstring,说明测试目标
+
+    json_store = make_store()  # 创建 JSON 格式存储
+    chunk = json_store.load_chunk(cx=-1, cy=4)  # 加载目标区块
+    new_cell = chunk.cell_at(3, 2).model_copy(deep=True)  # 复制格子
+    new_cell.deco = TileType.TREE_SAPLING  # 放置树苗
+    new_cell.growth_stage = 2  # 设置成长阶段
+    new_cell.height = -3  # 设置负高度
+    chunk.apply_cell(3, 2, new_cell)  # 应用修改
+    json_store.save_chunk(chunk)  # 以 JSON 保存
+    json_path = tmp_path / "world" / "chunks" / "-1_4.json"  # JSON 文件路径
+    assert json_path.exists()  # 断言 JSON 文件存在
+
+    binary_store = make_store(chunk_format="binary")  # 创建二进制格式存储
+    assert binary_store.load_chunk(cx=-1, cy=4).cell_at(3, 2).growth_stage == 2  # 自动识别旧 JSON
+    assert binary_store.migrate_chunks() == 1  # 迁移一个区块
+    binary_path = tmp_path / "world" / "chunks" / "-1_4.chunk"  # 二进制文件路径
+    assert binary_path.exists() and not json_path.exists()  # 断言文件已替换
+    assert binary_path.stat().st_size < 5_000  # 断言体积远小于 JSON
+
+    fresh_store = make_store()  # 创建新的存储实例,确保从磁盘重新加载
+    reloaded = fresh_store.load_chunk(cx=-1, cy=4)  # 从二进制文件加载
+    assert reloaded.model_dump(mode="json") == chunk.model_dump(mode="json")  # 断言数据一致
+    assert [c.cx for c in fresh_store.iter_chunks()] == [-1]  # 断言遍历可发现二进制区块
+
+
+def test_array_backed_chunk_views_and_dump() -> None:  # 定义测试函数,验证平面存储区块
+    """格子视图应为只读快照,序列化结构与旧版 grid 保持一致。"""  # 函数 docstring,说明测试目标
+
+    chunk = Chunk.create_default(cx=0, cy=0, size=4)  # 创建小尺寸默认区块
+    view = chunk.cell_at(2, 1)  # 读取格子视图
+    new_cell = view.model_copy(deep=True)  # 复制为可修改格子
+    new_cell.deco = TileType.TREE_SAPLING  # 放置树苗
+    new_cell.growth_stage = 1  # 设置成长阶段
+    chunk.apply_cell(2, 1, new_cell)  # 写回区块
+    assert view.deco is None  # 旧视图保持修改前的快照
+    assert chunk.cell_at(2, 1).deco == TileType.TREE_SAPLING  # 新视图读取到树苗
+    assert chunk.find_cells("deco", TileType.TREE_SAPLING) == [(2, 1)]  # 整块扫描定位树苗
+    assert chunk.to_summary() == {"GRASS": 16}  # 统计基础瓦片
+
+    payload = chunk.model_dump(mode="json")  # 序列化区块
+    assert list(payload) == ["cx", "cy", "size", "version", "revision", "sim_tick", "grid"]  # 顺序
+    assert payload["grid"][1][2] == {  # 断言单格结构
+        "base": "GRASS",  # 基础瓦片
+        "deco": "TREE_SAPLING",  # 装饰
+        "height": 0,  # 高度
+        "growth_stage": 1,  # 成长阶段
+    }  # 结束断言
+    assert Chunk.model_validate(payload) == chunk  # 反序列化后等价
+
+    bad_cell = TileCell(height=3)  # 构造合法格子
+    bad_cell.height = 99  # 绕过模型校验写入非法高度
+    try:  # 尝试写入非法数据
+        chunk.apply_cell(0, 0, bad_cell)  # 应当被拒绝
+    except ValueError:  # 捕获异常
+        pass  # 表示测试通过
+    else:  # 未抛出异常
+        raise AssertionError("非法高度应当抛出 ValueError")  # 手动失败测试
+
+
+def test_default_chunks_share_planes_until_written(
+    tmp_path: Path, make_store: StoreFactory
+) -> None:  # 定义测试函数
+    """默认区块共享只读平面,首次写入时复制,未修改的区块不落盘也不参与遍历。"""  # 函数 docstring
+
+    first = Chunk.create_default(cx=0, cy=0, size=8)  # 创建默认区块
+    second = Chunk.create_default(cx=1, cy=0, size=8)  # 再创建一个默认区块
+    assert first.is_shared_default and first.planes[0] is second.planes[0]  # 平面共享
+    first.apply_cell(1, 1, TileCell(base=TileType.ROAD))  # 写入格子
+    assert not first.is_shared_default and first.planes[0] is not second.planes[0]  # 写时复制
+    assert second.cell_at(1, 1).base == TileType.GRASS  # 另一区块不受影响
+    store = make_store()  # 创建文件存储
+    store.save_chunk(store.load_chunk(cx=3, cy=3))  # 保存未修改的区块
+    assert not (tmp_path / "world" / "chunks" / "3_3.json").exists()  # 未产生文件
+    edited = store.load_chunk(cx=4, cy=4)  # 加载另一区块
+    edited.apply_cell(0, 0, TileCell(base=TileType.ROAD))  # 修改格子
+    store.save_chunk(edited)  # 保存修改
+    assert [(chunk.cx, chunk.cy) for chunk in store.iter_chunks()] == [(4, 4)]  # 仅遍历修改过的区块
+
+
+def test_cell_codes_round_trip_to_public_change() -> None:  # 定义测试函数,验证编码级变更记录
+    """编码级读写与 TileCell 路径等价,CellChange 在边界转换出与 model_dump 相同的数据。"""
+
+    chunk = Chunk.create_default(cx=3, cy=4)  # 创建默认区块
+    chunk.apply_cell(1, 2, TileCell(base=TileType.SOIL, deco=TileType.TREE_SAPLING, growth_stage=2))
+    before_dump = chunk.cell_at(1, 2).model_dump()  # 导出修改前数据
+    [before] = chunk.read_codes([(1, 2)])  # 读取编码
+    after = (before[0], before[1], -3, 3)  # 修改高度与成长阶段
+    chunk.write_codes([(1, 2, after)])  # 写入编码
+    assert chunk.cell_at(1, 2) == (TileType.SOIL, TileType.TREE_SAPLING, -3, 3)  # 与模型视图一致
+    public = CellChange(3, 4, 1, 2, before, after).to_action_change().model_dump()  # 边界转换
+    assert public == {  # 与原 ActionChange 结构一致
+        "chunk": {"cx": 3, "cy": 4},  # 区块坐标
+        "pos": {"x": 1, "y": 2},  # 格子坐标
+        "before": before_dump,  # 修改前
+        "after": chunk.cell_at(1, 2).model_dump(),  # 修改后
+    }  # 结束字典
+    with pytest.raises(ValueError):  # 未知瓦片编码
+        chunk.write_codes([(0, 0, (99, 0, 0, 0))])  # 写入非法编码
+    with pytest.raises(ValueError):  # 坐标越界
+        chunk.read_codes([(32, 0)])  # 读取越界格子